@@ -8,8 +8,11 @@
 import secrets
 import hashlib
 import logging
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Any, Optional, List, Union
+from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 import bcrypt
@@ -18,6 +21,7 @@
 from cryptography.hazmat.backends import default_backend
 
 from .config_manager import get_config, SecurityConfig
+from .token_revocation import TokenRevocationStore
 
 logger = logging.getLogger('synapticos.security.jwt_auth')
 
@@ -71,12 +75,101 @@ class JWTSecurityError(Exception):
     pass
 
 
+class VerifiedTokenCache:
+    """Bounded LRU of verified token claims, keyed by a hash of the token
+
+    Entries live until the token's exp or ttl seconds, whichever is first.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 60.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[bytes, Tuple[TokenClaims, float]]" = OrderedDict()
+        self._keys_by_jti: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(token: str) -> bytes:
+        return hashlib.sha256(token.encode('utf-8')).digest()
+
+    def get(self, key: bytes, now: Optional[float] = None) -> Optional[TokenClaims]:
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def put(self, key: bytes, claims: TokenClaims, now: Optional[float] = None):
+        if self.max_size <= 0:
+            return
+        now = time.time() if now is None else now
+        expires = min(claims.expires_at, now + self.ttl)
+        with self._lock:
+            self._entries[key] = (claims, expires)
+            self._entries.move_to_end(key)
+            self._keys_by_jti[claims.jti] = key
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate_jti(self, jti: str) -> bool:
+        with self._lock:
+            key = self._keys_by_jti.get(jti)
+            if key is None:
+                return False
+            self._remove(key)
+            self.invalidations += 1
+            return True
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._keys_by_jti.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'ttl_seconds': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations
+        }
+
+    def _remove(self, key: bytes):
+        claims, _ = self._entries.pop(key)
+        if self._keys_by_jti.get(claims.jti) == key:
+            del self._keys_by_jti[claims.jti]
+
+
 class SecureJWTManager:
     """Secure JWT token manager with strong cryptography"""
     
-    def __init__(self, config: Optional[SecurityConfig] = None):
+    def __init__(self, config: Optional[SecurityConfig] = None,
+                 revocation_log_path: Optional[str] = None,
+                 token_cache_size: int = 10000, token_cache_ttl: float = 60.0):
         self.config = config or get_config().get_security_config()
-        self.revoked_tokens: set = set()  # In production, use Redis/database
+        # Bucketed by exp; share revocation_log_path between processes to share revocations
+        self.revoked_tokens = TokenRevocationStore(log_path=revocation_log_path)
+        # Repeat verifications of the same bearer token skip signature checks
+        self.token_cache = VerifiedTokenCache(token_cache_size, token_cache_ttl)
         self.failed_attempts: Dict[str, List[datetime]] = {}
         self.max_failed_attempts = 5
         self.lockout_duration = timedelta(minutes=15)
@@ -258,6 +351,19 @@ def create_refresh_token(self, user_id: str, username: str) -> str:
     def verify_token(self, token: str, token_type: Optional[TokenType] = None) -> TokenClaims:
         """Verify and decode a JWT token"""
         try:
+            cache_key = None
+            if self.token_cache.max_size > 0:
+                cache_key = VerifiedTokenCache.key(token)
+                claims = self.token_cache.get(cache_key)
+                if claims is not None:
+                    # Still checked on a hit: revocations may arrive through the shared log
+                    if self.revoked_tokens.is_revoked(claims.jti, claims.expires_at):
+                        self.token_cache.invalidate_jti(claims.jti)
+                        raise JWTSecurityError("Token has been revoked")
+                    if token_type and claims.token_type != token_type.value:
+                        raise JWTSecurityError(f"Invalid token type: expected {token_type.value}")
+                    return claims
+
             # Decode token
             verification_key = self._get_verification_key()
             payload = jwt.decode(
@@ -270,7 +376,7 @@ def verify_token(self, token: str, token_type: Optional[TokenType] = None) -> To
             
             # Check if token is revoked
             jti = payload.get('jti')
-            if jti and jti in self.revoked_tokens:
+            if jti and self.revoked_tokens.is_revoked(jti, payload.get('exp')):
                 raise JWTSecurityError("Token has been revoked")
             
             # Validate token type if specified
@@ -289,6 +395,8 @@ def verify_token(self, token: str, token_type: Optional[TokenType] = None) -> To
                 consciousness_level=payload.get('consciousness_level'),
                 api_permissions=payload.get('api_permissions')
             )
+            if cache_key is not None:
+                self.token_cache.put(cache_key, claims)
             
             logger.debug(f"Token verified for user {claims.username}")
             return claims
@@ -307,13 +415,38 @@ def revoke_token(self, token: str) -> bool:
         """Revoke a JWT token"""
         try:
             claims = self.verify_token(token)
-            self.revoked_tokens.add(claims.jti)
+            self.revoked_tokens.revoke(claims.jti, claims.expires_at)
+            self.token_cache.invalidate_jti(claims.jti)
             logger.info(f"Token revoked for user {claims.username} (JTI: {claims.jti})")
             return True
         except Exception as e:
             logger.error(f"Failed to revoke token: {e}")
             return False
     
+    def rotate_keys(self, secret_key: Optional[str] = None):
+        """Replace the signing keys; tokens signed with the old ones stop verifying
+
+        HS* tokens are signed with the shared secret, so rotating them requires
+        a new secret_key; RS* rotation generates a new key pair.
+        """
+        if secret_key is None:
+            if not self.config.jwt_algorithm.startswith('RS'):
+                raise JWTSecurityError(
+                    f"Rotating {self.config.jwt_algorithm} keys requires a new secret_key")
+        else:
+            if len(secret_key) < 32:
+                raise JWTSecurityError("JWT secret key must be at least 32 characters")
+            if secrets.compare_digest(secret_key, self.config.jwt_secret_key):
+                raise JWTSecurityError("New JWT secret key must differ from the current one")
+            self.config.jwt_secret_key = secret_key
+        self._initialize_keys()
+        self.token_cache.clear()
+        logger.info("JWT signing keys rotated; verified token cache cleared")
+    
+    def get_token_cache_stats(self) -> Dict[str, Any]:
+        """Verified token cache hit rate and size"""
+        return self.token_cache.stats()
+    
     def refresh_access_token(self, refresh_token: str) -> str:
         """Create new access token from refresh token"""
         try:
@@ -14,20 +14,31 @@
 - Real-time performance monitoring
 """
 
+import abc
 import asyncio
+import os
 import time
 import hashlib
 import secrets
 import logging
-from typing import Dict, Optional, Tuple, List
+import multiprocessing
+import socket
+import sqlite3
+import tempfile
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple, List
 from dataclasses import dataclass, asdict
 from enum import Enum
 import json
-from datetime import datetime, timedelta
-import weakref
+from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor
 import psutil
 
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
 # Configure logging for academic analysis
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -81,8 +92,8 @@ def to_dict(self) -> Dict:
 class OptimizedHasher:
     """Hardware-optimized password hashing"""
     
-    def __init__(self):
-        self.executor = ThreadPoolExecutor(max_workers=psutil.cpu_count())
+    def __init__(self, max_workers: Optional[int] = None):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or psutil.cpu_count())
         
     async def hash_password_async(self, password: str, salt: bytes, iterations: int = 50000) -> bytes:
         """Async password hashing with reduced iterations for performance"""
@@ -98,128 +109,673 @@ async def verify_password_async(self, password: str, salt: bytes, stored_hash: b
         computed_hash = await self.hash_password_async(password, salt, iterations)
         return secrets.compare_digest(computed_hash, stored_hash)
 
+class LRUTTLCache:
+    """LRU cache with per-entry TTL, O(1) get/set/evict
+    
+    Entries live in an OrderedDict kept in recency order. Expiry is tracked
+    in a timer wheel of `slots` buckets of `resolution` seconds; each
+    operation advances the wheel past elapsed ticks and drops the entries
+    due in them, so expired entries are reclaimed without being read.
+    Entries further out than one wheel turn stay in their slot until due.
+    With reap_batch set, each call drops at most that many entries and
+    resumes where it stopped, so a burst of expiries is spread out.
+    """
+    
+    def __init__(self, max_size: Optional[int] = None, default_ttl: Optional[float] = None,
+                 max_bytes: Optional[int] = None, sizeof: Optional[Callable[[Any], int]] = None,
+                 refresh_on_get: bool = False, resolution: float = 1.0, slots: int = 4096,
+                 reap_batch: Optional[int] = None):
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.refresh_on_get = refresh_on_get
+        self.resolution = resolution
+        self.reap_batch = reap_batch
+        
+        # key -> [value, expires_at, ttl, size]
+        self._entries: OrderedDict = OrderedDict()
+        self._wheel: List[set] = [set() for _ in range(slots)]
+        self._tick = int(time.time() / resolution) - 1  # Last fully elapsed tick
+        self.total_bytes = 0
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, key) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and (entry[1] is None or entry[1] > time.time())
+    
+    def get(self, key, default=None, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        if int(now / self.resolution) - 1 > self._tick:
+            self.expire(now)
+        
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        if entry[1] is not None and entry[1] <= now:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+        
+        self._entries.move_to_end(key)
+        if self.refresh_on_get and entry[2] is not None:
+            self._schedule(key, entry, now + entry[2])
+        self.hits += 1
+        return entry[0]
+    
+    def set(self, key, value, ttl: Optional[float] = None, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        if int(now / self.resolution) - 1 > self._tick:
+            self.expire(now)
+        
+        ttl = self.default_ttl if ttl is None else ttl
+        size = self.sizeof(value) if self.sizeof else 0
+        
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.total_bytes -= entry[3]
+            entry[0], entry[2], entry[3] = value, ttl, size
+            self._entries.move_to_end(key)
+        else:
+            entry = [value, None, ttl, size]
+            self._entries[key] = entry
+        self.total_bytes += size
+        self._schedule(key, entry, now + ttl if ttl is not None else None)
+        
+        # Evict least recently used entries while over capacity
+        while self._entries and (
+            (self.max_size is not None and len(self._entries) > self.max_size) or
+            (self.max_bytes is not None and self.total_bytes > self.max_bytes)
+        ):
+            victim = next(iter(self._entries))
+            if victim == key and len(self._entries) == 1:
+                break
+            self._remove(victim)
+            self.evictions += 1
+    
+    def pop(self, key, default=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            return default
+        self._remove(key)
+        return entry[0]
+    
+    def clear(self):
+        self._entries.clear()
+        for bucket in self._wheel:
+            bucket.clear()
+        self.total_bytes = 0
+    
+    def items(self):
+        """Live (key, value) pairs, least recently used first"""
+        now = time.time()
+        return [(key, entry[0]) for key, entry in self._entries.items()
+                if entry[1] is None or entry[1] > now]
+    
+    def expire(self, now: Optional[float] = None, limit: Optional[int] = None) -> int:
+        """Advance the wheel to now and drop entries in the elapsed ticks
+        
+        At most `limit` (default reap_batch) entries are dropped per call.
+        """
+        now = time.time() if now is None else now
+        current = int(now / self.resolution) - 1
+        if current <= self._tick:
+            return 0
+        limit = self.reap_batch if limit is None else limit
+        
+        slots = len(self._wheel)
+        first = max(self._tick + 1, current - slots + 1)
+        expired = 0
+        for tick in range(first, current + 1):
+            bucket = self._wheel[tick % slots]
+            if not bucket:
+                continue
+            due = []
+            for key in bucket:
+                if self._entries[key][1] <= now:
+                    due.append(key)
+                    if limit is not None and expired + len(due) >= limit:
+                        break
+            for key in due:
+                self._remove(key)
+            expired += len(due)
+            if limit is not None and expired >= limit:
+                # Resume from this tick on the next call
+                self._tick = tick - 1
+                self.expirations += expired
+                return expired
+        self._tick = current
+        self.expirations += expired
+        return expired
+    
+    async def run_reaper(self, interval: float = 1.0):
+        """Background task that reaps expired entries while the cache is idle"""
+        while True:
+            await asyncio.sleep(interval)
+            # Full batches mean more may be due; yield to the loop between them
+            expired = self.expire()
+            while self.reap_batch and expired >= self.reap_batch:
+                await asyncio.sleep(0)
+                expired = self.expire()
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+    
+    def _schedule(self, key, entry: list, expires_at: Optional[float]):
+        if entry[1] is not None:
+            self._wheel[int(entry[1] / self.resolution) % len(self._wheel)].discard(key)
+        entry[1] = expires_at
+        if expires_at is not None:
+            self._wheel[int(expires_at / self.resolution) % len(self._wheel)].add(key)
+    
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        if entry[1] is not None:
+            self._wheel[int(entry[1] / self.resolution) % len(self._wheel)].discard(key)
+        self.total_bytes -= entry[3]
+
 class SessionManager:
-    """High-performance session management with Redis-like caching"""
+    """High-performance session management with Redis-like caching
+    
+    Sessions live in an LRUTTLCache, whose timer wheel is the expiry index:
+    expired sessions are reaped a batch at a time on each call and by a
+    background task, and len() is the active count. With persist_path set,
+    live sessions are snapshotted to that file and reloaded on start; a
+    revocation rewrites the snapshot before it returns.
+    """
     
-    def __init__(self):
-        self.sessions: Dict[str, Dict] = {}
-        self.session_refs = weakref.WeakValueDictionary()
-        self.cleanup_interval = 300  # 5 minutes
+    def __init__(self, session_ttl: int = 3600, max_sessions: Optional[int] = None,
+                 persist_path: Optional[str] = None, reap_batch: int = 1000):
+        self.session_ttl = session_ttl
+        self.sessions = LRUTTLCache(max_size=max_sessions, default_ttl=session_ttl, reap_batch=reap_batch)
+        self.cleanup_interval = 5  # Idle reaping, seconds
+        self.persist_path = persist_path
+        self.persist_interval = 60
+        self._reaper_task: Optional[asyncio.Task] = None
+        self._save_lock = asyncio.Lock()
+        # Revocations made so far, and how many the last snapshot reflects
+        self._revocations = 0
+        self._saved_revocations = 0
+        
+        if persist_path:
+            self.load()
         
     async def create_session(self, user_id: str, auth_request: AuthRequest) -> str:
         """Create optimized session with minimal overhead"""
         session_token = secrets.token_urlsafe(32)
+        now = time.time()
         
         session_data = {
             "user_id": user_id,
-            "created": time.time(),
-            "expires": time.time() + 3600,  # 1 hour
+            "created": now,
+            "expires": now + self.session_ttl,
             "ip": auth_request.client_ip,
             "user_agent": auth_request.user_agent[:100],  # Truncate for performance
-            "last_activity": time.time()
+            "last_activity": now
         }
         
-        self.sessions[session_token] = session_data
+        self.sessions.set(session_token, session_data, now=now)
+        self._ensure_reaper()
         return session_token
     
     async def validate_session(self, session_token: str) -> Tuple[bool, Optional[str]]:
         """Fast session validation"""
-        if session_token not in self.sessions:
-            return False, None
-            
-        session = self.sessions[session_token]
-        
-        if session["expires"] < time.time():
-            # Expired session - remove immediately
-            del self.sessions[session_token]
+        session = self.sessions.get(session_token)
+        if session is None:
             return False, None
             
         # Update last activity
         session["last_activity"] = time.time()
         return True, session["user_id"]
     
+    async def revoke_session(self, session_token: str):
+        """Invalidate a session before it expires"""
+        if self.sessions.pop(session_token) is None or not self.persist_path:
+            return
+        self._revocations += 1
+        revocations = self._revocations
+        async with self._save_lock:
+            # A snapshot taken while we waited may already exclude this session
+            if self._saved_revocations < revocations:
+                try:
+                    await self._save_locked()
+                except OSError as e:
+                    logger.warning(f"Session snapshot after revocation failed: {e}")
+    
+    async def count_active_sessions(self) -> int:
+        return self.get_active_sessions_count()
+    
     def get_active_sessions_count(self) -> int:
-        """Get current active session count"""
-        current_time = time.time()
-        active = sum(1 for session in self.sessions.values() 
-                    if session["expires"] > current_time)
-        return active
+        """Get current active session count (exact to one reaping tick)"""
+        return len(self.sessions)
+    
+    async def save(self):
+        """Snapshot live sessions to persist_path, readable by the owner only"""
+        async with self._save_lock:
+            await self._save_locked()
+    
+    async def _save_locked(self):
+        # Copy on the loop, where sessions are mutated; serialize and write in a thread
+        revocations = self._revocations
+        snapshot = {token: dict(data) for token, data in self.sessions.items()}
+        await asyncio.get_running_loop().run_in_executor(None, self._write_snapshot, snapshot)
+        self._saved_revocations = revocations
+    
+    def _write_snapshot(self, snapshot: Dict[str, Dict]):
+        tmp_path = f"{self.persist_path}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, self.persist_path)
+    
+    def load(self) -> int:
+        """Restore unexpired sessions from persist_path"""
+        try:
+            with open(self.persist_path) as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not load sessions from {self.persist_path}: {e}")
+            return 0
+        
+        if not isinstance(snapshot, dict):
+            logger.warning(f"Ignoring malformed session snapshot {self.persist_path}")
+            return 0
+        
+        now = time.time()
+        loaded = skipped = 0
+        for session_token, session_data in snapshot.items():
+            try:
+                remaining = session_data["expires"] - now
+            except (KeyError, TypeError):
+                skipped += 1
+                continue
+            if remaining > 0:
+                self.sessions.set(session_token, session_data, ttl=remaining, now=now)
+                loaded += 1
+        if skipped:
+            logger.warning(f"Skipped {skipped} malformed session records in {self.persist_path}")
+        logger.info(f"Restored {loaded} sessions from {self.persist_path}")
+        return loaded
+    
+    async def close(self):
+        """Stop background reaping and write a final snapshot"""
+        if self._reaper_task is not None:
+            self._reaper_task.cancel()
+            self._reaper_task = None
+        if self.persist_path:
+            await self.save()
+    
+    def _ensure_reaper(self):
+        if self._reaper_task is None or self._reaper_task.done():
+            self._reaper_task = asyncio.get_running_loop().create_task(self._reap_loop())
+    
+    async def _reap_loop(self):
+        """Reap expired sessions while idle and snapshot them periodically"""
+        last_save = time.monotonic()
+        while True:
+            await asyncio.sleep(self.cleanup_interval)
+            expired = self.sessions.expire()
+            while expired >= self.sessions.reap_batch:
+                await asyncio.sleep(0)
+                expired = self.sessions.expire()
+            
+            if self.persist_path and time.monotonic() - last_save >= self.persist_interval:
+                try:
+                    await self.save()
+                except OSError as e:
+                    logger.warning(f"Session snapshot failed: {e}")
+                last_save = time.monotonic()
 
 class RateLimiter:
     """Advanced rate limiting with sliding window"""
     
-    def __init__(self, max_requests_per_minute: int = 60):
+    def __init__(self, max_requests_per_minute: int = 60, max_identifiers: int = 100000):
         self.max_requests = max_requests_per_minute
-        self.requests: Dict[str, List[float]] = {}
+        # Idle identifiers expire after the window; the busiest are kept under pressure
+        self.requests = LRUTTLCache(max_size=max_identifiers, default_ttl=60)
         
     async def is_allowed(self, identifier: str) -> bool:
         """Check if request is within rate limits"""
         current_time = time.time()
         minute_ago = current_time - 60
         
-        if identifier not in self.requests:
-            self.requests[identifier] = []
+        window = self.requests.get(identifier, now=current_time)
+        if window is None:
+            window = deque()
             
         # Clean old requests
-        self.requests[identifier] = [
-            req_time for req_time in self.requests[identifier] 
-            if req_time > minute_ago
-        ]
+        while window and window[0] <= minute_ago:
+            window.popleft()
         
-        if len(self.requests[identifier]) >= self.max_requests:
+        if len(window) >= self.max_requests:
             return False
             
-        self.requests[identifier].append(current_time)
+        window.append(current_time)
+        self.requests.set(identifier, window, now=current_time)
         return True
 
 class UserCache:
     """High-performance user data caching"""
     
     def __init__(self, max_size: int = 10000, ttl_seconds: int = 300):
-        self.cache: Dict[str, Dict] = {}
-        self.access_times: Dict[str, float] = {}
+        # Entries expire after ttl_seconds without access
+        self.cache = LRUTTLCache(max_size=max_size, default_ttl=ttl_seconds, refresh_on_get=True)
         self.max_size = max_size
         self.ttl = ttl_seconds
         
     async def get_user(self, username: str) -> Optional[Dict]:
         """Get user from cache with LRU eviction"""
-        current_time = time.time()
-        
-        if username in self.cache:
-            # Check TTL
-            if current_time - self.access_times[username] < self.ttl:
-                self.access_times[username] = current_time
-                return self.cache[username]
-            else:
-                # Expired
-                del self.cache[username]
-                del self.access_times[username]
-        
-        return None
+        return self.cache.get(username)
     
     async def set_user(self, username: str, user_data: Dict):
         """Set user in cache with size management"""
-        current_time = time.time()
-        
-        # Evict oldest if at capacity
-        if len(self.cache) >= self.max_size:
-            oldest_user = min(self.access_times.keys(), 
-                            key=lambda k: self.access_times[k])
-            del self.cache[oldest_user]
-            del self.access_times[oldest_user]
+        self.cache.set(username, user_data)
+
+class AuthStateStore(abc.ABC):
+    """Session, revocation and rate-limit state shared by auth worker processes"""
+    
+    @abc.abstractmethod
+    async def put_session(self, session_token: str, session_data: Dict, ttl_seconds: float):
+        ...
+    
+    @abc.abstractmethod
+    async def get_session(self, session_token: str) -> Optional[Dict]:
+        ...
+    
+    @abc.abstractmethod
+    async def delete_session(self, session_token: str):
+        ...
+    
+    @abc.abstractmethod
+    async def count_sessions(self) -> int:
+        ...
+    
+    @abc.abstractmethod
+    async def revoke(self, token_id: str, ttl_seconds: float):
+        ...
+    
+    @abc.abstractmethod
+    async def is_revoked(self, token_id: str) -> bool:
+        ...
+    
+    @abc.abstractmethod
+    async def hit_rate_limit(self, identifier: str, limit: int, window_seconds: int = 60) -> bool:
+        """Count a request and return whether it is within the limit"""
+        ...
+    
+    async def close(self):
+        pass
+    
+    @staticmethod
+    def _sliding_window_allowed(previous: int, current: int, limit: int,
+                                now: float, window_seconds: int) -> bool:
+        """Sliding-window estimate from the previous and current fixed windows"""
+        elapsed = (now % window_seconds) / window_seconds
+        return previous * (1.0 - elapsed) + current <= limit
+
+class SQLiteAuthStateStore(AuthStateStore):
+    """Shared state in a WAL-mode SQLite file, by default on tmpfs (/dev/shm)
+    
+    Statements run on a single dedicated thread, so a worker waiting out
+    another process's write lock (busy_timeout) never stalls its event loop.
+    """
+    
+    def __init__(self, db_path: str = "/dev/shm/synos-auth-state.db", purge_interval: float = 30.0):
+        self.db_path = db_path
+        self.purge_interval = purge_interval
+        self._last_purge = time.time()
+        # Largest rate-limit window in use; purging by it never drops a live window
+        self.rate_window_seconds = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="auth-state-sqlite")
+        
+        self.conn = sqlite3.connect(db_path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA busy_timeout = 5000")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        # State is ephemeral; durability across power loss is not needed
+        self.conn.execute("PRAGMA synchronous = OFF")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                token TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                expires REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions(expires);
+            CREATE TABLE IF NOT EXISTS revoked (
+                token_id TEXT PRIMARY KEY,
+                expires REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS rate_limits (
+                identifier TEXT NOT NULL,
+                window INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (identifier, window)
+            ) WITHOUT ROWID;
+        """)
+    
+    async def _run(self, func: Callable, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+    
+    async def put_session(self, session_token: str, session_data: Dict, ttl_seconds: float):
+        await self._run(self._put_session, session_token, json.dumps(session_data), ttl_seconds)
+    
+    def _put_session(self, session_token: str, data: str, ttl_seconds: float):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO sessions (token, data, expires) VALUES (?, ?, ?)",
+            (session_token, data, time.time() + ttl_seconds)
+        )
+        self._maybe_purge()
+    
+    async def get_session(self, session_token: str) -> Optional[Dict]:
+        row = await self._run(self._fetchone,
+                              "SELECT data FROM sessions WHERE token = ? AND expires > ?",
+                              (session_token, time.time()))
+        return json.loads(row[0]) if row else None
+    
+    async def delete_session(self, session_token: str):
+        await self._run(self._fetchone, "DELETE FROM sessions WHERE token = ?", (session_token,))
+    
+    async def count_sessions(self) -> int:
+        row = await self._run(self._fetchone, "SELECT COUNT(*) FROM sessions WHERE expires > ?", (time.time(),))
+        return row[0]
+    
+    async def revoke(self, token_id: str, ttl_seconds: float):
+        await self._run(self._fetchone, "INSERT OR REPLACE INTO revoked (token_id, expires) VALUES (?, ?)",
+                        (token_id, time.time() + ttl_seconds))
+    
+    async def is_revoked(self, token_id: str) -> bool:
+        row = await self._run(self._fetchone, "SELECT 1 FROM revoked WHERE token_id = ? AND expires > ?",
+                              (token_id, time.time()))
+        return row is not None
+    
+    async def hit_rate_limit(self, identifier: str, limit: int, window_seconds: int = 60) -> bool:
+        return await self._run(self._hit_rate_limit, identifier, limit, window_seconds)
+    
+    def _hit_rate_limit(self, identifier: str, limit: int, window_seconds: int) -> bool:
+        now = time.time()
+        window = int(now // window_seconds)
+        self.rate_window_seconds = max(self.rate_window_seconds, window_seconds)
+        current = self.conn.execute(
+            "INSERT INTO rate_limits (identifier, window, count) VALUES (?, ?, 1) "
+            "ON CONFLICT (identifier, window) DO UPDATE SET count = count + 1 RETURNING count",
+            (identifier, window)
+        ).fetchone()[0]
+        row = self.conn.execute(
+            "SELECT count FROM rate_limits WHERE identifier = ? AND window = ?", (identifier, window - 1)
+        ).fetchone()
+        self._maybe_purge()
+        return self._sliding_window_allowed(row[0] if row else 0, current, limit, now, window_seconds)
+    
+    def _fetchone(self, sql: str, params: Tuple = ()):
+        return self.conn.execute(sql, params).fetchone()
+    
+    def _maybe_purge(self):
+        now = time.time()
+        if now - self._last_purge < self.purge_interval:
+            return
+        self._last_purge = now
+        self.conn.execute("DELETE FROM sessions WHERE expires <= ?", (now,))
+        self.conn.execute("DELETE FROM revoked WHERE expires <= ?", (now,))
+        if self.rate_window_seconds:
+            # Only the current and previous windows are read, so older ones are stale
+            self.conn.execute("DELETE FROM rate_limits WHERE window < ?",
+                              (int(now // self.rate_window_seconds) - 2,))
+    
+    async def close(self):
+        await self._run(self.conn.close)
+        self._executor.shutdown(wait=False)
+
+class RedisAuthStateStore(AuthStateStore):
+    """Shared state in a local Redis (or Redis-compatible) server"""
+    
+    def __init__(self, url: str = "redis://localhost:6379/0", prefix: str = "synos:auth:"):
+        if aioredis is None:
+            raise RuntimeError("redis package is required for the Redis auth state store")
+        self.client = aioredis.from_url(url)
+        self.prefix = prefix
+    
+    async def put_session(self, session_token: str, session_data: Dict, ttl_seconds: float):
+        await self.client.set(f"{self.prefix}session:{session_token}", json.dumps(session_data),
+                              px=int(ttl_seconds * 1000))
+    
+    async def get_session(self, session_token: str) -> Optional[Dict]:
+        data = await self.client.get(f"{self.prefix}session:{session_token}")
+        return json.loads(data) if data else None
+    
+    async def delete_session(self, session_token: str):
+        await self.client.delete(f"{self.prefix}session:{session_token}")
+    
+    async def count_sessions(self) -> int:
+        count = 0
+        async for _ in self.client.scan_iter(match=f"{self.prefix}session:*", count=1000):
+            count += 1
+        return count
+    
+    async def revoke(self, token_id: str, ttl_seconds: float):
+        await self.client.set(f"{self.prefix}revoked:{token_id}", 1, px=int(ttl_seconds * 1000))
+    
+    async def is_revoked(self, token_id: str) -> bool:
+        return bool(await self.client.exists(f"{self.prefix}revoked:{token_id}"))
+    
+    async def hit_rate_limit(self, identifier: str, limit: int, window_seconds: int = 60) -> bool:
+        now = time.time()
+        window = int(now // window_seconds)
+        key = f"{self.prefix}ratelimit:{identifier}:"
+        pipe = self.client.pipeline(transaction=False)
+        pipe.incr(f"{key}{window}")
+        pipe.expire(f"{key}{window}", window_seconds * 2)
+        pipe.get(f"{key}{window - 1}")
+        current, _, previous = await pipe.execute()
+        return self._sliding_window_allowed(int(previous or 0), current, limit, now, window_seconds)
+    
+    async def close(self):
+        await self.client.close()
+
+def open_auth_state_store(url: str) -> AuthStateStore:
+    """Open a state store from a URL: sqlite:///path/to.db or redis://host:port/db"""
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisAuthStateStore(url)
+    if url.startswith("sqlite://"):
+        url = url[len("sqlite://"):]
+    return SQLiteAuthStateStore(url)
+
+class SharedSessionManager(SessionManager):
+    """Session manager backed by an AuthStateStore shared between workers"""
+    
+    def __init__(self, store: AuthStateStore, session_ttl: int = 3600):
+        super().__init__()
+        self.store = store
+        self.session_ttl = session_ttl
+        self._last_active_count = 0
+    
+    async def create_session(self, user_id: str, auth_request: AuthRequest) -> str:
+        session_token = secrets.token_urlsafe(32)
+        now = time.time()
         
-        self.cache[username] = user_data
-        self.access_times[username] = current_time
+        await self.store.put_session(session_token, {
+            "user_id": user_id,
+            "created": now,
+            "expires": now + self.session_ttl,
+            "ip": auth_request.client_ip,
+            "user_agent": auth_request.user_agent[:100]
+        }, self.session_ttl)
+        return session_token
+    
+    async def validate_session(self, session_token: str) -> Tuple[bool, Optional[str]]:
+        session = await self.store.get_session(session_token)
+        if session is None:
+            return False, None
+        # A revoked token stays invalid even if another worker re-puts its session
+        if await self.store.is_revoked(session_token):
+            return False, None
+        return True, session["user_id"]
+    
+    async def revoke_session(self, session_token: str):
+        await self.store.delete_session(session_token)
+        await self.store.revoke(session_token, self.session_ttl)
+    
+    async def count_active_sessions(self) -> int:
+        self._last_active_count = await self.store.count_sessions()
+        return self._last_active_count
+    
+    async def close(self):
+        await self.store.close()
+    
+    def get_active_sessions_count(self) -> int:
+        """Last count fetched from the shared store"""
+        return self._last_active_count
+
+class SharedRateLimiter(RateLimiter):
+    """Sliding-window rate limiter backed by an AuthStateStore"""
+    
+    def __init__(self, store: AuthStateStore, max_requests_per_minute: int = 60):
+        super().__init__(max_requests_per_minute)
+        self.store = store
+    
+    async def is_allowed(self, identifier: str) -> bool:
+        return await self.store.hit_rate_limit(identifier, self.max_requests)
 
 class OptimizedAuthEngine:
     """A+ Grade Authentication Engine"""
     
-    def __init__(self):
-        self.hasher = OptimizedHasher()
-        self.session_manager = SessionManager()
-        self.rate_limiter = RateLimiter(max_requests_per_minute=120)  # Higher limit for A+
+    def __init__(self, state_store: Optional[AuthStateStore] = None, hash_workers: Optional[int] = None,
+                 session_persist_path: Optional[str] = None, rate_limit_per_minute: Optional[int] = 120):
+        self.hasher = OptimizedHasher(max_workers=hash_workers)
+        self.state_store = state_store
+        self.rate_limiter: Optional[RateLimiter] = None  # None disables rate limiting
+        if state_store is None:
+            self.session_manager = SessionManager(persist_path=session_persist_path)
+            if rate_limit_per_minute is not None:
+                self.rate_limiter = RateLimiter(max_requests_per_minute=rate_limit_per_minute)
+        else:
+            # Worker mode: state shared with the other worker processes
+            self.session_manager = SharedSessionManager(state_store)
+            if rate_limit_per_minute is not None:
+                self.rate_limiter = SharedRateLimiter(state_store, max_requests_per_minute=rate_limit_per_minute)
         self.user_cache = UserCache()
         self.metrics = PerformanceMetrics()
+        self._cache_reapers: List[asyncio.Task] = []
         
         # Performance tracking
         self.request_times: List[float] = []
@@ -274,13 +830,14 @@ async def _create_single_user(self, user_id: int):
     async def authenticate(self, auth_request: AuthRequest) -> AuthResponse:
         """High-performance authentication with comprehensive metrics"""
         start_time = time.perf_counter()
+        self._ensure_cache_reapers()
         
         try:
             # Update metrics
             self.metrics.total_requests += 1
             
             # Rate limiting check
-            if not await self.rate_limiter.is_allowed(auth_request.client_ip):
+            if self.rate_limiter is not None and not await self.rate_limiter.is_allowed(auth_request.client_ip):
                 return self._create_response(
                     AuthResult.RATE_LIMITED, None, None, start_time, False, 0.0,
                     "Rate limit exceeded"
@@ -381,10 +938,7 @@ async def get_performance_metrics(self) -> PerformanceMetrics:
         avg_response_time = sum(self.request_times) / len(self.request_times) if self.request_times else 0
         
         # Calculate cache hit rate
-        cache_hit_rate = 0.0
-        if self.metrics.total_requests > 0:
-            # This would be tracked properly in production
-            cache_hit_rate = 0.75  # Simulated 75% hit rate
+        cache_hit_rate = self.user_cache.cache.stats()["hit_rate"]
         
         # System metrics
         cpu_usage = psutil.cpu_percent(interval=0.1)
@@ -392,7 +946,7 @@ async def get_performance_metrics(self) -> PerformanceMetrics:
         memory_usage_mb = (memory_info.total - memory_info.available) / (1024 * 1024)
         
         # Active sessions
-        active_sessions = self.session_manager.get_active_sessions_count()
+        active_sessions = await self.session_manager.count_active_sessions()
         
         self.metrics.avg_response_time_ms = avg_response_time
         self.metrics.current_rps = current_rps
@@ -407,15 +961,192 @@ async def validate_session(self, session_token: str) -> Tuple[bool, Optional[str
         """Fast session validation"""
         return await self.session_manager.validate_session(session_token)
     
+    async def revoke_session(self, session_token: str):
+        """Revoke a session (across all workers when state is shared)"""
+        await self.session_manager.revoke_session(session_token)
+    
+    async def close(self):
+        """Release background tasks and persist or close session state"""
+        for task in self._cache_reapers:
+            task.cancel()
+        self._cache_reapers = []
+        await self.session_manager.close()
+    
+    def _ensure_cache_reapers(self):
+        """Reap the user cache and local rate-limit windows in the background, not only on access"""
+        if self._cache_reapers:
+            return
+        loop = asyncio.get_running_loop()
+        caches = [self.user_cache.cache]
+        if self.state_store is None and self.rate_limiter is not None:
+            caches.append(self.rate_limiter.requests)
+        self._cache_reapers = [loop.create_task(cache.run_reaper()) for cache in caches]
+    
     def get_cache_stats(self) -> Dict:
         """Get detailed cache statistics"""
         return {
             "user_cache_size": len(self.user_cache.cache),
             "user_cache_max": self.user_cache.max_size,
+            "user_cache": self.user_cache.cache.stats(),
             "session_count": len(self.session_manager.sessions),
             "active_sessions": self.session_manager.get_active_sessions_count()
         }
 
+def _auth_response_payload(response: AuthResponse) -> Dict:
+    payload = asdict(response)
+    payload["result"] = response.result.value
+    return payload
+
+def _request_client_ip(request: Dict, peer_ip: str, trusted_proxies: FrozenSet[str]) -> str:
+    """Rate-limit key: the socket peer, or the forwarded client_ip when the peer is a trusted proxy"""
+    if peer_ip in trusted_proxies and isinstance(request.get("client_ip"), str):
+        return request["client_ip"]
+    return peer_ip
+
+async def _handle_auth_connection(engine: OptimizedAuthEngine, reader: asyncio.StreamReader,
+                                  writer: asyncio.StreamWriter, trusted_proxies: FrozenSet[str] = frozenset()):
+    """Newline-delimited JSON requests: authenticate, validate_session, revoke_session"""
+    peer_ip = writer.get_extra_info("peername")[0]
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                request = json.loads(line)
+                op = request.get("op")
+                if op == "authenticate":
+                    response = await engine.authenticate(AuthRequest(
+                        username=request["username"],
+                        password=request["password"],
+                        client_ip=_request_client_ip(request, peer_ip, trusted_proxies),
+                        user_agent=request.get("user_agent", ""),
+                        request_id=request.get("request_id", ""),
+                        timestamp=time.time()
+                    ))
+                    payload = _auth_response_payload(response)
+                elif op == "validate_session":
+                    valid, user_id = await engine.validate_session(request["session_token"])
+                    payload = {"valid": valid, "user_id": user_id}
+                elif op == "revoke_session":
+                    await engine.revoke_session(request["session_token"])
+                    payload = {"revoked": True}
+                else:
+                    payload = {"error": f"Unknown operation: {op}"}
+            except (ValueError, KeyError) as e:
+                payload = {"error": f"Malformed request: {e}"}
+            
+            writer.write(json.dumps(payload).encode() + b"\n")
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+async def _serve_auth_worker(host: str, port: int, users: Dict[str, Dict], store_url: str,
+                             hash_workers: int, ready, rate_limit_per_minute: Optional[int] = 120,
+                             trusted_proxies: FrozenSet[str] = frozenset()):
+    engine = OptimizedAuthEngine(state_store=open_auth_state_store(store_url), hash_workers=hash_workers,
+                                 rate_limit_per_minute=rate_limit_per_minute)
+    engine.user_database = users
+    
+    # Every worker binds the same port; the kernel spreads connections across them
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    
+    server = await asyncio.start_server(
+        lambda reader, writer: _handle_auth_connection(engine, reader, writer, trusted_proxies),
+        sock=sock, backlog=1024
+    )
+    ready.set()
+    async with server:
+        await server.serve_forever()
+
+def _auth_worker_main(host: str, port: int, users: Dict[str, Dict], store_url: str,
+                      hash_workers: int, ready, rate_limit_per_minute: Optional[int] = 120,
+                      trusted_proxies: FrozenSet[str] = frozenset()):
+    """Worker process entry point"""
+    try:
+        asyncio.run(_serve_auth_worker(host, port, users, store_url, hash_workers, ready,
+                                       rate_limit_per_minute, trusted_proxies))
+    except KeyboardInterrupt:
+        pass
+
+class AuthWorkerServer:
+    """Shared-nothing auth worker processes behind one SO_REUSEPORT listener
+    
+    Each worker runs its own OptimizedAuthEngine and event loop; sessions,
+    revocations and rate limits live in the shared state store. Rate limits
+    are keyed on the connection's peer address; a request's client_ip is only
+    honoured when that peer is one of trusted_proxies.
+    """
+    
+    def __init__(self, users: Dict[str, Dict], store_url: str = "sqlite:///dev/shm/synos-auth-state.db",
+                 host: str = "127.0.0.1", port: int = 0, workers: Optional[int] = None,
+                 hash_workers: int = 1, rate_limit_per_minute: Optional[int] = 120,
+                 trusted_proxies: Optional[List[str]] = None):
+        if not hasattr(socket, "SO_REUSEPORT"):
+            raise RuntimeError("SO_REUSEPORT is not supported on this platform")
+        self.users = users
+        self.store_url = store_url
+        self.host = host
+        self.port = port
+        self.workers = workers or psutil.cpu_count()
+        self.hash_workers = hash_workers
+        self.rate_limit_per_minute = rate_limit_per_minute
+        self.trusted_proxies = frozenset(trusted_proxies or ())
+        self.processes: List[multiprocessing.Process] = []
+    
+    def start(self, timeout: float = 30.0) -> int:
+        """Start the workers and return the port they listen on"""
+        # Reserve the port (resolving port 0) until the workers have bound it
+        reservation = socket.socket(socket.AF_INET6 if ":" in self.host else socket.AF_INET, socket.SOCK_STREAM)
+        reservation.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        reservation.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        reservation.bind((self.host, self.port))
+        self.port = reservation.getsockname()[1]
+        
+        # Initialize the store schema once rather than racing N workers
+        asyncio.run(open_auth_state_store(self.store_url).close())
+        
+        context = multiprocessing.get_context("spawn")
+        ready_events = []
+        try:
+            for _ in range(self.workers):
+                ready = context.Event()
+                process = context.Process(
+                    target=_auth_worker_main,
+                    args=(self.host, self.port, self.users, self.store_url, self.hash_workers, ready,
+                          self.rate_limit_per_minute, self.trusted_proxies),
+                    daemon=True
+                )
+                process.start()
+                self.processes.append(process)
+                ready_events.append(ready)
+            
+            deadline = time.monotonic() + timeout
+            for process, ready in zip(self.processes, ready_events):
+                while not ready.wait(0.05):
+                    if not process.is_alive() or time.monotonic() > deadline:
+                        raise RuntimeError(f"Auth worker {process.pid} failed to start")
+        except Exception:
+            self.stop()
+            raise
+        finally:
+            reservation.close()
+        
+        logger.info(f"Started {self.workers} auth workers on {self.host}:{self.port}")
+        return self.port
+    
+    def stop(self):
+        for process in self.processes:
+            process.terminate()
+        for process in self.processes:
+            process.join(timeout=5)
+        self.processes = []
+
 # Academic-grade testing and validation
 class AuthEngineValidator:
     """Validation suite for A+ grade authentication engine"""
@@ -423,7 +1154,7 @@ class AuthEngineValidator:
     def __init__(self, auth_engine: OptimizedAuthEngine):
         self.auth_engine = auth_engine
         
-    async def run_performance_validation(self) -> Dict:
+    async def run_performance_validation(self, include_worker_scaling: bool = True) -> Dict:
         """Comprehensive performance validation for A+ grade"""
         logger.info("Running A+ performance validation...")
         
@@ -449,6 +1180,10 @@ async def run_performance_validation(self) -> Dict:
         cache_results = await self._test_cache_efficiency()
         results["tests"]["cache_efficiency"] = cache_results
         
+        # Test 5: Multi-process worker scaling (1 worker to all cores)
+        if include_worker_scaling:
+            results["tests"]["worker_scaling"] = await self._test_worker_scaling()
+        
         # Overall grade calculation
         grade = self._calculate_performance_grade(results["tests"])
         results["overall_grade"] = grade
@@ -601,7 +1336,7 @@ async def _test_sustained_performance(self, duration_seconds: int = 60, target_r
             "rps_efficiency": (request_count / actual_duration) / target_rps
         }
     
-    async def _test_cache_efficiency(self) -> Dict:
+    async def _test_cache_efficiency(self, scale_users: int = 1_000_000) -> Dict:
         """Test caching system efficiency"""
         logger.info("Testing cache efficiency...")
         
@@ -643,9 +1378,129 @@ async def _test_cache_efficiency(self) -> Dict:
             "cache_hit_count": len(cache_hit_times),
             "avg_cache_hit_time_ms": sum(cache_hit_times) / len(cache_hit_times) if cache_hit_times else 0,
             "cache_stats": cache_stats,
-            "cache_efficiency": len(cache_hit_times) / 100  # Percentage of cache hits
+            "cache_efficiency": len(cache_hit_times) / 100,  # Percentage of cache hits
+            "scale": await self._test_cache_scale(scale_users) if scale_users else {}
         }
     
+    async def _test_cache_scale(self, users: int) -> Dict:
+        """Fill a UserCache sized for half of `users` users, then read them all back"""
+        logger.info(f"Testing user cache at scale ({users} users)...")
+        cache = UserCache(max_size=users // 2)
+        user_data = {"user_id": "uid", "account_locked": False}
+        
+        start_time = time.perf_counter()
+        for i in range(users):
+            await cache.set_user(f"user_{i:07d}", user_data)
+        set_time = time.perf_counter() - start_time
+        
+        start_time = time.perf_counter()
+        for i in range(users):
+            await cache.get_user(f"user_{i:07d}")
+        get_time = time.perf_counter() - start_time
+        
+        stats = cache.cache.stats()
+        return {
+            "users": users,
+            "max_size": cache.max_size,
+            "set_ops_per_sec": users / set_time,
+            "get_ops_per_sec": users / get_time,
+            "avg_set_time_us": set_time / users * 1e6,
+            "avg_get_time_us": get_time / users * 1e6,
+            "hit_rate": stats["hit_rate"],
+            "evictions": stats["evictions"]
+        }
+    
+    async def _test_worker_scaling(self, worker_counts: Optional[List[int]] = None,
+                                   requests_per_step: int = 2000, connections: int = 64,
+                                   store_url: Optional[str] = None) -> Dict:
+        """Measure RPS and p99 latency of AuthWorkerServer from 1 worker to all cores"""
+        cores = psutil.cpu_count()
+        if worker_counts is None:
+            worker_counts = sorted({min(2 ** i, cores) for i in range(cores.bit_length() + 1)})
+        logger.info(f"Testing worker scaling ({worker_counts} workers, {requests_per_step} req/step)...")
+        
+        shm_dir = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+        db_path = os.path.join(shm_dir, f"synos-auth-validate-{os.getpid()}.db")
+        store_url = store_url or f"sqlite://{db_path}"
+        loop = asyncio.get_running_loop()
+        
+        steps = []
+        try:
+            for workers in worker_counts:
+                # Every request comes from loopback: measure the workers, not the rate limiter
+                server = AuthWorkerServer(self.auth_engine.user_database, store_url, workers=workers,
+                                          rate_limit_per_minute=None)
+                port = await loop.run_in_executor(None, server.start)
+                try:
+                    await self._drive_worker_load(port, min(200, requests_per_step), connections)  # Warm up
+                    times, elapsed, success = await self._drive_worker_load(port, requests_per_step, connections)
+                finally:
+                    await loop.run_in_executor(None, server.stop)
+                
+                times.sort()
+                steps.append({
+                    "workers": workers,
+                    "total_requests": len(times),
+                    "total_time_seconds": elapsed,
+                    "throughput_ops_per_sec": len(times) / elapsed,
+                    "avg_time_ms": sum(times) / len(times),
+                    "p50_time_ms": times[len(times) // 2],
+                    "p99_time_ms": times[int(0.99 * len(times))],
+                    "success_rate": success / len(times)
+                })
+        finally:
+            if store_url == f"sqlite://{db_path}":
+                for suffix in ("", "-wal", "-shm"):
+                    if os.path.exists(db_path + suffix):
+                        os.remove(db_path + suffix)
+        
+        baseline = steps[0]["throughput_ops_per_sec"] / steps[0]["workers"]
+        return {
+            "cpu_count": cores,
+            "connections": connections,
+            "steps": steps,
+            "scaling_efficiency": {
+                str(step["workers"]): step["throughput_ops_per_sec"] / (baseline * step["workers"])
+                for step in steps
+            }
+        }
+    
+    async def _drive_worker_load(self, port: int, total_requests: int,
+                                 connections: int) -> Tuple[List[float], float, int]:
+        """Send authenticate requests over persistent connections; returns (latencies, elapsed, successes)"""
+        users = list(self.auth_engine.user_database) or ["user_000000"]
+        counter = iter(range(total_requests))
+        times: List[float] = []
+        success = 0
+        
+        async def client():
+            nonlocal success
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            try:
+                for i in counter:
+                    username = users[i % len(users)]
+                    request = {
+                        "op": "authenticate",
+                        "username": username,
+                        "password": f"pass_{username[5:]}_{secrets.token_hex(2)}",
+                        "user_agent": "WorkerScalingClient/1.0",
+                        "request_id": f"scaling_{i}"
+                    }
+                    start_time = time.perf_counter()
+                    writer.write(json.dumps(request).encode() + b"\n")
+                    await writer.drain()
+                    response = json.loads(await reader.readline())
+                    times.append((time.perf_counter() - start_time) * 1000)
+                    if response.get("result") == AuthResult.SUCCESS.value:
+                        success += 1
+            finally:
+                writer.close()
+        
+        start_time = time.perf_counter()
+        await asyncio.gather(*[client() for _ in range(min(connections, total_requests))])
+        return times, time.perf_counter() - start_time, success
+    
+    
     def _calculate_performance_grade(self, test_results: Dict) -> Dict:
         """Calculate A+ performance grade based on results"""
         grade_points = 0
@@ -795,6 +1650,13 @@ async def main():
     print(f"  - P95 Response Time: {concurrent['p95_time_ms']:.1f}ms")
     print(f"  - Success Rate: {concurrent.get('success_rate', 0):.1%}")
     
+    scaling = results["tests"].get("worker_scaling")
+    if scaling:
+        print(f"\n🧵 Worker Scaling ({scaling['cpu_count']} cores):")
+        for step in scaling["steps"]:
+            print(f"  - {step['workers']} workers: {step['throughput_ops_per_sec']:.0f} ops/sec, "
+                  f"p99 {step['p99_time_ms']:.1f}ms")
+    
     # Show recommendations
     if results['overall_grade']['issues']:
         print(f"\n⚠️ Issues to Address:")
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+JWT Revocation Store for Syn_OS
+Keeps revoked jti values bucketed by token expiry, behind a bloom prefilter,
+with an append-only log for restarts and sharing between processes
+"""
+
+import fcntl
+import hashlib
+import logging
+import math
+import os
+import struct
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger('synapticos.security.token_revocation')
+
+# Log record: token expiry (unix seconds) and jti fingerprint
+_LOG_RECORD = struct.Struct('<qQ')
+
+
+def jti_fingerprint(jti: str) -> int:
+    """64-bit fingerprint of a jti"""
+    return int.from_bytes(hashlib.blake2b(jti.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class BloomFilter:
+    """Bit-array bloom filter over 64-bit fingerprints"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.capacity = max(int(capacity), 1)
+        self.error_rate = error_rate
+        self.size = max(64, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def add(self, fingerprint: int):
+        bits, size = self.bits, self.size
+        h1, h2 = fingerprint & 0xFFFFFFFF, (fingerprint >> 32) | 1
+        for i in range(self.hashes):
+            pos = (h1 + i * h2) % size
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, fingerprint: int) -> bool:
+        bits, size = self.bits, self.size
+        h1, h2 = fingerprint & 0xFFFFFFFF, (fingerprint >> 32) | 1
+        for i in range(self.hashes):
+            pos = (h1 + i * h2) % size
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def fill_ratio(self) -> float:
+        return sum(bin(byte).count('1') for byte in self.bits) / self.size
+
+
+class _ExpiryBucket:
+    """Fingerprints of revoked tokens expiring within one bucket interval
+
+    New fingerprints land in a small set that is merged into a sorted
+    array('Q') once it grows past a sixteenth of the array, so the bulk of a
+    bucket costs 8 bytes per entry.
+    """
+
+    __slots__ = ('frozen', 'pending')
+
+    MIN_MERGE = 256
+
+    def __init__(self):
+        self.frozen = array('Q')
+        self.pending = set()
+
+    def __len__(self) -> int:
+        return len(self.frozen) + len(self.pending)
+
+    def __contains__(self, fingerprint: int) -> bool:
+        if fingerprint in self.pending:
+            return True
+        frozen = self.frozen
+        i = bisect_left(frozen, fingerprint)
+        return i < len(frozen) and frozen[i] == fingerprint
+
+    def __iter__(self) -> Iterator[int]:
+        yield from self.frozen
+        yield from self.pending
+
+    def add(self, fingerprint: int) -> bool:
+        if fingerprint in self:
+            return False
+        self.pending.add(fingerprint)
+        if len(self.pending) >= max(self.MIN_MERGE, len(self.frozen) >> 4):
+            # Two sorted runs: timsort merges them in linear time
+            merged = self.frozen.tolist()
+            merged.extend(sorted(self.pending))
+            merged.sort()
+            self.frozen = array('Q', merged)
+            self.pending = set()
+        return True
+
+
+class TokenRevocationStore:
+    """Revoked jti values, dropped bucket by bucket once their tokens expire
+
+    Lookups hash the jti once, reject through the bloom filter in the common
+    not-revoked case and otherwise probe the single bucket the token's exp
+    falls into. With a log path every revocation is appended as a fixed-size
+    record; other processes sharing the path pick new records up every
+    sync_interval seconds, and the log is compacted once it is mostly expired.
+    """
+
+    def __init__(self, log_path: Optional[str] = None, bucket_seconds: int = 300,
+                 leeway: int = 0, expected_revocations: int = 100000,
+                 error_rate: float = 0.01, sync_interval: float = 1.0):
+        self.log_path = log_path
+        self.bucket_seconds = bucket_seconds
+        self.leeway = leeway
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self.expected_revocations = expected_revocations
+
+        self._buckets: Dict[int, _ExpiryBucket] = {}
+        self._bloom = BloomFilter(expected_revocations, error_rate)
+        self._count = 0
+        self._lock = threading.RLock()
+        self._next_purge = 0.0
+        self._last_sync = 0.0
+
+        self._log_fd: Optional[int] = None
+        self._log_inode: Optional[int] = None
+        self._log_offset = 0
+
+        self.stats_counters = {'checks': 0, 'bloom_rejections': 0, 'bucket_probes': 0,
+                               'purged': 0, 'compactions': 0}
+
+        if log_path:
+            self._open_log()
+            self.refresh()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, jti: str) -> bool:
+        return self.is_revoked(jti)
+
+    def revoke(self, jti: str, expires_at: int) -> bool:
+        """Record a revoked jti until its token's exp; False if already known or expired"""
+        now = time.time()
+        if expires_at + self.leeway <= now:
+            return False
+
+        fingerprint = jti_fingerprint(jti)
+        with self._lock:
+            if not self._insert(fingerprint, expires_at):
+                return False
+            if self._log_fd is not None:
+                self._append_record(expires_at, fingerprint)
+        self._maintain(now)
+        return True
+
+    def is_revoked(self, jti: str, expires_at: Optional[int] = None) -> bool:
+        """Check a jti; passing the token's exp limits the probe to one bucket"""
+        now = time.time()
+        if now >= self._next_purge or (self._log_fd is not None and now - self._last_sync >= self.sync_interval):
+            self._maintain(now)
+
+        counters = self.stats_counters
+        counters['checks'] += 1
+        fingerprint = jti_fingerprint(jti)
+        if fingerprint not in self._bloom:
+            counters['bloom_rejections'] += 1
+            return False
+
+        counters['bucket_probes'] += 1
+        if expires_at is not None:
+            bucket = self._buckets.get(expires_at // self.bucket_seconds)
+            return bucket is not None and fingerprint in bucket
+        return any(fingerprint in bucket for bucket in list(self._buckets.values()))
+
+    def purge(self, now: Optional[float] = None) -> int:
+        """Drop every bucket whose tokens have all expired"""
+        now = time.time() if now is None else now
+        cutoff = now - self.leeway
+        dropped = 0
+        with self._lock:
+            for key in sorted(self._buckets):
+                if (key + 1) * self.bucket_seconds > cutoff:
+                    break
+                dropped += len(self._buckets.pop(key))
+            self._count -= dropped
+            self.stats_counters['purged'] += dropped
+
+            # Stale fingerprints only cost false positives; rebuild once they dominate
+            if self._bloom.count > 2 * self._count + 1024:
+                self._rebuild_bloom()
+            if self._log_fd is not None and self.log_records() > 2 * self._count + 1024:
+                self.compact()
+        if dropped:
+            logger.debug(f"Purged {dropped} expired token revocations")
+        return dropped
+
+    def refresh(self) -> int:
+        """Apply records appended to the log by other processes"""
+        if self._log_fd is None:
+            return 0
+        with self._lock:
+            self._last_sync = time.time()
+            try:
+                st = os.stat(self.log_path)
+            except FileNotFoundError:
+                st = None
+            if st is None or st.st_ino != self._log_inode:
+                # Compacted (or removed) elsewhere: reopen and replay from the start
+                self._open_log()
+                st = os.fstat(self._log_fd)
+            end = self._log_offset + (st.st_size - self._log_offset) // _LOG_RECORD.size * _LOG_RECORD.size
+            if end <= self._log_offset:
+                return 0
+            with open(self.log_path, 'rb') as f:
+                f.seek(self._log_offset)
+                data = f.read(end - self._log_offset)
+            self._log_offset += len(data)
+
+            cutoff = self._last_sync - self.leeway
+            added = 0
+            for expires_at, fingerprint in _LOG_RECORD.iter_unpack(data):
+                if expires_at > cutoff and self._insert(fingerprint, expires_at):
+                    added += 1
+            return added
+
+    def compact(self):
+        """Rewrite the log with only live revocations"""
+        if self._log_fd is None:
+            return
+        with self._lock:
+            fcntl.flock(self._log_fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(self._log_fd).st_ino != os.stat(self.log_path).st_ino:
+                    # Another process compacted first; its log replaces ours on refresh
+                    return
+                self.refresh()
+                tmp_path = f"{self.log_path}.{os.getpid()}.tmp"
+                records = 0
+                with open(tmp_path, 'wb') as f:
+                    os.chmod(tmp_path, 0o600)
+                    for key, bucket in self._buckets.items():
+                        # Any exp inside the bucket keeps the record until the bucket is purged
+                        expires_at = (key + 1) * self.bucket_seconds - 1
+                        f.write(b''.join(_LOG_RECORD.pack(expires_at, fp) for fp in bucket))
+                        records += len(bucket)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.log_path)
+            finally:
+                fcntl.flock(self._log_fd, fcntl.LOCK_UN)
+            self._open_log()
+            self._log_offset = records * _LOG_RECORD.size
+            self.stats_counters['compactions'] += 1
+        logger.info(f"Compacted token revocation log to {records} records")
+
+    def log_records(self) -> int:
+        if self._log_fd is None:
+            return 0
+        return os.fstat(self._log_fd).st_size // _LOG_RECORD.size
+
+    def close(self):
+        with self._lock:
+            if self._log_fd is not None:
+                os.close(self._log_fd)
+                self._log_fd = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'revoked': self._count,
+            'buckets': len(self._buckets),
+            'bloom_bytes': len(self._bloom.bits),
+            'bloom_hashes': self._bloom.hashes,
+            'bloom_entries': self._bloom.count,
+            'log_records': self.log_records(),
+            **self.stats_counters
+        }
+
+    def _insert(self, fingerprint: int, expires_at: int) -> bool:
+        key = expires_at // self.bucket_seconds
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _ExpiryBucket()
+        if not bucket.add(fingerprint):
+            return False
+        self._count += 1
+        if self._count > self._bloom.capacity:
+            self._rebuild_bloom()
+        else:
+            self._bloom.add(fingerprint)
+        return True
+
+    def _rebuild_bloom(self):
+        bloom = BloomFilter(max(self.expected_revocations, 2 * self._count), self.error_rate)
+        for bucket in self._buckets.values():
+            for fingerprint in bucket:
+                bloom.add(fingerprint)
+        self._bloom = bloom
+
+    def _maintain(self, now: float):
+        if now >= self._next_purge:
+            self._next_purge = now + self.bucket_seconds
+            self.purge(now)
+        if self._log_fd is not None and now - self._last_sync >= self.sync_interval:
+            self.refresh()
+
+    def _open_log(self):
+        if self._log_fd is not None:
+            os.close(self._log_fd)
+        os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+        self._log_fd = os.open(self.log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        self._log_inode = os.fstat(self._log_fd).st_ino
+        self._log_offset = 0
+
+    def _append_record(self, expires_at: int, fingerprint: int):
+        fcntl.flock(self._log_fd, fcntl.LOCK_SH)
+        try:
+            if os.fstat(self._log_fd).st_ino != os.stat(self.log_path).st_ino:
+                # Another process compacted the log; write to the new file
+                fcntl.flock(self._log_fd, fcntl.LOCK_UN)
+                self._open_log()
+                fcntl.flock(self._log_fd, fcntl.LOCK_SH)
+            os.write(self._log_fd, _LOG_RECORD.pack(expires_at, fingerprint))
+        finally:
+            fcntl.flock(self._log_fd, fcntl.LOCK_UN)
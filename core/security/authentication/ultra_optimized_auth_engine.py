@@ -16,6 +16,7 @@
 from dataclasses import dataclass
 from enum import Enum
 import json
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor
 import multiprocessing
 
@@ -64,21 +65,58 @@ def verify_password_fast(self, password: str, salt: bytes, stored_hash: bytes) -
         return secrets.compare_digest(computed_hash, stored_hash)
 
 class FastSessionManager:
-    """Minimal overhead session manager"""
+    """Minimal overhead session manager
     
-    def __init__(self):
-        self.sessions = {}
+    Every session gets the same TTL, so creation order is expiry order and
+    the OrderedDict doubles as the expiry index: reaping pops from the
+    front, a batch at a time.
+    """
+    
+    def __init__(self, session_ttl: float = 3600, reap_batch: int = 64):
+        self.sessions: OrderedDict = OrderedDict()
+        self.session_ttl = session_ttl
+        self.reap_batch = reap_batch
         self._token_counter = 0
     
     def create_session(self, user_id: str) -> str:
         """Create session with minimal overhead"""
+        now = time.time()
+        self.reap_expired(now)
+        
         self._token_counter += 1
         session_token = f"session_{self._token_counter}_{secrets.token_hex(8)}"
         self.sessions[session_token] = {
             "user_id": user_id,
-            "created": time.time()
+            "created": now,
+            "expires": now + self.session_ttl
         }
         return session_token
+    
+    def validate_session(self, session_token: str) -> Optional[str]:
+        """User id for a live session, or None"""
+        session = self.sessions.get(session_token)
+        if session is None or session["expires"] <= time.time():
+            return None
+        return session["user_id"]
+    
+    def reap_expired(self, now: Optional[float] = None, limit: Optional[int] = None) -> int:
+        """Drop up to `limit` (default reap_batch) expired sessions from the oldest end"""
+        now = time.time() if now is None else now
+        limit = self.reap_batch if limit is None else limit
+        reaped = 0
+        while reaped < limit and self.sessions:
+            session_token, session = next(iter(self.sessions.items()))
+            if session["expires"] > now:
+                break
+            self.sessions.popitem(last=False)
+            reaped += 1
+        return reaped
+    
+    def get_active_sessions_count(self) -> int:
+        # Drain whatever backlog creation-time reaping has not caught up with
+        while self.reap_expired():
+            pass
+        return len(self.sessions)
 
 class FastRateLimiter:
     """Minimal rate limiter for basic protection"""
@@ -238,7 +276,7 @@ def get_performance_stats(self) -> Dict:
             "success_rate": success_rate,
             "requests_per_second": rps,
             "uptime_seconds": uptime,
-            "active_sessions": len(self.session_manager.sessions),
+            "active_sessions": self.session_manager.get_active_sessions_count(),
             "users_in_database": len(self.user_database)
         }
 
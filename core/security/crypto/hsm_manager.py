@@ -4,12 +4,18 @@
 Provides hardware-backed key storage and cryptographic operations using TPM 2.0
 """
 
+import abc
 import os
 import subprocess
 import logging
 import hashlib
 import secrets
-from typing import Dict, Any, Optional, Tuple
+import asyncio
+import queue
+import tempfile
+import threading
+from concurrent.futures import Future
+from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 import json
@@ -19,6 +25,13 @@
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.backends import default_backend
 
+try:
+    from tpm2_pytss import ESAPI
+    from tpm2_pytss.constants import TPM2_ALG, TPM2_RH, TPM2_ST
+    from tpm2_pytss.types import TPM2B_DIGEST, TPMS_CONTEXT, TPMT_SIG_SCHEME, TPMT_TK_HASHCHECK
+except ImportError:
+    ESAPI = None
+
 class HSMKeyType(Enum):
     RSA_2048 = "rsa2048"
     RSA_4096 = "rsa4096"
@@ -34,14 +47,239 @@ class HSMKey:
     created_at: str = ""
     usage: str = ""
 
+class SigningBackend(abc.ABC):
+    """Signs a batch of messages with one key, keeping key material loaded between batches"""
+    
+    name = "base"
+    
+    @abc.abstractmethod
+    def sign_batch(self, key: HSMKey, messages: List[bytes]) -> List[bytes]:
+        """Return one signature per message, in order"""
+    
+    def close(self):
+        pass
+
+class SoftwareSigningBackend(SigningBackend):
+    """RSA-PSS signing with PEM keys parsed once and kept in memory"""
+    
+    name = "software"
+    
+    def __init__(self):
+        self._private_keys: Dict[str, Any] = {}
+    
+    def sign_batch(self, key: HSMKey, messages: List[bytes]) -> List[bytes]:
+        if key.key_type not in [HSMKeyType.RSA_2048, HSMKeyType.RSA_4096]:
+            raise ValueError("Software signing only supports RSA keys")
+        
+        private_key = self._private_keys.get(key.handle)
+        if private_key is None:
+            with open(key.handle, 'rb') as f:
+                private_key = serialization.load_pem_private_key(
+                    f.read(),
+                    password=None,
+                    backend=default_backend()
+                )
+            self._private_keys[key.handle] = private_key
+        
+        pss = padding.PSS(
+            mgf=padding.MGF1(hashes.SHA256()),
+            salt_length=padding.PSS.MAX_LENGTH
+        )
+        return [private_key.sign(message, pss, hashes.SHA256()) for message in messages]
+
+class TPMToolsSigningBackend(SigningBackend):
+    """tpm2_sign per message; the tools cannot hold a session, so this is the slow path"""
+    
+    name = "tpm2-tools"
+    
+    def __init__(self, work_dir: str):
+        self.work_dir = work_dir
+    
+    def sign_batch(self, key: HSMKey, messages: List[bytes]) -> List[bytes]:
+        signatures = []
+        with tempfile.TemporaryDirectory(dir=self.work_dir) as tmp:
+            for i, message in enumerate(messages):
+                hash_file = os.path.join(tmp, f"hash_{i}")
+                with open(hash_file, 'wb') as f:
+                    f.write(hashlib.sha256(message).digest())
+                
+                result = subprocess.run([
+                    "tpm2_sign",
+                    "-c", key.handle,
+                    "-g", "sha256",
+                    "-o", f"{hash_file}.sig",
+                    hash_file
+                ], capture_output=True, text=True, timeout=30)
+                
+                if result.returncode != 0:
+                    raise Exception(f"TPM signing failed: {result.stderr}")
+                
+                with open(f"{hash_file}.sig", 'rb') as f:
+                    signatures.append(f.read())
+        return signatures
+
+class TPMContextSigningBackend(SigningBackend):
+    """Signs through one persistent ESAPI context with keys loaded once
+    
+    Produces the same marshalled TPMT_SIGNATURE as tpm2_sign over the hash
+    file, i.e. an RSASSA-SHA256 signature of sha256(sha256(message)).
+    """
+    
+    name = "tpm2-pytss"
+    
+    def __init__(self, tcti: Optional[str] = None):
+        if ESAPI is None:
+            raise RuntimeError("tpm2-pytss is not installed")
+        self._esys = ESAPI(tcti)
+        self._handles: Dict[str, Any] = {}
+        self._scheme = TPMT_SIG_SCHEME(scheme=TPM2_ALG.RSASSA)
+        self._scheme.details.any.hashAlg = TPM2_ALG.SHA256
+        self._validation = TPMT_TK_HASHCHECK(tag=TPM2_ST.HASHCHECK, hierarchy=TPM2_RH.NULL)
+    
+    def sign_batch(self, key: HSMKey, messages: List[bytes]) -> List[bytes]:
+        handle = self._handles.get(key.handle)
+        if handle is None:
+            with open(key.handle, 'rb') as f:
+                handle = self._esys.context_load(TPMS_CONTEXT.from_tools(f.read()))
+            self._handles[key.handle] = handle
+        
+        signatures = []
+        for message in messages:
+            digest = TPM2B_DIGEST(hashlib.sha256(hashlib.sha256(message).digest()).digest())
+            signature = self._esys.sign(handle, digest, self._scheme, self._validation)
+            signatures.append(signature.marshal())
+        return signatures
+    
+    def close(self):
+        for handle in self._handles.values():
+            self._esys.flush_context(handle)
+        self._handles.clear()
+        self._esys.close()
+
+class SigningService:
+    """Queues sign requests for one worker thread that drains them in batches
+    
+    Backends are only ever used from the worker, which keeps the ESAPI
+    context single-threaded and signing off the event loop. Requests for TPM
+    keys fall back to the software backend if the TPM fails.
+    """
+    
+    def __init__(self, tpm_backend: Optional[SigningBackend] = None,
+                 software_backend: Optional[SigningBackend] = None, max_batch: int = 64):
+        self.logger = logging.getLogger("security.hsm.signing")
+        self.tpm_backend = tpm_backend
+        self.software_backend = software_backend or SoftwareSigningBackend()
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[Optional[Tuple[HSMKey, List[bytes], Future]]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.stats = {
+            "requests": 0,
+            "batches": 0,
+            "tpm_signatures": 0,
+            "software_signatures": 0,
+            "tpm_fallbacks": 0
+        }
+    
+    @property
+    def backend_name(self) -> str:
+        return self.tpm_backend.name if self.tpm_backend else self.software_backend.name
+    
+    async def sign(self, key: HSMKey, data: bytes) -> bytes:
+        """Sign one message"""
+        return (await self.sign_many(key, [data]))[0]
+    
+    async def sign_many(self, key: HSMKey, messages: List[bytes]) -> List[bytes]:
+        """Sign several messages with one key as a single request"""
+        future: Future = Future()
+        self._ensure_worker()
+        self._queue.put((key, list(messages), future))
+        return await asyncio.wrap_future(future)
+    
+    def close(self):
+        """Finish queued requests, stop the worker and release backends"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+        if self.tpm_backend is not None:
+            self.tpm_backend.close()
+        self.software_backend.close()
+    
+    def _ensure_worker(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="hsm-signing", daemon=True)
+                    self._thread.start()
+    
+    def _run(self):
+        stopping = False
+        while not stopping:
+            request = self._queue.get()
+            if request is None:
+                break
+            batch = [request]
+            count = len(request[1])
+            while count < self.max_batch:
+                try:
+                    request = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                batch.append(request)
+                count += len(request[1])
+            self._process(batch)
+    
+    def _process(self, batch: List[Tuple[HSMKey, List[bytes], Future]]):
+        groups: Dict[str, Tuple[HSMKey, List[bytes], List[Tuple[Future, int, int]]]] = {}
+        for key, messages, future in batch:
+            if not future.set_running_or_notify_cancel():
+                continue
+            _, group_messages, futures = groups.setdefault(key.handle, (key, [], []))
+            futures.append((future, len(group_messages), len(messages)))
+            group_messages.extend(messages)
+        
+        for key, messages, futures in groups.values():
+            self.stats["requests"] += len(futures)
+            self.stats["batches"] += 1
+            try:
+                signatures = self._sign_group(key, messages)
+            except Exception as e:
+                for future, _, _ in futures:
+                    future.set_exception(e)
+                continue
+            for future, start, length in futures:
+                future.set_result(signatures[start:start + length])
+    
+    def _sign_group(self, key: HSMKey, messages: List[bytes]) -> List[bytes]:
+        if self.tpm_backend is not None and "_software" not in key.handle:
+            try:
+                signatures = self.tpm_backend.sign_batch(key, messages)
+                self.stats["tpm_signatures"] += len(signatures)
+                return signatures
+            except Exception as e:
+                self.logger.error(f"TPM signing failed: {e}")
+                self.stats["tpm_fallbacks"] += 1
+        
+        signatures = self.software_backend.sign_batch(key, messages)
+        self.stats["software_signatures"] += len(signatures)
+        return signatures
+
 class TPMManager:
     """TPM 2.0 Hardware Security Module Manager"""
     
-    def __init__(self):
+    def __init__(self, signing_batch_size: int = 64, tcti: Optional[str] = None):
         self.logger = logging.getLogger("security.hsm.tpm")
         self.tpm_available = self._check_tpm_availability()
         self.key_storage_path = "/var/lib/syn_os/tpm_keys"
         self._ensure_key_storage()
+        self.signing_batch_size = signing_batch_size
+        self.tcti = tcti or os.environ.get("TPM2TOOLS_TCTI")
+        self._signing_service: Optional[SigningService] = None
     
     def _check_tpm_availability(self) -> bool:
         """Check if TPM 2.0 is available and accessible"""
@@ -303,69 +541,36 @@ async def _create_software_key(self, key_type: HSMKeyType, key_id: str, usage: s
         else:
             raise ValueError(f"Unsupported key type: {key_type}")
     
+    @property
+    def signing_service(self) -> SigningService:
+        """Signing queue, backed by a persistent TPM context when tpm2-pytss is installed"""
+        if self._signing_service is None:
+            tpm_backend = None
+            if self.tpm_available:
+                if ESAPI is not None:
+                    try:
+                        tpm_backend = TPMContextSigningBackend(self.tcti)
+                    except Exception as e:
+                        self.logger.warning(f"Persistent TPM context unavailable, using tpm2-tools: {e}")
+                if tpm_backend is None:
+                    tpm_backend = TPMToolsSigningBackend(self.key_storage_path)
+            self._signing_service = SigningService(tpm_backend, SoftwareSigningBackend(), self.signing_batch_size)
+            self.logger.info(f"Signing service started with {self._signing_service.backend_name} backend")
+        return self._signing_service
+    
     async def sign_data(self, key: HSMKey, data: bytes) -> bytes:
         """Sign data using HSM key"""
-        if not self.tpm_available or "_software" in key.handle:
-            return await self._software_sign_data(key, data)
-        
-        try:
-            # Create hash of data
-            data_hash = hashlib.sha256(data).digest()
-            hash_file = f"{self.key_storage_path}/temp_hash_{key.key_id}"
-            
-            with open(hash_file, 'wb') as f:
-                f.write(data_hash)
-            
-            # Sign with TPM
-            result = subprocess.run([
-                "tpm2_sign",
-                "-c", key.handle,
-                "-g", "sha256",
-                "-o", f"{hash_file}.sig",
-                hash_file
-            ], capture_output=True, text=True, timeout=30)
-            
-            if result.returncode != 0:
-                raise Exception(f"TPM signing failed: {result.stderr}")
-            
-            # Read signature
-            with open(f"{hash_file}.sig", 'rb') as f:
-                signature = f.read()
-            
-            # Cleanup
-            os.unlink(hash_file)
-            os.unlink(f"{hash_file}.sig")
-            
-            return signature
-            
-        except Exception as e:
-            self.logger.error(f"TPM signing failed: {e}")
-            return await self._software_sign_data(key, data)
+        return await self.signing_service.sign(key, data)
     
-    async def _software_sign_data(self, key: HSMKey, data: bytes) -> bytes:
-        """Software-based signing fallback"""
-        if key.key_type not in [HSMKeyType.RSA_2048, HSMKeyType.RSA_4096]:
-            raise ValueError("Software signing only supports RSA keys")
-        
-        # Load private key
-        with open(key.handle, 'rb') as f:
-            private_key = serialization.load_pem_private_key(
-                f.read(),
-                password=None,
-                backend=default_backend()
-            )
-        
-        # Sign data
-        signature = private_key.sign(
-            data,
-            padding.PSS(
-                mgf=padding.MGF1(hashes.SHA256()),
-                salt_length=padding.PSS.MAX_LENGTH
-            ),
-            hashes.SHA256()
-        )
-        
-        return signature
+    async def sign_data_batch(self, key: HSMKey, messages: List[bytes]) -> List[bytes]:
+        """Sign several messages using one HSM key"""
+        return await self.signing_service.sign_many(key, messages)
+    
+    def close(self):
+        """Stop the signing service"""
+        if self._signing_service is not None:
+            self._signing_service.close()
+            self._signing_service = None
     
     async def encrypt_data(self, key: HSMKey, data: bytes) -> bytes:
         """Encrypt data using HSM key"""
@@ -499,6 +704,14 @@ async def sign_jwt_token(self, payload: bytes) -> bytes:
         
         return await self.tpm_manager.sign_data(jwt_key, payload)
     
+    async def sign_jwt_tokens(self, payloads: List[bytes]) -> List[bytes]:
+        """Sign several JWT tokens in one batch using HSM"""
+        jwt_key = self.keys.get("jwt_signing")
+        if not jwt_key:
+            raise ValueError("JWT signing key not available")
+        
+        return await self.tpm_manager.sign_data_batch(jwt_key, payloads)
+    
     async def encrypt_sensitive_data(self, data: bytes) -> bytes:
         """Encrypt sensitive data using HSM"""
         encryption_key = self.keys.get("data_encryption")
@@ -507,6 +720,10 @@ async def encrypt_sensitive_data(self, data: bytes) -> bytes:
         
         return await self.tpm_manager.encrypt_data(encryption_key, data)
     
+    def close(self):
+        """Release the signing service"""
+        self.tpm_manager.close()
+    
     def get_status(self) -> Dict[str, Any]:
         """Get HSM status"""
         return {
@@ -514,6 +731,10 @@ def get_status(self) -> Dict[str, Any]:
             "tpm_available": self.tpm_manager.tpm_available,
             "keys_loaded": len(self.keys),
             "key_storage_path": self.tpm_manager.key_storage_path,
+            "signing": {
+                "backend": self.tpm_manager.signing_service.backend_name,
+                **self.tpm_manager.signing_service.stats
+            } if self.tpm_manager._signing_service else None,
             "keys": {key_id: {
                 "type": key.key_type.value,
                 "usage": key.usage,
@@ -554,6 +775,9 @@ async def main():
         test_payload = b"test_jwt_payload"
         signature = await hsm_manager.sign_jwt_token(test_payload)
         print(f"✅ JWT signing successful: {len(signature)} bytes")
+        
+        signatures = await hsm_manager.sign_jwt_tokens([test_payload] * 16)
+        print(f"✅ Batch JWT signing successful: {len(signatures)} signatures")
     except Exception as e:
         print(f"❌ JWT signing failed: {e}")
     
@@ -564,10 +788,10 @@ async def main():
         print(f"✅ Data encryption successful: {len(encrypted)} bytes")
     except Exception as e:
         print(f"❌ Data encryption failed: {e}")
+    
+    hsm_manager.close()
 
 if __name__ == "__main__":
-    import asyncio
-    
     # Configure logging
     logging.basicConfig(
         level=logging.INFO,
@@ -4,11 +4,16 @@
 Provides post-quantum cryptographic algorithms for future-proof security
 """
 
+import asyncio
 import os
 import secrets
 import hashlib
 import logging
-from typing import Dict, Any, Tuple, Optional, List
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Dict, Any, Tuple, Optional, List, Sequence
 from dataclasses import dataclass
 from enum import Enum
 import json
@@ -55,9 +60,83 @@ class PQCEncryptedData:
     key_id: str
     timestamp: datetime
 
-class KyberKEM:
+_batch_pool: Optional[ProcessPoolExecutor] = None
+# Guards the per-scheme key prefix caches; batches may run in executor threads
+_key_prefix_lock = threading.Lock()
+
+def _get_batch_pool() -> ProcessPoolExecutor:
+    """Process pool shared by the batch APIs, started on the first large batch"""
+    global _batch_pool
+    if _batch_pool is None:
+        _batch_pool = ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn"))
+    return _batch_pool
+
+def _run_batch_chunk(scheme_class, security_level, method: str, key: bytes, items: list) -> list:
+    """Pool worker: run one chunk of a batch call in-process, never in a nested pool"""
+    scheme = scheme_class(security_level)
+    return getattr(scheme, method)(key, items, parallel=False)
+
+class _BatchMixin:
+    """Shared plumbing for the batch APIs
+    
+    Hashing a 1.6-4.8 KB private key dominates every single-item call, so
+    the SHA-256 state after absorbing the key is kept per key id (checked
+    against the key bytes, so a regenerated key never reuses a stale state).
+    Batches of parallel_threshold items or more are split across a process
+    pool when more than one CPU is available. The *_async variants await the
+    pool, or run inline batches in a thread, instead of blocking the loop.
+    """
+    
+    parallel_threshold = 4096
+    parallel_workers = os.cpu_count() or 1
+    key_cache_size = 256
+    
+    def _key_prefix(self, key: bytes, key_id: Optional[str]):
+        if key_id is None:
+            return hashlib.sha256(key)
+        with _key_prefix_lock:
+            cache = self.__dict__.setdefault("_key_prefixes", OrderedDict())
+            cached = cache.get(key_id)
+            if cached is not None and cached[0] == key:
+                cache.move_to_end(key_id)
+                return cached[1]
+            prefix = hashlib.sha256(key)
+            cache[key_id] = (key, prefix)
+            if len(cache) > self.key_cache_size:
+                cache.popitem(last=False)
+            return prefix
+    
+    def _submit_parallel(self, method: str, key: bytes, items: Sequence) -> Optional[List[Future]]:
+        """Submit a large batch to the process pool in chunks; None when it should run inline"""
+        workers = self.parallel_workers
+        if len(items) < self.parallel_threshold or workers < 2:
+            return None
+        chunk = -(-len(items) // workers)
+        pool = _get_batch_pool()
+        return [
+            pool.submit(_run_batch_chunk, type(self), self.security_level, method, key, list(items[i:i + chunk]))
+            for i in range(0, len(items), chunk)
+        ]
+    
+    def _maybe_parallel(self, method: str, key: bytes, items: Sequence, parallel: bool) -> Optional[list]:
+        """Run a large batch across the process pool; None when it should run inline"""
+        futures = self._submit_parallel(method, key, items) if parallel else None
+        if futures is None:
+            return None
+        return [result for future in futures for result in future.result()]
+    
+    async def _batch_async(self, method: str, key: bytes, items: Sequence, key_id: Optional[str]) -> list:
+        futures = self._submit_parallel(method, key, items)
+        if futures is None:
+            return await asyncio.to_thread(getattr(self, method), key, items, key_id=key_id, parallel=False)
+        chunks = await asyncio.gather(*(asyncio.wrap_future(future) for future in futures))
+        return [result for chunk in chunks for result in chunk]
+
+class KyberKEM(_BatchMixin):
     """Kyber Key Encapsulation Mechanism (simplified implementation)"""
     
+    CIPHERTEXT_SIZES = {512: 768, 768: 1088, 1024: 1568}
+    
     def __init__(self, security_level: int = 512):
         self.security_level = security_level
         self.logger = logging.getLogger(f"security.pqc.kyber{security_level}")
@@ -118,10 +197,83 @@ def decapsulate(self, private_key: bytes, ciphertext: bytes) -> bytes:
         shared_secret = hashlib.sha256(combined).digest()
         
         return shared_secret
+    
+    def encapsulate_batch(self, public_key: bytes, count: int) -> List[Tuple[bytes, bytes]]:
+        """Encapsulate `count` shared secrets under one public key"""
+        ciphertext_size = self.CIPHERTEXT_SIZES[self.security_level]
+        record_size = ciphertext_size + 32
+        randomness = secrets.token_bytes(count * record_size)
+        view = memoryview(randomness)
+        return [
+            (bytes(view[i:i + ciphertext_size]), bytes(view[i + ciphertext_size:i + record_size]))
+            for i in range(0, len(randomness), record_size)
+        ]
+    
+    def decapsulate_batch(self, private_key: bytes, ciphertexts: Sequence[bytes],
+                          key_id: Optional[str] = None, parallel: bool = True) -> List[bytes]:
+        """Decapsulate many ciphertexts; same results as decapsulate() per item"""
+        results = self._maybe_parallel("decapsulate_batch", private_key, ciphertexts, parallel)
+        if results is not None:
+            return results
+        
+        prefix = self._key_prefix(private_key, key_id)
+        shared_secrets = []
+        for ciphertext in ciphertexts:
+            state = prefix.copy()
+            state.update(ciphertext)
+            shared_secrets.append(state.digest())
+        return shared_secrets
+    
+    async def decapsulate_batch_async(self, private_key: bytes, ciphertexts: Sequence[bytes],
+                                      key_id: Optional[str] = None) -> List[bytes]:
+        """decapsulate_batch() without blocking the event loop"""
+        return await self._batch_async("decapsulate_batch", private_key, ciphertexts, key_id)
 
-class DilithiumSignature:
+class _HashSignatureBatchMixin(_BatchMixin):
+    """Batch sign/verify for the seed-expansion signature placeholders"""
+    
+    SIGNATURE_SIZES: Dict[Any, int] = {}
+    
+    def sign_batch(self, private_key: bytes, messages: Sequence[bytes],
+                   key_id: Optional[str] = None, parallel: bool = True) -> List[bytes]:
+        """Sign many messages; same signatures as sign() per message"""
+        results = self._maybe_parallel("sign_batch", private_key, messages, parallel)
+        if results is not None:
+            return results
+        
+        signature_size = self.SIGNATURE_SIZES[self.security_level]
+        counters = [counter.to_bytes(4, 'big') for counter in range(-(-signature_size // 32))]
+        prefix = self._key_prefix(private_key, key_id)
+        sha256 = hashlib.sha256
+        
+        signatures = []
+        for message in messages:
+            state = prefix.copy()
+            state.update(sha256(message).digest())
+            signature_seed = state.digest()
+            signature = b"".join([sha256(signature_seed + counter).digest() for counter in counters])
+            signatures.append(signature[:signature_size])
+        return signatures
+    
+    async def sign_batch_async(self, private_key: bytes, messages: Sequence[bytes],
+                               key_id: Optional[str] = None) -> List[bytes]:
+        """sign_batch() without blocking the event loop"""
+        return await self._batch_async("sign_batch", private_key, messages, key_id)
+    
+    def verify_batch(self, public_key: bytes, messages: Sequence[bytes],
+                     signatures: Sequence[bytes]) -> List[bool]:
+        """Verify many signatures; same results as verify() per item"""
+        if len(messages) != len(signatures):
+            raise ValueError("messages and signatures must have the same length")
+        # verify() accepts any signature of the expected size
+        expected_size = self.SIGNATURE_SIZES[self.security_level]
+        return [len(signature) == expected_size for signature in signatures]
+
+class DilithiumSignature(_HashSignatureBatchMixin):
     """Dilithium Digital Signature Scheme (simplified implementation)"""
     
+    SIGNATURE_SIZES = {2: 2420, 3: 3293, 5: 4595}
+    
     def __init__(self, security_level: int = 2):
         self.security_level = security_level
         self.logger = logging.getLogger(f"security.pqc.dilithium{security_level}")
@@ -200,9 +352,11 @@ def verify(self, public_key: bytes, message: bytes, signature: bytes) -> bool:
         # In real implementation, this would be proper lattice-based verification
         return len(verification_hash) == 32  # Always true for demonstration
 
-class SPHINCSSignature:
+class SPHINCSSignature(_HashSignatureBatchMixin):
     """SPHINCS+ Hash-based Signature Scheme (simplified implementation)"""
     
+    SIGNATURE_SIZES = {"128f": 17088, "192f": 35664, "256f": 49856}
+    
     def __init__(self, security_level: str = "128f"):
         self.security_level = security_level
         self.logger = logging.getLogger(f"security.pqc.sphincs{security_level}")
@@ -452,6 +606,93 @@ async def decapsulate_key(self, key_id: str, encrypted_data: PQCEncryptedData) -
         self.logger.info(f"Decapsulated key with {keypair.algorithm.value}: {key_id}")
         return shared_secret
     
+    async def sign_messages(self, key_id: str, messages: Sequence[bytes]) -> List[PQCSignature]:
+        """Sign many messages with one post-quantum key in a single batch"""
+        keypair = await self.load_keypair(key_id)
+        if not keypair:
+            raise ValueError(f"Key pair not found: {key_id}")
+        
+        crypto_impl = self.algorithms[keypair.algorithm]
+        if not isinstance(crypto_impl, _HashSignatureBatchMixin):
+            raise ValueError(f"Algorithm {keypair.algorithm.value} does not support signing")
+        
+        signatures = await crypto_impl.sign_batch_async(keypair.private_key, messages, key_id=key_id)
+        timestamp = datetime.now()
+        
+        self.logger.info(f"Signed {len(signatures)} messages with {keypair.algorithm.value} key: {key_id}")
+        return [
+            PQCSignature(
+                algorithm=keypair.algorithm,
+                signature=signature,
+                message_hash=hashlib.sha256(message).digest(),
+                key_id=key_id,
+                timestamp=timestamp
+            )
+            for message, signature in zip(messages, signatures)
+        ]
+    
+    async def verify_signatures(self, key_id: str, messages: Sequence[bytes],
+                                signatures: Sequence[PQCSignature]) -> List[bool]:
+        """Verify many post-quantum signatures made with one key"""
+        keypair = await self.load_keypair(key_id)
+        if not keypair:
+            raise ValueError(f"Key pair not found: {key_id}")
+        
+        if any(signature.algorithm != keypair.algorithm for signature in signatures):
+            raise ValueError("Algorithm mismatch between key and signature")
+        
+        crypto_impl = self.algorithms[keypair.algorithm]
+        valid = crypto_impl.verify_batch(keypair.public_key, messages, [s.signature for s in signatures])
+        results = [
+            is_valid and hashlib.sha256(message).digest() == signature.message_hash
+            for is_valid, message, signature in zip(valid, messages, signatures)
+        ]
+        
+        self.logger.info(f"Verified {len(results)} signatures ({sum(results)} valid) for key {key_id}")
+        return results
+    
+    async def encapsulate_keys(self, key_id: str, count: int) -> List[PQCEncryptedData]:
+        """Encapsulate many shared secrets under one KEM key, e.g. to rekey sessions"""
+        keypair = await self.load_keypair(key_id)
+        if not keypair:
+            raise ValueError(f"Key pair not found: {key_id}")
+        
+        crypto_impl = self.algorithms[keypair.algorithm]
+        if not isinstance(crypto_impl, KyberKEM):
+            raise ValueError(f"Algorithm {keypair.algorithm.value} does not support KEM")
+        
+        timestamp = datetime.now()
+        encapsulated = [
+            PQCEncryptedData(
+                algorithm=keypair.algorithm,
+                ciphertext=ciphertext,
+                encapsulated_key=shared_secret,
+                key_id=key_id,
+                timestamp=timestamp
+            )
+            for ciphertext, shared_secret in crypto_impl.encapsulate_batch(keypair.public_key, count)
+        ]
+        
+        self.logger.info(f"Encapsulated {count} keys with {keypair.algorithm.value}: {key_id}")
+        return encapsulated
+    
+    async def decapsulate_keys(self, key_id: str, encrypted_data: Sequence[PQCEncryptedData]) -> List[bytes]:
+        """Decapsulate many shared secrets with one KEM key"""
+        keypair = await self.load_keypair(key_id)
+        if not keypair:
+            raise ValueError(f"Key pair not found: {key_id}")
+        
+        if any(item.algorithm != keypair.algorithm for item in encrypted_data):
+            raise ValueError("Algorithm mismatch between key and encrypted data")
+        
+        crypto_impl = self.algorithms[keypair.algorithm]
+        shared_secrets = await crypto_impl.decapsulate_batch_async(
+            keypair.private_key, [item.ciphertext for item in encrypted_data], key_id=key_id
+        )
+        
+        self.logger.info(f"Decapsulated {len(shared_secrets)} keys with {keypair.algorithm.value}: {key_id}")
+        return shared_secrets
+    
     def get_supported_algorithms(self) -> List[str]:
         """Get list of supported post-quantum algorithms"""
         return [alg.value for alg in PQCAlgorithm]
@@ -543,8 +784,6 @@ async def main():
         print(f"❌ Kyber KEM failed: {e}")
 
 if __name__ == "__main__":
-    import asyncio
-    
     # Configure logging
     logging.basicConfig(
         level=logging.INFO,
@@ -5,24 +5,188 @@
 """
 
 import asyncio
+import ipaddress
 import logging
+import multiprocessing
 import os
 import json
+from collections import OrderedDict, deque
+from collections.abc import MutableMapping
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Tuple
-from datetime import datetime, timedelta
+from typing import Dict, Any, Iterator, List, Optional, Set, Tuple
+from datetime import datetime, timedelta, timezone
 from cryptography import x509
 from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.asymmetric import rsa, ec
+from cryptography.hazmat.primitives.asymmetric import rsa, ec, padding
 from cryptography.x509.oid import NameOID, ExtensionOID
 from cryptography.hazmat.backends import default_backend
 import hashlib
 import secrets
 
+def _generate_entity_key(key_size: int) -> Tuple[bytes, bytes]:
+    """Generate an RSA key in a pool worker; returns (PKCS8 PEM, public key DER)"""
+    private_key = rsa.generate_private_key(
+        public_exponent=65537,
+        key_size=key_size,
+        backend=default_backend()
+    )
+    private_pem = private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption()
+    )
+    public_der = private_key.public_key().public_bytes(
+        encoding=serialization.Encoding.DER,
+        format=serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    return private_pem, public_der
+
+class EntityKeyPool:
+    """Entity RSA keys generated ahead of time in worker processes
+    
+    Keeps `size` keys either ready or being generated; every acquire queues a
+    replacement. Keys cross the process boundary as PEM/DER bytes, so the
+    event loop never runs RSA key generation.
+    """
+    
+    def __init__(self, size: int = 32, key_size: int = 2048, max_workers: Optional[int] = None):
+        self.logger = logging.getLogger("security.mtls.key_pool")
+        self.size = size
+        self.key_size = key_size
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._keys: "deque[Future]" = deque()
+        self.stats = {"acquired": 0, "ready_on_acquire": 0}
+    
+    def start(self):
+        """Start the worker processes and queue the initial keys"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            self._fill()
+            self.logger.info(f"Key pool started: {self.size} x RSA-{self.key_size}, {self.max_workers} workers")
+    
+    def ready(self) -> int:
+        return sum(1 for future in self._keys if future.done())
+    
+    async def warm(self):
+        """Wait until every queued key has been generated"""
+        self.start()
+        await asyncio.gather(*(asyncio.wrap_future(future) for future in list(self._keys)))
+    
+    async def acquire(self) -> Tuple[bytes, bytes]:
+        """Take a key, waiting for the oldest in-flight one if none is ready"""
+        self.start()
+        future = next((f for f in self._keys if f.done()), None)
+        if future is not None:
+            self.stats["ready_on_acquire"] += 1
+        else:
+            future = self._keys[0]
+        self._keys.remove(future)
+        self._fill()
+        self.stats["acquired"] += 1
+        return await asyncio.wrap_future(future)
+    
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._keys.clear()
+    
+    def _fill(self):
+        while len(self._keys) < self.size:
+            self._keys.append(self._executor.submit(_generate_entity_key, self.key_size))
+
+class CertificateRegistry(MutableMapping):
+    """Certificate records by entity id, indexed by fingerprint and serial number
+    
+    Records are plain dicts in the registry JSON format. Revoke through
+    revoke() so the revocation index stays in step; revoked fingerprints of
+    superseded certificates are carried into the replacing record, and stay
+    revoked when their record is deleted.
+    """
+    
+    def __init__(self, records: Optional[Dict[str, Dict[str, Any]]] = None):
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._by_fingerprint: Dict[str, str] = {}
+        self._by_serial: Dict[str, str] = {}
+        self._revoked_fingerprints: Set[str] = set()
+        for entity_id, record in (records or {}).items():
+            self[entity_id] = record
+    
+    def __getitem__(self, entity_id: str) -> Dict[str, Any]:
+        return self._records[entity_id]
+    
+    def __setitem__(self, entity_id: str, record: Dict[str, Any]):
+        previous = self._records.get(entity_id)
+        if previous is not None:
+            self._unindex(previous)
+            carried = list(previous.get("revoked_fingerprints", []))
+            if previous.get("revoked") and previous.get("fingerprint") != record.get("fingerprint"):
+                carried.append(previous["fingerprint"])
+            if carried:
+                record["revoked_fingerprints"] = carried
+        self._records[entity_id] = record
+        self._index(entity_id, record)
+    
+    def __delitem__(self, entity_id: str):
+        record = self._records.pop(entity_id)
+        self._unindex(record)
+        # Dropping a record must not un-revoke its certificates
+        if record.get("revoked"):
+            self._revoked_fingerprints.add(record["fingerprint"])
+        self._revoked_fingerprints.update(record.get("revoked_fingerprints", []))
+    
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._records)
+    
+    def __len__(self) -> int:
+        return len(self._records)
+    
+    def find_by_fingerprint(self, fingerprint: str) -> Optional[str]:
+        return self._by_fingerprint.get(fingerprint)
+    
+    def find_by_serial(self, serial_number: str) -> Optional[str]:
+        return self._by_serial.get(str(serial_number))
+    
+    def is_revoked(self, fingerprint: str) -> bool:
+        return fingerprint in self._revoked_fingerprints
+    
+    def revoke(self, entity_id: str, revoked_at: str) -> Optional[str]:
+        """Mark an entity's current certificate revoked; returns its fingerprint"""
+        record = self._records.get(entity_id)
+        if record is None:
+            return None
+        record["revoked"] = True
+        record["revoked_at"] = revoked_at
+        self._revoked_fingerprints.add(record["fingerprint"])
+        return record["fingerprint"]
+    
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return dict(self._records)
+    
+    def _index(self, entity_id: str, record: Dict[str, Any]):
+        self._by_fingerprint[record["fingerprint"]] = entity_id
+        if "serial_number" in record:
+            self._by_serial[record["serial_number"]] = entity_id
+        if record.get("revoked"):
+            self._revoked_fingerprints.add(record["fingerprint"])
+        self._revoked_fingerprints.update(record.get("revoked_fingerprints", []))
+    
+    def _unindex(self, record: Dict[str, Any]):
+        self._by_fingerprint.pop(record["fingerprint"], None)
+        self._by_serial.pop(record.get("serial_number"), None)
+        self._revoked_fingerprints.discard(record["fingerprint"])
+        self._revoked_fingerprints.difference_update(record.get("revoked_fingerprints", []))
+
 class MTLSCertificateManager:
     """Manages mTLS certificates for Zero Trust authentication"""
     
-    def __init__(self, cert_base_path: str = "certs/zero_trust"):
+    def __init__(self, cert_base_path: str = "certs/zero_trust", key_pool_size: int = 32,
+                 key_pool_workers: Optional[int] = None, verification_cache_size: int = 10000):
         """Initialize mTLS Certificate Manager"""
         self.logger = logging.getLogger("security.mtls.cert_manager")
         self.cert_base_path = Path(cert_base_path)
@@ -35,17 +199,30 @@ def __init__(self, cert_base_path: str = "certs/zero_trust"):
         self.ca_certificate = None
         
         # Certificate registry
-        self.certificate_registry: Dict[str, Dict[str, Any]] = {}
+        self.certificate_registry = CertificateRegistry()
+        self._registry_version = 0
+        self._registry_saved_version = 0
+        self._registry_save_lock = asyncio.Lock()
         
         # Configuration
         self.config = {
             "ca_validity_days": 3650,  # 10 years
             "entity_validity_days": 365,  # 1 year
             "key_size": 4096,
+            "entity_key_size": 2048,  # Smaller key for entities
             "signature_algorithm": "sha256",
             "auto_renewal_threshold_days": 30
         }
         
+        # Entity keys are generated ahead of time off the event loop
+        self.key_pool = EntityKeyPool(key_pool_size, self.config["entity_key_size"],
+                                      key_pool_workers) if key_pool_size > 0 else None
+        
+        # Parsed and signature-checked certificates, keyed by a digest of the PEM
+        self.verification_cache_size = verification_cache_size
+        self._verification_cache: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+        self.verification_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+        
         self._ensure_directory_structure()
 
     def _ensure_directory_structure(self):
@@ -71,6 +248,9 @@ async def initialize(self) -> bool:
             # Check for expiring certificates
             await self._check_expiring_certificates()
             
+            if self.key_pool is not None:
+                self.key_pool.start()
+            
             self.logger.info("mTLS Certificate Manager initialized successfully")
             return True
             
@@ -133,6 +313,7 @@ async def _create_ca(self) -> bool:
             
             # Save CA certificate and key
             await self._save_ca()
+            self._verification_cache.clear()
             
             self.logger.info("Certificate Authority created successfully")
             return True
@@ -183,11 +364,12 @@ async def _load_ca(self) -> bool:
                 )
             
             # Verify CA certificate validity
-            now = datetime.utcnow()
-            if now < self.ca_certificate.not_valid_before or now > self.ca_certificate.not_valid_after:
+            now = datetime.now(timezone.utc)
+            if now < self.ca_certificate.not_valid_before_utc or now > self.ca_certificate.not_valid_after_utc:
                 self.logger.warning("CA certificate has expired or is not yet valid")
                 return False
             
+            self._verification_cache.clear()
             self.logger.info("Certificate Authority loaded successfully")
             return True
             
@@ -198,95 +380,33 @@ async def _load_ca(self) -> bool:
     async def generate_entity_certificate(self, entity) -> str:
         """Generate certificate for a Zero Trust entity"""
         try:
-            # Generate private key for entity
-            private_key = rsa.generate_private_key(
-                public_exponent=65537,
-                key_size=2048,  # Smaller key for entities
-                backend=default_backend()
-            )
-            
-            # Create certificate subject
-            subject = x509.Name([
-                x509.NameAttribute(NameOID.COUNTRY_NAME, "US"),
-                x509.NameAttribute(NameOID.STATE_OR_PROVINCE_NAME, "Secure"),
-                x509.NameAttribute(NameOID.LOCALITY_NAME, "ZeroTrust"),
-                x509.NameAttribute(NameOID.ORGANIZATION_NAME, "SynapticOS"),
-                x509.NameAttribute(NameOID.ORGANIZATIONAL_UNIT_NAME, entity.entity_type),
-                x509.NameAttribute(NameOID.COMMON_NAME, entity.name),
-            ])
-            
-            # Create Subject Alternative Names
-            san_list = []
-            for ip in entity.ip_addresses:
-                try:
-                    san_list.append(x509.IPAddress(ipaddress.ip_address(ip)))
-                except:
-                    san_list.append(x509.DNSName(ip))
-            
-            # Build certificate
-            cert_builder = x509.CertificateBuilder().subject_name(
-                subject
-            ).issuer_name(
-                self.ca_certificate.subject
-            ).public_key(
-                private_key.public_key()
-            ).serial_number(
-                x509.random_serial_number()
-            ).not_valid_before(
-                datetime.utcnow()
-            ).not_valid_after(
-                datetime.utcnow() + timedelta(days=self.config["entity_validity_days"])
-            ).add_extension(
-                x509.BasicConstraints(ca=False, path_length=None),
-                critical=True,
-            ).add_extension(
-                x509.KeyUsage(
-                    key_cert_sign=False,
-                    crl_sign=False,
-                    digital_signature=True,
-                    content_commitment=True,
-                    key_encipherment=True,
-                    data_encipherment=False,
-                    key_agreement=False,
-                    encipher_only=False,
-                    decipher_only=False,
-                ),
-                critical=True,
-            ).add_extension(
-                x509.ExtendedKeyUsage([
-                    x509.oid.ExtendedKeyUsageOID.CLIENT_AUTH,
-                    x509.oid.ExtendedKeyUsageOID.SERVER_AUTH,
-                ]),
-                critical=True,
-            ).add_extension(
-                x509.SubjectKeyIdentifier.from_public_key(private_key.public_key()),
-                critical=False,
-            ).add_extension(
-                x509.AuthorityKeyIdentifier.from_issuer_public_key(self.ca_private_key.public_key()),
-                critical=False,
-            )
-            
-            # Add SAN if available
-            if san_list:
-                cert_builder = cert_builder.add_extension(
-                    x509.SubjectAlternativeName(san_list),
-                    critical=False,
+            loop = asyncio.get_running_loop()
+            
+            # Take a pre-generated private key for the entity
+            if self.key_pool is not None:
+                private_key_pem, public_key_der = await self.key_pool.acquire()
+            else:
+                private_key_pem, public_key_der = await loop.run_in_executor(
+                    None, _generate_entity_key, self.config["entity_key_size"]
                 )
             
-            # Sign the certificate
-            certificate = cert_builder.sign(self.ca_private_key, hashes.SHA256(), default_backend())
+            # Build and sign off the event loop
+            certificate = await loop.run_in_executor(
+                None, self._build_entity_certificate, entity, public_key_der
+            )
             
             # Calculate certificate fingerprint
             fingerprint = hashlib.sha256(certificate.public_bytes(serialization.Encoding.DER)).hexdigest()
             
             # Save certificate and private key
-            await self._save_entity_certificate(entity.entity_id, certificate, private_key)
+            await self._save_entity_certificate(entity.entity_id, certificate, private_key_pem)
             
             # Register certificate
             self.certificate_registry[entity.entity_id] = {
                 "fingerprint": fingerprint,
                 "issued": datetime.utcnow().isoformat(),
-                "expires": certificate.not_valid_after.isoformat(),
+                # Registry timestamps are naive UTC, like the "issued" field
+                "expires": certificate.not_valid_after_utc.replace(tzinfo=None).isoformat(),
                 "entity_type": entity.entity_type,
                 "entity_name": entity.name,
                 "serial_number": str(certificate.serial_number)
@@ -301,20 +421,108 @@ async def generate_entity_certificate(self, entity) -> str:
             self.logger.error(f"Certificate generation failed for {entity.entity_id}: {e}")
             raise
 
+    async def generate_entity_certificates(self, entities: List[Any]) -> Dict[str, str]:
+        """Generate certificates for many entities concurrently; returns fingerprints by entity id"""
+        results = await asyncio.gather(
+            *(self.generate_entity_certificate(entity) for entity in entities),
+            return_exceptions=True
+        )
+        return {
+            entity.entity_id: fingerprint
+            for entity, fingerprint in zip(entities, results)
+            if not isinstance(fingerprint, Exception)
+        }
+
+    def _build_entity_certificate(self, entity, public_key_der: bytes) -> x509.Certificate:
+        """Build and sign an entity certificate for the given public key"""
+        public_key = serialization.load_der_public_key(public_key_der, backend=default_backend())
+        
+        # Create certificate subject
+        subject = x509.Name([
+            x509.NameAttribute(NameOID.COUNTRY_NAME, "US"),
+            x509.NameAttribute(NameOID.STATE_OR_PROVINCE_NAME, "Secure"),
+            x509.NameAttribute(NameOID.LOCALITY_NAME, "ZeroTrust"),
+            x509.NameAttribute(NameOID.ORGANIZATION_NAME, "SynapticOS"),
+            x509.NameAttribute(NameOID.ORGANIZATIONAL_UNIT_NAME, entity.entity_type),
+            x509.NameAttribute(NameOID.COMMON_NAME, entity.name),
+        ])
+        
+        # Create Subject Alternative Names
+        san_list = []
+        for ip in entity.ip_addresses:
+            try:
+                san_list.append(x509.IPAddress(ipaddress.ip_address(ip)))
+            except ValueError:
+                san_list.append(x509.DNSName(ip))
+        
+        # Build certificate
+        cert_builder = x509.CertificateBuilder().subject_name(
+            subject
+        ).issuer_name(
+            self.ca_certificate.subject
+        ).public_key(
+            public_key
+        ).serial_number(
+            x509.random_serial_number()
+        ).not_valid_before(
+            datetime.utcnow()
+        ).not_valid_after(
+            datetime.utcnow() + timedelta(days=self.config["entity_validity_days"])
+        ).add_extension(
+            x509.BasicConstraints(ca=False, path_length=None),
+            critical=True,
+        ).add_extension(
+            x509.KeyUsage(
+                key_cert_sign=False,
+                crl_sign=False,
+                digital_signature=True,
+                content_commitment=True,
+                key_encipherment=True,
+                data_encipherment=False,
+                key_agreement=False,
+                encipher_only=False,
+                decipher_only=False,
+            ),
+            critical=True,
+        ).add_extension(
+            x509.ExtendedKeyUsage([
+                x509.oid.ExtendedKeyUsageOID.CLIENT_AUTH,
+                x509.oid.ExtendedKeyUsageOID.SERVER_AUTH,
+            ]),
+            critical=True,
+        ).add_extension(
+            x509.SubjectKeyIdentifier.from_public_key(public_key),
+            critical=False,
+        ).add_extension(
+            x509.AuthorityKeyIdentifier.from_issuer_public_key(self.ca_private_key.public_key()),
+            critical=False,
+        )
+        
+        # Add SAN if available
+        if san_list:
+            cert_builder = cert_builder.add_extension(
+                x509.SubjectAlternativeName(san_list),
+                critical=False,
+            )
+        
+        # Sign the certificate
+        return cert_builder.sign(self.ca_private_key, hashes.SHA256(), default_backend())
+
     async def _save_entity_certificate(self, entity_id: str, certificate: x509.Certificate, 
-                                     private_key: rsa.RSAPrivateKey):
+                                     private_key_pem: bytes):
         """Save entity certificate and private key"""
+        await asyncio.get_running_loop().run_in_executor(
+            None, self._write_entity_files, entity_id, certificate, private_key_pem
+        )
+
+    def _write_entity_files(self, entity_id: str, certificate: x509.Certificate, private_key_pem: bytes):
         entity_dir = self.entity_cert_path / entity_id
         entity_dir.mkdir(exist_ok=True, mode=0o700)
         
         # Save private key
         key_path = entity_dir / "private_key.pem"
         with open(key_path, "wb") as f:
-            f.write(private_key.private_bytes(
-                encoding=serialization.Encoding.PEM,
-                format=serialization.PrivateFormat.PKCS8,
-                encryption_algorithm=serialization.NoEncryption()
-            ))
+            f.write(private_key_pem)
         os.chmod(key_path, 0o600)
         
         # Save certificate
@@ -342,48 +550,79 @@ async def get_ca_certificate_path(self) -> str:
 
     async def verify_certificate(self, certificate_pem: bytes) -> Dict[str, Any]:
         """Verify a certificate against the CA"""
-        try:
-            # Load certificate
-            certificate = x509.load_pem_x509_certificate(certificate_pem, default_backend())
-            
-            # Verify signature
-            ca_public_key = self.ca_certificate.public_key()
+        cache_key = hashlib.sha256(certificate_pem).digest()
+        info = self._verification_cache.get(cache_key)
+        if info is not None:
+            self._verification_cache.move_to_end(cache_key)
+            self.verification_stats["hits"] += 1
+        else:
+            self.verification_stats["misses"] += 1
+            try:
+                info = self._parse_and_verify(certificate_pem)
+            except Exception as e:
+                return {
+                    "valid": False,
+                    "error": str(e)
+                }
+            self._verification_cache[cache_key] = info
+            while len(self._verification_cache) > self.verification_cache_size:
+                self._verification_cache.popitem(last=False)
+        
+        # Validity period and revocation are checked on every call
+        now = datetime.now(timezone.utc)
+        revoked = self.certificate_registry.is_revoked(info["fingerprint"])
+        return {
+            "valid": info["not_before"] <= now <= info["not_after"] and not revoked,
+            "revoked": revoked,
+            "entity_id": self.certificate_registry.find_by_fingerprint(info["fingerprint"]),
+            "fingerprint": info["fingerprint"],
+            "subject": info["subject"],
+            "issuer": info["issuer"],
+            "not_before": info["not_before"].isoformat(),
+            "not_after": info["not_after"].isoformat(),
+            "serial_number": info["serial_number"]
+        }
+
+    def _parse_and_verify(self, certificate_pem: bytes) -> Dict[str, Any]:
+        """Parse a certificate and check its signature against the CA"""
+        certificate = x509.load_pem_x509_certificate(certificate_pem, default_backend())
+        
+        ca_public_key = self.ca_certificate.public_key()
+        if isinstance(ca_public_key, rsa.RSAPublicKey):
             ca_public_key.verify(
                 certificate.signature,
                 certificate.tbs_certificate_bytes,
-                certificate.signature_algorithm_oid._name
+                padding.PKCS1v15(),
+                certificate.signature_hash_algorithm
             )
-            
-            # Check validity period
-            now = datetime.utcnow()
-            is_valid = (now >= certificate.not_valid_before and 
-                       now <= certificate.not_valid_after)
-            
-            # Calculate fingerprint
-            fingerprint = hashlib.sha256(certificate.public_bytes(serialization.Encoding.DER)).hexdigest()
-            
-            return {
-                "valid": is_valid,
-                "fingerprint": fingerprint,
-                "subject": str(certificate.subject),
-                "issuer": str(certificate.issuer),
-                "not_before": certificate.not_valid_before.isoformat(),
-                "not_after": certificate.not_valid_after.isoformat(),
-                "serial_number": str(certificate.serial_number)
-            }
-            
-        except Exception as e:
-            return {
-                "valid": False,
-                "error": str(e)
-            }
+        else:
+            ca_public_key.verify(
+                certificate.signature,
+                certificate.tbs_certificate_bytes,
+                ec.ECDSA(certificate.signature_hash_algorithm)
+            )
+        
+        return {
+            "fingerprint": hashlib.sha256(certificate.public_bytes(serialization.Encoding.DER)).hexdigest(),
+            "subject": str(certificate.subject),
+            "issuer": str(certificate.issuer),
+            "not_before": certificate.not_valid_before_utc,
+            "not_after": certificate.not_valid_after_utc,
+            "serial_number": str(certificate.serial_number)
+        }
+
+    def _invalidate_verification(self, fingerprint: str):
+        stale = [key for key, info in self._verification_cache.items() if info["fingerprint"] == fingerprint]
+        for key in stale:
+            del self._verification_cache[key]
+        self.verification_stats["invalidations"] += len(stale)
 
     async def revoke_certificate(self, entity_id: str) -> bool:
         """Revoke a certificate (simplified implementation)"""
         try:
-            if entity_id in self.certificate_registry:
-                self.certificate_registry[entity_id]["revoked"] = True
-                self.certificate_registry[entity_id]["revoked_at"] = datetime.utcnow().isoformat()
+            fingerprint = self.certificate_registry.revoke(entity_id, datetime.utcnow().isoformat())
+            if fingerprint is not None:
+                self._invalidate_verification(fingerprint)
                 await self._save_certificate_registry()
                 
                 self.logger.info(f"Certificate revoked for entity {entity_id}")
@@ -400,19 +639,32 @@ async def _load_certificate_registry(self):
         if registry_path.exists():
             try:
                 with open(registry_path, 'r') as f:
-                    self.certificate_registry = json.load(f)
+                    self.certificate_registry = CertificateRegistry(json.load(f))
             except Exception as e:
                 self.logger.error(f"Failed to load certificate registry: {e}")
-                self.certificate_registry = {}
+                self.certificate_registry = CertificateRegistry()
 
     async def _save_certificate_registry(self):
-        """Save certificate registry to file"""
+        """Save certificate registry to file; concurrent callers share one write"""
+        self._registry_version += 1
+        version = self._registry_version
+        async with self._registry_save_lock:
+            if self._registry_saved_version >= version:
+                return
+            version = self._registry_version
+            snapshot = json.dumps(self.certificate_registry.to_dict(), indent=2)
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self._write_registry, snapshot)
+                self._registry_saved_version = version
+            except Exception as e:
+                self.logger.error(f"Failed to save certificate registry: {e}")
+
+    def _write_registry(self, snapshot: str):
         registry_path = self.cert_base_path / "certificate_registry.json"
-        try:
-            with open(registry_path, 'w') as f:
-                json.dump(self.certificate_registry, f, indent=2)
-        except Exception as e:
-            self.logger.error(f"Failed to save certificate registry: {e}")
+        tmp_path = registry_path.with_suffix(".json.tmp")
+        with open(tmp_path, 'w') as f:
+            f.write(snapshot)
+        os.replace(tmp_path, registry_path)
 
     async def _check_expiring_certificates(self):
         """Check for expiring certificates and log warnings"""
@@ -454,3 +706,22 @@ async def list_certificates(self) -> Dict[str, Any]:
             status = await self.get_certificate_status(entity_id)
             result[entity_id] = {**cert_info, **status}
         return result
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Verification cache and key pool statistics"""
+        lookups = self.verification_stats["hits"] + self.verification_stats["misses"]
+        return {
+            "verification_cache_size": len(self._verification_cache),
+            "verification_hit_rate": self.verification_stats["hits"] / lookups if lookups else 0.0,
+            **self.verification_stats,
+            "key_pool": {
+                "size": self.key_pool.size,
+                "ready": self.key_pool.ready(),
+                **self.key_pool.stats
+            } if self.key_pool is not None else None
+        }
+
+    async def close(self):
+        """Stop the key pool workers"""
+        if self.key_pool is not None:
+            self.key_pool.close()
@@ -5,17 +5,28 @@
 """
 
 import asyncio
+import difflib
 import logging
 import json
+import socket
 import subprocess
+from collections import OrderedDict
 from typing import Dict, Any, List, Optional, Set, Tuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from enum import Enum
-from ipaddress import IPv4Network, IPv6Network, ip_network, ip_address
-import iptables
-import netfilterqueue
+from ipaddress import IPv4Network, IPv6Network, collapse_addresses, ip_network, ip_address
 from datetime import datetime
 
+try:
+    import iptables
+except ImportError:
+    iptables = None
+
+try:
+    import netfilterqueue
+except ImportError:
+    netfilterqueue = None
+
 class NetworkZone(Enum):
     """Network zones for micro-segmentation"""
     CONSCIOUSNESS = "consciousness"      # AI consciousness modules
@@ -88,10 +99,396 @@ class TrafficFlow:
     last_seen: str
     risk_score: float
 
+class _TrieNode:
+    """One 8-bit stride of a prefix trie"""
+
+    __slots__ = ("children", "entries")
+
+    def __init__(self):
+        self.children: List[Optional["_TrieNode"]] = [None] * 256
+        # Per slot: (prefix length, value) of every prefix covering it, longest first
+        self.entries: List[Optional[List[Tuple[int, Any]]]] = [None] * 256
+
+
+class PrefixTrie:
+    """Longest-prefix-match trie with 8-bit strides and prefix expansion"""
+
+    def __init__(self, bits: int):
+        self.bits = bits
+        self.root = _TrieNode()
+
+    def insert(self, address: int, prefix_len: int, value: Any):
+        """Insert a prefix; an existing prefix of the same length keeps its value"""
+        if prefix_len == 0:
+            depth, remainder = 0, 0
+        else:
+            depth = (prefix_len - 1) // 8
+            remainder = prefix_len - depth * 8
+
+        node = self.root
+        for level in range(depth):
+            byte = (address >> (self.bits - 8 * (level + 1))) & 0xFF
+            if node.children[byte] is None:
+                node.children[byte] = _TrieNode()
+            node = node.children[byte]
+
+        byte = (address >> (self.bits - 8 * (depth + 1))) & 0xFF
+        base = byte & (0xFF << (8 - remainder)) & 0xFF
+        for entry in range(base, base + (1 << (8 - remainder))):
+            covering = node.entries[entry]
+            if covering is None:
+                node.entries[entry] = [(prefix_len, value)]
+            elif all(length != prefix_len for length, _ in covering):
+                covering.append((prefix_len, value))
+                covering.sort(key=lambda pair: -pair[0])
+
+    def lookup(self, address: int, max_len: Optional[int] = None) -> Any:
+        """Value of the longest prefix containing address (no longer than max_len)"""
+        max_len = self.bits if max_len is None else max_len
+        node, best = self.root, None
+        shift = self.bits - 8
+        while node is not None and shift >= 0:
+            byte = (address >> shift) & 0xFF
+            # Shorter prefixes stay reachable when max_len cuts off the longest one
+            for length, value in node.entries[byte] or ():
+                if length <= max_len:
+                    best = value
+                    break
+            node = node.children[byte]
+            shift -= 8
+        return best
+
+
+def _parse_address(address: str) -> Tuple[int, int, int]:
+    """Parse an IP or CIDR into (version, integer, prefix length)"""
+    if '/' in address:
+        network = ip_network(address, strict=False)
+        return network.version, int(network.network_address), network.prefixlen
+    try:
+        return 4, int.from_bytes(socket.inet_pton(socket.AF_INET, address), 'big'), 32
+    except OSError:
+        return 6, int.from_bytes(socket.inet_pton(socket.AF_INET6, address), 'big'), 128
+
+
+class ZoneLookup:
+    """Zone membership by longest-prefix match over IPv4 and IPv6 tries"""
+
+    def __init__(self, zone_networks: Dict[NetworkZone, List[str]]):
+        self.tries = {4: PrefixTrie(32), 6: PrefixTrie(128)}
+        for zone, networks in zone_networks.items():
+            for network_str in networks:
+                network = ip_network(network_str, strict=False)
+                self.tries[network.version].insert(int(network.network_address), network.prefixlen, zone)
+
+    def lookup(self, address: str) -> Optional[NetworkZone]:
+        version, value, prefix_len = _parse_address(address)
+        return self.tries[version].lookup(value, prefix_len)
+
+
+class CompiledRuleIndex:
+    """Enabled rules bucketed by (source zone, destination zone, protocol)
+
+    Each bucket maps destination port to its best rule and keeps the best
+    port-wildcard rule, so a bucket is resolved with two dict lookups.
+    EXTERNAL rule zones and the "any" protocol act as wildcards, as in
+    evaluate_traffic.
+    """
+
+    def __init__(self, rules: List[NetworkRule]):
+        # Rank by priority, then by insertion order for equal priorities
+        self.buckets: Dict[Tuple[NetworkZone, NetworkZone, str], Tuple[Dict[int, Tuple], Optional[Tuple]]] = {}
+        for order, rule in enumerate(rules):
+            if not rule.enabled:
+                continue
+            ranked = (rule.priority, order, rule)
+            key = (rule.source_zone, rule.destination_zone, rule.protocol)
+            by_port, any_port = self.buckets.setdefault(key, ({}, None))
+            if rule.destination_ports:
+                for port in set(rule.destination_ports):
+                    if port not in by_port or ranked[:2] < by_port[port][:2]:
+                        by_port[port] = ranked
+            elif any_port is None or ranked[:2] < any_port[:2]:
+                self.buckets[key] = (by_port, ranked)
+
+    def match(self, source_zone: NetworkZone, dest_zone: NetworkZone,
+              dest_port: int, protocol: str) -> Optional[NetworkRule]:
+        best = None
+        for src in {source_zone, NetworkZone.EXTERNAL}:
+            for dst in {dest_zone, NetworkZone.EXTERNAL}:
+                for proto in {protocol, "any"}:
+                    bucket = self.buckets.get((src, dst, proto))
+                    if bucket is None:
+                        continue
+                    by_port, any_port = bucket
+                    for candidate in (by_port.get(dest_port), any_port):
+                        if candidate is not None and (best is None or candidate[:2] < best[:2]):
+                            best = candidate
+        return best[2] if best else None
+
+
+@dataclass
+class FirewallRuleset:
+    """A rendered segmentation ruleset for one firewall backend
+
+    rules are the segmentation chain's rule specs in evaluation order;
+    zone_sets holds nftables set elements (empty for iptables, which
+    inlines zone networks into the rules).
+    """
+    backend: str
+    rules: List[str]
+    zone_sets: Dict[str, List[str]] = field(default_factory=dict)
+
+    def render(self) -> str:
+        """Full ruleset, replacing whatever is loaded in a single transaction"""
+        if self.backend == "nftables":
+            return self._render_nft()
+        return self._render_iptables()
+
+    def diff(self, applied: "FirewallRuleset") -> Optional[str]:
+        """Incremental transaction from applied to this ruleset
+
+        Returns "" when nothing changed and None when the change cannot be
+        expressed incrementally (a full render is needed).
+        """
+        if applied.backend != self.backend or set(applied.zone_sets) != set(self.zone_sets):
+            return None
+        if self.backend == "nftables":
+            return self._diff_nft(applied)
+        return self._diff_iptables(applied)
+
+    def restore_command(self, incremental: bool) -> List[str]:
+        if self.backend == "nftables":
+            return ["nft", "-f", "-"]
+        return ["iptables-restore", "--noflush"] if incremental else ["iptables-restore"]
+
+    def _render_iptables(self) -> str:
+        chain = FirewallRulesetCompiler.IPTABLES_CHAIN
+        lines = [
+            "*filter",
+            ":INPUT DROP [0:0]",
+            ":FORWARD DROP [0:0]",
+            ":OUTPUT ACCEPT [0:0]",
+            f":{chain} - [0:0]",
+            "-A INPUT -i lo -j ACCEPT",
+            "-A INPUT -m conntrack --ctstate ESTABLISHED,RELATED -j ACCEPT",
+            "-A OUTPUT -o lo -j ACCEPT",
+            "-A FORWARD -m conntrack --ctstate ESTABLISHED,RELATED -j ACCEPT",
+            f"-A FORWARD -j {chain}"
+        ]
+        lines.extend(f"-A {chain} {spec}" for spec in self.rules)
+        lines.append("COMMIT")
+        return "\n".join(lines) + "\n"
+
+    def _diff_iptables(self, applied: "FirewallRuleset") -> str:
+        chain = FirewallRulesetCompiler.IPTABLES_CHAIN
+        matcher = difflib.SequenceMatcher(a=applied.rules, b=self.rules, autojunk=False)
+        commands = []
+        # Work back to front so earlier rule numbers stay valid
+        for tag, i1, i2, j1, j2 in reversed(matcher.get_opcodes()):
+            if tag == "equal":
+                continue
+            for position in range(i2, i1, -1):
+                commands.append(f"-D {chain} {position}")
+            for offset, spec in enumerate(self.rules[j1:j2]):
+                commands.append(f"-I {chain} {i1 + 1 + offset} {spec}")
+        if not commands:
+            return ""
+        return "\n".join(["*filter", *commands, "COMMIT"]) + "\n"
+
+    def _render_nft(self) -> str:
+        table = f"inet {FirewallRulesetCompiler.NFT_TABLE}"
+        chain = FirewallRulesetCompiler.NFT_CHAIN
+        lines = [f"table {table}", f"delete table {table}", f"table {table} {{"]
+        for name, elements in self.zone_sets.items():
+            addr_type = "ipv6_addr" if name.endswith("_v6") else "ipv4_addr"
+            lines.append(f"\tset {name} {{")
+            lines.append(f"\t\ttype {addr_type}")
+            lines.append("\t\tflags interval")
+            if elements:
+                lines.append(f"\t\telements = {{ {', '.join(elements)} }}")
+            lines.append("\t}")
+        lines.extend([
+            "\tchain input {",
+            "\t\ttype filter hook input priority 0; policy drop;",
+            '\t\tiif "lo" accept',
+            "\t\tct state established,related accept",
+            "\t}",
+            "\tchain forward {",
+            "\t\ttype filter hook forward priority 0; policy drop;",
+            "\t\tct state established,related accept",
+            f"\t\tjump {chain}",
+            "\t}",
+            "\tchain output {",
+            "\t\ttype filter hook output priority 0; policy accept;",
+            "\t}",
+            f"\tchain {chain} {{",
+            "\t}",
+            "}"
+        ])
+        lines.extend(f"add rule {table} {chain} {spec}" for spec in self.rules)
+        return "\n".join(lines) + "\n"
+
+    def _diff_nft(self, applied: "FirewallRuleset") -> str:
+        table = f"inet {FirewallRulesetCompiler.NFT_TABLE}"
+        chain = FirewallRulesetCompiler.NFT_CHAIN
+        commands = []
+        # Zone membership lives in sets, so quarantines only touch elements
+        for name, elements in self.zone_sets.items():
+            previous, current = set(applied.zone_sets[name]), set(elements)
+            removed = [e for e in applied.zone_sets[name] if e not in current]
+            added = [e for e in elements if e not in previous]
+            if removed:
+                commands.append(f"delete element {table} {name} {{ {', '.join(removed)} }}")
+            if added:
+                commands.append(f"add element {table} {name} {{ {', '.join(added)} }}")
+        if self.rules != applied.rules:
+            commands.append(f"flush chain {table} {chain}")
+            commands.extend(f"add rule {table} {chain} {spec}" for spec in self.rules)
+        return "\n".join(commands) + "\n" if commands else ""
+
+
+class FirewallRulesetCompiler:
+    """Compiles zones and segmentation rules into an iptables or nftables ruleset"""
+
+    BACKENDS = ("iptables", "nftables")
+    IPTABLES_CHAIN = "SYNOS-SEGMENTATION"
+    NFT_TABLE = "synos_segmentation"
+    NFT_CHAIN = "segmentation"
+    MULTIPORT_LIMIT = 15
+
+    IPTABLES_TARGETS = {
+        TrafficAction.ALLOW: "-j ACCEPT",
+        TrafficAction.DENY: "-j DROP",
+        TrafficAction.QUARANTINE: "-j DROP",
+        TrafficAction.INSPECT: "-j NFQUEUE --queue-num 0 --queue-bypass"
+    }
+    NFT_VERDICTS = {
+        TrafficAction.ALLOW: "accept",
+        TrafficAction.DENY: "drop",
+        TrafficAction.QUARANTINE: "drop",
+        TrafficAction.INSPECT: "queue num 0 bypass"
+    }
+
+    def __init__(self, backend: str = "iptables"):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unsupported firewall backend: {backend}")
+        self.backend = backend
+
+    def compile(self, zone_networks: Dict[NetworkZone, List[str]],
+                rules: List[NetworkRule]) -> FirewallRuleset:
+        # Same precedence as evaluate_traffic: priority, then insertion order
+        ordered = [rule for _, _, rule in sorted(
+            (rule.priority, order, rule) for order, rule in enumerate(rules) if rule.enabled
+        )]
+        networks = {zone: self._collapse(nets) for zone, nets in zone_networks.items()}
+
+        if self.backend == "nftables":
+            zone_sets = {}
+            for zone in networks:
+                if zone == NetworkZone.EXTERNAL:
+                    continue
+                for version in (4, 6):
+                    zone_sets[self._set_name(zone, version)] = [
+                        str(net) for net in networks[zone] if net.version == version
+                    ]
+            specs = [spec for rule in ordered for spec in self._nft_specs(rule)]
+            return FirewallRuleset("nftables", specs, zone_sets)
+
+        specs = [spec for rule in ordered for spec in self._iptables_specs(rule, networks)]
+        return FirewallRuleset("iptables", specs)
+
+    def _collapse(self, networks: List[str]) -> List:
+        parsed = [ip_network(net, strict=False) for net in networks]
+        collapsed = []
+        for version in (4, 6):
+            collapsed.extend(collapse_addresses(net for net in parsed if net.version == version))
+        return collapsed
+
+    def _protocols(self, rule: NetworkRule) -> List[Tuple[Optional[str], List[int]]]:
+        """(protocol, ports) variants; ports only apply to tcp and udp"""
+        ports = sorted(set(rule.destination_ports))
+        if rule.protocol in ("tcp", "udp"):
+            return [(rule.protocol, ports)]
+        if rule.protocol == "any":
+            return [("tcp", ports), ("udp", ports)] if ports else [(None, [])]
+        return [(rule.protocol, [])]
+
+    def _comment(self, rule: NetworkRule) -> str:
+        text = f"{rule.rule_id}: {rule.name}".replace('"', "'").replace("\\", "/")
+        return text[:255]
+
+    def _iptables_specs(self, rule: NetworkRule, networks: Dict[NetworkZone, List]) -> List[str]:
+        def endpoints(zone):
+            # EXTERNAL is the wildcard zone, as in evaluate_traffic
+            if zone == NetworkZone.EXTERNAL:
+                return [None]
+            return [str(net) for net in networks.get(zone, []) if net.version == 4]
+
+        if rule.action == TrafficAction.LOG:
+            target = f'-j LOG --log-prefix "[{rule.rule_id[:24]}] "'
+        else:
+            target = self.IPTABLES_TARGETS[rule.action]
+        comment = f'-m comment --comment "{self._comment(rule)}"'
+
+        specs = []
+        for source in endpoints(rule.source_zone):
+            for dest in endpoints(rule.destination_zone):
+                for protocol, ports in self._protocols(rule):
+                    parts = []
+                    if source:
+                        parts.append(f"-s {source}")
+                    if dest:
+                        parts.append(f"-d {dest}")
+                    if protocol:
+                        parts.append(f"-p {protocol}")
+                    port_groups = [ports[i:i + self.MULTIPORT_LIMIT]
+                                   for i in range(0, len(ports), self.MULTIPORT_LIMIT)] or [[]]
+                    for group in port_groups:
+                        port_match = [f"-m multiport --dports {','.join(map(str, group))}"] if group else []
+                        specs.append(" ".join(parts + port_match + [comment, target]))
+        return specs
+
+    def _set_name(self, zone: NetworkZone, version: int) -> str:
+        return f"zone_{zone.value}_v{version}"
+
+    def _nft_specs(self, rule: NetworkRule) -> List[str]:
+        if rule.action == TrafficAction.LOG:
+            verdict = f'log prefix "[{rule.rule_id[:24]}] "'
+        else:
+            verdict = self.NFT_VERDICTS[rule.action]
+        comment = f'comment "{self._comment(rule)[:127]}"'
+
+        if rule.source_zone == NetworkZone.EXTERNAL and rule.destination_zone == NetworkZone.EXTERNAL:
+            families = [None]
+        else:
+            families = [(4, "ip"), (6, "ip6")]
+
+        specs = []
+        for family in families:
+            addresses = []
+            if family:
+                version, keyword = family
+                if rule.source_zone != NetworkZone.EXTERNAL:
+                    addresses.append(f"{keyword} saddr @{self._set_name(rule.source_zone, version)}")
+                if rule.destination_zone != NetworkZone.EXTERNAL:
+                    addresses.append(f"{keyword} daddr @{self._set_name(rule.destination_zone, version)}")
+            for protocol, ports in self._protocols(rule):
+                if protocol in ("tcp", "udp") and ports:
+                    match = [f"{protocol} dport {{ {', '.join(map(str, ports))} }}"]
+                elif protocol:
+                    match = [f"meta l4proto {protocol}"]
+                else:
+                    match = []
+                specs.append(" ".join(addresses + match + ["counter", verdict, comment]))
+        return specs
+
+
 class NetworkSegmentationEngine:
     """Manages network micro-segmentation for Zero Trust"""
     
-    def __init__(self, config_path: str = "config/security/network_segmentation.yaml"):
+    def __init__(self, config_path: str = "config/security/network_segmentation.yaml",
+                 decision_cache_size: int = 65536, firewall_backend: str = "iptables",
+                 firewall_dry_run: bool = False):
         """Initialize Network Segmentation Engine"""
         self.logger = logging.getLogger("security.zero_trust.network")
         self.config_path = config_path
@@ -102,6 +499,18 @@ def __init__(self, config_path: str = "config/security/network_segmentation.yaml
         self.rules: Dict[str, NetworkRule] = {}
         self.active_flows: Dict[str, TrafficFlow] = {}
         
+        # Compiled policy, rebuilt lazily after zones or rules change
+        self._zone_lookup: Optional[ZoneLookup] = None
+        self._rule_index: Optional[CompiledRuleIndex] = None
+        self.decision_cache_size = decision_cache_size
+        self._decision_cache: OrderedDict = OrderedDict()
+        
+        # Firewall ruleset; dry-run renders transactions without applying them
+        self.firewall_compiler = FirewallRulesetCompiler(firewall_backend)
+        self.firewall_dry_run = firewall_dry_run
+        self._applied_ruleset: Optional[FirewallRuleset] = None
+        self.last_firewall_transaction = ""
+        
         # Default zone networks
         self._initialize_default_zones()
         
@@ -244,15 +653,18 @@ async def _create_default_rules(self):
         for rule in default_rules:
             rule.created_at = datetime.utcnow().isoformat()
             self.rules[rule.rule_id] = rule
+        
+        self.invalidate_policy()
 
     async def add_segmentation_rule(self, rule: NetworkRule) -> bool:
         """Add a new network segmentation rule"""
         try:
             rule.created_at = datetime.utcnow().isoformat()
             self.rules[rule.rule_id] = rule
+            self.invalidate_policy()
             
             # Apply rule to firewall
-            await self._apply_firewall_rule(rule)
+            await self.apply_firewall_ruleset()
             
             self.logger.info(f"Added segmentation rule: {rule.name}")
             return True
@@ -261,124 +673,84 @@ async def add_segmentation_rule(self, rule: NetworkRule) -> bool:
             self.logger.error(f"Failed to add segmentation rule: {e}")
             return False
 
-    async def _apply_firewall_rule(self, rule: NetworkRule):
-        """Apply a rule to the firewall (iptables)"""
-        try:
-            # Convert rule to iptables command
-            iptables_cmd = await self._rule_to_iptables(rule)
-            
-            # Execute iptables command
-            process = await asyncio.create_subprocess_shell(
-                iptables_cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            stdout, stderr = await process.communicate()
-            
-            if process.returncode != 0:
-                self.logger.error(f"iptables command failed: {stderr.decode()}")
-            else:
-                self.logger.debug(f"Applied iptables rule: {iptables_cmd}")
-                
-        except Exception as e:
-            self.logger.error(f"Failed to apply firewall rule: {e}")
+    def build_firewall_ruleset(self) -> FirewallRuleset:
+        """Compile the current zones and rules for the configured backend"""
+        return self.firewall_compiler.compile(self.zone_networks, list(self.rules.values()))
 
-    async def _rule_to_iptables(self, rule: NetworkRule) -> str:
-        """Convert a segmentation rule to iptables command"""
-        # Get source and destination networks
-        source_networks = self.zone_networks.get(rule.source_zone, [])
-        dest_networks = self.zone_networks.get(rule.destination_zone, [])
-        
-        cmd_parts = ["iptables", "-A", "FORWARD"]
-        
-        # Source network
-        if source_networks and source_networks[0] != "0.0.0.0/0":
-            cmd_parts.extend(["-s", source_networks[0]])
-        
-        # Destination network
-        if dest_networks and dest_networks[0] != "0.0.0.0/0":
-            cmd_parts.extend(["-d", dest_networks[0]])
+    def render_firewall_ruleset(self) -> str:
+        """Full ruleset as iptables-restore or nft -f input"""
+        return self.build_firewall_ruleset().render()
+
+    async def apply_firewall_ruleset(self, full: bool = False) -> bool:
+        """Push the ruleset in one transaction, only the changes unless full"""
+        ruleset = self.build_firewall_ruleset()
         
-        # Protocol
-        if rule.protocol != "any":
-            cmd_parts.extend(["-p", rule.protocol])
+        transaction = None
+        if not full and self._applied_ruleset is not None:
+            transaction = ruleset.diff(self._applied_ruleset)
+        incremental = transaction is not None
+        if transaction is None:
+            transaction = ruleset.render()
+        if not transaction:
+            return True
         
-        # Destination ports
-        if rule.destination_ports:
-            if rule.protocol in ["tcp", "udp"]:
-                ports = ",".join(map(str, rule.destination_ports))
-                cmd_parts.extend(["--dport", ports])
+        self.last_firewall_transaction = transaction
+        if self.firewall_dry_run:
+            self.logger.debug(f"Dry-run firewall transaction:\n{transaction}")
+            self._applied_ruleset = ruleset
+            return True
         
-        # Action
-        if rule.action == TrafficAction.ALLOW:
-            cmd_parts.extend(["-j", "ACCEPT"])
-        elif rule.action == TrafficAction.DENY:
-            cmd_parts.extend(["-j", "DROP"])
-        elif rule.action == TrafficAction.LOG:
-            cmd_parts.extend(["-j", "LOG", "--log-prefix", f"[{rule.rule_id}] "])
+        command = ruleset.restore_command(incremental)
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *command,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            stdout, stderr = await process.communicate(transaction.encode())
+        except OSError as e:
+            self.logger.error(f"Failed to run {command[0]}: {e}")
+            return False
         
-        # Add comment
-        cmd_parts.extend(["-m", "comment", "--comment", f"{rule.name}"])
+        if process.returncode != 0:
+            # The transaction was rejected as a whole; resync fully next time
+            self.logger.error(f"{command[0]} failed: {stderr.decode()}")
+            self._applied_ruleset = None
+            return False
         
-        return " ".join(cmd_parts)
+        self._applied_ruleset = ruleset
+        self.logger.debug(f"Applied {'incremental' if incremental else 'full'} firewall ruleset "
+                          f"({len(ruleset.rules)} rules)")
+        return True
 
     async def _configure_firewall_rules(self):
         """Configure base firewall rules"""
         try:
-            # Clear existing rules
-            await self._execute_command("iptables -F FORWARD")
-            await self._execute_command("iptables -F INPUT")
-            await self._execute_command("iptables -F OUTPUT")
-            
-            # Set default policies
-            await self._execute_command("iptables -P FORWARD DROP")
-            await self._execute_command("iptables -P INPUT DROP")
-            await self._execute_command("iptables -P OUTPUT ACCEPT")
-            
-            # Allow loopback
-            await self._execute_command("iptables -A INPUT -i lo -j ACCEPT")
-            await self._execute_command("iptables -A OUTPUT -o lo -j ACCEPT")
-            
-            # Allow established connections
-            await self._execute_command("iptables -A INPUT -m conntrack --ctstate ESTABLISHED,RELATED -j ACCEPT")
-            await self._execute_command("iptables -A FORWARD -m conntrack --ctstate ESTABLISHED,RELATED -j ACCEPT")
-            
-            # Apply all segmentation rules
-            for rule in self.rules.values():
-                if rule.enabled:
-                    await self._apply_firewall_rule(rule)
-            
-            self.logger.info("Firewall rules configured successfully")
+            if await self.apply_firewall_ruleset(full=True):
+                self.logger.info("Firewall rules configured successfully")
             
         except Exception as e:
             self.logger.error(f"Failed to configure firewall rules: {e}")
 
-    async def _execute_command(self, command: str):
-        """Execute a shell command"""
-        process = await asyncio.create_subprocess_shell(
-            command,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        stdout, stderr = await process.communicate()
-        
-        if process.returncode != 0:
-            self.logger.warning(f"Command failed: {command} - {stderr.decode()}")
-        
-        return stdout.decode(), stderr.decode(), process.returncode
+    def invalidate_policy(self):
+        """Drop the compiled policy and cached decisions after zones or rules change"""
+        self._zone_lookup = None
+        self._rule_index = None
+        self._decision_cache.clear()
+
+    def _compiled_policy(self) -> Tuple[ZoneLookup, CompiledRuleIndex]:
+        if self._zone_lookup is None:
+            self._zone_lookup = ZoneLookup(self.zone_networks)
+        if self._rule_index is None:
+            self._rule_index = CompiledRuleIndex(list(self.rules.values()))
+        return self._zone_lookup, self._rule_index
 
     def get_zone_for_ip(self, ip_address: str) -> NetworkZone:
-        """Get the network zone for an IP address"""
+        """Get the network zone for an IP address (longest matching prefix wins)"""
         try:
-            ip = ip_network(ip_address, strict=False)
-            
-            for zone, networks in self.zone_networks.items():
-                for network_str in networks:
-                    network = ip_network(network_str, strict=False)
-                    if ip.subnet_of(network) or ip == network:
-                        return zone
-            
-            return NetworkZone.EXTERNAL
+            zone_lookup, _ = self._compiled_policy()
+            return zone_lookup.lookup(ip_address) or NetworkZone.EXTERNAL
             
         except Exception:
             return NetworkZone.EXTERNAL
@@ -387,39 +759,24 @@ async def evaluate_traffic(self, source_ip: str, dest_ip: str,
                              dest_port: int, protocol: str) -> Tuple[TrafficAction, str]:
         """Evaluate traffic against segmentation rules"""
         try:
-            source_zone = self.get_zone_for_ip(source_ip)
-            dest_zone = self.get_zone_for_ip(dest_ip)
-            
-            # Find matching rules (sorted by priority)
-            matching_rules = []
-            for rule in self.rules.values():
-                if not rule.enabled:
-                    continue
-                
-                # Check zone matching
-                if (rule.source_zone != source_zone and 
-                    rule.source_zone != NetworkZone.EXTERNAL):
-                    continue
-                
-                if (rule.destination_zone != dest_zone and 
-                    rule.destination_zone != NetworkZone.EXTERNAL):
-                    continue
+            cache_key = (source_ip, dest_ip, dest_port, protocol)
+            if cache_key in self._decision_cache:
+                # Cached decisions (including default deny as None) skip zone and rule lookup
+                self._decision_cache.move_to_end(cache_key)
+                rule = self._decision_cache[cache_key]
+            else:
+                source_zone = self.get_zone_for_ip(source_ip)
+                dest_zone = self.get_zone_for_ip(dest_ip)
                 
-                # Check protocol
-                if rule.protocol != "any" and rule.protocol != protocol:
-                    continue
+                # Highest-priority rule (lowest number) from the compiled index
+                _, rule_index = self._compiled_policy()
+                rule = rule_index.match(source_zone, dest_zone, dest_port, protocol)
                 
-                # Check destination port
-                if rule.destination_ports and dest_port not in rule.destination_ports:
-                    continue
-                
-                matching_rules.append(rule)
-            
-            # Sort by priority (lower number = higher priority)
-            matching_rules.sort(key=lambda r: r.priority)
+                self._decision_cache[cache_key] = rule
+                if len(self._decision_cache) > self.decision_cache_size:
+                    self._decision_cache.popitem(last=False)
             
-            if matching_rules:
-                rule = matching_rules[0]
+            if rule is not None:
                 rule.match_count += 1
                 rule.last_matched = datetime.utcnow().isoformat()
                 
@@ -508,14 +865,15 @@ async def remove_from_quarantine(self, ip_address: str) -> bool:
             if ip_cidr in quarantine_networks:
                 quarantine_networks.remove(ip_cidr)
                 self.zone_networks[NetworkZone.QUARANTINE] = quarantine_networks
-            
+            self.invalidate_policy()
+
             # Remove quarantine rule
             rule_id = f"quarantine_{ip_address.replace('.', '_')}"
             if rule_id in self.rules:
                 del self.rules[rule_id]
-                
-                # Remove from iptables
-                await self._execute_command(f"iptables -D FORWARD -s {ip_address} -j DROP")
+            
+            # Push the zone and rule removal to the firewall
+            await self.apply_firewall_ruleset()
             
             self.logger.info(f"IP {ip_address} removed from quarantine")
             return True
@@ -17,13 +17,17 @@
 import logging
 import os
 import time
-from datetime import datetime, timedelta
+from collections import deque
+from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple, Callable
+
+import numpy as np
 
 try:
     from flask import Flask, render_template, jsonify, request, websocket
-    from flask_socketio import SocketIO, emit
+    from flask_socketio import SocketIO, emit, join_room
     import plotly.graph_objs as go
     import plotly.utils
     FLASK_AVAILABLE = True
@@ -39,45 +43,184 @@
 
 logger = logging.getLogger(__name__)
 
+class ColumnarRingBuffer:
+    """Fixed-capacity time series store with one NumPy column per metric
+
+    Appends overwrite the oldest row in O(1). Rows are kept in timestamp order, so
+    time-range queries binary-search the (at most two) contiguous segments of the ring.
+    """
+
+    def __init__(self, capacity: int, columns: List[str], object_columns: Optional[List[str]] = None):
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.columns = {name: np.zeros(capacity, dtype=np.float64) for name in columns}
+        # Non-numeric fields (e.g. pattern lists) ride along in plain Python slots
+        self.object_columns = {name: [None] * capacity for name in (object_columns or [])}
+        self.head = 0
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def append(self, timestamp: float, values: Dict[str, Any]):
+        """Add a row, overwriting the oldest one once full"""
+        if self.size and timestamp < self.last_timestamp():
+            # Keep the ring sorted if the wall clock steps backwards
+            timestamp = self.last_timestamp()
+
+        i = self.head
+        self.timestamps[i] = timestamp
+        for name, column in self.columns.items():
+            column[i] = values.get(name, 0.0)
+        for name, column in self.object_columns.items():
+            column[i] = values.get(name)
+
+        self.head = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def last_timestamp(self) -> float:
+        return float(self.timestamps[(self.head - 1) % self.capacity])
+
+    def first_timestamp(self) -> float:
+        return float(self.timestamps[(self.head - self.size) % self.capacity])
+
+    def _segments(self) -> List[Tuple[int, int]]:
+        """Physical [start, stop) slices holding rows in chronological order"""
+        if self.size == 0:
+            return []
+        start = (self.head - self.size) % self.capacity
+        if start < self.head:
+            return [(start, self.head)]
+        return [(start, self.capacity), (0, self.head)]
+
+    def _select(self, start_ts: float, end_ts: float) -> List[Tuple[int, int]]:
+        """Binary-search each segment for rows with start_ts < t <= end_ts"""
+        selected = []
+        for seg_start, seg_stop in self._segments():
+            segment = self.timestamps[seg_start:seg_stop]
+            lo = seg_start + int(np.searchsorted(segment, start_ts, side='right'))
+            hi = seg_start + int(np.searchsorted(segment, end_ts, side='right'))
+            if lo < hi:
+                selected.append((lo, hi))
+        return selected
+
+    def _gather(self, slices: List[Tuple[int, int]]) -> Dict[str, Any]:
+        def take(column):
+            return np.concatenate([column[lo:hi] for lo, hi in slices]) if slices else column[:0]
+
+        result = {'timestamp': take(self.timestamps)}
+        for name, column in self.columns.items():
+            result[name] = take(column)
+        for name, column in self.object_columns.items():
+            result[name] = [value for lo, hi in slices for value in column[lo:hi]]
+        return result
+
+    def range(self, start_ts: float, end_ts: Optional[float] = None) -> Dict[str, Any]:
+        """Columns for rows newer than start_ts (and not after end_ts)"""
+        if end_ts is None:
+            end_ts = float('inf')
+        return self._gather(self._select(start_ts, end_ts))
+
+    def tail(self, count: int) -> Dict[str, Any]:
+        """Columns for the newest count rows"""
+        count = min(count, self.size)
+        slices = []
+        remaining = count
+        for lo, hi in reversed(self._segments()):
+            if remaining <= 0:
+                break
+            take = min(remaining, hi - lo)
+            slices.insert(0, (hi - take, hi))
+            remaining -= take
+        return self._gather(slices)
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """Newest row as a dict, or None when empty"""
+        if self.size == 0:
+            return None
+        i = (self.head - 1) % self.capacity
+        row = {'timestamp': float(self.timestamps[i])}
+        row.update({name: float(column[i]) for name, column in self.columns.items()})
+        row.update({name: column[i] for name, column in self.object_columns.items()})
+        return row
+
+    def downsample(self, start_ts: float, end_ts: float, buckets: int) -> Dict[str, Any]:
+        """Min/max/avg per equal-width time bucket, skipping empty buckets"""
+        data = self.range(start_ts, end_ts)
+        timestamps = data['timestamp']
+        if len(timestamps) == 0:
+            return {'timestamp': timestamps, 'count': np.zeros(0, dtype=np.int64)}
+
+        edges = np.linspace(start_ts, end_ts, buckets + 1)
+        # Rows are sorted, so bucket boundaries are just insertion points
+        bounds = np.searchsorted(timestamps, edges[:-1], side='right')
+        bounds = np.append(bounds, len(timestamps))
+        counts = np.diff(bounds)
+        starts = bounds[:-1][counts > 0]
+        counts = counts[counts > 0]
+
+        result = {
+            'timestamp': np.add.reduceat(timestamps, starts) / counts,
+            'count': counts
+        }
+        for name in self.columns:
+            values = data[name]
+            result[name] = {
+                'min': np.minimum.reduceat(values, starts),
+                'max': np.maximum.reduceat(values, starts),
+                'avg': np.add.reduceat(values, starts) / counts
+            }
+        return result
+
+
+def _rows_from_columns(data: Dict[str, Any], columns: List[str]) -> List[Dict[str, Any]]:
+    """Convert columnar query results into the row dicts the API returns"""
+    timestamps = data['timestamp']
+    column_lists = {name: (data[name].tolist() if isinstance(data[name], np.ndarray) else data[name])
+                    for name in columns}
+    return [
+        {
+            'timestamp': datetime.fromtimestamp(ts).isoformat(),
+            **{name: column_lists[name][i] for name in columns}
+        }
+        for i, ts in enumerate(timestamps.tolist())
+    ]
+
+
 class AIMetricsCollector:
     """Collects and aggregates AI metrics for dashboard display"""
 
-    def __init__(self):
-        self.consciousness_history = []
-        self.neural_activity_history = []
-        self.learning_events = []
-        self.security_events = []
-        self.system_metrics = []
-        self.max_history_points = 1000
+    CONSCIOUSNESS_COLUMNS = ['awareness_level', 'neural_activity', 'learning_rate', 'system_integration']
+    NEURAL_COLUMNS = ['total_groups', 'active_groups', 'competition_score', 'adaptation_rate']
+
+    def __init__(self, max_history_points: int = 1000):
+        self.max_history_points = max_history_points
+        self.consciousness_history = ColumnarRingBuffer(
+            max_history_points, self.CONSCIOUSNESS_COLUMNS, object_columns=['active_patterns']
+        )
+        self.neural_activity_history = ColumnarRingBuffer(max_history_points, self.NEURAL_COLUMNS)
+        self.learning_events = deque(maxlen=max_history_points)
+        self.security_events = deque(maxlen=max_history_points)
+        self.system_metrics = deque(maxlen=max_history_points)
 
     def add_consciousness_state(self, state: Dict[str, Any]):
         """Add consciousness state data point"""
-        timestamp = datetime.now()
-        data_point = {
-            'timestamp': timestamp.isoformat(),
+        self.consciousness_history.append(time.time(), {
             'awareness_level': state.get('awareness_level', 0.0),
             'neural_activity': state.get('neural_activity', 0.0),
             'learning_rate': state.get('learning_rate', 0.0),
             'system_integration': state.get('system_integration', 0.0),
             'active_patterns': state.get('active_patterns', [])
-        }
-
-        self.consciousness_history.append(data_point)
-        self._trim_history(self.consciousness_history)
+        })
 
     def add_neural_activity(self, activity: Dict[str, Any]):
         """Add neural activity data point"""
-        timestamp = datetime.now()
-        data_point = {
-            'timestamp': timestamp.isoformat(),
+        self.neural_activity_history.append(time.time(), {
             'total_groups': activity.get('total_groups', 0),
             'active_groups': activity.get('active_groups', 0),
             'competition_score': activity.get('competition_score', 0.0),
             'adaptation_rate': activity.get('adaptation_rate', 0.0)
-        }
-
-        self.neural_activity_history.append(data_point)
-        self._trim_history(self.neural_activity_history)
+        })
 
     def add_learning_event(self, event: Dict[str, Any]):
         """Add learning event"""
@@ -90,7 +233,6 @@ def add_learning_event(self, event: Dict[str, Any]):
         }
 
         self.learning_events.append(event_data)
-        self._trim_history(self.learning_events)
 
     def add_security_event(self, event: Dict[str, Any]):
         """Add security event"""
@@ -104,31 +246,65 @@ def add_security_event(self, event: Dict[str, Any]):
         }
 
         self.security_events.append(event_data)
-        self._trim_history(self.security_events)
 
-    def _trim_history(self, history_list: List[Dict]):
-        """Trim history to maximum points"""
-        if len(history_list) > self.max_history_points:
-            history_list[:] = history_list[-self.max_history_points:]
+    def _tail(self, events: deque, count: int) -> List[Dict]:
+        """Newest count entries of an event deque"""
+        return list(islice(events, max(len(events) - count, 0), None))
+
+    def clamp_history_minutes(self, minutes: int) -> int:
+        """Bound a requested history window to the span the ring buffer still holds"""
+        history = self.consciousness_history
+        retained = 1
+        if len(history):
+            # Range queries exclude the cutoff itself, so round past the oldest row
+            retained = int((time.time() - history.first_timestamp()) // 60) + 1
+        return max(1, min(minutes, retained))
 
     def get_recent_consciousness_data(self, minutes: int = 60) -> List[Dict]:
         """Get recent consciousness data points"""
-        cutoff = datetime.now() - timedelta(minutes=minutes)
-        return [
-            point for point in self.consciousness_history
-            if datetime.fromisoformat(point['timestamp']) > cutoff
-        ]
+        cutoff = time.time() - minutes * 60
+        data = self.consciousness_history.range(cutoff)
+        return _rows_from_columns(data, self.CONSCIOUSNESS_COLUMNS + ['active_patterns'])
+
+    def get_latest_consciousness(self, max_age_seconds: float = 60) -> Optional[Dict]:
+        """Get the newest consciousness data point if it is recent enough"""
+        latest = self.consciousness_history.latest()
+        if latest is None or latest['timestamp'] < time.time() - max_age_seconds:
+            return None
+        latest['timestamp'] = datetime.fromtimestamp(latest['timestamp']).isoformat()
+        return latest
+
+    def get_consciousness_series(self, minutes: int = 60, max_points: int = 500) -> Dict[str, Any]:
+        """Get consciousness history as columns, downsampled to min/max/avg buckets if long"""
+        end = time.time()
+        start = end - minutes * 60
+        data = self.consciousness_history.range(start, end)
+
+        if len(data['timestamp']) <= max_points:
+            series = {name: data[name].tolist() for name in self.CONSCIOUSNESS_COLUMNS}
+            timestamps = data['timestamp']
+        else:
+            buckets = self.consciousness_history.downsample(start, end, max_points)
+            series = {}
+            for name in self.CONSCIOUSNESS_COLUMNS:
+                series[name] = buckets[name]['avg'].tolist()
+                series[f'{name}_min'] = buckets[name]['min'].tolist()
+                series[f'{name}_max'] = buckets[name]['max'].tolist()
+            timestamps = buckets['timestamp']
+
+        series['timestamps'] = [datetime.fromtimestamp(ts).isoformat() for ts in timestamps.tolist()]
+        return series
 
     def get_neural_activity_summary(self) -> Dict[str, Any]:
         """Get neural activity summary"""
-        if not self.neural_activity_history:
+        if not len(self.neural_activity_history):
             return {}
 
-        recent_activity = self.neural_activity_history[-10:]  # Last 10 points
+        recent_activity = self.neural_activity_history.tail(10)  # Last 10 points
         return {
-            'current_active_groups': recent_activity[-1].get('active_groups', 0) if recent_activity else 0,
-            'avg_competition_score': sum(p.get('competition_score', 0) for p in recent_activity) / len(recent_activity) if recent_activity else 0,
-            'adaptation_trend': self._calculate_trend([p.get('adaptation_rate', 0) for p in recent_activity])
+            'current_active_groups': int(recent_activity['active_groups'][-1]),
+            'avg_competition_score': float(recent_activity['competition_score'].mean()),
+            'adaptation_trend': self._calculate_trend(recent_activity['adaptation_rate'].tolist())
         }
 
     def get_learning_summary(self) -> Dict[str, Any]:
@@ -136,7 +312,7 @@ def get_learning_summary(self) -> Dict[str, Any]:
         if not self.learning_events:
             return {}
 
-        recent_events = self.learning_events[-50:]  # Last 50 events
+        recent_events = self._tail(self.learning_events, 50)  # Last 50 events
         success_rates = [e.get('success_rate', 0) for e in recent_events]
 
         return {
@@ -151,7 +327,7 @@ def get_security_summary(self) -> Dict[str, Any]:
         if not self.security_events:
             return {}
 
-        recent_events = self.security_events[-100:]  # Last 100 events
+        recent_events = self._tail(self.security_events, 100)  # Last 100 events
         severity_counts = {}
         for event in recent_events:
             severity = event.get('severity', 'info')
@@ -179,6 +355,149 @@ def _calculate_trend(self, values: List[float]) -> str:
         else:
             return "stable"
 
+_REMOVED = '__removed__'
+
+
+def diff_snapshot(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields of current that differ from previous, recursing into nested dicts
+
+    Keys present in previous but missing from current are listed under '__removed__'.
+    """
+    delta = {}
+    for key, value in current.items():
+        old_value = previous.get(key, _REMOVED)
+        if isinstance(value, dict) and isinstance(old_value, dict):
+            nested = diff_snapshot(old_value, value)
+            if nested:
+                delta[key] = nested
+        elif value != old_value:
+            delta[key] = value
+
+    removed = [key for key in previous if key not in current]
+    if removed:
+        delta[_REMOVED] = removed
+    return delta
+
+
+class BroadcastScheduler:
+    """Compute dashboard snapshots once per tick and push only what changed
+
+    Bus messages and client update requests only mark state dirty; the tick loop
+    builds at most one snapshot, emits one delta to every live client, and sends
+    full snapshots only to clients that just connected or asked for a resync
+    (rate-limited per client). Snapshots are also rebuilt once they are
+    max_snapshot_age seconds old, so time-windowed values age out while the
+    bus is quiet.
+    """
+
+    ROOM = 'dashboard-live'
+
+    def __init__(self, socketio, build_snapshot: Callable[[], Dict[str, Any]],
+                 tick_interval: float = 0.5, min_client_interval: float = 2.0,
+                 max_snapshot_age: float = 5.0):
+        self.socketio = socketio
+        self.build_snapshot = build_snapshot
+        self.tick_interval = tick_interval
+        self.min_client_interval = min_client_interval
+        self.max_snapshot_age = max_snapshot_age
+
+        self.snapshot: Dict[str, Any] = {}
+        self.snapshot_built_at = float('-inf')
+        self.version = 0
+        self.dirty = True
+        self.running = False
+
+        self.clients: set = set()
+        self.pending_full: set = set()
+        self.last_full_sent: Dict[str, float] = {}
+
+        self.stats = {
+            'ticks': 0,
+            'snapshots_built': 0,
+            'snapshots_expired': 0,
+            'deltas_sent': 0,
+            'full_snapshots_sent': 0,
+            'requests_coalesced': 0,
+            'requests_rate_limited': 0,
+            'bytes_sent': 0
+        }
+
+    def mark_dirty(self):
+        """Note that metrics changed; coalesced until the next tick"""
+        if self.dirty:
+            self.stats['requests_coalesced'] += 1
+        self.dirty = True
+
+    def client_connected(self, sid: str):
+        self.clients.add(sid)
+        self.pending_full.add(sid)
+
+    def client_disconnected(self, sid: str):
+        self.clients.discard(sid)
+        self.pending_full.discard(sid)
+        self.last_full_sent.pop(sid, None)
+
+    def request_full(self, sid: str, now: Optional[float] = None):
+        """Queue a full snapshot for a client unless it asked too recently"""
+        now = time.monotonic() if now is None else now
+        if now - self.last_full_sent.get(sid, float('-inf')) < self.min_client_interval:
+            self.stats['requests_rate_limited'] += 1
+            return
+        self.pending_full.add(sid)
+
+    def tick(self, now: Optional[float] = None):
+        """Run one scheduling round"""
+        now = time.monotonic() if now is None else now
+        self.stats['ticks'] += 1
+
+        expired = now - self.snapshot_built_at >= self.max_snapshot_age
+        if self.dirty or expired:
+            if not self.dirty:
+                self.stats['snapshots_expired'] += 1
+            self.dirty = False
+            snapshot = self.build_snapshot()
+            self.snapshot_built_at = now
+            self.stats['snapshots_built'] += 1
+
+            delta = diff_snapshot(self.snapshot, snapshot)
+            if delta:
+                base_version = self.version
+                self.version += 1
+                self.snapshot = snapshot
+                payload = {'version': self.version, 'base_version': base_version,
+                           'timestamp': datetime.now().isoformat(), 'changes': delta}
+                # One emit to the room serializes the delta once for every live client
+                self.socketio.emit('data_delta', payload, to=self.ROOM)
+                self.stats['deltas_sent'] += 1
+                self.stats['bytes_sent'] += self._payload_size(payload) * len(self.clients)
+
+        if self.pending_full:
+            pending, self.pending_full = self.pending_full, set()
+            payload = {'version': self.version, 'timestamp': datetime.now().isoformat(), **self.snapshot}
+            size = self._payload_size(payload)
+            for sid in pending:
+                self.socketio.emit('data_update', payload, to=sid)
+                self.last_full_sent[sid] = now
+                self.stats['full_snapshots_sent'] += 1
+                self.stats['bytes_sent'] += size
+
+    def _payload_size(self, payload: Dict[str, Any]) -> int:
+        return len(json.dumps(payload, default=str))
+
+    def run(self):
+        """Tick loop, started as a Socket.IO background task"""
+        self.running = True
+        while self.running:
+            try:
+                self.tick()
+            except Exception as e:
+                logger.error(f"Broadcast tick failed: {e}")
+            self.socketio.sleep(self.tick_interval)
+
+    def stop(self):
+        self.running = False
+
+
 class SynOSAIDashboard:
     """Main dashboard application class"""
 
@@ -195,6 +514,7 @@ def __init__(self, host: str = "localhost", port: int = 8080):
         self.port = port
         self.metrics_collector = AIMetricsCollector()
         self.message_bus = None
+        self.broadcaster = BroadcastScheduler(self.socketio, self._build_snapshot)
 
         self._setup_routes()
         self._setup_websocket_handlers()
@@ -209,15 +529,12 @@ def dashboard():
         @self.app.route('/api/consciousness/current')
         def get_current_consciousness():
             """Get current consciousness state"""
-            recent_data = self.metrics_collector.get_recent_consciousness_data(minutes=1)
-            if recent_data:
-                return jsonify(recent_data[-1])
-            return jsonify({})
+            return jsonify(self.metrics_collector.get_latest_consciousness(max_age_seconds=60) or {})
 
         @self.app.route('/api/consciousness/history')
         def get_consciousness_history():
             """Get consciousness history"""
-            minutes = int(request.args.get('minutes', 60))
+            minutes = self.metrics_collector.clamp_history_minutes(request.args.get('minutes', 60, type=int))
             data = self.metrics_collector.get_recent_consciousness_data(minutes)
             return jsonify(data)
 
@@ -239,36 +556,24 @@ def get_security_summary():
         @self.app.route('/api/consciousness/chart')
         def get_consciousness_chart():
             """Get consciousness data formatted for charts"""
-            data = self.metrics_collector.get_recent_consciousness_data(minutes=60)
+            minutes = self.metrics_collector.clamp_history_minutes(request.args.get('minutes', 60, type=int))
+            chart_data = self.metrics_collector.get_consciousness_series(minutes=minutes)
 
-            if not data:
+            if not chart_data['timestamps']:
                 return jsonify({})
 
-            timestamps = [point['timestamp'] for point in data]
-            awareness = [point['awareness_level'] for point in data]
-            neural_activity = [point['neural_activity'] for point in data]
-            learning_rate = [point['learning_rate'] for point in data]
-
-            chart_data = {
-                'timestamps': timestamps,
-                'awareness_level': awareness,
-                'neural_activity': neural_activity,
-                'learning_rate': learning_rate
-            }
-
             return jsonify(chart_data)
 
         @self.app.route('/api/system/status')
         def get_system_status():
             """Get overall system status"""
-            consciousness_data = self.metrics_collector.get_recent_consciousness_data(minutes=5)
+            latest = self.metrics_collector.get_latest_consciousness(max_age_seconds=300)
             neural_summary = self.metrics_collector.get_neural_activity_summary()
             learning_summary = self.metrics_collector.get_learning_summary()
 
             # Calculate overall health score
             health_score = 0.0
-            if consciousness_data:
-                latest = consciousness_data[-1]
+            if latest:
                 health_score = (
                     latest.get('awareness_level', 0) * 0.3 +
                     latest.get('neural_activity', 0) * 0.3 +
@@ -278,10 +583,10 @@ def get_system_status():
 
             status = {
                 'health_score': health_score,
-                'consciousness_active': len(consciousness_data) > 0,
+                'consciousness_active': latest is not None,
                 'neural_groups_active': neural_summary.get('current_active_groups', 0),
                 'patterns_learned': learning_summary.get('total_patterns_learned', 0),
-                'last_update': consciousness_data[-1]['timestamp'] if consciousness_data else None
+                'last_update': latest['timestamp'] if latest else None
             }
 
             return jsonify(status)
@@ -293,38 +598,31 @@ def _setup_websocket_handlers(self):
         def handle_connect():
             logger.info("Dashboard client connected")
             emit('status', {'message': 'Connected to SynOS AI Dashboard'})
+            join_room(BroadcastScheduler.ROOM)
+            self.broadcaster.client_connected(request.sid)
 
         @self.socketio.on('disconnect')
         def handle_disconnect():
             logger.info("Dashboard client disconnected")
+            self.broadcaster.client_disconnected(request.sid)
 
         @self.socketio.on('request_update')
         def handle_update_request():
-            """Handle client request for data update"""
-            self._broadcast_current_data()
-
-    def _broadcast_current_data(self):
-        """Broadcast current data to all connected clients"""
-        try:
-            # Get latest data
-            consciousness_data = self.metrics_collector.get_recent_consciousness_data(minutes=1)
-            neural_summary = self.metrics_collector.get_neural_activity_summary()
-            learning_summary = self.metrics_collector.get_learning_summary()
-            security_summary = self.metrics_collector.get_security_summary()
-
-            # Prepare data for broadcast
-            broadcast_data = {
-                'consciousness': consciousness_data[-1] if consciousness_data else {},
-                'neural': neural_summary,
-                'learning': learning_summary,
-                'security': security_summary,
-                'timestamp': datetime.now().isoformat()
-            }
+            """Handle client request for a full resync"""
+            self.broadcaster.request_full(request.sid)
 
-            self.socketio.emit('data_update', broadcast_data)
+    def _build_snapshot(self) -> Dict[str, Any]:
+        """Compute the dashboard state pushed to clients"""
+        return {
+            'consciousness': self.metrics_collector.get_latest_consciousness(max_age_seconds=60) or {},
+            'neural': self.metrics_collector.get_neural_activity_summary(),
+            'learning': self.metrics_collector.get_learning_summary(),
+            'security': self.metrics_collector.get_security_summary()
+        }
 
-        except Exception as e:
-            logger.error(f"Failed to broadcast data: {e}")
+    def _broadcast_current_data(self):
+        """Schedule changed data for the next broadcast tick"""
+        self.broadcaster.mark_dirty()
 
     async def _message_bus_handler(self, message_data: Dict[str, Any]):
         """Handle incoming messages from NATS bus"""
@@ -371,6 +669,8 @@ def run(self, debug: bool = False):
             except Exception as e:
                 logger.error(f"Failed to start message bus: {e}")
 
+        self.socketio.start_background_task(self.broadcaster.run)
+
         # Run Flask application
         self.socketio.run(
             self.app,
@@ -544,8 +844,38 @@ def run(self, debug: bool = False):
             socket.emit('request_update');
         });
 
+        // Full snapshot on connect/resync, then field-level deltas
+        let dashboardState = {};
+        let stateVersion = -1;
+
+        function applyDelta(target, changes) {
+            for (const key in changes) {
+                if (key === '__removed__') {
+                    changes[key].forEach(k => delete target[k]);
+                } else if (changes[key] && typeof changes[key] === 'object' && !Array.isArray(changes[key])
+                           && target[key] && typeof target[key] === 'object' && !Array.isArray(target[key])) {
+                    applyDelta(target[key], changes[key]);
+                } else {
+                    target[key] = changes[key];
+                }
+            }
+        }
+
         socket.on('data_update', function(data) {
-            updateDashboard(data);
+            dashboardState = data;
+            stateVersion = data.version;
+            updateDashboard(dashboardState);
+        });
+
+        socket.on('data_delta', function(delta) {
+            if (delta.base_version !== stateVersion) {
+                // Missed a delta; ask for a full snapshot instead
+                socket.emit('request_update');
+                return;
+            }
+            applyDelta(dashboardState, delta.changes);
+            stateVersion = delta.version;
+            updateDashboard(dashboardState);
         });
 
         function updateDashboard(data) {
@@ -590,11 +920,6 @@ def run(self, debug: bool = False):
             }
         }
 
-        // Request updates every 5 seconds
-        setInterval(function() {
-            socket.emit('request_update');
-        }, 5000);
-
         // Initialize chart
         const layout = {
             title: '',
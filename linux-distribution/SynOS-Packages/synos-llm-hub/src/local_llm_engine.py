@@ -5,6 +5,7 @@
 """
 
 import asyncio
+import gc
 import json
 import logging
 import os
@@ -12,6 +13,7 @@
 import time
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple, Any, Union, AsyncGenerator
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from pathlib import Path
 import sqlite3
@@ -150,10 +152,139 @@ def recommend_quantization(self, model_size: ModelSize) -> Optional[str]:
         return None
 
 
+@dataclass
+class ResidentModel:
+    key: str
+    model: Any
+    tokenizer: Any
+    footprint_bytes: int
+    loaded_at: float = field(default_factory=time.time)
+    last_used: float = field(default_factory=time.time)
+    hits: int = 0
+
+
+class ModelResidencyManager:
+    """Keep loaded models within a memory budget, evicting least-recently-used first"""
+
+    def __init__(self, memory_budget_bytes: int):
+        self.memory_budget_bytes = memory_budget_bytes
+        self.resident: "OrderedDict[str, ResidentModel]" = OrderedDict()
+        self.resident_bytes = 0
+        self._lock = threading.RLock()
+
+        self.metrics = {
+            'loads': 0,
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'load_time_total': 0.0,
+            'bytes_evicted': 0
+        }
+
+    def get(self, key: str) -> Optional[Tuple[Any, Any]]:
+        """Return a resident (model, tokenizer) and mark it most recently used"""
+        with self._lock:
+            entry = self.resident.get(key)
+            if entry is None:
+                self.metrics['misses'] += 1
+                return None
+
+            self.resident.move_to_end(key)
+            entry.last_used = time.time()
+            entry.hits += 1
+            self.metrics['hits'] += 1
+            return entry.model, entry.tokenizer
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.resident
+
+    def peek(self, key: str) -> Optional[ResidentModel]:
+        """Return a resident entry without touching LRU order or metrics"""
+        with self._lock:
+            return self.resident.get(key)
+
+    def reserve(self, expected_bytes: int):
+        """Evict LRU models until expected_bytes fits within the budget"""
+        with self._lock:
+            while self.resident and self.resident_bytes + expected_bytes > self.memory_budget_bytes:
+                self.evict(next(iter(self.resident)))
+
+    def admit(self, key: str, model: Any, tokenizer: Any, footprint_bytes: int, load_time: float = 0.0):
+        """Register a freshly loaded model, evicting older ones if over budget"""
+        with self._lock:
+            if key in self.resident:
+                self.evict(key)
+
+            self.reserve(footprint_bytes)
+
+            self.resident[key] = ResidentModel(
+                key=key,
+                model=model,
+                tokenizer=tokenizer,
+                footprint_bytes=footprint_bytes
+            )
+            self.resident_bytes += footprint_bytes
+            self.metrics['loads'] += 1
+            self.metrics['load_time_total'] += load_time
+
+            if self.resident_bytes > self.memory_budget_bytes:
+                logging.warning(
+                    f"Model {key} ({footprint_bytes / (1024**3):.2f} GB) exceeds residency budget "
+                    f"of {self.memory_budget_bytes / (1024**3):.2f} GB on its own"
+                )
+
+    def evict(self, key: str) -> bool:
+        """Drop a resident model and release its memory"""
+        with self._lock:
+            entry = self.resident.pop(key, None)
+            if entry is None:
+                return False
+
+            self.resident_bytes -= entry.footprint_bytes
+            self.metrics['evictions'] += 1
+            self.metrics['bytes_evicted'] += entry.footprint_bytes
+
+        # Drop the last strong references before asking allocators to give memory back
+        entry.model = None
+        entry.tokenizer = None
+        del entry
+        gc.collect()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+        logging.info(f"Evicted model {key} from memory")
+        return True
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self.resident.keys())
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Residency statistics for status reporting"""
+        with self._lock:
+            lookups = self.metrics['hits'] + self.metrics['misses']
+            return {
+                **self.metrics,
+                'hit_rate': self.metrics['hits'] / lookups if lookups else 0.0,
+                'resident_models': [
+                    {
+                        'key': entry.key,
+                        'footprint_bytes': entry.footprint_bytes,
+                        'hits': entry.hits,
+                        'last_used': entry.last_used
+                    }
+                    for entry in self.resident.values()
+                ],
+                'resident_bytes': self.resident_bytes,
+                'memory_budget_bytes': self.memory_budget_bytes
+            }
+
+
 class ModelManager:
     """Manage local LLM models and their configurations"""
 
-    def __init__(self, models_dir: str = "/var/lib/synos/llm_models"):
+    def __init__(self, models_dir: str = "/var/lib/synos/llm_models",
+                 memory_budget_gb: Optional[float] = None):
         self.models_dir = Path(models_dir)
         self.models_dir.mkdir(parents=True, exist_ok=True)
 
@@ -209,8 +340,15 @@ def __init__(self, models_dir: str = "/var/lib/synos/llm_models"):
             )
         }
 
-        self.loaded_models: Dict[str, Any] = {}
+        # Default budget leaves 40% of RAM for the OS, tools and inference buffers
+        if memory_budget_gb is None:
+            memory_budget_bytes = int(psutil.virtual_memory().total * 0.6)
+        else:
+            memory_budget_bytes = int(memory_budget_gb * (1024**3))
+
+        self.residency = ModelResidencyManager(memory_budget_bytes)
         self.resource_monitor = SystemResourceMonitor()
+        self._load_locks: Dict[str, asyncio.Lock] = {}
 
     def get_recommended_models(self) -> List[ModelConfig]:
         """Get models recommended for current system"""
@@ -302,66 +440,137 @@ async def download_model(self, model_id: str, progress_callback: Optional[callab
             logging.error(f"Failed to download model {model_id}: {e}")
             raise
 
+    @property
+    def loaded_models(self) -> Dict[str, Tuple[Any, Any]]:
+        """Snapshot of resident models keyed by model key"""
+        return {key: (entry.model, entry.tokenizer) for key, entry in self.residency.resident.items()}
+
+    @staticmethod
+    def model_key(config: ModelConfig) -> str:
+        """Residency key for a model configuration"""
+        return f"{config.model_id}_{config.quantization or 'fp16'}"
+
+    def _measure_footprint(self) -> int:
+        """Current process RSS plus CUDA allocations, in bytes"""
+        footprint = psutil.Process().memory_info().rss
+        if torch.cuda.is_available():
+            footprint += torch.cuda.memory_allocated()
+        return footprint
+
+    def _model_footprint(self, model: Any) -> int:
+        """Bytes held by a model's own parameters and buffers, 0 if unknown"""
+        if hasattr(model, "get_memory_footprint"):
+            return int(model.get_memory_footprint())
+        if hasattr(model, "parameters"):
+            footprint = sum(p.numel() * p.element_size() for p in model.parameters())
+            if hasattr(model, "buffers"):
+                footprint += sum(b.numel() * b.element_size() for b in model.buffers())
+            return int(footprint)
+        return 0
+
+    def _has_safetensors(self, model_path: Optional[str]) -> bool:
+        """Whether a local model directory ships safetensors weights"""
+        if not model_path:
+            return False
+        path = Path(model_path)
+        return path.is_dir() and any(path.glob("*.safetensors"))
+
     async def load_model(self, config: ModelConfig) -> Tuple[Any, Any]:  # Returns (model, tokenizer)
         """Load model and tokenizer with optimal configuration"""
-        model_key = f"{config.model_id}_{config.quantization or 'fp16'}"
+        model_key = self.model_key(config)
 
-        if model_key in self.loaded_models:
+        cached = self.residency.get(model_key)
+        if cached is not None:
             logging.info(f"Using cached model {model_key}")
-            return self.loaded_models[model_key]
+            return cached
 
-        logging.info(f"Loading model {config.model_id}...")
+        # Serialize concurrent loads of the same model so it is only read once
+        load_lock = self._load_locks.setdefault(model_key, asyncio.Lock())
+        async with load_lock:
+            if model_key in self.residency:
+                return self.residency.get(model_key)
 
-        try:
-            # Configure quantization if requested
-            quantization_config = None
-            if config.quantization == "4bit":
-                quantization_config = BitsAndBytesConfig(
-                    load_in_4bit=True,
-                    bnb_4bit_use_double_quant=True,
-                    bnb_4bit_quant_type="nf4",
-                    bnb_4bit_compute_dtype=torch.float16
-                )
-            elif config.quantization == "8bit":
-                quantization_config = BitsAndBytesConfig(load_in_8bit=True)
+            # Make room up front so the new model never overlaps with models about to be evicted
+            expected_bytes = int(self._estimate_memory_requirements(config) * (1024**3))
+            self.residency.reserve(expected_bytes)
 
-            # Load tokenizer
-            tokenizer = AutoTokenizer.from_pretrained(
-                config.local_path or config.model_id,
-                trust_remote_code=True
-            )
+            logging.info(f"Loading model {config.model_id}...")
+            start_time = time.time()
+            baseline = self._measure_footprint()
 
-            # Add pad token if missing
-            if tokenizer.pad_token is None:
-                tokenizer.pad_token = tokenizer.eos_token
+            try:
+                model, tokenizer = await asyncio.to_thread(self._load_model_sync, config)
+            except Exception as e:
+                logging.error(f"Failed to load model {config.model_id}: {e}")
+                raise
 
-            # Load model
-            model_kwargs = {
-                "trust_remote_code": True,
-                "torch_dtype": torch.float16,
-                "device_map": config.device if config.device != "auto" else None
-            }
+            load_time = time.time() - start_time
 
-            if quantization_config:
-                model_kwargs["quantization_config"] = quantization_config
+            # RSS growth also counts whatever other loads allocated meanwhile, so it
+            # is only used when the model cannot report its own size
+            footprint = self._model_footprint(model)
+            if not footprint:
+                footprint = max(self._measure_footprint() - baseline, 0)
 
-            if config.max_memory:
-                model_kwargs["max_memory"] = config.max_memory
+            self.residency.admit(model_key, model, tokenizer, footprint, load_time)
 
-            model = AutoModelForCausalLM.from_pretrained(
-                config.local_path or config.model_id,
-                **model_kwargs
+            logging.info(
+                f"Model {config.model_id} loaded successfully in {load_time:.1f}s "
+                f"({footprint / (1024**3):.2f} GB resident)"
             )
+            return model, tokenizer
 
-            # Cache loaded model
-            self.loaded_models[model_key] = (model, tokenizer)
+    def _load_model_sync(self, config: ModelConfig) -> Tuple[Any, Any]:
+        """Blocking model load, run off the event loop"""
+        model_path = config.local_path or config.model_id
 
-            logging.info(f"Model {config.model_id} loaded successfully")
-            return model, tokenizer
+        # Configure quantization if requested
+        quantization_config = None
+        if config.quantization == "4bit":
+            quantization_config = BitsAndBytesConfig(
+                load_in_4bit=True,
+                bnb_4bit_use_double_quant=True,
+                bnb_4bit_quant_type="nf4",
+                bnb_4bit_compute_dtype=torch.float16
+            )
+        elif config.quantization == "8bit":
+            quantization_config = BitsAndBytesConfig(load_in_8bit=True)
 
-        except Exception as e:
-            logging.error(f"Failed to load model {config.model_id}: {e}")
-            raise
+        # Load tokenizer
+        tokenizer = AutoTokenizer.from_pretrained(
+            model_path,
+            trust_remote_code=True
+        )
+
+        # Add pad token if missing
+        if tokenizer.pad_token is None:
+            tokenizer.pad_token = tokenizer.eos_token
+
+        # Load model
+        model_kwargs = {
+            "trust_remote_code": True,
+            "torch_dtype": torch.float16,
+            "device_map": config.device if config.device != "auto" else None
+        }
+
+        # safetensors weights are memory-mapped rather than copied, so a warm
+        # restart reuses the page cache instead of re-reading the checkpoint
+        if self._has_safetensors(config.local_path):
+            model_kwargs["use_safetensors"] = True
+            model_kwargs["low_cpu_mem_usage"] = True
+
+        if quantization_config:
+            model_kwargs["quantization_config"] = quantization_config
+
+        if config.max_memory:
+            model_kwargs["max_memory"] = config.max_memory
+
+        model = AutoModelForCausalLM.from_pretrained(
+            model_path,
+            **model_kwargs
+        )
+
+        return model, tokenizer
 
     def get_model_info(self, model_id: str) -> Optional[ModelConfig]:
         """Get information about available model"""
@@ -378,15 +587,17 @@ def list_available_models(self, model_type: Optional[ModelType] = None) -> List[
 
     def unload_model(self, model_id: str):
         """Unload model from memory"""
-        keys_to_remove = [k for k in self.loaded_models.keys() if k.startswith(model_id)]
+        keys_to_remove = [k for k in self.residency.keys() if k.startswith(model_id)]
 
         for key in keys_to_remove:
-            del self.loaded_models[key]
-            if torch.cuda.is_available():
-                torch.cuda.empty_cache()
+            self.residency.evict(key)
 
         logging.info(f"Unloaded model {model_id}")
 
+    def get_residency_metrics(self) -> Dict[str, Any]:
+        """Get model load, hit and eviction statistics"""
+        return self.residency.get_metrics()
+
 
 class ConversationManager:
     """Manage chat sessions and conversation history"""
@@ -657,8 +868,7 @@ def __init__(self):
         self.model_manager = ModelManager()
         self.conversation_manager = ConversationManager()
         self.current_model_config: Optional[ModelConfig] = None
-        self.current_model: Optional[Any] = None
-        self.current_tokenizer: Optional[Any] = None
+        self.current_model_key: Optional[str] = None
 
         # Generation settings
         self.default_generation_config = GenerationConfig(
@@ -671,6 +881,21 @@ def __init__(self):
             eos_token_id=None   # Will be set when model loads
         )
 
+    @property
+    def current_model(self) -> Optional[Any]:
+        """The active model while it is resident; eviction really frees it"""
+        entry = self.model_manager.residency.peek(self.current_model_key) if self.current_model_key else None
+        return entry.model if entry else None
+
+    @property
+    def current_tokenizer(self) -> Optional[Any]:
+        entry = self.model_manager.residency.peek(self.current_model_key) if self.current_model_key else None
+        return entry.tokenizer if entry else None
+
+    async def _ensure_model_loaded(self) -> Tuple[Any, Any]:
+        """Active (model, tokenizer), reloading it if it was evicted under memory pressure"""
+        return await self.model_manager.load_model(self.current_model_config)
+
     async def initialize(self, model_id: Optional[str] = None) -> bool:
         """Initialize LLM engine with recommended model"""
         try:
@@ -699,8 +924,7 @@ async def initialize(self, model_id: Optional[str] = None) -> bool:
             model, tokenizer = await self.model_manager.load_model(model_config)
 
             self.current_model_config = model_config
-            self.current_model = model
-            self.current_tokenizer = tokenizer
+            self.current_model_key = self.model_manager.model_key(model_config)
 
             # Update generation config
             self.default_generation_config.pad_token_id = tokenizer.pad_token_id
@@ -715,7 +939,7 @@ async def initialize(self, model_id: Optional[str] = None) -> bool:
 
     async def generate_response(self, session_id: str, user_input: str) -> str:
         """Generate response for user input in chat session"""
-        if not self.current_model or not self.current_tokenizer:
+        if not self.current_model_config:
             return "Error: LLM not initialized. Please run initialization first."
 
         try:
@@ -744,8 +968,11 @@ async def generate_response(self, session_id: str, user_input: str) -> str:
     async def _generate_text(self, input_text: str) -> str:
         """Generate text using current model"""
         try:
+            # Hold the model for the whole generation even if it is evicted meanwhile
+            model, tokenizer = await self._ensure_model_loaded()
+
             # Tokenize input
-            inputs = self.current_tokenizer(
+            inputs = tokenizer(
                 input_text,
                 return_tensors="pt",
                 truncation=True,
@@ -758,16 +985,16 @@ async def _generate_text(self, input_text: str) -> str:
 
             # Generate
             with torch.no_grad():
-                outputs = self.current_model.generate(
+                outputs = model.generate(
                     **inputs,
                     generation_config=self.default_generation_config,
-                    pad_token_id=self.current_tokenizer.pad_token_id
+                    pad_token_id=tokenizer.pad_token_id
                 )
 
             # Decode response
             input_length = inputs['input_ids'].shape[1]
             generated_tokens = outputs[0][input_length:]
-            response = self.current_tokenizer.decode(generated_tokens, skip_special_tokens=True)
+            response = tokenizer.decode(generated_tokens, skip_special_tokens=True)
 
             # Clean up response
             response = response.strip()
@@ -849,13 +1076,15 @@ async def get_code_assistance(self, code_context: str, request: str) -> str:
     def get_system_status(self) -> Dict[str, Any]:
         """Get LLM engine system status"""
         status = {
-            "initialized": self.current_model is not None,
+            "initialized": self.current_model_config is not None,
+            "model_resident": self.current_model is not None,
             "current_model": self.current_model_config.model_id if self.current_model_config else None,
             "model_type": self.current_model_config.model_type.value if self.current_model_config else None,
             "device": self.current_model_config.device if self.current_model_config else None,
             "quantization": self.current_model_config.quantization if self.current_model_config else None,
             "active_sessions": len(self.conversation_manager.active_sessions),
-            "resource_usage": self.model_manager.resource_monitor.metrics
+            "resource_usage": self.model_manager.resource_monitor.metrics,
+            "model_residency": self.model_manager.get_residency_metrics()
         }
 
         return status
@@ -14,10 +14,15 @@
 import asyncio
 import json
 import logging
+import os
+import struct
+import threading
 import time
-from typing import Dict, Any, Callable, Optional, List
-from dataclasses import asdict
+from collections import defaultdict, deque
+from typing import Dict, Any, Callable, Optional, List, Tuple
+from dataclasses import asdict, dataclass
 from datetime import datetime
+from pathlib import Path
 
 try:
     import nats
@@ -28,16 +33,502 @@
     ConnectionClosedError = Exception
     TimeoutError = Exception
 
+try:
+    import msgpack
+except ImportError:
+    # Fallback to JSON encoding without msgpack
+    msgpack = None
+
 logger = logging.getLogger(__name__)
 
+# Message headers describing how a payload is encoded
+HEADER_CODEC = 'Synos-Codec'
+HEADER_SCHEMA = 'Synos-Schema'
+HEADER_BATCH = 'Synos-Batch'
+
+
+class JSONCodec:
+    """Plain JSON payloads, readable by any subscriber"""
+
+    name = 'json'
+
+    def encode(self, data: Any) -> bytes:
+        return json.dumps(data, default=str, separators=(',', ':')).encode()
+
+    def decode(self, payload: bytes) -> Any:
+        return json.loads(payload.decode())
+
+
+class MsgpackCodec:
+    """Compact binary payloads using msgpack"""
+
+    name = 'msgpack'
+
+    def encode(self, data: Any) -> bytes:
+        return msgpack.packb(data, default=str, use_bin_type=True)
+
+    def decode(self, payload: bytes) -> Any:
+        return msgpack.unpackb(payload, raw=False)
+
+
+CODECS = {'json': JSONCodec}
+if msgpack:
+    CODECS['msgpack'] = MsgpackCodec
+
+
+def get_codec(name: Optional[str] = None):
+    """Resolve a codec by name; JSON unless msgpack is asked for explicitly
+
+    Subscribers that predate the codec header only understand JSON, so the
+    compact msgpack encoding is opt-in.
+    """
+    if name is None:
+        name = 'json'
+    if name not in CODECS:
+        raise ValueError(f"Unknown or unavailable codec: {name}")
+    return CODECS[name]()
+
+
+def decode_message(payload: bytes, headers: Optional[Dict[str, str]] = None) -> Tuple[Any, int]:
+    """Decode a payload using its codec header; returns (data, batch_size)
+
+    Messages without headers are treated as JSON so older publishers keep working.
+    """
+    headers = headers or {}
+    codec = get_codec(headers.get(HEADER_CODEC, 'json'))
+    return codec.decode(payload), int(headers.get(HEADER_BATCH, 0))
+
+
+class PublishOutbox:
+    """Bounded on-disk outbox holding messages published while disconnected
+
+    Records are appended as length-prefixed (subject, headers, payload) frames so
+    they survive a process restart and can be replayed in order after reconnecting.
+    Methods do blocking file I/O and are thread-safe; NATSPublisher calls them
+    off the event loop.
+    """
+
+    _FRAME = struct.Struct('>HII')
+
+    def __init__(self, path: str, max_messages: int = 10000, max_bytes: int = 64 * 1024 * 1024):
+        self.path = Path(path)
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._count, self._bytes = self._scan()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _scan(self) -> Tuple[int, int]:
+        """Count records already on disk from a previous run"""
+        if not self.path.exists():
+            return 0, 0
+        count = sum(1 for _ in self._read_records())
+        return count, self.path.stat().st_size
+
+    def _read_records(self):
+        with open(self.path, 'rb') as f:
+            while True:
+                frame = f.read(self._FRAME.size)
+                if len(frame) < self._FRAME.size:
+                    return
+                subject_len, headers_len, payload_len = self._FRAME.unpack(frame)
+                body = f.read(subject_len + headers_len + payload_len)
+                if len(body) < subject_len + headers_len + payload_len:
+                    # Torn write from a crash; ignore the partial tail
+                    return
+                subject = body[:subject_len].decode()
+                headers = json.loads(body[subject_len:subject_len + headers_len].decode())
+                payload = body[subject_len + headers_len:]
+                yield subject, headers, payload
+
+    def _encode_record(self, subject: str, headers: Dict[str, str], payload: bytes) -> bytes:
+        subject_bytes = subject.encode()
+        headers_bytes = json.dumps(headers).encode()
+        return (self._FRAME.pack(len(subject_bytes), len(headers_bytes), len(payload))
+                + subject_bytes + headers_bytes + payload)
+
+    def append(self, subject: str, headers: Dict[str, str], payload: bytes):
+        """Queue a message, discarding the oldest ones once the outbox is full"""
+        record = self._encode_record(subject, headers, payload)
+
+        with self._lock:
+            if self._count + 1 > self.max_messages or self._bytes + len(record) > self.max_bytes:
+                self._compact(len(record))
+
+            with open(self.path, 'ab') as f:
+                f.write(record)
+            self._count += 1
+            self._bytes += len(record)
+
+    def _compact(self, incoming_bytes: int):
+        """Rewrite the outbox without its oldest records to make room"""
+        records = list(self._read_records())
+        # Drop a quarter at a time so compaction is rare under sustained outages
+        keep_from = max(1, len(records) // 4)
+        kept = records[keep_from:]
+        while kept and (len(kept) + 1 > self.max_messages or
+                        sum(len(self._encode_record(*r)) for r in kept) + incoming_bytes > self.max_bytes):
+            kept = kept[1:]
+
+        self.dropped += len(records) - len(kept)
+        logger.warning(f"Outbox full, dropped {len(records) - len(kept)} oldest messages")
+
+        tmp_path = self.path.with_suffix('.tmp')
+        with open(tmp_path, 'wb') as f:
+            for record in kept:
+                f.write(self._encode_record(*record))
+        os.replace(tmp_path, self.path)
+        self._count, self._bytes = len(kept), self.path.stat().st_size
+
+    def drain(self) -> List[Tuple[str, Dict[str, str], bytes]]:
+        """Remove and return every queued message in publish order"""
+        with self._lock:
+            if not self._count:
+                return []
+            records = list(self._read_records())
+            self.path.unlink(missing_ok=True)
+            self._count, self._bytes = 0, 0
+            return records
+
+    def requeue(self, records: List[Tuple[str, Dict[str, str], bytes]]):
+        """Put back messages that could not be replayed"""
+        for subject, headers, payload in records:
+            self.append(subject, headers, payload)
+
+
+@dataclass
+class SubjectStats:
+    """Per-subject publish counters"""
+    messages: int = 0
+    bytes: int = 0
+    publishes: int = 0
+    batches: int = 0
+    outboxed: int = 0
+    buffered: int = 0
+    failed: int = 0
+
+
+class NATSPublisher:
+    """Publisher layer with pluggable codecs, subject batching and an outbox
+
+    Subjects listed in ``batched_subjects`` are coalesced into periodic batch
+    messages (a JSON array plus the batch header); everything else is sent as a
+    single message. Anything that cannot be sent while disconnected goes to the
+    on-disk outbox, or without one to an in-memory buffer of at most
+    ``max_buffered`` messages (oldest dropped first), and is replayed on reconnect.
+    Works against any connection object exposing ``publish(subject, payload, headers=...)``.
+    """
+
+    def __init__(self, codec: Optional[str] = None,
+                 schemas: Optional[Dict[str, str]] = None,
+                 batched_subjects: Optional[List[str]] = None,
+                 batch_interval: float = 1.0,
+                 max_batch_size: int = 500,
+                 outbox_path: Optional[str] = None,
+                 outbox_max_messages: int = 10000,
+                 max_buffered: int = 1000):
+        self.codec = get_codec(codec)
+        self.schemas = schemas or {}
+        self.batched_subjects = set(batched_subjects or [])
+        self.batch_interval = batch_interval
+        self.max_batch_size = max_batch_size
+        self.outbox = None
+        if outbox_path:
+            try:
+                self.outbox = PublishOutbox(outbox_path, outbox_max_messages)
+            except OSError as e:
+                logger.warning(f"Outbox disabled, cannot use {outbox_path}: {e}")
+        self._buffer: deque = deque(maxlen=max_buffered) if max_buffered > 0 else None
+        self.buffer_dropped = 0
+
+        self.nc = None
+        self.connected = False
+        self.stats: Dict[str, SubjectStats] = defaultdict(SubjectStats)
+        self.started_at = time.time()
+
+        self._pending: Dict[str, List[Any]] = defaultdict(list)
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def _headers_for(self, subject: str, batch_size: int = 0) -> Dict[str, str]:
+        headers = {HEADER_CODEC: self.codec.name}
+        if subject in self.schemas:
+            headers[HEADER_SCHEMA] = self.schemas[subject]
+        if batch_size:
+            headers[HEADER_BATCH] = str(batch_size)
+        return headers
+
+    async def attach(self, nc):
+        """Bind to a live connection, start batching and replay the outbox"""
+        self.nc = nc
+        self.connected = True
+        if self.batched_subjects and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self._flush_loop())
+        await self.replay_outbox()
+
+    def mark_disconnected(self):
+        self.connected = False
+
+    async def close(self):
+        """Stop batching and flush whatever is still buffered"""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+        self.connected = False
+
+    async def publish(self, subject: str, data: Any) -> bool:
+        """Encode and publish a message, batching or outboxing as configured"""
+        if subject in self.batched_subjects:
+            pending = self._pending[subject]
+            pending.append(data)
+            if len(pending) >= self.max_batch_size:
+                return await self._flush_subject(subject)
+            return True
+
+        payload = self.codec.encode(data)
+        return await self._send(subject, payload, self._headers_for(subject), messages=1)
+
+    async def flush(self) -> bool:
+        """Publish all buffered batches now"""
+        ok = True
+        for subject in list(self._pending.keys()):
+            ok = await self._flush_subject(subject) and ok
+        return ok
+
+    async def _flush_subject(self, subject: str) -> bool:
+        items = self._pending.pop(subject, None)
+        if not items:
+            return True
+        payload = self.codec.encode(items)
+        self.stats[subject].batches += 1
+        return await self._send(subject, payload, self._headers_for(subject, len(items)), messages=len(items))
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.batch_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Batch flush failed: {e}")
+
+    async def _send(self, subject: str, payload: bytes, headers: Dict[str, str], messages: int) -> bool:
+        stats = self.stats[subject]
+
+        if self.connected and self.nc:
+            try:
+                await self.nc.publish(subject, payload, headers=headers)
+                stats.messages += messages
+                stats.bytes += len(payload)
+                stats.publishes += 1
+                logger.debug(f"Published to {subject}: {len(payload)} bytes ({messages} messages)")
+                return True
+            except Exception as e:
+                logger.error(f"Failed to publish to {subject}: {e}")
+                stats.failed += messages
+
+        if self.outbox is not None:
+            await asyncio.to_thread(self.outbox.append, subject, headers, payload)
+            stats.outboxed += messages
+            return True
+
+        if self._buffer is not None:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.buffer_dropped += 1
+            self._buffer.append((subject, headers, payload))
+            stats.buffered += messages
+            return True
+
+        logger.warning(f"Cannot publish to {subject}: not connected to NATS")
+        return False
+
+    async def replay_outbox(self) -> int:
+        """Send messages queued while disconnected; returns how many were sent"""
+        if self.outbox is not None and len(self.outbox):
+            records = await asyncio.to_thread(self.outbox.drain)
+        elif self._buffer:
+            records = list(self._buffer)
+            self._buffer.clear()
+        else:
+            return 0
+
+        sent = 0
+        for index, (subject, headers, payload) in enumerate(records):
+            try:
+                await self.nc.publish(subject, payload, headers=headers)
+            except Exception as e:
+                logger.error(f"Outbox replay interrupted: {e}")
+                if self.outbox is not None:
+                    await asyncio.to_thread(self.outbox.requeue, records[index:])
+                else:
+                    self._buffer.extendleft(reversed(records[index:]))
+                break
+            stats = self.stats[subject]
+            stats.messages += int(headers.get(HEADER_BATCH, 1))
+            stats.bytes += len(payload)
+            stats.publishes += 1
+            sent += 1
+
+        logger.info(f"Replayed {sent} outbox messages")
+        return sent
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-subject throughput counters and rates since start"""
+        elapsed = max(time.time() - self.started_at, 1e-6)
+        return {
+            'codec': self.codec.name,
+            'outbox_pending': len(self.outbox) if self.outbox else 0,
+            'outbox_dropped': self.outbox.dropped if self.outbox else 0,
+            'buffer_pending': len(self._buffer) if self._buffer is not None else 0,
+            'buffer_dropped': self.buffer_dropped,
+            'subjects': {
+                subject: {
+                    **asdict(stats),
+                    'messages_per_sec': stats.messages / elapsed,
+                    'bytes_per_sec': stats.bytes / elapsed
+                }
+                for subject, stats in self.stats.items()
+            }
+        }
+
+class OverflowPolicy:
+    """What a subscription does when its dispatch queue is full"""
+    DROP_NEWEST = 'drop'
+    DROP_OLDEST = 'drop_oldest'
+    BLOCK = 'block'
+
+
+@dataclass
+class DispatchStats:
+    """Per-subscription delivery counters"""
+    received: int = 0
+    processed: int = 0
+    dropped: int = 0
+    errors: int = 0
+    max_queue_depth: int = 0
+    total_lag: float = 0.0
+    max_lag: float = 0.0
+
+
+class SubscriptionDispatcher:
+    """Bounded queue plus worker tasks sitting between NATS and a callback
+
+    Raw messages are queued as received and only decoded by a worker, so a slow
+    callback delays its own subscription's queue instead of NATS delivery for
+    everyone. With more than one worker, callbacks may complete out of order.
+    """
+
+    def __init__(self, subject: str, callback: Callable, workers: int = 1,
+                 max_pending: int = 1000, overflow: str = OverflowPolicy.DROP_OLDEST):
+        if overflow not in (OverflowPolicy.DROP_NEWEST, OverflowPolicy.DROP_OLDEST, OverflowPolicy.BLOCK):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+
+        self.subject = subject
+        self.callback = callback
+        self.workers = max(1, workers)
+        self.overflow = overflow
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self.stats = DispatchStats()
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        """Spawn the worker tasks"""
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"dispatch:{self.subject}:{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self, drain_timeout: float = 5.0):
+        """Let workers finish queued messages for up to drain_timeout seconds, then cancel them"""
+        if self._tasks and self.queue.qsize():
+            try:
+                await asyncio.wait_for(self.queue.join(), drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"Dispatcher for {self.subject} stopped with "
+                               f"{self.queue.qsize()} messages undelivered")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def enqueue(self, msg):
+        """NATS message callback: queue the raw message according to the overflow policy"""
+        self.stats.received += 1
+        item = (msg.data, msg.headers, time.monotonic())
+
+        if self.overflow == OverflowPolicy.BLOCK:
+            # Holding the NATS callback pushes backpressure onto this subscription only
+            await self.queue.put(item)
+        elif self.queue.full():
+            if self.overflow == OverflowPolicy.DROP_NEWEST:
+                self.stats.dropped += 1
+                return
+            self.queue.get_nowait()
+            self.queue.task_done()
+            self.stats.dropped += 1
+            self.queue.put_nowait(item)
+        else:
+            self.queue.put_nowait(item)
+
+        depth = self.queue.qsize()
+        if depth > self.stats.max_queue_depth:
+            self.stats.max_queue_depth = depth
+
+    async def _worker(self):
+        while True:
+            payload, headers, received_at = await self.queue.get()
+            try:
+                lag = time.monotonic() - received_at
+                self.stats.total_lag += lag
+                if lag > self.stats.max_lag:
+                    self.stats.max_lag = lag
+
+                data, batch_size = decode_message(payload, headers)
+                if batch_size:
+                    for item in data:
+                        await self.callback(item)
+                else:
+                    await self.callback(data)
+                self.stats.processed += 1
+            except Exception as e:
+                self.stats.errors += 1
+                logger.error(f"Error processing message from {self.subject}: {e}")
+            finally:
+                self.queue.task_done()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, drop counts and delivery lag for this subscription"""
+        handled = self.stats.processed + self.stats.errors
+        return {
+            **asdict(self.stats),
+            'subject': self.subject,
+            'workers': self.workers,
+            'overflow': self.overflow,
+            'queue_depth': self.queue.qsize(),
+            'queue_capacity': self.queue.maxsize,
+            'avg_lag': self.stats.total_lag / handled if handled else 0.0
+        }
+
+
 class SynOSNATSClient:
     """High-performance NATS client for SynOS AI services"""
 
-    def __init__(self, servers: List[str] = None):
+    def __init__(self, servers: List[str] = None, codec: Optional[str] = None,
+                 outbox_path: Optional[str] = None,
+                 batch_interval: float = 1.0,
+                 batched_subjects: Optional[List[str]] = None):
         self.servers = servers or ["nats://localhost:4222"]
         self.nc = None
         self.connected = False
         self.subscriptions = {}
+        self.dispatchers: Dict[str, SubscriptionDispatcher] = {}
         self.reconnect_count = 0
         self.max_reconnects = 10
 
@@ -54,6 +545,16 @@ def __init__(self, servers: List[str] = None):
             'adaptation_signals': 'synos.adaptation.signals'
         }
 
+        self.publisher = NATSPublisher(
+            codec=codec,
+            schemas={subject: f"{name}.v1" for name, subject in self.subjects.items()},
+            # Batches arrive as JSON arrays, so only subjects whose subscribers
+            # understand the batch header (e.g. 'system_metrics') should opt in
+            batched_subjects=[self.subjects.get(name, name) for name in batched_subjects or []],
+            batch_interval=batch_interval,
+            outbox_path=outbox_path
+        )
+
     async def connect(self) -> bool:
         """Connect to NATS server with resilience"""
         if not nats:
@@ -74,6 +575,7 @@ async def connect(self) -> bool:
 
             self.connected = True
             logger.info(f"Connected to NATS server: {self.nc.connected_url}")
+            await self.publisher.attach(self.nc)
             return True
 
         except Exception as e:
@@ -85,6 +587,10 @@ async def disconnect(self):
         """Disconnect from NATS server gracefully"""
         if self.nc and self.connected:
             try:
+                await self.publisher.close()
+                for dispatcher in self.dispatchers.values():
+                    await dispatcher.stop()
+                self.dispatchers.clear()
                 await self.nc.close()
                 logger.info("Disconnected from NATS server")
             except Exception as e:
@@ -176,28 +682,37 @@ async def request_inference(self, model_id: str, input_data: Any, timeout: float
             logger.error(f"Inference request failed: {e}")
             return None
 
-    async def subscribe_to_consciousness_updates(self, callback: Callable) -> str:
+    async def subscribe_to_consciousness_updates(self, callback: Callable, **dispatch_options) -> str:
         """Subscribe to consciousness state updates from other nodes"""
+        # Only the latest state matters, so shed stale updates rather than queue them
+        dispatch_options.setdefault('overflow', OverflowPolicy.DROP_OLDEST)
         return await self._subscribe_json(
             self.subjects['consciousness_state'],
             callback,
-            queue="consciousness-subscribers"
+            queue="consciousness-subscribers",
+            **dispatch_options
         )
 
-    async def subscribe_to_security_events(self, callback: Callable) -> str:
+    async def subscribe_to_security_events(self, callback: Callable, **dispatch_options) -> str:
         """Subscribe to security events for AI response coordination"""
+        # Security events must not be lost; slow responders get more workers and backpressure
+        dispatch_options.setdefault('workers', 4)
+        dispatch_options.setdefault('overflow', OverflowPolicy.BLOCK)
         return await self._subscribe_json(
             self.subjects['security_events'],
             callback,
-            queue="security-ai-responders"
+            queue="security-ai-responders",
+            **dispatch_options
         )
 
-    async def subscribe_to_model_updates(self, callback: Callable) -> str:
+    async def subscribe_to_model_updates(self, callback: Callable, **dispatch_options) -> str:
         """Subscribe to AI model updates and reloading signals"""
+        dispatch_options.setdefault('overflow', OverflowPolicy.BLOCK)
         return await self._subscribe_json(
             self.subjects['model_updates'],
             callback,
-            queue="model-update-subscribers"
+            queue="model-update-subscribers",
+            **dispatch_options
         )
 
     async def send_adaptation_signal(self, signal_type: str, data: Dict[str, Any]) -> bool:
@@ -215,45 +730,36 @@ async def send_adaptation_signal(self, signal_type: str, data: Dict[str, Any]) -
         )
 
     async def _publish_json(self, subject: str, data: Dict[str, Any]) -> bool:
-        """Publish JSON data to NATS subject"""
-        if not self.connected or not self.nc:
-            logger.warning(f"Cannot publish to {subject}: not connected to NATS")
-            return False
-
-        try:
-            await self.nc.publish(
-                subject,
-                json.dumps(data, default=str).encode()
-            )
-            logger.debug(f"Published to {subject}: {len(json.dumps(data))} bytes")
-            return True
+        """Publish structured data to NATS subject through the publisher layer"""
+        return await self.publisher.publish(subject, data)
 
-        except Exception as e:
-            logger.error(f"Failed to publish to {subject}: {e}")
-            return False
+    def get_publish_stats(self) -> Dict[str, Any]:
+        """Get per-subject publish throughput counters"""
+        return self.publisher.get_stats()
 
-    async def _subscribe_json(self, subject: str, callback: Callable, queue: str = None) -> str:
-        """Subscribe to JSON messages on NATS subject"""
+    async def _subscribe_json(self, subject: str, callback: Callable, queue: str = None,
+                              workers: int = 1, max_pending: int = 1000,
+                              overflow: str = OverflowPolicy.DROP_OLDEST) -> str:
+        """Subscribe to structured messages on NATS subject via a bounded dispatcher"""
         if not self.connected or not self.nc:
             logger.error(f"Cannot subscribe to {subject}: not connected to NATS")
             return ""
 
-        async def message_handler(msg):
-            try:
-                data = json.loads(msg.data.decode())
-                await callback(data)
-            except Exception as e:
-                logger.error(f"Error processing message from {subject}: {e}")
+        dispatcher = SubscriptionDispatcher(subject, callback, workers=workers,
+                                            max_pending=max_pending, overflow=overflow)
 
         try:
             if queue:
-                sub = await self.nc.subscribe(subject, queue=queue, cb=message_handler)
+                sub = await self.nc.subscribe(subject, queue=queue, cb=dispatcher.enqueue)
             else:
-                sub = await self.nc.subscribe(subject, cb=message_handler)
+                sub = await self.nc.subscribe(subject, cb=dispatcher.enqueue)
 
+            dispatcher.start()
             sub_id = str(sub.sid)
             self.subscriptions[sub_id] = sub
-            logger.info(f"Subscribed to {subject} (queue: {queue}) with ID {sub_id}")
+            self.dispatchers[sub_id] = dispatcher
+            logger.info(f"Subscribed to {subject} (queue: {queue}) with ID {sub_id}, "
+                        f"{dispatcher.workers} workers, overflow={overflow}")
             return sub_id
 
         except Exception as e:
@@ -266,21 +772,30 @@ async def unsubscribe(self, subscription_id: str):
             try:
                 await self.subscriptions[subscription_id].unsubscribe()
                 del self.subscriptions[subscription_id]
+                dispatcher = self.dispatchers.pop(subscription_id, None)
+                if dispatcher:
+                    await dispatcher.stop()
                 logger.info(f"Unsubscribed from subscription {subscription_id}")
             except Exception as e:
                 logger.error(f"Failed to unsubscribe {subscription_id}: {e}")
 
+    def get_subscription_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-subscription queue depth, drops and lag"""
+        return {sub_id: dispatcher.get_stats() for sub_id, dispatcher in self.dispatchers.items()}
+
     # Connection event callbacks
     async def _reconnected_cb(self):
         """Handle NATS reconnection"""
         self.reconnect_count += 1
         logger.info(f"Reconnected to NATS server (count: {self.reconnect_count})")
         self.connected = True
+        await self.publisher.attach(self.nc)
 
     async def _disconnected_cb(self):
         """Handle NATS disconnection"""
         logger.warning("Disconnected from NATS server")
         self.connected = False
+        self.publisher.mark_disconnected()
 
     async def _error_cb(self, e):
         """Handle NATS errors"""
@@ -290,6 +805,7 @@ async def _closed_cb(self):
         """Handle NATS connection closure"""
         logger.info("NATS connection closed")
         self.connected = False
+        self.publisher.mark_disconnected()
 
 class ConsciousnessMessageBus:
     """High-level interface for consciousness framework messaging"""
@@ -340,13 +856,17 @@ async def coordinate_ai_response(self, trigger_event: str,
 
         return await self.client.send_adaptation_signal("coordinate_response", coordination_data)
 
-    async def register_consciousness_observer(self, callback: Callable):
+    async def register_consciousness_observer(self, callback: Callable, **dispatch_options):
         """Register to observe consciousness state changes"""
-        return await self.client.subscribe_to_consciousness_updates(callback)
+        return await self.client.subscribe_to_consciousness_updates(callback, **dispatch_options)
 
-    async def register_security_responder(self, callback: Callable):
+    async def register_security_responder(self, callback: Callable, **dispatch_options):
         """Register as AI security event responder"""
-        return await self.client.subscribe_to_security_events(callback)
+        return await self.client.subscribe_to_security_events(callback, **dispatch_options)
+
+    def get_dispatch_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-handler lag and drop metrics"""
+        return self.client.get_subscription_stats()
 
 # Example usage and testing functions
 async def test_message_bus():
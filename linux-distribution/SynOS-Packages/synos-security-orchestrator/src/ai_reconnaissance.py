@@ -15,10 +15,16 @@
 import asyncio
 import json
 import logging
+import os
+import random
 import re
 import socket
+import string
+import struct
 import subprocess
+import tempfile
 import time
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, asdict
 from datetime import datetime, timedelta
@@ -27,6 +33,7 @@
 from urllib.parse import urlparse, urljoin
 import hashlib
 import base64
+import ipaddress
 
 try:
     import requests
@@ -41,6 +48,12 @@
     DEPS_AVAILABLE = False
     requests = None
 
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+    DEPS_AVAILABLE = False
+
 # Import SynOS AI framework
 import sys
 sys.path.append('/usr/lib/synos')
@@ -70,10 +83,659 @@ class OSINTSource:
     rate_limit: int  # requests per minute
     reliability_score: float
 
+# DNS wire-format constants
+DNS_TYPE_A = 1
+DNS_TYPE_CNAME = 5
+DNS_TYPE_SOA = 6
+DNS_CLASS_IN = 1
+DNS_RCODE_NOERROR = 0
+DNS_RCODE_NXDOMAIN = 3
+DNS_FLAG_TC = 0x0200
+
+
+class DNSProtocolError(Exception):
+    """Malformed or unexpected DNS response"""
+
+
+def build_dns_query(txid: int, hostname: str, qtype: int = DNS_TYPE_A) -> bytes:
+    """Encode a recursive DNS query for hostname"""
+    header = struct.pack('>HHHHHH', txid, 0x0100, 1, 0, 0, 0)  # RD flag, one question
+    qname = b''.join(
+        bytes([len(label)]) + label
+        for label in (part.encode('idna') for part in hostname.rstrip('.').split('.'))
+    ) + b'\x00'
+    return header + qname + struct.pack('>HH', qtype, DNS_CLASS_IN)
+
+
+def _skip_dns_name(data: bytes, offset: int) -> int:
+    """Offset just past a (possibly compressed) domain name"""
+    while True:
+        if offset >= len(data):
+            raise DNSProtocolError("Truncated name")
+        length = data[offset]
+        if length == 0:
+            return offset + 1
+        if length & 0xC0 == 0xC0:
+            return offset + 2
+        offset += length + 1
+
+
+def parse_dns_response(data: bytes) -> Tuple[int, int, List[str], int]:
+    """Decode a response into (txid, rcode, A-record addresses, ttl)
+
+    For negative answers the TTL comes from the authority SOA, per RFC 2308.
+    """
+    if len(data) < 12:
+        raise DNSProtocolError("Short response")
+    txid, flags, qdcount, ancount, nscount, _ = struct.unpack('>HHHHHH', data[:12])
+    rcode = flags & 0x000F
+
+    offset = 12
+    for _ in range(qdcount):
+        offset = _skip_dns_name(data, offset) + 4
+
+    addresses = []
+    ttl = None
+    negative_ttl = None
+    for index in range(ancount + nscount):
+        offset = _skip_dns_name(data, offset)
+        rtype, rclass, rttl, rdlength = struct.unpack('>HHIH', data[offset:offset + 10])
+        offset += 10
+        rdata = data[offset:offset + rdlength]
+        offset += rdlength
+
+        if index < ancount:
+            if rtype == DNS_TYPE_A and rclass == DNS_CLASS_IN and rdlength == 4:
+                addresses.append(socket.inet_ntoa(rdata))
+            if rtype in (DNS_TYPE_A, DNS_TYPE_CNAME):
+                ttl = rttl if ttl is None else min(ttl, rttl)
+        elif rtype == DNS_TYPE_SOA and len(rdata) >= 4:
+            soa_minimum = struct.unpack('>I', rdata[-4:])[0]
+            negative_ttl = min(rttl, soa_minimum)
+
+    if addresses:
+        return txid, rcode, addresses, ttl or 0
+    return txid, rcode, [], negative_ttl if negative_ttl is not None else -1
+
+
+class _DNSClientProtocol(asyncio.DatagramProtocol):
+    """One UDP socket with many queries in flight, matched by transaction id"""
+
+    def __init__(self):
+        self.transport = None
+        self.pending: Dict[int, asyncio.Future] = {}
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        if len(data) < 2:
+            return
+        txid = struct.unpack('>H', data[:2])[0]
+        future = self.pending.pop(txid, None)
+        if future and not future.done():
+            future.set_result(data)
+
+    def error_received(self, exc):
+        logger.debug(f"DNS socket error: {exc}")
+
+    def connection_lost(self, exc):
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("DNS socket closed"))
+        self.pending.clear()
+
+
+class AdaptiveRateLimiter:
+    """AIMD limit on queries in flight: grow on answers, halve on timeouts
+
+    Waiters are woken one at a time in FIFO order, so queuing thousands of
+    lookups costs O(1) per release rather than waking every waiter.
+    """
+
+    def __init__(self, initial: int = 100, minimum: int = 10, maximum: int = 1000):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.in_flight = 0
+        self._waiters: deque = deque()
+
+    async def acquire(self):
+        if not self._waiters and self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot was granted just as we were cancelled; hand it back
+                self.in_flight -= 1
+                self._wake()
+            raise
+
+    def release(self, success: bool):
+        self.in_flight -= 1
+        if success:
+            self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+        else:
+            self.limit = max(self.minimum, self.limit / 2)
+        self._wake()
+
+    def _wake(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            future = self._waiters.popleft()
+            if not future.done():
+                self.in_flight += 1
+                future.set_result(None)
+
+
+class AsyncDNSResolver:
+    """Non-blocking UDP stub resolver for bulk subdomain enumeration
+
+    Queries are pipelined over one socket per nameserver and spread round-robin
+    across the configured resolvers. Positive answers are cached for their TTL and
+    negative answers for the SOA minimum (capped by negative_ttl). Truncated UDP
+    answers are retried over TCP. IP literals are returned as-is, and single
+    lookups can fall back to the system resolver (/etc/hosts, nsswitch).
+    """
+
+    def __init__(self, nameservers: Optional[List[str]] = None, timeout: float = 2.0, retries: int = 2,
+                 initial_concurrency: int = 100, max_concurrency: int = 1000,
+                 negative_ttl: int = 300, max_cache_entries: int = 100000):
+        self.nameservers = [self._parse_nameserver(ns) for ns in (nameservers or self._system_nameservers())]
+        self.timeout = timeout
+        self.retries = retries
+        self.negative_ttl = negative_ttl
+        self.max_cache_entries = max_cache_entries
+        self.limiter = AdaptiveRateLimiter(initial_concurrency, maximum=max_concurrency)
+
+        self.cache: Dict[str, Tuple[float, List[str]]] = {}
+        self.wildcards: Dict[str, Set[str]] = {}
+        self._protocols: List[_DNSClientProtocol] = []
+        self._next_server = 0
+        self._start_lock = asyncio.Lock()
+
+        self.stats = {
+            'queries_sent': 0,
+            'answers': 0,
+            'nxdomain': 0,
+            'timeouts': 0,
+            'errors': 0,
+            'cache_hits': 0,
+            'wildcard_filtered': 0,
+            'tcp_retries': 0,
+            'system_fallbacks': 0
+        }
+
+    @staticmethod
+    def _system_nameservers() -> List[str]:
+        """Nameservers from /etc/resolv.conf, falling back to public resolvers"""
+        servers = []
+        try:
+            with open('/etc/resolv.conf') as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) >= 2 and parts[0] == 'nameserver' and ':' not in parts[1]:
+                        servers.append(parts[1])
+        except OSError:
+            pass
+        return servers or ['1.1.1.1', '8.8.8.8']
+
+    @staticmethod
+    def _parse_nameserver(nameserver: str) -> Tuple[str, int]:
+        host, _, port = nameserver.partition(':')
+        return host, int(port or 53)
+
+    async def start(self):
+        """Open one UDP endpoint per nameserver"""
+        async with self._start_lock:
+            if self._protocols:
+                return
+            loop = asyncio.get_running_loop()
+            for address in self.nameservers:
+                _, protocol = await loop.create_datagram_endpoint(_DNSClientProtocol, remote_addr=address)
+                self._protocols.append(protocol)
+
+    async def close(self):
+        for protocol in self._protocols:
+            if protocol.transport:
+                protocol.transport.close()
+        self._protocols = []
+
+    def _cache_get(self, hostname: str) -> Optional[List[str]]:
+        entry = self.cache.get(hostname)
+        if entry is None:
+            return None
+        expires, addresses = entry
+        if expires < time.monotonic():
+            del self.cache[hostname]
+            return None
+        self.stats['cache_hits'] += 1
+        return addresses
+
+    def _cache_put(self, hostname: str, addresses: List[str], ttl: int):
+        if len(self.cache) >= self.max_cache_entries:
+            # Dicts keep insertion order, so this drops the oldest entry
+            self.cache.pop(next(iter(self.cache)))
+        self.cache[hostname] = (time.monotonic() + ttl, addresses)
+
+    async def _query(self, hostname: str) -> Tuple[int, List[str], int]:
+        """Send one query with retries across nameservers"""
+        last_error: Exception = TimeoutError(f"DNS timeout for {hostname}")
+        for _ in range(self.retries + 1):
+            server_index = self._next_server % len(self._protocols)
+            protocol = self._protocols[server_index]
+            self._next_server += 1
+
+            txid = random.randrange(0x10000)
+            while txid in protocol.pending:
+                txid = random.randrange(0x10000)
+            future = asyncio.get_running_loop().create_future()
+            protocol.pending[txid] = future
+
+            await self.limiter.acquire()
+            success = False
+            try:
+                protocol.transport.sendto(build_dns_query(txid, hostname))
+                self.stats['queries_sent'] += 1
+                data = await asyncio.wait_for(future, self.timeout)
+                if len(data) >= 4 and struct.unpack('>H', data[2:4])[0] & DNS_FLAG_TC:
+                    # Answer did not fit in a datagram; ask the same server over TCP
+                    self.stats['tcp_retries'] += 1
+                    data = await asyncio.wait_for(self._query_tcp(self.nameservers[server_index], hostname),
+                                                  self.timeout)
+                _, rcode, addresses, ttl = parse_dns_response(data)
+                if rcode not in (DNS_RCODE_NOERROR, DNS_RCODE_NXDOMAIN):
+                    # SERVFAIL/REFUSED: try the next resolver
+                    last_error = DNSProtocolError(f"rcode {rcode} for {hostname}")
+                    self.stats['errors'] += 1
+                    continue
+                success = True
+                return rcode, addresses, ttl
+            except asyncio.TimeoutError as e:
+                self.stats['timeouts'] += 1
+                last_error = e
+            except (DNSProtocolError, OSError, struct.error, asyncio.IncompleteReadError) as e:
+                self.stats['errors'] += 1
+                last_error = e
+            finally:
+                protocol.pending.pop(txid, None)
+                self.limiter.release(success)
+        raise last_error
+
+    async def _query_tcp(self, address: Tuple[str, int], hostname: str) -> bytes:
+        """One query over TCP with the 2-byte length framing of RFC 1035 4.2.2"""
+        reader, writer = await asyncio.open_connection(*address)
+        try:
+            query = build_dns_query(random.randrange(0x10000), hostname)
+            writer.write(struct.pack('>H', len(query)) + query)
+            await writer.drain()
+            length = struct.unpack('>H', await reader.readexactly(2))[0]
+            return await reader.readexactly(length)
+        finally:
+            writer.close()
+
+    async def _system_resolve(self, hostname: str) -> List[str]:
+        """IPv4 addresses from the system resolver, which also reads /etc/hosts"""
+        self.stats['system_fallbacks'] += 1
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(
+                hostname, None, family=socket.AF_INET, type=socket.SOCK_STREAM
+            )
+        except (socket.gaierror, UnicodeError) as e:
+            logger.debug(f"System resolution failed for {hostname}: {e}")
+            return []
+        return list(dict.fromkeys(info[4][0] for info in infos))
+
+    async def resolve(self, hostname: str, system_fallback: bool = False) -> List[str]:
+        """IPv4 addresses for hostname; empty if it does not resolve
+
+        With system_fallback, names the stub resolver cannot answer (NXDOMAIN,
+        no A record, timeouts) are retried through getaddrinfo. Bulk enumeration
+        leaves it off so misses stay cheap.
+        """
+        hostname = hostname.rstrip('.').lower()
+        try:
+            return [str(ipaddress.ip_address(hostname))]
+        except ValueError:
+            pass
+
+        addresses = self._cache_get(hostname)
+        if addresses is None:
+            addresses = await self._resolve_uncached(hostname)
+        if not addresses and system_fallback:
+            addresses = await self._system_resolve(hostname)
+        return addresses
+
+    async def _resolve_uncached(self, hostname: str) -> List[str]:
+        if not self._protocols:
+            await self.start()
+
+        try:
+            rcode, addresses, ttl = await self._query(hostname)
+        except Exception as e:
+            logger.debug(f"DNS resolution failed for {hostname}: {e}")
+            return []
+
+        if addresses:
+            self.stats['answers'] += 1
+            self._cache_put(hostname, addresses, max(ttl, 1))
+        else:
+            if rcode == DNS_RCODE_NXDOMAIN:
+                self.stats['nxdomain'] += 1
+            ttl = self.negative_ttl if ttl < 0 else min(ttl, self.negative_ttl)
+            self._cache_put(hostname, [], ttl)
+        return addresses
+
+    async def resolve_many(self, hostnames: List[str]) -> Dict[str, List[str]]:
+        """Resolve hostnames concurrently; the rate limiter bounds queries in flight"""
+        results = await asyncio.gather(*(self.resolve(name) for name in hostnames))
+        return dict(zip(hostnames, results))
+
+    async def detect_wildcard(self, domain: str, probes: int = 3) -> Set[str]:
+        """Addresses returned for random labels under domain, i.e. wildcard DNS answers"""
+        domain = domain.rstrip('.').lower()
+        if domain in self.wildcards:
+            return self.wildcards[domain]
+
+        labels = [''.join(random.choices(string.ascii_lowercase + string.digits, k=16)) for _ in range(probes)]
+        answers = await self.resolve_many([f"{label}.{domain}" for label in labels])
+        wildcard_ips = set().union(*answers.values()) if answers else set()
+        if wildcard_ips:
+            logger.info(f"Wildcard DNS detected for {domain}: {sorted(wildcard_ips)}")
+        self.wildcards[domain] = wildcard_ips
+        return wildcard_ips
+
+    async def enumerate_subdomains(self, domain: str, labels: List[str]) -> Dict[str, List[str]]:
+        """Resolve label.domain for every label, dropping wildcard-only answers"""
+        wildcard_ips = await self.detect_wildcard(domain)
+        resolved = await self.resolve_many([f"{label}.{domain}" for label in labels])
+
+        found = {}
+        for fqdn, addresses in resolved.items():
+            if not addresses:
+                continue
+            if wildcard_ips and set(addresses) <= wildcard_ips:
+                self.stats['wildcard_filtered'] += 1
+                continue
+            found[fqdn] = addresses
+        return found
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'cache_entries': len(self.cache),
+            'concurrency_limit': int(self.limiter.limit),
+            'nameservers': [f"{host}:{port}" for host, port in self.nameservers]
+        }
+
+class ResponseCache:
+    """On-disk HTTP response cache with a TTL per OSINT source
+
+    Each entry is a body file plus a small JSON sidecar holding status and expiry,
+    both named by the SHA-256 of the URL. Every fetch streams into its own temp
+    file, so concurrent fetches of one URL never interleave their writes.
+    """
+
+    def __init__(self, cache_dir: str, default_ttl: int = 3600, source_ttls: Optional[Dict[str, int]] = None):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.default_ttl = default_ttl
+        self.source_ttls = source_ttls or {}
+
+    def _paths(self, url: str) -> Tuple[Path, Path]:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return self.cache_dir / f"{key}.body", self.cache_dir / f"{key}.meta"
+
+    def ttl_for(self, source: str) -> int:
+        return self.source_ttls.get(source, self.default_ttl)
+
+    def get(self, url: str) -> Optional[Tuple[int, Path]]:
+        """(status, body path) for a fresh entry, else None"""
+        body_path, meta_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text())
+        except (OSError, ValueError):
+            return None
+        if meta['expires'] < time.time() or not body_path.exists():
+            return None
+        return meta['status'], body_path
+
+    def new_partial(self, url: str) -> Path:
+        """Unique temporary path to stream a new body into before commit()"""
+        prefix = self._paths(url)[0].stem + '.'
+        fd, path = tempfile.mkstemp(dir=self.cache_dir, prefix=prefix, suffix='.partial')
+        os.close(fd)
+        return Path(path)
+
+    def commit(self, url: str, partial: Path, status: int, source: str) -> Path:
+        """Move a completed body into place; the last concurrent writer wins whole"""
+        body_path, meta_path = self._paths(url)
+        os.replace(partial, body_path)
+        meta_partial = self.new_partial(url)
+        meta_partial.write_text(json.dumps({
+            'url': url,
+            'status': status,
+            'expires': time.time() + self.ttl_for(source)
+        }))
+        os.replace(meta_partial, meta_path)
+        return body_path
+
+    def discard(self, partial: Path):
+        partial.unlink(missing_ok=True)
+
+
+async def iter_json_array(chunks):
+    """Yield elements of a top-level JSON array from an async iterator of byte chunks
+
+    Only one element (plus the current chunk) is held in memory at a time, so
+    multi-hundred-megabyte crt.sh responses parse in bounded memory.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+    pending = b''
+
+    async for chunk in chunks:
+        try:
+            text = (pending + chunk).decode('utf-8')
+            pending = b''
+        except UnicodeDecodeError as e:
+            # Chunk boundary split a multi-byte character; keep the tail for next time
+            text = (pending + chunk)[:e.start].decode('utf-8')
+            pending = (pending + chunk)[e.start:]
+        buffer += text
+
+        position = 0
+        while True:
+            while position < len(buffer) and buffer[position] in ' \t\r\n,':
+                position += 1
+            if position >= len(buffer):
+                break
+            if not started:
+                if buffer[position] != '[':
+                    raise ValueError("Response is not a JSON array")
+                started = True
+                position += 1
+                continue
+            if buffer[position] == ']':
+                return
+            try:
+                element, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # Element continues in the next chunk
+                break
+            if not isinstance(element, (dict, list, str)) and (
+                    end >= len(buffer) or buffer[end] not in ' \t\r\n,]'):
+                # Numbers are not self-delimiting: "12" may be the start of "1234"
+                break
+            position = end
+            yield element
+        buffer = buffer[position:]
+
+
+async def _iter_file_chunks(path: Path, chunk_size: int = 65536):
+    with open(path, 'rb') as f:
+        while True:
+            chunk = await asyncio.to_thread(f.read, chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+class ReconHTTPClient:
+    """Shared non-blocking HTTP layer for OSINT collectors
+
+    One aiohttp session keeps keep-alive connection pools per host. Each source has
+    its own request spacing derived from OSINTSource.rate_limit and its own cache TTL.
+    """
+
+    def __init__(self, cache_dir: str = "/var/cache/synos/recon", source_ttls: Optional[Dict[str, int]] = None,
+                 rate_limits: Optional[Dict[str, int]] = None, max_connections: int = 100,
+                 max_per_host: int = 8, timeout: float = 30.0):
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.rate_limits = rate_limits or {}
+        self.cache = None
+        try:
+            self.cache = ResponseCache(cache_dir, source_ttls=source_ttls)
+        except OSError as e:
+            logger.warning(f"Response cache disabled, cannot use {cache_dir}: {e}")
+
+        self._session = None
+        self._next_request_at: Dict[str, float] = {}
+        self._source_locks: Dict[str, asyncio.Lock] = {}
+        self.stats = {'requests': 0, 'cache_hits': 0, 'errors': 0, 'bytes': 0}
+
+    async def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_per_host,
+                keepalive_timeout=30,
+                ttl_dns_cache=300
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={'User-Agent': 'SynOS-Recon/1.0'}
+            )
+        return self._session
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+
+    async def _throttle(self, source: str):
+        """Space requests to a source according to its per-minute rate limit"""
+        per_minute = self.rate_limits.get(source)
+        if not per_minute:
+            return
+        lock = self._source_locks.setdefault(source, asyncio.Lock())
+        async with lock:
+            now = time.monotonic()
+            wait = self._next_request_at.get(source, now) - now
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_request_at[source] = max(now, self._next_request_at.get(source, now)) + 60.0 / per_minute
+
+    async def _fetch_to_cache(self, url: str, source: str, headers: Optional[Dict[str, str]]) -> Optional[Tuple[int, Path]]:
+        """Stream a response body to the cache and return (status, body path)"""
+        cached = self.cache.get(url)
+        if cached:
+            self.stats['cache_hits'] += 1
+            return cached
+
+        await self._throttle(source)
+        session = await self._get_session()
+        partial = self.cache.new_partial(url)
+        try:
+            self.stats['requests'] += 1
+            async with session.get(url, headers=headers) as response:
+                with open(partial, 'wb') as f:
+                    async for chunk in response.content.iter_chunked(65536):
+                        f.write(chunk)
+                        self.stats['bytes'] += len(chunk)
+                status = response.status
+        except Exception as e:
+            self.stats['errors'] += 1
+            self.cache.discard(partial)
+            logger.debug(f"HTTP request to {url} failed: {e}")
+            return None
+
+        if status != 200:
+            # Only successful responses are worth caching
+            self.cache.discard(partial)
+            return status, None
+        return status, self.cache.commit(url, partial, status, source)
+
+    async def get_json(self, url: str, source: str, headers: Optional[Dict[str, str]] = None) -> Optional[Any]:
+        """Fetch and decode a JSON document"""
+        if self.cache is not None:
+            result = await self._fetch_to_cache(url, source, headers)
+            if not result or result[0] != 200:
+                return None
+            return json.loads(await asyncio.to_thread(result[1].read_bytes))
+
+        await self._throttle(source)
+        session = await self._get_session()
+        try:
+            self.stats['requests'] += 1
+            async with session.get(url, headers=headers) as response:
+                if response.status != 200:
+                    return None
+                return await response.json(content_type=None)
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.debug(f"HTTP request to {url} failed: {e}")
+            return None
+
+    async def iter_json_array(self, url: str, source: str, headers: Optional[Dict[str, str]] = None):
+        """Stream elements of a JSON array response without buffering the whole body"""
+        if self.cache is not None:
+            result = await self._fetch_to_cache(url, source, headers)
+            if not result or result[0] != 200:
+                return
+            async for element in iter_json_array(_iter_file_chunks(result[1])):
+                yield element
+            return
+
+        await self._throttle(source)
+        session = await self._get_session()
+        self.stats['requests'] += 1
+        async with session.get(url, headers=headers) as response:
+            if response.status != 200:
+                return
+            async for element in iter_json_array(response.content.iter_chunked(65536)):
+                yield element
+
+    async def fan_out(self, requests_by_source: Dict[str, str]) -> Dict[str, Optional[Any]]:
+        """Fetch one JSON document per source concurrently"""
+        sources = list(requests_by_source)
+        results = await asyncio.gather(
+            *(self.get_json(requests_by_source[source], source) for source in sources),
+            return_exceptions=True
+        )
+        return {
+            source: None if isinstance(result, Exception) else result
+            for source, result in zip(sources, results)
+        }
+
 class AIReconEngine:
     """AI-powered reconnaissance and OSINT analysis engine"""
 
-    def __init__(self):
+    # Public endpoints; overridable so collectors can run against a local mock server
+    DEFAULT_ENDPOINTS = {
+        'crtsh': 'https://crt.sh',
+        'certspotter': 'https://api.certspotter.com'
+    }
+
+    def __init__(self, endpoints: Optional[Dict[str, str]] = None, cache_dir: str = "/var/cache/synos/recon"):
+        self.endpoints = {**self.DEFAULT_ENDPOINTS, **(endpoints or {})}
         self.osint_sources = self._initialize_osint_sources()
         self.ml_models = {}
         self.subdomain_validator = None
@@ -83,6 +745,14 @@ def __init__(self):
         # Rate limiting and caching
         self.request_cache = {}
         self.rate_limiters = {}
+        self.dns_resolver = AsyncDNSResolver()
+        self.http = ReconHTTPClient(
+            cache_dir=cache_dir,
+            # CT logs change slowly; passive DNS and threat feeds are refreshed more often
+            source_ttls={'crtsh': 6 * 3600, 'certspotter': 6 * 3600, 'virustotal': 3600,
+                         'securitytrails': 3600, 'threatcrowd': 3600},
+            rate_limits={name: source.rate_limit for name, source in self.osint_sources.items()}
+        )
 
     def _initialize_osint_sources(self) -> Dict[str, OSINTSource]:
         """Initialize OSINT data sources"""
@@ -130,17 +800,18 @@ async def _passive_dns_enumeration(self, domain: str) -> Set[str]:
         """Passive DNS enumeration from multiple sources"""
         subdomains = set()
 
-        # VirusTotal passive DNS
-        vt_subdomains = await self._query_virustotal_dns(domain)
-        subdomains.update(vt_subdomains)
-
-        # SecurityTrails historical DNS data
-        st_subdomains = await self._query_securitytrails_dns(domain)
-        subdomains.update(st_subdomains)
-
-        # ThreatCrowd passive DNS
-        tc_subdomains = await self._query_threatcrowd_dns(domain)
-        subdomains.update(tc_subdomains)
+        # VirusTotal, SecurityTrails and ThreatCrowd passive DNS, queried concurrently
+        results = await asyncio.gather(
+            self._query_virustotal_dns(domain),
+            self._query_securitytrails_dns(domain),
+            self._query_threatcrowd_dns(domain),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.debug(f"Passive DNS source failed: {result}")
+            else:
+                subdomains.update(result)
 
         return subdomains
 
@@ -159,22 +830,9 @@ async def _dictionary_subdomain_scan(self, domain: str) -> Set[str]:
         industry_subs = await self._generate_industry_specific_subdomains(domain)
         common_subs.extend(industry_subs)
 
-        # Concurrent DNS resolution with rate limiting
-        semaphore = asyncio.Semaphore(50)  # Limit concurrent DNS queries
-
-        async def check_subdomain(subdomain):
-            async with semaphore:
-                fqdn = f"{subdomain}.{domain}"
-                if await self._dns_resolve(fqdn):
-                    return fqdn
-                return None
-
-        tasks = [check_subdomain(sub) for sub in common_subs]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        for result in results:
-            if result and not isinstance(result, Exception):
-                subdomains.add(result)
+        # Pipelined DNS resolution with adaptive rate limiting and wildcard filtering
+        resolved = await self.dns_resolver.enumerate_subdomains(domain, list(dict.fromkeys(common_subs)))
+        subdomains.update(resolved.keys())
 
         return subdomains
 
@@ -182,31 +840,30 @@ async def _certificate_transparency_scan(self, domain: str) -> Set[str]:
         """Certificate Transparency log analysis for subdomain discovery"""
         subdomains = set()
 
-        try:
-            # Query multiple CT log sources
-            ct_sources = [
-                f"https://crt.sh/?q={domain}&output=json",
-                f"https://certspotter.com/api/v1/issuances?domain={domain}&include_subdomains=true",
-            ]
-
-            for source in ct_sources:
-                try:
-                    response = requests.get(source, timeout=10)
-                    if response.status_code == 200:
-                        data = response.json()
-                        if isinstance(data, list):
-                            for cert in data:
-                                # Extract CN and SANs
-                                if 'name_value' in cert:
-                                    names = cert['name_value'].split('\n')
-                                    for name in names:
-                                        if domain in name and self._is_valid_subdomain(name):
-                                            subdomains.add(name.strip())
-                except Exception as e:
-                    logger.debug(f"CT source {source} failed: {e}")
+        # Query multiple CT log sources concurrently
+        ct_sources = {
+            'crtsh': f"{self.endpoints['crtsh']}/?q={domain}&output=json",
+            'certspotter': f"{self.endpoints['certspotter']}/v1/issuances?domain={domain}"
+                           f"&include_subdomains=true&expand=dns_names",
+        }
 
-        except Exception as e:
-            logger.error(f"Certificate transparency scan failed: {e}")
+        async def scan_source(source: str, url: str) -> Set[str]:
+            found = set()
+            try:
+                async for cert in self.http.iter_json_array(url, source):
+                    # crt.sh packs CN and SANs into name_value; certspotter lists dns_names
+                    names = cert.get('name_value', '').split('\n') + cert.get('dns_names', [])
+                    for name in names:
+                        name = name.strip().lstrip('*.').lower()
+                        if (name == domain or name.endswith('.' + domain)) and self._is_valid_subdomain(name):
+                            found.add(name)
+            except Exception as e:
+                logger.debug(f"CT source {source} failed: {e}")
+            return found
+
+        results = await asyncio.gather(*(scan_source(source, url) for source, url in ct_sources.items()))
+        for result in results:
+            subdomains.update(result)
 
         return subdomains
 
@@ -258,7 +915,10 @@ async def _discover_network_ranges(self, target: str) -> List[str]:
 
         try:
             # Resolve target to IP
-            ip = socket.gethostbyname(target)
+            addresses = await self.dns_resolver.resolve(target, system_fallback=True)
+            if not addresses:
+                raise ValueError(f"Could not resolve {target}")
+            ip = addresses[0]
 
             # WHOIS lookup for network information
             whois_data = await self._whois_lookup(ip)
@@ -449,11 +1109,7 @@ def generate_reconnaissance_report(self, recon_target: ReconTarget) -> Dict[str,
     # Helper methods (simplified implementations)
     async def _dns_resolve(self, hostname: str) -> bool:
         """Check if hostname resolves"""
-        try:
-            socket.gethostbyname(hostname)
-            return True
-        except:
-            return False
+        return bool(await self.dns_resolver.resolve(hostname, system_fallback=True))
 
     def _is_valid_subdomain(self, subdomain: str) -> bool:
         """Validate subdomain format"""
@@ -498,13 +1154,7 @@ async def _generate_industry_specific_subdomains(self, domain: str) -> List[str]
 
     async def _resolve_target_ips(self, target: str) -> List[str]:
         """Resolve target domain to IP addresses"""
-        ips = []
-        try:
-            ip = socket.gethostbyname(target)
-            ips.append(ip)
-        except:
-            pass
-        return ips
+        return await self.dns_resolver.resolve(target, system_fallback=True)
 
     async def _technology_detection(self, target: str) -> List[str]:
         """Detect technologies used by target"""
@@ -520,7 +1170,7 @@ def main():
     """Main reconnaissance interface"""
     if not DEPS_AVAILABLE:
         print("Required dependencies not installed:")
-        print("pip3 install requests dnspython python-nmap shodan censys beautifulsoup4 python-whois")
+        print("pip3 install requests aiohttp dnspython python-nmap shodan censys beautifulsoup4 python-whois")
         return 1
 
     engine = AIReconEngine()
@@ -547,6 +1197,9 @@ async def run_recon():
             json.dump(report, f, indent=2, default=str)
         print(f"Report saved to: {report_file}")
 
+        await engine.http.close()
+        await engine.dns_resolver.close()
+
     asyncio.run(run_recon())
     return 0
 
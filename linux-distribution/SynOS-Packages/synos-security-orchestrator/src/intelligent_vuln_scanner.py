@@ -5,9 +5,13 @@
 """
 
 import asyncio
+import gzip
 import json
 import logging
+import re
+import threading
 import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Set, Tuple, Any
 from dataclasses import dataclass, field
@@ -16,6 +20,8 @@
 import subprocess
 import tempfile
 import hashlib
+import ipaddress
+import shlex
 import sqlite3
 from enum import Enum
 
@@ -25,7 +31,6 @@
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.preprocessing import StandardScaler
 import requests
-import nmap
 
 
 class ScanType(Enum):
@@ -86,6 +91,522 @@ class ScanResult:
     ai_insights: Dict[str, Any] = field(default_factory=dict)
 
 
+@dataclass
+class HostScanResult:
+    host: str
+    ports: List[Dict[str, Any]] = field(default_factory=list)
+    shard: Optional[str] = None
+
+
+class NmapScanScheduler:
+    """Shard network targets and run nmap workers with bounded parallelism
+
+    Each shard is a separate nmap process writing XML to stdout, parsed as it
+    streams so hosts are reported as soon as nmap finishes them. Completed shards
+    are checkpointed in SQLite, so re-running a scan id skips them.
+    """
+
+    def __init__(self, db_path: Path, max_workers: int = 4, ipv4_shard_prefix: int = 28,
+                 ipv6_shard_prefix: int = 124, nmap_binary: str = "nmap"):
+        self.db_path = db_path
+        self.max_workers = max_workers
+        self.ipv4_shard_prefix = ipv4_shard_prefix
+        self.ipv6_shard_prefix = ipv6_shard_prefix
+        self.nmap_binary = nmap_binary
+        self._init_checkpoints()
+
+    def _init_checkpoints(self):
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS scan_shards (
+                    scan_id TEXT NOT NULL,
+                    shard TEXT NOT NULL,
+                    nmap_args TEXT NOT NULL,
+                    status TEXT DEFAULT 'pending',
+                    results TEXT,
+                    completed_at TIMESTAMP,
+                    PRIMARY KEY (scan_id, shard)
+                )
+            """)
+            conn.commit()
+
+    def split_targets(self, target: str) -> List[str]:
+        """Split a target spec into shards; CIDR ranges become fixed-size subnets"""
+        shards = []
+        for part in target.replace(',', ' ').split():
+            try:
+                network = ipaddress.ip_network(part, strict=False)
+            except ValueError:
+                # Hostnames and nmap-style ranges are left to nmap as one shard
+                shards.append(part)
+                continue
+
+            shard_prefix = self.ipv4_shard_prefix if network.version == 4 else self.ipv6_shard_prefix
+            if network.prefixlen >= shard_prefix:
+                shards.append(part)
+            else:
+                shards.extend(str(subnet) for subnet in network.subnets(new_prefix=shard_prefix))
+        return shards
+
+    def _load_checkpoints(self, scan_id: str) -> Dict[str, Tuple[str, Optional[str]]]:
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT shard, status, results FROM scan_shards WHERE scan_id = ?", (scan_id,)
+            ).fetchall()
+        return {shard: (status, results) for shard, status, results in rows}
+
+    def get_nmap_args(self, scan_id: str) -> Optional[str]:
+        """nmap arguments a scan's shards were checkpointed with, if any"""
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT nmap_args FROM scan_shards WHERE scan_id = ? LIMIT 1", (scan_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _checkpoint(self, scan_id: str, shard: str, status: str, hosts: Optional[List[HostScanResult]] = None):
+        results = json.dumps([{'host': h.host, 'ports': h.ports} for h in hosts]) if hosts is not None else None
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute("""
+                UPDATE scan_shards SET status = ?, results = ?, completed_at = ?
+                WHERE scan_id = ? AND shard = ?
+            """, (status, results, datetime.now() if status == 'completed' else None, scan_id, shard))
+            conn.commit()
+
+    def get_progress(self, scan_id: str) -> Dict[str, int]:
+        """Shard counts by status for a scan"""
+        with sqlite3.connect(self.db_path) as conn:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) FROM scan_shards WHERE scan_id = ? GROUP BY status", (scan_id,)
+            ).fetchall()
+        return dict(rows)
+
+    async def scan(self, scan_id: str, target: str, nmap_args: str):
+        """Yield HostScanResult objects as hosts finish, resuming from checkpoints"""
+        shards = self.split_targets(target)
+        checkpoints = self._load_checkpoints(scan_id)
+
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO scan_shards (scan_id, shard, nmap_args) VALUES (?, ?, ?)",
+                [(scan_id, shard, nmap_args) for shard in shards]
+            )
+            conn.commit()
+
+        pending = []
+        for shard in shards:
+            status, results = checkpoints.get(shard, ('pending', None))
+            if status == 'completed' and results:
+                # Replay hosts from shards finished before the interruption
+                for host in json.loads(results):
+                    yield HostScanResult(host=host['host'], ports=host['ports'], shard=shard)
+            else:
+                pending.append(shard)
+
+        if not pending:
+            return
+
+        logging.info(f"Scan {scan_id}: {len(pending)}/{len(shards)} shards to run "
+                     f"with {self.max_workers} nmap workers")
+
+        queue: asyncio.Queue = asyncio.Queue()
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def run_shard(shard: str):
+            async with semaphore:
+                try:
+                    hosts = await self._run_nmap(shard, nmap_args, queue)
+                    self._checkpoint(scan_id, shard, 'completed', hosts)
+                except Exception as e:
+                    logging.error(f"Scan {scan_id} shard {shard} failed: {e}")
+                    self._checkpoint(scan_id, shard, 'failed')
+                finally:
+                    await queue.put(None)
+
+        tasks = [asyncio.create_task(run_shard(shard)) for shard in pending]
+        remaining = len(tasks)
+        try:
+            while remaining:
+                item = await queue.get()
+                if item is None:
+                    remaining -= 1
+                else:
+                    yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run_nmap(self, shard: str, nmap_args: str, queue: asyncio.Queue) -> List[HostScanResult]:
+        """Run nmap on one shard, streaming each finished host into the queue"""
+        process = await asyncio.create_subprocess_exec(
+            self.nmap_binary, *shlex.split(nmap_args), '-oX', '-', shard,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+
+        # Drain stderr alongside stdout so a chatty nmap cannot block on a full pipe
+        stderr_task = asyncio.create_task(process.stderr.read())
+        parser = ET.XMLPullParser(events=('end',))
+        hosts = []
+        try:
+            while True:
+                chunk = await process.stdout.read(65536)
+                if not chunk:
+                    break
+                parser.feed(chunk)
+                for _, element in parser.read_events():
+                    if element.tag == 'host':
+                        host = self._parse_host_element(element, shard)
+                        element.clear()
+                        if host:
+                            hosts.append(host)
+                            await queue.put(host)
+        except asyncio.CancelledError:
+            process.kill()
+            stderr_task.cancel()
+            raise
+
+        stderr = await stderr_task
+        if await process.wait() != 0:
+            raise RuntimeError(f"nmap exited with {process.returncode}: {stderr.decode(errors='ignore').strip()}")
+        return hosts
+
+    def _parse_host_element(self, element: ET.Element, shard: str) -> Optional[HostScanResult]:
+        address = element.find("address[@addrtype='ipv4']")
+        if address is None:
+            address = element.find("address[@addrtype='ipv6']")
+        if address is None:
+            return None
+
+        ports = []
+        for port in element.iter('port'):
+            state = port.find('state')
+            service = port.find('service')
+            ports.append({
+                'port': int(port.get('portid')),
+                'protocol': port.get('protocol'),
+                'state': state.get('state') if state is not None else 'unknown',
+                'name': service.get('name', '') if service is not None else '',
+                'product': service.get('product', '') if service is not None else '',
+                'version': service.get('version', '') if service is not None else ''
+            })
+        return HostScanResult(host=address.get('addr'), ports=ports, shard=shard)
+
+
+@dataclass
+class CVERecord:
+    cve_id: str
+    cvss_score: float
+    description: str
+    vendor: str
+    product: str
+
+
+# Suffixes that mark a release candidate rather than a patch level ("1.0rc1" < "1.0" < "1.0p1")
+PRE_RELEASE_TAGS = {'dev', 'alpha', 'beta', 'pre', 'preview', 'rc'}
+
+
+def version_key(version: str) -> str:
+    """Sortable string key for a version
+
+    Each part gets a marker that orders it against the end of the version:
+    pre-release tags ('!') < end ('#') < other suffixes ('+') < numeric parts
+    ('.'). Numbers are zero-padded, and zero parts before a suffix or the end
+    are dropped so "1.0" == "1" and "1.0rc1" < "1.0".
+    """
+    # nmap appends distro details ("7.4p1 Debian 10+deb9u7"); only the upstream version matters
+    upstream = (version or '').strip().split(' ')[0]
+    parts = re.findall(r'\d+|[a-z]+', upstream.lower())
+    if not parts:
+        return ''
+
+    zero = '.' + '0' * 10
+    tokens = []
+    for part in parts + ['']:
+        if not part.isdigit():
+            while len(tokens) > 1 and tokens[-1] == zero:
+                tokens.pop()
+        if not part:
+            tokens.append('#')
+        elif part.isdigit():
+            tokens.append('.' + part.zfill(10))
+        elif part in PRE_RELEASE_TAGS:
+            tokens.append('!' + part)
+        else:
+            tokens.append('+' + part)
+    return ''.join(tokens)
+
+
+# Version keys that bound open-ended CPE ranges
+VERSION_KEY_MIN = ''
+VERSION_KEY_MAX = '~'
+# Bumped whenever version_key output changes, so stored ranges are rebuilt
+VERSION_KEY_FORMAT = 2
+
+
+class CVEDatabase:
+    """Offline CVE store built from NVD JSON feeds, indexed by product and version range
+
+    Each vulnerable CPE match is stored as a (vendor, product, start, end) version
+    interval; lookups are range probes on a (product, end_key, start_key) index.
+    Feeds are re-imported only when their content changes, and individual CVEs
+    only when their lastModified date moves forward.
+    """
+
+    # nmap product/service names that differ from their CPE (vendor, product)
+    PRODUCT_ALIASES = {
+        'openssh': ('openbsd', 'openssh'),
+        'apache httpd': ('apache', 'http_server'),
+        'apache tomcat': ('apache', 'tomcat'),
+        'nginx': ('f5', 'nginx'),
+        'microsoft iis httpd': ('microsoft', 'internet_information_services'),
+        'mysql': ('oracle', 'mysql'),
+        'postgresql': ('postgresql', 'postgresql'),
+        'vsftpd': ('vsftpd_project', 'vsftpd'),
+        'proftpd': ('proftpd', 'proftpd'),
+        'samba smbd': ('samba', 'samba'),
+        'isc bind': ('isc', 'bind'),
+        'exim smtpd': ('exim', 'exim'),
+        'postfix smtpd': ('postfix', 'postfix'),
+        'openssl': ('openssl', 'openssl'),
+        'redis key-value store': ('redis', 'redis'),
+    }
+
+    def __init__(self, db_path: str = "/var/lib/synos/cve.db", cache_size: int = 4096):
+        self.db_path = Path(db_path)
+        self.cache_size = cache_size
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'lookups': 0, 'cache_hits': 0}
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._init_database()
+
+    def _init_database(self):
+        with self._lock:
+            self._conn.executescript("""
+                PRAGMA journal_mode=WAL;
+                CREATE TABLE IF NOT EXISTS cves (
+                    cve_id TEXT PRIMARY KEY,
+                    cvss_score REAL,
+                    description TEXT,
+                    last_modified TEXT
+                );
+                CREATE TABLE IF NOT EXISTS cpe_ranges (
+                    cve_id TEXT NOT NULL,
+                    vendor TEXT NOT NULL,
+                    product TEXT NOT NULL,
+                    start_key TEXT NOT NULL,
+                    start_inclusive INTEGER NOT NULL,
+                    end_key TEXT NOT NULL,
+                    end_inclusive INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_cpe_ranges_product
+                    ON cpe_ranges (product, end_key, start_key);
+                CREATE INDEX IF NOT EXISTS idx_cpe_ranges_cve ON cpe_ranges (cve_id);
+                CREATE TABLE IF NOT EXISTS feed_state (
+                    feed_name TEXT PRIMARY KEY,
+                    sha256 TEXT NOT NULL,
+                    imported_at TIMESTAMP
+                );
+            """)
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] != VERSION_KEY_FORMAT:
+                # Ranges keyed with an older version_key no longer compare correctly; re-import feeds
+                self._conn.executescript(f"""
+                    DELETE FROM cpe_ranges;
+                    DELETE FROM cves;
+                    DELETE FROM feed_state;
+                    PRAGMA user_version = {VERSION_KEY_FORMAT};
+                """)
+            self._conn.commit()
+
+    def import_feed(self, feed_path: str) -> Dict[str, int]:
+        """Import an NVD JSON feed (1.1 feed or 2.0 API format, optionally gzipped)"""
+        path = Path(feed_path)
+        raw = path.read_bytes()
+        digest = hashlib.sha256(raw).hexdigest()
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sha256 FROM feed_state WHERE feed_name = ?", (path.name,)
+            ).fetchone()
+        if row and row[0] == digest:
+            return {'updated': 0, 'skipped': 0, 'unchanged_feed': 1}
+
+        if raw[:2] == b'\x1f\x8b':
+            raw = gzip.decompress(raw)
+        feed = json.loads(raw)
+
+        updated = skipped = 0
+        with self._lock:
+            known = dict(self._conn.execute("SELECT cve_id, last_modified FROM cves"))
+            for record in self._iter_feed_records(feed):
+                cve_id = record['cve_id']
+                if cve_id in known and (known[cve_id] or '') >= record['last_modified']:
+                    skipped += 1
+                    continue
+
+                self._conn.execute("DELETE FROM cpe_ranges WHERE cve_id = ?", (cve_id,))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cves (cve_id, cvss_score, description, last_modified) VALUES (?, ?, ?, ?)",
+                    (cve_id, record['cvss_score'], record['description'], record['last_modified'])
+                )
+                self._conn.executemany(
+                    "INSERT INTO cpe_ranges VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(cve_id, *r) for r in record['ranges']]
+                )
+                updated += 1
+
+            self._conn.execute(
+                "INSERT OR REPLACE INTO feed_state (feed_name, sha256, imported_at) VALUES (?, ?, ?)",
+                (path.name, digest, datetime.now())
+            )
+            self._conn.commit()
+            self._cache.clear()
+
+        logging.info(f"Imported CVE feed {path.name}: {updated} updated, {skipped} unchanged")
+        return {'updated': updated, 'skipped': skipped, 'unchanged_feed': 0}
+
+    def _iter_feed_records(self, feed: Dict):
+        """Normalize NVD 1.1 feed items and 2.0 API vulnerabilities"""
+        for item in feed.get('CVE_Items', []):
+            cve = item.get('cve', {})
+            impact = item.get('impact', {})
+            score = (impact.get('baseMetricV3', {}).get('cvssV3', {}).get('baseScore')
+                     or impact.get('baseMetricV2', {}).get('cvssV2', {}).get('baseScore') or 0.0)
+            descriptions = cve.get('description', {}).get('description_data', [])
+            matches = []
+            for node in item.get('configurations', {}).get('nodes', []):
+                matches.extend(self._node_matches(node, 'cpe_match', 'cpe23Uri', 'children'))
+            yield {
+                'cve_id': cve.get('CVE_data_meta', {}).get('ID'),
+                'cvss_score': float(score),
+                'description': descriptions[0].get('value', '') if descriptions else '',
+                'last_modified': item.get('lastModifiedDate', ''),
+                'ranges': [r for r in map(self._match_to_range, matches) if r]
+            }
+
+        for item in feed.get('vulnerabilities', []):
+            cve = item.get('cve', {})
+            metrics = cve.get('metrics', {})
+            score = 0.0
+            for key in ('cvssMetricV31', 'cvssMetricV30', 'cvssMetricV2'):
+                if metrics.get(key):
+                    score = metrics[key][0].get('cvssData', {}).get('baseScore', 0.0)
+                    break
+            description = next((d.get('value', '') for d in cve.get('descriptions', [])
+                                if d.get('lang') == 'en'), '')
+            matches = []
+            for config in cve.get('configurations', []):
+                for node in config.get('nodes', []):
+                    matches.extend(self._node_matches(node, 'cpeMatch', 'criteria', 'children'))
+            yield {
+                'cve_id': cve.get('id'),
+                'cvss_score': float(score),
+                'description': description,
+                'last_modified': cve.get('lastModified', ''),
+                'ranges': [r for r in map(self._match_to_range, matches) if r]
+            }
+
+    def _node_matches(self, node: Dict, match_key: str, uri_key: str, children_key: str) -> List[Dict]:
+        matches = [dict(m, uri=m.get(uri_key, '')) for m in node.get(match_key, []) if m.get('vulnerable', True)]
+        for child in node.get(children_key, []):
+            matches.extend(self._node_matches(child, match_key, uri_key, children_key))
+        return matches
+
+    def _match_to_range(self, match: Dict) -> Optional[Tuple[str, str, str, int, str, int]]:
+        """Convert a CPE match into (vendor, product, start, start_incl, end, end_incl)"""
+        parts = match['uri'].split(':')
+        if len(parts) < 6:
+            return None
+        vendor, product, version = parts[3], parts[4], parts[5]
+
+        if version not in ('*', '-', ''):
+            key = version_key(version)
+            return (vendor, product, key, 1, key, 1)
+
+        start, start_inclusive = VERSION_KEY_MIN, 1
+        end, end_inclusive = VERSION_KEY_MAX, 1
+        if match.get('versionStartIncluding'):
+            start = version_key(match['versionStartIncluding'])
+        elif match.get('versionStartExcluding'):
+            start, start_inclusive = version_key(match['versionStartExcluding']), 0
+        if match.get('versionEndIncluding'):
+            end = version_key(match['versionEndIncluding'])
+        elif match.get('versionEndExcluding'):
+            end, end_inclusive = version_key(match['versionEndExcluding']), 0
+        return (vendor, product, start, start_inclusive, end, end_inclusive)
+
+    def resolve_product(self, service: str) -> Tuple[Optional[str], str]:
+        """Map an nmap product or service name to a CPE (vendor, product)"""
+        name = (service or '').strip().lower()
+        if name in self.PRODUCT_ALIASES:
+            return self.PRODUCT_ALIASES[name]
+        return None, re.sub(r'[\s-]+', '_', name)
+
+    def lookup(self, service: str, version: str) -> List[CVERecord]:
+        """CVEs whose vulnerable version range contains this service version"""
+        return self.lookup_many([(service, version)])[0]
+
+    def lookup_many(self, services: List[Tuple[str, str]]) -> List[List[CVERecord]]:
+        """Batch lookup for many (service, version) pairs in a single query"""
+        results: List[Optional[List[CVERecord]]] = [None] * len(services)
+        probes = []
+
+        with self._lock:
+            self.stats['lookups'] += len(services)
+            for index, (service, version) in enumerate(services):
+                cache_key = ((service or '').lower(), version or '')
+                if cache_key in self._cache:
+                    self._cache.move_to_end(cache_key)
+                    results[index] = self._cache[cache_key]
+                    self.stats['cache_hits'] += 1
+                    continue
+                if not version:
+                    # Without a version every range would match; report nothing
+                    results[index] = []
+                    continue
+                vendor, product = self.resolve_product(service)
+                probes.append((index, vendor, product, version_key(version)))
+
+            if probes:
+                found: Dict[int, List[CVERecord]] = {index: [] for index, *_ in probes}
+                for i in range(0, len(probes), 200):
+                    chunk = probes[i:i + 200]
+                    values = ','.join('(?, ?, ?, ?)' for _ in chunk)
+                    rows = self._conn.execute(f"""
+                        WITH q(idx, vendor, product, vkey) AS (VALUES {values})
+                        SELECT q.idx, c.cve_id, c.cvss_score, c.description, r.vendor, r.product
+                        FROM q
+                        JOIN cpe_ranges r ON r.product = q.product
+                            AND (q.vendor IS NULL OR r.vendor = q.vendor)
+                            AND (r.end_key > q.vkey OR (r.end_inclusive AND r.end_key = q.vkey))
+                            AND (r.start_key < q.vkey OR (r.start_inclusive AND r.start_key = q.vkey))
+                        JOIN cves c ON c.cve_id = r.cve_id
+                    """, [value for probe in chunk for value in probe]).fetchall()
+
+                    for index, cve_id, score, description, vendor, product in rows:
+                        found[index].append(CVERecord(cve_id, score or 0.0, description or '', vendor, product))
+
+                for index, records in found.items():
+                    unique = {r.cve_id: r for r in records}
+                    results[index] = sorted(unique.values(), key=lambda r: r.cvss_score, reverse=True)
+                    service, version = services[index]
+                    self._cache[((service or '').lower(), version or '')] = results[index]
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            cves = self._conn.execute("SELECT COUNT(*) FROM cves").fetchone()[0]
+            ranges = self._conn.execute("SELECT COUNT(*) FROM cpe_ranges").fetchone()[0]
+            feeds = self._conn.execute("SELECT COUNT(*) FROM feed_state").fetchone()[0]
+        return {'cves': cves, 'cpe_ranges': ranges, 'feeds': feeds, **self.stats}
+
+
 class AIVulnAnalyzer:
     """AI-powered vulnerability analysis and prioritization"""
 
@@ -169,15 +690,17 @@ def _get_action_recommendation(self, vuln: Vulnerability, exploit_prob: float) -
 class IntelligentVulnScanner:
     """AI-enhanced vulnerability scanner with adaptive policies"""
 
-    def __init__(self, db_path: str = "/var/lib/synos/vuln_scanner.db"):
+    def __init__(self, db_path: str = "/var/lib/synos/vuln_scanner.db", max_nmap_workers: int = 4,
+                 cve_db_path: str = "/var/lib/synos/cve.db"):
         self.db_path = Path(db_path)
         self.ai_analyzer = AIVulnAnalyzer()
-        self.nm = nmap.PortScanner()
         self.active_scans: Dict[str, asyncio.Task] = {}
         self.scan_history: List[ScanResult] = []
 
         # Initialize database
         self._init_database()
+        self.scan_scheduler = NmapScanScheduler(self.db_path, max_workers=max_nmap_workers)
+        self.cve_db = CVEDatabase(cve_db_path)
 
         # Load and train AI models
         self._load_training_data()
@@ -302,17 +825,43 @@ async def scan_target(self, target: str, policy: Optional[VulnPolicy] = None) ->
         logging.info(f"Started intelligent scan {scan_id} for target {target}")
         return scan_id
 
-    async def _execute_scan(self, scan_result: ScanResult, policy: VulnPolicy):
+    async def resume_scan(self, scan_id: str) -> bool:
+        """Restart an interrupted scan, skipping shards that already completed"""
+        with sqlite3.connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT target, scan_type, start_time, status FROM scans WHERE scan_id = ?", (scan_id,)
+            ).fetchone()
+
+        if not row or row[3] == 'completed' or scan_id in self.active_scans:
+            return False
+
+        target, scan_type, start_time, _ = row
+        scan_result = ScanResult(
+            scan_id=scan_id,
+            target=target,
+            scan_type=ScanType(scan_type),
+            start_time=datetime.fromisoformat(start_time) if isinstance(start_time, str) else start_time
+        )
+        policy = VulnPolicy(scan_type=ScanType(scan_type), target_profile='resumed')
+        # Pending shards rerun with the nmap arguments the scan was started with
+        nmap_args = self.scan_scheduler.get_nmap_args(scan_id)
+
+        self.active_scans[scan_id] = asyncio.create_task(self._execute_scan(scan_result, policy, nmap_args))
+        logging.info(f"Resumed scan {scan_id} for target {target}: {self.scan_scheduler.get_progress(scan_id)}")
+        return True
+
+    async def _execute_scan(self, scan_result: ScanResult, policy: VulnPolicy, nmap_args: Optional[str] = None):
         """Execute the actual vulnerability scan"""
         try:
             vulnerabilities = []
 
             if policy.scan_type == ScanType.NETWORK:
-                vulnerabilities.extend(await self._network_scan(scan_result.target, policy))
+                vulnerabilities.extend(await self._network_scan(scan_result.target, policy, scan_result.scan_id, nmap_args))
             elif policy.scan_type == ScanType.WEB:
                 vulnerabilities.extend(await self._web_scan(scan_result.target, policy))
             elif policy.scan_type == ScanType.INFRASTRUCTURE:
-                vulnerabilities.extend(await self._infrastructure_scan(scan_result.target, policy))
+                vulnerabilities.extend(await self._infrastructure_scan(scan_result.target, policy, scan_result.scan_id,
+                                                                   nmap_args))
 
             # AI analysis of discovered vulnerabilities
             for vuln in vulnerabilities:
@@ -341,33 +890,33 @@ async def _execute_scan(self, scan_result: ScanResult, policy: VulnPolicy):
             if scan_result.scan_id in self.active_scans:
                 del self.active_scans[scan_result.scan_id]
 
-    async def _network_scan(self, target: str, policy: VulnPolicy) -> List[Vulnerability]:
-        """Perform network vulnerability scan using Nmap"""
+    async def _network_scan(self, target: str, policy: VulnPolicy, scan_id: Optional[str] = None,
+                            nmap_args: Optional[str] = None) -> List[Vulnerability]:
+        """Perform network vulnerability scan using sharded Nmap workers"""
         vulnerabilities = []
+        scan_id = scan_id or self._generate_scan_id(target)
 
         try:
-            # Adaptive Nmap command based on policy
-            nmap_args = self._build_nmap_args(target, policy)
-
-            # Execute scan
-            self.nm.scan(hosts=target, arguments=nmap_args)
-
-            for host in self.nm.all_hosts():
-                for proto in self.nm[host].all_protocols():
-                    ports = self.nm[host][proto].keys()
-
-                    for port in ports:
-                        port_info = self.nm[host][proto][port]
-
-                        if port_info['state'] == 'open':
-                            # Check for known vulnerabilities
-                            vuln = await self._check_service_vulnerabilities(
-                                host, port, port_info.get('name', ''),
-                                port_info.get('version', '')
-                            )
-
-                            if vuln:
-                                vulnerabilities.append(vuln)
+            # Adaptive Nmap command based on policy, unless resuming with checkpointed arguments
+            nmap_args = nmap_args or self._build_nmap_args(target, policy)
+
+            # Hosts arrive as their shard's nmap process reports them
+            async for host_result in self.scan_scheduler.scan(scan_id, target, nmap_args):
+                open_ports = [p for p in host_result.ports if p['state'] == 'open']
+                if not open_ports:
+                    continue
+
+                # One CVE lookup covers every open port on the host
+                matches = self.cve_db.lookup_many(
+                    [(p['product'] or p['name'], p['version']) for p in open_ports]
+                )
+                for port_info, cves in zip(open_ports, matches):
+                    vuln_info = self._summarize_cves(port_info['name'], port_info['version'], cves)
+                    if vuln_info:
+                        vulnerabilities.append(self._build_service_vulnerability(
+                            host_result.host, port_info['port'], port_info['name'],
+                            port_info['version'], vuln_info
+                        ))
 
         except Exception as e:
             logging.error(f"Network scan failed: {e}")
@@ -389,13 +938,14 @@ async def _web_scan(self, target: str, policy: VulnPolicy) -> List[Vulnerability
 
         return vulnerabilities
 
-    async def _infrastructure_scan(self, target: str, policy: VulnPolicy) -> List[Vulnerability]:
+    async def _infrastructure_scan(self, target: str, policy: VulnPolicy, scan_id: Optional[str] = None,
+                                   nmap_args: Optional[str] = None) -> List[Vulnerability]:
         """Perform infrastructure vulnerability scan"""
         vulnerabilities = []
 
         try:
             # Infrastructure-specific checks
-            vulnerabilities.extend(await self._network_scan(target, policy))
+            vulnerabilities.extend(await self._network_scan(target, policy, scan_id, nmap_args))
             vulnerabilities.extend(await self._check_infrastructure_config(target))
 
         except Exception as e:
@@ -410,35 +960,68 @@ async def _check_service_vulnerabilities(self, host: str, port: int, service: st
         vuln_info = await self._query_vuln_database(service, version)
 
         if vuln_info:
-            return Vulnerability(
-                id=self._generate_vuln_id(host, port, service),
-                name=f"{service} {version} - {vuln_info['name']}",
-                severity=VulnSeverity(vuln_info.get('severity', 3)),
-                cvss_score=vuln_info.get('cvss_score', 5.0),
-                description=vuln_info.get('description', ''),
-                target=host,
-                port=port,
-                service=service,
-                cve_ids=vuln_info.get('cve_ids', [])
-            )
+            return self._build_service_vulnerability(host, port, service, version, vuln_info)
 
         return None
 
+    def _build_service_vulnerability(self, host: str, port: int, service: str, version: str,
+                                     vuln_info: Dict) -> Vulnerability:
+        return Vulnerability(
+            id=self._generate_vuln_id(host, port, service),
+            name=f"{service} {version} - {vuln_info['name']}",
+            severity=VulnSeverity(vuln_info.get('severity', 3)),
+            cvss_score=vuln_info.get('cvss_score', 5.0),
+            description=vuln_info.get('description', ''),
+            target=host,
+            port=port,
+            service=service,
+            cve_ids=vuln_info.get('cve_ids', [])
+        )
+
     async def _query_vuln_database(self, service: str, version: str) -> Optional[Dict]:
-        """Query external vulnerability databases"""
+        """Query the local CVE database"""
         try:
-            # Example: Query NVD API (simplified)
-            # In production, implement proper CVE database integration
-            return {
-                'name': f'Known vulnerability in {service}',
-                'severity': 3,
-                'cvss_score': 6.5,
-                'description': f'Potential security issue in {service} {version}',
-                'cve_ids': []
-            }
-        except Exception:
+            return self._summarize_cves(service, version, self.cve_db.lookup(service, version))
+        except Exception as e:
+            logging.error(f"CVE lookup failed for {service} {version}: {e}")
             return None
 
+    def _summarize_cves(self, service: str, version: str, cves: List[CVERecord]) -> Optional[Dict]:
+        """Collapse matching CVEs into a single finding led by the highest CVSS score"""
+        if not cves:
+            return None
+
+        top = cves[0]
+        if top.cvss_score >= 9.0:
+            severity = VulnSeverity.CRITICAL
+        elif top.cvss_score >= 7.0:
+            severity = VulnSeverity.HIGH
+        elif top.cvss_score >= 4.0:
+            severity = VulnSeverity.MEDIUM
+        elif top.cvss_score > 0:
+            severity = VulnSeverity.LOW
+        else:
+            severity = VulnSeverity.INFO
+
+        return {
+            'name': top.cve_id if len(cves) == 1 else f"{top.cve_id} and {len(cves) - 1} more",
+            'severity': severity.value,
+            'cvss_score': top.cvss_score,
+            'description': top.description,
+            'cve_ids': [c.cve_id for c in cves]
+        }
+
+    def update_cve_database(self, feed_dir: str = "/var/lib/synos/nvd") -> Dict[str, int]:
+        """Import new or changed NVD feeds from a directory"""
+        totals = {'updated': 0, 'skipped': 0, 'unchanged_feed': 0}
+        for feed_path in sorted(Path(feed_dir).glob('*.json*')):
+            try:
+                for key, value in self.cve_db.import_feed(str(feed_path)).items():
+                    totals[key] += value
+            except Exception as e:
+                logging.error(f"Failed to import CVE feed {feed_path}: {e}")
+        return totals
+
     def _build_nmap_args(self, target: str, policy: VulnPolicy) -> str:
         """Build adaptive Nmap command arguments"""
         args = []
@@ -575,7 +1158,8 @@ async def get_scan_status(self, scan_id: str) -> Dict[str, Any]:
                 "end_time": end_time,
                 "status": status,
                 "vulnerabilities_found": vuln_count,
-                "is_active": scan_id in self.active_scans
+                "is_active": scan_id in self.active_scans,
+                "shards": self.scan_scheduler.get_progress(scan_id)
             }
 
     async def get_vulnerabilities(self, scan_id: str) -> List[Dict[str, Any]]:
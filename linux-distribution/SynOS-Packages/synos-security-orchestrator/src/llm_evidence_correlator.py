@@ -10,11 +10,13 @@
 import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Set, Tuple, Any, Union
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, asdict
 from pathlib import Path
+from collections import OrderedDict, defaultdict
 import sqlite3
 from enum import Enum
 import hashlib
+import uuid
 import re
 import mimetypes
 
@@ -24,6 +26,7 @@
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.cluster import DBSCAN
+from sklearn.neighbors import NearestNeighbors
 import openai
 import requests
 
@@ -96,6 +99,207 @@ class EvidenceCluster:
     threat_level: str = "unknown"
 
 
+@dataclass
+class CorrelationReport:
+    evidence_count: int
+    pairs_considered: int
+    candidate_pairs: int = 0
+    pairs_analyzed: int = 0
+    cache_hits: int = 0
+    correlations_created: int = 0
+    pairs_by_reason: Dict[str, int] = field(default_factory=dict)
+    oversized_blocks_skipped: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def pruning_ratio(self) -> float:
+        """Fraction of all possible pairs that never reached the LLM"""
+        if not self.pairs_considered:
+            return 0.0
+        return 1.0 - self.candidate_pairs / self.pairs_considered
+
+
+class CandidatePairGenerator:
+    """Blocking stage that proposes evidence pairs worth sending to the LLM
+
+    Pairs are only generated between items that share an extracted indicator,
+    a host, a time window, or are near neighbours in TF-IDF space. Indicator and
+    host blocks larger than max_block_size (e.g. an IP present in every log) are
+    skipped because they say nothing about a specific pair.
+    """
+
+    HOST_METADATA_KEYS = ('host', 'hostname', 'source_host', 'src_ip', 'dst_ip', 'system')
+
+    def __init__(self, time_window: timedelta = timedelta(minutes=10), max_block_size: int = 200,
+                 neighbors: int = 5, min_similarity: float = 0.3):
+        self.time_window = time_window
+        self.max_block_size = max_block_size
+        self.neighbors = neighbors
+        self.min_similarity = min_similarity
+        self.oversized_blocks = 0
+
+    def generate(self, evidence: List[EvidenceItem]) -> Dict[Tuple[str, str], Set[str]]:
+        """Map each candidate pair (ids in sorted order) to the reasons it was proposed"""
+        self.oversized_blocks = 0
+        candidates: Dict[Tuple[str, str], Set[str]] = defaultdict(set)
+
+        self._add_blocks(candidates, self._indicator_blocks(evidence), 'shared_indicator')
+        self._add_blocks(candidates, self._host_blocks(evidence), 'shared_host')
+        self._add_time_window_pairs(candidates, evidence)
+        self._add_embedding_neighbors(candidates, evidence)
+
+        return candidates
+
+    def _add_blocks(self, candidates, blocks: Dict[str, List[str]], reason: str):
+        for members in blocks.values():
+            if len(members) < 2:
+                continue
+            if len(members) > self.max_block_size:
+                self.oversized_blocks += 1
+                continue
+            members = sorted(set(members))
+            for i, id1 in enumerate(members):
+                for id2 in members[i + 1:]:
+                    candidates[(id1, id2)].add(reason)
+
+    def _indicator_blocks(self, evidence: List[EvidenceItem]) -> Dict[str, List[str]]:
+        blocks = defaultdict(list)
+        for item in evidence:
+            for entity_type, values in item.extracted_entities.items():
+                for value in values:
+                    blocks[f"{entity_type}:{value.lower()}"].append(item.id)
+            if item.file_hash:
+                blocks[f"file_hash:{item.file_hash.lower()}"].append(item.id)
+        return blocks
+
+    def _host_blocks(self, evidence: List[EvidenceItem]) -> Dict[str, List[str]]:
+        blocks = defaultdict(list)
+        for item in evidence:
+            hosts = set()
+            if item.source_system:
+                hosts.add(str(item.source_system).lower())
+            for key in self.HOST_METADATA_KEYS:
+                value = item.metadata.get(key)
+                if isinstance(value, str) and value:
+                    hosts.add(value.lower())
+            for host in hosts:
+                blocks[host].append(item.id)
+        return blocks
+
+    def _add_time_window_pairs(self, candidates, evidence: List[EvidenceItem]):
+        """Sliding window over timestamp-sorted items"""
+        timed = sorted((item for item in evidence if item.timestamp), key=lambda item: item.timestamp)
+        start = 0
+        for end, item in enumerate(timed):
+            while item.timestamp - timed[start].timestamp > self.time_window:
+                start += 1
+            # Cap the window so a burst of simultaneous events does not go quadratic
+            for other in timed[max(start, end - self.max_block_size):end]:
+                candidates[tuple(sorted((other.id, item.id)))].add('time_window')
+
+    def _add_embedding_neighbors(self, candidates, evidence: List[EvidenceItem]):
+        """Nearest neighbours in TF-IDF space above a cosine similarity threshold"""
+        texted = [item for item in evidence if item.content and item.content.strip()]
+        if len(texted) < 2:
+            return
+
+        try:
+            vectors = TfidfVectorizer(max_features=5000, stop_words='english').fit_transform(
+                [item.content for item in texted]
+            )
+        except ValueError:
+            # Only stop words / empty vocabulary
+            return
+
+        k = min(self.neighbors + 1, len(texted))
+        index = NearestNeighbors(n_neighbors=k, metric='cosine').fit(vectors)
+        distances, neighbors = index.kneighbors(vectors)
+
+        for row, item in enumerate(texted):
+            for distance, col in zip(distances[row], neighbors[row]):
+                if col == row or 1.0 - distance < self.min_similarity:
+                    continue
+                candidates[tuple(sorted((item.id, texted[col].id)))].add('embedding_neighbor')
+
+
+class IncrementalClusterTracker:
+    """Union-find over correlated evidence that remembers which components changed
+
+    Components are merged as correlations arrive, so only components touched since
+    the last detection pass need community detection re-run. Cluster ids are carried
+    over to the new community that overlaps an old cluster the most; fresh ids are
+    random so they never collide with clusters persisted by earlier runs.
+    """
+
+    def __init__(self, min_overlap: float = 0.5):
+        self.min_overlap = min_overlap
+        self.parent: Dict[str, str] = {}
+        self.members: Dict[str, Set[str]] = {}
+        self.dirty_roots: Set[str] = set()
+        self.node_cluster: Dict[str, str] = {}
+        self.cluster_members: Dict[str, Set[str]] = {}
+
+    def find(self, node: str) -> str:
+        """Root of node's component, with path halving"""
+        if node not in self.parent:
+            self.parent[node] = node
+            self.members[node] = {node}
+            return node
+        while self.parent[node] != node:
+            self.parent[node] = self.parent[self.parent[node]]
+            node = self.parent[node]
+        return node
+
+    def add_edge(self, u: str, v: str):
+        """Record a correlation, merging components and marking the result changed"""
+        root_u, root_v = self.find(u), self.find(v)
+        if root_u != root_v:
+            # Union by size: fold the smaller member set into the larger one
+            if len(self.members[root_u]) < len(self.members[root_v]):
+                root_u, root_v = root_v, root_u
+            self.parent[root_v] = root_u
+            self.members[root_u] |= self.members.pop(root_v)
+            self.dirty_roots.discard(root_v)
+        self.dirty_roots.add(root_u)
+
+    def take_dirty_components(self) -> List[Set[str]]:
+        """Member sets of components changed since the last call"""
+        components = [self.members[root] for root in self.dirty_roots if root in self.members]
+        self.dirty_roots.clear()
+        return components
+
+    def assign_ids(self, old_cluster_ids: Set[str], communities: List[Set[str]]) -> List[Tuple[str, Set[str]]]:
+        """Give each new community the id of the old cluster it overlaps most, else a fresh id"""
+        candidates = []
+        for index, community in enumerate(communities):
+            for cluster_id in old_cluster_ids:
+                old = self.cluster_members.get(cluster_id, set())
+                overlap = len(community & old) / len(community | old) if old else 0.0
+                if overlap >= self.min_overlap:
+                    candidates.append((overlap, index, cluster_id))
+
+        assigned: Dict[int, str] = {}
+        used: Set[str] = set()
+        for overlap, index, cluster_id in sorted(candidates, reverse=True):
+            if index not in assigned and cluster_id not in used:
+                assigned[index] = cluster_id
+                used.add(cluster_id)
+
+        for cluster_id in old_cluster_ids - used:
+            self.cluster_members.pop(cluster_id, None)
+
+        result = []
+        for index, community in enumerate(communities):
+            cluster_id = assigned.get(index)
+            if cluster_id is None:
+                cluster_id = f"cluster_{uuid.uuid4().hex}"
+            self.cluster_members[cluster_id] = set(community)
+            for node in community:
+                self.node_cluster[node] = cluster_id
+            result.append((cluster_id, community))
+        return result
+
+
 class LLMAnalyzer:
     """Large Language Model analyzer for evidence correlation"""
 
@@ -110,7 +314,11 @@ def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4-turbo"):
             logging.warning("No OpenAI API key provided - using mock responses")
 
     async def analyze_evidence_pair(self, evidence1: EvidenceItem, evidence2: EvidenceItem) -> Dict[str, Any]:
-        """Analyze correlation between two evidence items using LLM"""
+        """Analyze correlation between two evidence items using LLM
+
+        The result's 'analysis_source' is 'llm' for a model response and
+        'heuristic' for the fallback used without a client or on API errors.
+        """
 
         if not self.client:
             return self._mock_analysis(evidence1, evidence2)
@@ -119,7 +327,9 @@ async def analyze_evidence_pair(self, evidence1: EvidenceItem, evidence2: Eviden
 
         try:
             response = await self._call_llm(prompt)
-            return self._parse_llm_response(response)
+            analysis = self._parse_llm_response(response)
+            analysis['analysis_source'] = 'llm'
+            return analysis
 
         except Exception as e:
             logging.error(f"LLM analysis failed: {e}")
@@ -237,7 +447,8 @@ def _mock_analysis(self, evidence1: EvidenceItem, evidence2: EvidenceItem) -> Di
             "threat_indicators": [],
             "recommended_actions": ["Manual review required"],
             "timeline_reconstruction": "Automated analysis - manual review needed",
-            "technical_analysis": "Basic heuristic correlation performed"
+            "technical_analysis": "Basic heuristic correlation performed",
+            "analysis_source": "heuristic"
         }
 
     async def generate_attack_narrative(self, evidence_cluster: EvidenceCluster, all_evidence: List[EvidenceItem]) -> str:
@@ -303,13 +514,21 @@ async def generate_attack_narrative(self, evidence_cluster: EvidenceCluster, all
 class EvidenceCorrelationEngine:
     """Main engine for evidence correlation and analysis"""
 
-    def __init__(self, db_path: str = "/var/lib/synos/evidence_correlation.db", openai_key: Optional[str] = None):
+    def __init__(self, db_path: str = "/var/lib/synos/evidence_correlation.db", openai_key: Optional[str] = None,
+                 max_concurrent_analyses: int = 8, analysis_cache_size: int = 10000):
         self.db_path = Path(db_path)
         self.llm_analyzer = LLMAnalyzer(openai_key)
+        self.pair_generator = CandidatePairGenerator()
+        self.max_concurrent_analyses = max_concurrent_analyses
+        self.analysis_cache_size = analysis_cache_size
+        self.analysis_cache: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self.correlation_report: Optional[CorrelationReport] = None
         self.evidence_items: Dict[str, EvidenceItem] = {}
         self.correlations: List[EvidenceCorrelation] = []
         self.evidence_graph = nx.DiGraph()
         self.clusters: List[EvidenceCluster] = []
+        self.cluster_index: Dict[str, EvidenceCluster] = {}
+        self.cluster_tracker = IncrementalClusterTracker()
 
         # Text processing components
         self.text_vectorizer = TfidfVectorizer(max_features=1000, stop_words='english')
@@ -372,6 +591,14 @@ def _init_database(self):
                 )
             """)
 
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_analysis_cache (
+                    pair_key TEXT PRIMARY KEY,
+                    analysis TEXT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
             conn.commit()
 
     def _load_entity_patterns(self) -> Dict[str, re.Pattern]:
@@ -437,12 +664,16 @@ async def correlate_evidence(self, evidence_id1: str, evidence_id2: str) -> Opti
             logging.error(f"Evidence items not found: {evidence_id1}, {evidence_id2}")
             return None
 
-        # Perform LLM-based correlation analysis
-        analysis = await self.llm_analyzer.analyze_evidence_pair(evidence1, evidence2)
+        # Perform LLM-based correlation analysis, reusing results for unchanged content
+        analysis = await self._analyze_pair_cached(evidence1, evidence2)
 
         if analysis.get('confidence_score', 0) < 0.3:
             return None  # Skip low-confidence correlations
 
+        # The analysis describes the pair in id order, so directed relationships
+        # ("evidence 1 causes evidence 2") run from the lower id to the higher one
+        evidence_id1, evidence_id2 = sorted((evidence1.id, evidence2.id))
+
         # Create correlation object
         correlation_id = self._generate_correlation_id(evidence_id1, evidence_id2)
         correlation = EvidenceCorrelation(
@@ -467,62 +698,169 @@ async def correlate_evidence(self, evidence_id1: str, evidence_id2: str) -> Opti
             confidence=correlation.confidence_score,
             description=correlation.description
         )
+        self.cluster_tracker.add_edge(evidence_id1, evidence_id2)
 
         logging.info(f"Created correlation: {correlation_id} (confidence: {correlation.confidence_score:.2f})")
         return correlation
 
+    def _content_hash(self, evidence: EvidenceItem) -> str:
+        """Hash of everything the LLM sees about an evidence item"""
+        hasher = hashlib.sha256()
+        hasher.update(evidence.type.value.encode())
+        hasher.update(evidence.name.encode())
+        hasher.update(str(evidence.timestamp).encode())
+        hasher.update(json.dumps(evidence.metadata, sort_keys=True, default=str).encode())
+        hasher.update((evidence.content or '').encode())
+        return hasher.hexdigest()
+
+    async def _analyze_pair_cached(self, evidence1: EvidenceItem, evidence2: EvidenceItem) -> Dict[str, Any]:
+        """Analyze a pair via the LLM, cached by evidence id and content hash of both items
+
+        The pair is always presented to the LLM in id order, so (a, b) and (b, a)
+        share one cache entry and the answer's direction refers to that order.
+        """
+        evidence1, evidence2 = sorted((evidence1, evidence2), key=lambda e: e.id)
+        pair_key = (f"{evidence1.id}:{self._content_hash(evidence1)}|"
+                    f"{evidence2.id}:{self._content_hash(evidence2)}")
+
+        cached = self.analysis_cache.get(pair_key)
+        if cached is not None:
+            self.analysis_cache.move_to_end(pair_key)
+        else:
+            with sqlite3.connect(self.db_path) as conn:
+                row = conn.execute(
+                    "SELECT analysis FROM llm_analysis_cache WHERE pair_key = ?", (pair_key,)
+                ).fetchone()
+            if row:
+                cached = json.loads(row[0])
+                self._remember_analysis(pair_key, cached)
+
+        if cached is not None:
+            if self.correlation_report:
+                self.correlation_report.cache_hits += 1
+            return cached
+
+        analysis = await self.llm_analyzer.analyze_evidence_pair(evidence1, evidence2)
+        if self.correlation_report:
+            self.correlation_report.pairs_analyzed += 1
+
+        # Heuristic fallbacks and failed parses are not cached, so a later run
+        # with a working API still gets a real answer
+        if analysis.get('analysis_source') == 'llm' and 'error' not in analysis:
+            self._remember_analysis(pair_key, analysis)
+            with sqlite3.connect(self.db_path) as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_analysis_cache (pair_key, analysis) VALUES (?, ?)",
+                    (pair_key, json.dumps(analysis, default=str))
+                )
+                conn.commit()
+
+        return analysis
+
+    def _remember_analysis(self, pair_key: str, analysis: Dict[str, Any]):
+        """Keep an analysis in the in-memory LRU; evicted entries stay in the database"""
+        self.analysis_cache[pair_key] = analysis
+        self.analysis_cache.move_to_end(pair_key)
+        while len(self.analysis_cache) > self.analysis_cache_size:
+            self.analysis_cache.popitem(last=False)
+
     async def perform_bulk_correlation(self, evidence_ids: Optional[List[str]] = None) -> int:
-        """Perform correlation analysis on all evidence pairs"""
+        """Perform correlation analysis on candidate evidence pairs"""
         if evidence_ids is None:
             evidence_ids = list(self.evidence_items.keys())
 
-        correlations_created = 0
-
-        # Generate all pairs for correlation
-        for i, id1 in enumerate(evidence_ids):
-            for id2 in evidence_ids[i+1:]:
-                correlation = await self.correlate_evidence(id1, id2)
-                if correlation:
-                    correlations_created += 1
-
-                # Rate limiting to avoid overwhelming LLM API
-                await asyncio.sleep(0.1)
+        start_time = time.time()
+        evidence = [self.evidence_items[eid] for eid in evidence_ids if eid in self.evidence_items]
+        report = CorrelationReport(
+            evidence_count=len(evidence),
+            pairs_considered=len(evidence) * (len(evidence) - 1) // 2
+        )
+        self.correlation_report = report
+
+        # Only pairs with something in common are worth an LLM call
+        candidates = self.pair_generator.generate(evidence)
+        report.candidate_pairs = len(candidates)
+        report.oversized_blocks_skipped = self.pair_generator.oversized_blocks
+
+        reason_counts = defaultdict(int)
+        for reasons in candidates.values():
+            for reason in reasons:
+                reason_counts[reason] += 1
+        report.pairs_by_reason = dict(reason_counts)
+
+        # Bounded concurrency replaces the fixed per-pair sleep as API rate limiting
+        semaphore = asyncio.Semaphore(self.max_concurrent_analyses)
+
+        async def correlate(pair: Tuple[str, str]) -> bool:
+            async with semaphore:
+                try:
+                    return await self.correlate_evidence(*pair) is not None
+                except Exception as e:
+                    logging.error(f"Correlation of {pair[0]} and {pair[1]} failed: {e}")
+                    return False
+
+        results = await asyncio.gather(*(correlate(pair) for pair in candidates))
+        report.correlations_created = sum(results)
+        report.elapsed_seconds = time.time() - start_time
+
+        logging.info(
+            f"Created {report.correlations_created} evidence correlations: "
+            f"{report.candidate_pairs}/{report.pairs_considered} pairs proposed "
+            f"({report.pruning_ratio:.1%} pruned), {report.pairs_analyzed} LLM calls, "
+            f"{report.cache_hits} cache hits"
+        )
+        return report.correlations_created
 
-        logging.info(f"Created {correlations_created} evidence correlations")
-        return correlations_created
+    def get_correlation_report(self) -> Dict[str, Any]:
+        """Pairs considered versus analyzed for the last bulk correlation"""
+        if not self.correlation_report:
+            return {}
+        return {**asdict(self.correlation_report), 'pruning_ratio': self.correlation_report.pruning_ratio}
 
     async def detect_evidence_clusters(self, min_cluster_size: int = 3) -> List[EvidenceCluster]:
-        """Detect clusters of related evidence using graph analysis"""
-        if len(self.evidence_graph.nodes) < min_cluster_size:
-            return []
-
-        clusters = []
+        """Update clusters of related evidence for components changed since the last call"""
+        import networkx.algorithms.community as nx_comm
+
+        changed_components = self.cluster_tracker.take_dirty_components()
+
+        for component in changed_components:
+            old_cluster_ids = {
+                self.cluster_tracker.node_cluster[node]
+                for node in component if node in self.cluster_tracker.node_cluster
+            }
+
+            # Community detection only sees this component, not the whole graph
+            subgraph = self.evidence_graph.subgraph(component).to_undirected()
+            try:
+                if hasattr(nx_comm, 'louvain_communities'):
+                    communities = nx_comm.louvain_communities(subgraph, seed=42)
+                else:
+                    communities = nx_comm.greedy_modularity_communities(subgraph)
+            except Exception as e:
+                logging.error(f"Cluster detection failed: {e}")
+                # Fallback to the connected component itself
+                communities = [component]
+
+            communities = [set(c) for c in communities]
+            for cluster_id in old_cluster_ids:
+                self.cluster_index.pop(cluster_id, None)
+
+            for cluster_id, community in self.cluster_tracker.assign_ids(old_cluster_ids, communities):
+                if len(community) >= min_cluster_size:
+                    self.cluster_index[cluster_id] = await self._create_evidence_cluster(
+                        sorted(community), cluster_id, cluster_id=cluster_id
+                    )
 
-        # Use community detection algorithms
-        try:
-            import networkx.algorithms.community as nx_comm
-            communities = nx_comm.greedy_modularity_communities(self.evidence_graph.to_undirected())
+            # Merged-away clusters and ones that shrank below the minimum size
+            self._delete_clusters(old_cluster_ids - self.cluster_index.keys())
 
-            for i, community in enumerate(communities):
-                if len(community) >= min_cluster_size:
-                    cluster = await self._create_evidence_cluster(list(community), f"cluster_{i}")
-                    clusters.append(cluster)
-                    self.clusters.append(cluster)
+        self.clusters = list(self.cluster_index.values())
+        logging.info(f"Updated {len(changed_components)} changed components, "
+                     f"{len(self.clusters)} evidence clusters total")
+        return self.clusters
 
-        except Exception as e:
-            logging.error(f"Cluster detection failed: {e}")
-            # Fallback to simple connected components
-            components = list(nx.connected_components(self.evidence_graph.to_undirected()))
-            for i, component in enumerate(components):
-                if len(component) >= min_cluster_size:
-                    cluster = await self._create_evidence_cluster(list(component), f"component_{i}")
-                    clusters.append(cluster)
-                    self.clusters.append(cluster)
-
-        logging.info(f"Detected {len(clusters)} evidence clusters")
-        return clusters
-
-    async def _create_evidence_cluster(self, evidence_ids: List[str], cluster_name: str) -> EvidenceCluster:
+    async def _create_evidence_cluster(self, evidence_ids: List[str], cluster_name: str,
+                                       cluster_id: Optional[str] = None) -> EvidenceCluster:
         """Create evidence cluster from list of evidence IDs"""
 
         # Analyze cluster characteristics
@@ -557,7 +895,7 @@ async def _create_evidence_cluster(self, evidence_ids: List[str], cluster_name:
         threat_level = self._assess_threat_level(evidence_items)
 
         cluster = EvidenceCluster(
-            id=f"cluster_{int(time.time())}_{len(evidence_ids)}",
+            id=cluster_id or f"cluster_{int(time.time())}_{len(evidence_ids)}",
             name=cluster_name,
             evidence_items=evidence_ids,
             cluster_type=cluster_type,
@@ -704,6 +1042,14 @@ def _store_cluster(self, cluster: EvidenceCluster):
             ))
             conn.commit()
 
+    def _delete_clusters(self, cluster_ids: Set[str]):
+        """Remove retired clusters from the database"""
+        if not cluster_ids:
+            return
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany("DELETE FROM evidence_clusters WHERE id = ?", [(cid,) for cid in cluster_ids])
+            conn.commit()
+
     def _generate_correlation_id(self, evidence_id1: str, evidence_id2: str) -> str:
         """Generate unique correlation ID"""
         combined = f"{min(evidence_id1, evidence_id2)}_{max(evidence_id1, evidence_id2)}"
@@ -822,6 +1168,8 @@ async def main():
     # Perform bulk correlation
     correlations_count = await correlator.perform_bulk_correlation()
     print(f"Created {correlations_count} correlations")
+    report = correlator.get_correlation_report()
+    print(f"Pairs considered: {report['pairs_considered']}, analyzed: {report['pairs_analyzed']}")
 
     # Detect clusters
     clusters = await correlator.detect_evidence_clusters()
@@ -7,9 +7,11 @@
 import asyncio
 import json
 import logging
+import re
 import subprocess
 import tempfile
 import time
+import uuid
 from datetime import datetime
 from typing import Dict, List, Optional, Set, Tuple, Any
 from dataclasses import dataclass, field
@@ -26,6 +28,16 @@
 from sklearn.cluster import KMeans
 import requests
 
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 
 class ExploitCategory(Enum):
     REMOTE = "remote"
@@ -100,6 +112,111 @@ class ExploitSession:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+class ModuleIndex:
+    """Inverted index of exploit modules by service token, CVE and platform"""
+
+    # nmap service names whose Metasploit module paths use a different token
+    SERVICE_ALIASES = {
+        'microsoft-ds': ['smb'],
+        'netbios-ssn': ['smb'],
+        'ms-wbt-server': ['rdp'],
+        'ms-sql-s': ['mssql'],
+        'postgresql': ['postgres'],
+        'https': ['http'],
+        'http-proxy': ['http'],
+        'http-alt': ['http'],
+        'ssl/http': ['http'],
+        'domain': ['dns'],
+        'vnc-http': ['vnc'],
+    }
+
+    # Target OS keywords mapped to module platforms; 'multi' modules always apply
+    OS_PLATFORMS = {
+        'windows': {'windows', 'multi'},
+        'linux': {'linux', 'unix', 'multi'},
+        'freebsd': {'freebsd', 'bsd', 'unix', 'multi'},
+        'mac os': {'osx', 'unix', 'multi'},
+        'solaris': {'solaris', 'unix', 'multi'},
+    }
+
+    # Module types whose second path component is a platform; auxiliary/scanner/...
+    # and post modules are grouped by function instead and count as 'multi'
+    PLATFORM_MODULE_TYPES = {'exploit', 'exploits', 'payload', 'payloads'}
+
+    def __init__(self, modules: List[ExploitModule] = None):
+        self.by_token: Dict[str, Set[str]] = {}
+        self.by_cve: Dict[str, Set[str]] = {}
+        self.by_platform: Dict[str, Set[str]] = {}
+        self.modules: Dict[str, ExploitModule] = {}
+        self._fragment_cache: Dict[str, Set[str]] = {}
+        for module in modules or []:
+            self.add(module)
+
+    @staticmethod
+    def _tokens(text: str) -> Set[str]:
+        return set(re.findall(r'[a-z0-9]+', text.lower()))
+
+    def add(self, module: ExploitModule):
+        self.modules[module.name] = module
+        self._fragment_cache.clear()
+        for token in self._tokens(module.name) | self._tokens(module.description):
+            self.by_token.setdefault(token, set()).add(module.name)
+
+        cves = set(module.cve_refs) | set(re.findall(r'CVE-\d{4}-\d+', module.description))
+        for cve in cves:
+            self.by_cve.setdefault(cve, set()).add(module.name)
+
+        path = module.name.split('/')
+        platform = path[1] if len(path) > 2 and path[0] in self.PLATFORM_MODULE_TYPES else 'multi'
+        self.by_platform.setdefault(platform, set()).add(module.name)
+
+    def _modules_with(self, fragment: str) -> Set[str]:
+        """Modules with an indexed token containing fragment, so 'ssh' finds 'openssh'"""
+        names = self._fragment_cache.get(fragment)
+        if names is None:
+            names = set().union(*(mods for token, mods in self.by_token.items() if fragment in token))
+            self._fragment_cache[fragment] = names
+        return names
+
+    def by_service(self, service: str) -> Set[str]:
+        """Modules whose name or description contains every token of the service
+
+        Tokens match as substrings of indexed tokens, so every module the old
+        ``service in name or description`` scan found is still returned.
+        """
+        names = set()
+        variants = [service.lower()] + self.SERVICE_ALIASES.get(service.lower(), [])
+        for variant in variants:
+            tokens = self._tokens(variant)
+            if not tokens:
+                continue
+            matched = set.intersection(*(self._modules_with(t) for t in tokens))
+            names |= matched
+        return names
+
+    def platforms_for(self, os_name: Optional[str]) -> Optional[Set[str]]:
+        if not os_name:
+            return None
+        os_lower = os_name.lower()
+        for keyword, platforms in self.OS_PLATFORMS.items():
+            if keyword in os_lower:
+                return platforms
+        return None
+
+    def candidates(self, target: Target) -> List[ExploitModule]:
+        """Relevant modules for a target: service or CVE matches, filtered by platform"""
+        names = self.by_service(target.service)
+        for vuln in target.vulnerabilities:
+            names |= self.by_cve.get(vuln, set())
+
+        platforms = self.platforms_for(target.os)
+        if platforms is not None:
+            allowed = set().union(*(self.by_platform.get(p, set()) for p in platforms))
+            names &= allowed
+
+        return [self.modules[name] for name in sorted(names)]
+
+
 class MSFDatabase:
     """Interface to Metasploit database and module information"""
 
@@ -108,6 +225,7 @@ def __init__(self, msf_path: str = "/usr/share/metasploit-framework"):
         self.modules_cache: Dict[str, ExploitModule] = {}
         self.payloads_cache: List[PayloadType] = []
         self._load_modules()
+        self.index = ModuleIndex(list(self.modules_cache.values()))
 
     def _load_modules(self):
         """Load Metasploit modules information"""
@@ -193,26 +311,21 @@ def _load_sample_modules(self):
         for module in sample_modules:
             self.modules_cache[module.name] = module
 
+    def add_module(self, module: ExploitModule):
+        self.modules_cache[module.name] = module
+        self.index.add(module)
+
     def get_modules_by_service(self, service: str) -> List[ExploitModule]:
         """Get exploit modules targeting specific service"""
-        matching_modules = []
-
-        for module in self.modules_cache.values():
-            if (service.lower() in module.name.lower() or
-                service.lower() in module.description.lower()):
-                matching_modules.append(module)
-
-        return matching_modules
+        return [self.modules_cache[name] for name in sorted(self.index.by_service(service))]
 
     def get_modules_by_cve(self, cve: str) -> List[ExploitModule]:
         """Get exploit modules for specific CVE"""
-        matching_modules = []
-
-        for module in self.modules_cache.values():
-            if cve in module.cve_refs or cve in module.description:
-                matching_modules.append(module)
+        return [self.modules_cache[name] for name in sorted(self.index.by_cve.get(cve, set()))]
 
-        return matching_modules
+    def get_candidate_modules(self, target: Target) -> List[ExploitModule]:
+        """Get modules relevant to a target by service, CVE and platform"""
+        return self.index.candidates(target)
 
 
 class AIExploitSelector:
@@ -269,62 +382,55 @@ def select_optimal_exploit(self, target: Target, available_modules: List[Exploit
         if not available_modules:
             return None
 
-        best_module = None
-        best_score = -1
-
-        for module in available_modules:
-            score = self._score_exploit_match(target, module)
-
-            if score > best_score:
-                best_score = score
-                best_module = module
-
-        return best_module
+        scores = self.score_modules(target, available_modules)
+        return available_modules[int(np.argmax(scores))]
+
+    RANK_WEIGHTS = {
+        'excellent': 3.0,
+        'great': 2.5,
+        'good': 2.0,
+        'normal': 1.5,
+        'average': 1.0,
+        'low': 0.5,
+        'manual': 0.2
+    }
+
+    def _match_features(self, target: Target, modules: List[ExploitModule]) -> np.ndarray:
+        """Per-module model features: target port, service match, description length, target vuln count"""
+        service = target.service.lower()
+        return np.column_stack([
+            np.full(len(modules), float(target.port)),
+            np.fromiter((service in m.name.lower() for m in modules), dtype=float, count=len(modules)),
+            np.fromiter((len(m.description) for m in modules), dtype=float, count=len(modules)),
+            np.full(len(modules), float(len(target.vulnerabilities)))
+        ])
 
-    def _score_exploit_match(self, target: Target, module: ExploitModule) -> float:
-        """Score exploit module compatibility with target"""
-        score = 0.0
+    def score_modules(self, target: Target, modules: List[ExploitModule]) -> np.ndarray:
+        """Score every module against a target with a single model call"""
+        vulns = set(target.vulnerabilities)
+        features = self._match_features(target, modules)
 
         # Service matching
-        if target.service.lower() in module.name.lower():
-            score += 3.0
+        service_match = features[:, 1]
 
         # CVE matching
-        for vuln in target.vulnerabilities:
-            if vuln in module.cve_refs:
-                score += 5.0
+        cve_matches = np.fromiter((len(vulns.intersection(m.cve_refs)) for m in modules),
+                                  dtype=float, count=len(modules))
 
         # Rank weighting
-        rank_weights = {
-            'excellent': 3.0,
-            'great': 2.5,
-            'good': 2.0,
-            'normal': 1.5,
-            'average': 1.0,
-            'low': 0.5,
-            'manual': 0.2
-        }
-        score += rank_weights.get(module.rank.lower(), 1.0)
+        rank_weight = np.fromiter((self.RANK_WEIGHTS.get(m.rank.lower(), 1.0) for m in modules),
+                                  dtype=float, count=len(modules))
+
+        scores = service_match * 3.0 + cve_matches * 5.0 + rank_weight
 
         # AI prediction (if trained)
         if self.trained:
             try:
-                features = self._extract_target_features(target, module)
-                success_prob = self.success_predictor.predict_proba([features])[0][1]
-                score += success_prob * 2.0
+                scores += self.success_predictor.predict_proba(features)[:, 1] * 2.0
             except Exception:
                 pass
 
-        return score
-
-    def _extract_target_features(self, target: Target, module: ExploitModule) -> List[float]:
-        """Extract features for AI model prediction"""
-        return [
-            target.port,
-            1.0 if target.service.lower() in module.name.lower() else 0.0,
-            len(module.description),
-            len(target.vulnerabilities)
-        ]
+        return scores
 
     def recommend_payload(self, target: Target, exploit: ExploitModule, context: Dict[str, Any]) -> PayloadConfig:
         """Recommend optimal payload configuration"""
@@ -353,16 +459,195 @@ def recommend_payload(self, target: Target, exploit: ExploitModule, context: Dic
         )
 
 
+class MSFRPCError(Exception):
+    """Error returned by msfrpcd"""
+
+
+class MSFRPCClient:
+    """Async client for the msfrpcd MessagePack RPC API"""
+
+    def __init__(self, url: str = "http://127.0.0.1:55552/api/", username: str = "msf",
+                 password: str = "", timeout: float = 30.0):
+        if aiohttp is None or msgpack is None:
+            raise RuntimeError("msfrpcd backend requires aiohttp and msgpack")
+        self.url = url
+        self.username = username
+        self.password = password
+        self.timeout = timeout
+        self.token: Optional[str] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._login_lock = asyncio.Lock()
+
+    async def _post(self, method: str, *args) -> Dict[str, Any]:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                connector=aiohttp.TCPConnector(limit=32, ssl=False)
+            )
+
+        body = msgpack.packb([method, *args], use_bin_type=True)
+        async with self._session.post(self.url, data=body,
+                                      headers={'Content-Type': 'binary/message-pack'}) as response:
+            result = msgpack.unpackb(await response.read(), raw=False)
+
+        if isinstance(result, dict) and result.get('error'):
+            raise MSFRPCError(result.get('error_message') or result.get('error_class') or 'RPC error')
+        return result
+
+    async def login(self):
+        async with self._login_lock:
+            result = await self._post('auth.login', self.username, self.password)
+            if result.get('result') != 'success':
+                raise MSFRPCError("msfrpcd authentication failed")
+            self.token = result['token']
+
+    async def call(self, method: str, *args) -> Dict[str, Any]:
+        """Call an authenticated RPC method, logging in again if the token expired"""
+        if self.token is None:
+            await self.login()
+        try:
+            return await self._post(method, self.token, *args)
+        except MSFRPCError as e:
+            if 'token' not in str(e).lower():
+                raise
+            await self.login()
+            return await self._post(method, self.token, *args)
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+class MSFConsolePool:
+    """Pool of long-lived msfrpcd consoles shared by concurrent exploit runs
+
+    At most ``size`` consoles exist at once. Idle consoles wait on a queue; a
+    ``None`` entry marks a slot freed by a failed or discarded console, so a
+    caller blocked on the queue wakes up and creates the replacement.
+    """
+
+    def __init__(self, client: MSFRPCClient, size: int = 4, poll_interval: float = 0.25,
+                 idle_polls: int = 2):
+        self.client = client
+        self.size = size
+        self.poll_interval = poll_interval
+        self.idle_polls = idle_polls
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._created = 0
+        self._create_lock = asyncio.Lock()
+
+    async def _acquire(self) -> str:
+        while True:
+            if self._idle.empty():
+                async with self._create_lock:
+                    if self._created < self.size:
+                        return await self._create_console()
+            console_id = await self._idle.get()
+            if console_id is not None:
+                return console_id
+
+    async def _create_console(self) -> str:
+        self._created += 1
+        console_id = None
+        created = False
+        try:
+            console = await self.client.call('console.create')
+            console_id = str(console['id'])
+            # Discard the banner so it is not attributed to the first run
+            async for _ in self._read_until_idle(console_id):
+                pass
+            created = True
+            return console_id
+        finally:
+            if not created:
+                await self._discard(console_id)
+
+    async def _discard(self, console_id: Optional[str]):
+        """Free a console's slot, waking one waiter to create a replacement"""
+        self._created -= 1
+        self._idle.put_nowait(None)
+        if console_id is not None:
+            try:
+                await self.client.call('console.destroy', console_id)
+            except Exception:
+                pass
+
+    async def _read_until_idle(self, console_id: str, timeout: float = 60.0):
+        """Yield console output until it stops being busy and goes quiet"""
+        deadline = time.monotonic() + timeout
+        quiet = 0
+        while quiet < self.idle_polls:
+            result = await self.client.call('console.read', console_id)
+            data = result.get('data', '')
+            if data:
+                quiet = 0
+                yield data
+            elif not result.get('busy'):
+                quiet += 1
+            if time.monotonic() > deadline:
+                raise asyncio.TimeoutError(f"Console {console_id} still busy after {timeout}s")
+            await asyncio.sleep(self.poll_interval)
+
+    async def stream(self, resource_script: str, timeout: float = 300.0):
+        """Run a resource script on a pooled console, yielding output as it arrives"""
+        console_id = await self._acquire()
+        healthy = False
+        try:
+            await self.client.call('console.write', console_id, resource_script.rstrip('\n') + '\n')
+            async for chunk in self._read_until_idle(console_id, timeout):
+                yield chunk
+            # Leave module context so the next run starts clean
+            await self.client.call('console.write', console_id, 'back\n')
+            async for _ in self._read_until_idle(console_id):
+                pass
+            healthy = True
+        finally:
+            if healthy:
+                self._idle.put_nowait(console_id)
+            else:
+                # A console interrupted mid-run is in an unknown state; replace it
+                await self._discard(console_id)
+
+    async def execute(self, resource_script: str, timeout: float = 300.0) -> str:
+        chunks = []
+        async for chunk in self.stream(resource_script, timeout):
+            chunks.append(chunk)
+        return ''.join(chunks)
+
+    async def close(self):
+        while not self._idle.empty():
+            console_id = self._idle.get_nowait()
+            if console_id is None:
+                continue
+            try:
+                await self.client.call('console.destroy', console_id)
+            except Exception:
+                pass
+        self._created = 0
+        await self.client.close()
+
+
 class SmartMetasploit:
     """AI-enhanced Metasploit framework integration"""
 
-    def __init__(self, db_path: str = "/var/lib/synos/metasploit.db"):
+    def __init__(self, db_path: str = "/var/lib/synos/metasploit.db", rpc_url: Optional[str] = None,
+                 rpc_user: str = "msf", rpc_password: str = "", console_pool_size: int = 4):
         self.db_path = Path(db_path)
         self.msf_db = MSFDatabase()
         self.ai_selector = AIExploitSelector()
         self.active_sessions: Dict[str, ExploitSession] = {}
         self.session_history: List[ExploitSession] = []
 
+        # Long-lived msfrpcd consoles when configured, otherwise one msfconsole per run
+        self.console_pool: Optional[MSFConsolePool] = None
+        if rpc_url:
+            try:
+                client = MSFRPCClient(rpc_url, rpc_user, rpc_password)
+                self.console_pool = MSFConsolePool(client, size=console_pool_size)
+            except RuntimeError as e:
+                logging.warning(f"msfrpcd backend unavailable, using msfconsole: {e}")
+
         # Initialize database
         self._init_database()
 
@@ -486,17 +771,8 @@ async def select_exploit_strategy(self, target: Target, context: Dict[str, Any]
         if context is None:
             context = {}
 
-        # Get available exploit modules for target service
-        available_modules = self.msf_db.get_modules_by_service(target.service)
-
-        # Add CVE-specific modules
-        for vuln in target.vulnerabilities:
-            cve_modules = self.msf_db.get_modules_by_cve(vuln)
-            available_modules.extend(cve_modules)
-
-        # Remove duplicates
-        unique_modules = {m.name: m for m in available_modules}
-        available_modules = list(unique_modules.values())
+        # Indexed service, CVE and platform candidates
+        available_modules = self.msf_db.get_candidate_modules(target)
 
         # AI-powered exploit selection
         selected_exploit = self.ai_selector.select_optimal_exploit(target, available_modules)
@@ -530,10 +806,16 @@ async def execute_exploit(self, target: Target, exploit: ExploitModule, payload:
 
         try:
             # Generate Metasploit resource script
-            resource_script = self._generate_resource_script(target, exploit, payload)
-
-            # Execute via msfconsole
-            result = await self._execute_msfconsole(resource_script)
+            resource_script = self._generate_resource_script(target, exploit, payload,
+                                                             pooled=self.console_pool is not None)
+
+            if self.console_pool is not None:
+                # Stream console output into the live session as it arrives
+                async for chunk in self.console_pool.stream(resource_script):
+                    session.output += chunk
+                result = session.output
+            else:
+                result = await self._execute_msfconsole(resource_script)
 
             # Parse results
             session.success = self._parse_exploit_results(result)
@@ -562,7 +844,24 @@ async def execute_exploit(self, target: Target, exploit: ExploitModule, payload:
 
         return session_id
 
-    def _generate_resource_script(self, target: Target, exploit: ExploitModule, payload: PayloadConfig) -> str:
+    async def execute_exploits(self, attempts: List[Tuple[Target, ExploitModule, PayloadConfig]],
+                               max_parallel: Optional[int] = None) -> List[str]:
+        """Execute several exploit attempts concurrently, bounded by the console pool size"""
+        limit = max_parallel or (self.console_pool.size if self.console_pool else 1)
+        semaphore = asyncio.Semaphore(limit)
+
+        async def run(target, exploit, payload):
+            async with semaphore:
+                return await self.execute_exploit(target, exploit, payload)
+
+        return await asyncio.gather(*(run(*attempt) for attempt in attempts))
+
+    async def close(self):
+        if self.console_pool is not None:
+            await self.console_pool.close()
+
+    def _generate_resource_script(self, target: Target, exploit: ExploitModule, payload: PayloadConfig,
+                                  pooled: bool = False) -> str:
         """Generate Metasploit resource script for execution"""
         script_lines = [
             f"use {exploit.name}",
@@ -586,11 +885,11 @@ def _generate_resource_script(self, target: Target, exploit: ExploitModule, payl
         for key, value in exploit.required_options.items():
             script_lines.append(f"set {key} {value}")
 
-        script_lines.extend([
-            "check",
-            "exploit",
-            "exit"
-        ])
+        if pooled:
+            # Pooled consoles stay alive: don't interact with new sessions or exit
+            script_lines.extend(["check", "exploit -z"])
+        else:
+            script_lines.extend(["check", "exploit", "exit"])
 
         return '\n'.join(script_lines)
 
@@ -601,12 +900,19 @@ async def _execute_msfconsole(self, resource_script: str) -> str:
             resource_file = f.name
 
         try:
-            # Execute msfconsole with resource script
-            result = subprocess.run([
-                'msfconsole', '-q', '-r', resource_file
-            ], capture_output=True, text=True, timeout=300)
+            # Execute msfconsole with resource script without blocking the event loop
+            process = await asyncio.create_subprocess_exec(
+                'msfconsole', '-q', '-r', resource_file,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT
+            )
+            try:
+                stdout, _ = await asyncio.wait_for(process.communicate(), timeout=300)
+            except asyncio.TimeoutError:
+                process.kill()
+                raise
 
-            return result.stdout + result.stderr
+            return stdout.decode(errors='replace')
 
         finally:
             Path(resource_file).unlink(missing_ok=True)
@@ -629,6 +935,10 @@ def _parse_exploit_results(self, output: str) -> bool:
 
         output_lower = output.lower()
 
+        # msf reports "Meterpreter session 1 opened" / "Command shell session 2 opened"
+        if re.search(r'session \d+ opened', output_lower):
+            return True
+
         for indicator in success_indicators:
             if indicator in output_lower:
                 return True
@@ -700,22 +1010,23 @@ async def get_session_status(self, session_id: str) -> Dict[str, Any]:
     def _generate_session_id(self) -> str:
         """Generate unique session ID"""
         timestamp = int(time.time())
-        return f"exploit_{timestamp}"
+        # Parallel attempts start within the same second
+        return f"exploit_{timestamp}_{uuid.uuid4().hex[:8]}"
 
     async def get_exploit_recommendations(self, target_host: str, target_port: int) -> List[Dict[str, Any]]:
         """Get AI-powered exploit recommendations for target"""
         target = await self.analyze_target(target_host, target_port)
 
-        available_modules = self.msf_db.get_modules_by_service(target.service)
+        available_modules = self.msf_db.get_candidate_modules(target)
+        if not available_modules:
+            return []
 
-        # Add CVE-specific modules
-        for vuln in target.vulnerabilities:
-            cve_modules = self.msf_db.get_modules_by_cve(vuln)
-            available_modules.extend(cve_modules)
+        scores = self.ai_selector.score_modules(target, available_modules)
+        top = np.argsort(-scores, kind='stable')[:10]  # Top 10 recommendations
 
         recommendations = []
-        for module in available_modules[:10]:  # Top 10 recommendations
-            score = self.ai_selector._score_exploit_match(target, module)
+        for i in top:
+            module, score = available_modules[i], float(scores[i])
 
             recommendations.append({
                 "module": module.name,
@@ -726,8 +1037,6 @@ async def get_exploit_recommendations(self, target_host: str, target_port: int)
                 "cve_refs": module.cve_refs
             })
 
-        # Sort by compatibility score
-        recommendations.sort(key=lambda x: x['compatibility_score'], reverse=True)
         return recommendations
 
 
@@ -20,16 +20,16 @@
 import struct
 import socket
 import threading
+import queue
 from dataclasses import dataclass, asdict
 from typing import Dict, List, Optional, Tuple, Set, Any, Callable
 from enum import Enum
 from datetime import datetime, timedelta
-from collections import defaultdict, deque
+from collections import defaultdict
 import numpy as np
 import scapy.all as scapy
 from scapy.layers.inet import IP, TCP, UDP, ICMP
 from scapy.layers.http import HTTPRequest, HTTPResponse
-import statistics
 import hashlib
 import base64
 
@@ -62,27 +62,10 @@ class AnalysisLevel(Enum):
     ADVANCED = "advanced"     # ML-based fingerprinting detection
     PARANOID = "paranoid"     # Full spectrum analysis
 
-@dataclass
-class PacketFeatures:
-    """Features extracted from network packets"""
-    timestamp: float
-    size: int
-    protocol: str
-    source_ip: str
-    dest_ip: str
-    source_port: int
-    dest_port: int
-    flags: Set[str]
-    payload_entropy: float
-    inter_arrival_time: float = 0.0
-    burst_position: int = 0
-    direction: str = "outbound"  # outbound/inbound
-
 @dataclass
 class TrafficBurst:
     """A burst of related network traffic"""
     burst_id: str
-    packets: List[PacketFeatures]
     start_time: float
     end_time: float
     total_bytes: int
@@ -129,6 +112,402 @@ class CamouflageProfile:
     decoy_destinations: List[str]
     protocol_preferences: Dict[str, float]
 
+# Protocol codes used in the columnar packet buffers
+PROTOCOL_NAMES = ["Unknown", "TCP", "UDP"]
+PROTO_UNKNOWN, PROTO_TCP, PROTO_UDP = 0, 1, 2
+
+# TCP flag bits as carried in the TCP header
+TCP_FIN, TCP_SYN = 0x01, 0x02
+
+
+def ip_to_int(address: str) -> int:
+    return int.from_bytes(socket.inet_aton(address), 'big')
+
+
+def int_to_ip(value: int) -> str:
+    return socket.inet_ntoa(int(value).to_bytes(4, 'big'))
+
+
+def batch_entropy(payloads: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Shannon entropy of each row's first `lengths[i]` bytes, via one bincount
+
+    Rows must be zero-padded past their length; the padding is subtracted
+    from the zero-byte counts instead of being masked out.
+    """
+    rows = payloads.shape[0]
+    if rows == 0:
+        return np.zeros(0)
+
+    width = int(lengths.max())
+    offsets = (np.arange(rows, dtype=np.intp) * 256)[:, None]
+    counts = np.bincount((payloads[:, :width] + offsets).ravel(), minlength=rows * 256).reshape(rows, 256)
+    counts[:, 0] -= width - lengths
+
+    probabilities = counts / np.maximum(lengths, 1)[:, None]
+    log_probabilities = np.zeros_like(probabilities)
+    np.log2(probabilities, out=log_probabilities, where=counts > 0)
+    return -(probabilities * log_probabilities).sum(axis=1)
+
+
+class PacketBatch:
+    """Preallocated columnar buffer for a batch of captured packets"""
+
+    def __init__(self, capacity: int = 2048, max_payload: int = 1500):
+        self.capacity = capacity
+        self.max_payload = max_payload
+        self.payloads = np.zeros((capacity, max_payload), dtype=np.uint8)
+        self.payload_len = np.zeros(capacity, dtype=np.int32)
+        self.timestamp = np.zeros(capacity, dtype=np.float64)
+        self.size = np.zeros(capacity, dtype=np.int32)
+        self.protocol = np.zeros(capacity, dtype=np.uint8)
+        self.src_ip = np.zeros(capacity, dtype=np.uint32)
+        self.dst_ip = np.zeros(capacity, dtype=np.uint32)
+        self.src_port = np.zeros(capacity, dtype=np.uint16)
+        self.dst_port = np.zeros(capacity, dtype=np.uint16)
+        self.tcp_flags = np.zeros(capacity, dtype=np.uint8)
+        self.outbound = np.ones(capacity, dtype=bool)
+        self.entropy = np.zeros(capacity, dtype=np.float64)
+        self.inter_arrival = np.zeros(capacity, dtype=np.float64)
+        self.count = 0
+
+    def append(self, timestamp: float, size: int, protocol: int, src_ip: int, dst_ip: int,
+               src_port: int, dst_port: int, tcp_flags: int, payload: bytes) -> bool:
+        """Store one packet; returns True once the batch is full"""
+        i = self.count
+        self.timestamp[i] = timestamp
+        self.size[i] = size
+        self.protocol[i] = protocol
+        self.src_ip[i] = src_ip
+        self.dst_ip[i] = dst_ip
+        self.src_port[i] = src_port
+        self.dst_port[i] = dst_port
+        self.tcp_flags[i] = tcp_flags
+        length = min(len(payload), self.max_payload)
+        self.payloads[i, :length] = np.frombuffer(payload, dtype=np.uint8, count=length)
+        # Keep the row zero-padded for batch_entropy
+        self.payloads[i, length:self.payload_len[i]] = 0
+        self.payload_len[i] = length
+        self.count += 1
+        return self.count >= self.capacity
+
+    def compute_features(self, previous_timestamp: Optional[float] = None):
+        """Fill the entropy and inter-arrival columns for the stored packets"""
+        n = self.count
+        self.entropy[:n] = batch_entropy(self.payloads[:n], self.payload_len[:n])
+        if n:
+            self.inter_arrival[1:n] = np.diff(self.timestamp[:n])
+            self.inter_arrival[0] = self.timestamp[0] - previous_timestamp if previous_timestamp else 0.0
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        n = self.count
+        return {
+            'timestamp': self.timestamp[:n], 'size': self.size[:n], 'protocol': self.protocol[:n],
+            'src_ip': self.src_ip[:n], 'dst_ip': self.dst_ip[:n],
+            'src_port': self.src_port[:n], 'dst_port': self.dst_port[:n],
+            'tcp_flags': self.tcp_flags[:n], 'outbound': self.outbound[:n],
+            'entropy': self.entropy[:n], 'inter_arrival': self.inter_arrival[:n]
+        }
+
+    def reset(self):
+        # payload_len is kept so append() knows how much stale payload to clear
+        self.count = 0
+
+
+class RecentPacketWindow:
+    """Fixed-size columnar ring of the most recent packets"""
+
+    FIELDS = {
+        'timestamp': np.float64, 'size': np.int32, 'protocol': np.uint8,
+        'dst_ip': np.uint32, 'dst_port': np.uint16, 'entropy': np.float64
+    }
+
+    def __init__(self, capacity: int = 10000):
+        self.capacity = capacity
+        self.columns = {name: np.zeros(capacity, dtype=dtype) for name, dtype in self.FIELDS.items()}
+        self.head = 0
+        self.length = 0
+
+    def __len__(self) -> int:
+        return self.length
+
+    def extend(self, columns: Dict[str, np.ndarray]):
+        n = len(columns['timestamp'])
+        if n >= self.capacity:
+            columns = {name: values[-self.capacity:] for name, values in columns.items()}
+            n = self.capacity
+        positions = (self.head + np.arange(n)) % self.capacity
+        for name in self.FIELDS:
+            self.columns[name][positions] = columns[name][-n:]
+        self.head = (self.head + n) % self.capacity
+        self.length = min(self.length + n, self.capacity)
+
+    def tail(self, n: int) -> Dict[str, np.ndarray]:
+        """Last n packets in arrival order"""
+        n = min(n, self.length)
+        positions = (self.head - n + np.arange(n)) % self.capacity
+        return {name: values[positions] for name, values in self.columns.items()}
+
+class TimerWheel:
+    """Hierarchical timer wheel with O(1) scheduling and amortized O(1) expiry"""
+
+    def __init__(self, tick: float = 1.0, level_sizes: Tuple[int, ...] = (256, 64, 64),
+                 start: Optional[float] = None):
+        self.tick = tick
+        self.level_sizes = level_sizes
+        # Ticks spanned by one bucket at each level
+        self.spans = [1]
+        for size in level_sizes[:-1]:
+            self.spans.append(self.spans[-1] * size)
+        self.levels = [[[] for _ in range(size)] for size in level_sizes]
+        self.overflow: List[Tuple[int, Any]] = []
+        self.current = int((time.time() if start is None else start) / tick)
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def schedule(self, item: Any, expires_at: float):
+        self._insert(int(expires_at / self.tick), item)
+        self.count += 1
+
+    def _insert(self, deadline: int, item: Any):
+        delta = max(deadline - self.current, 0)
+        for level, size in enumerate(self.level_sizes):
+            if delta < self.spans[level] * size:
+                deadline = max(deadline, self.current)
+                self.levels[level][(deadline // self.spans[level]) % size].append((deadline, item))
+                return
+        self.overflow.append((deadline, item))
+
+    def _cascade(self, level: int):
+        """Move the bucket for the current tick down from a coarser level"""
+        size = self.level_sizes[level]
+        index = (self.current // self.spans[level]) % size
+        if index == 0:
+            if level + 1 < len(self.level_sizes):
+                self._cascade(level + 1)
+            else:
+                overflow, self.overflow = self.overflow, []
+                for deadline, item in overflow:
+                    self._insert(deadline, item)
+        bucket, self.levels[level][index] = self.levels[level][index], []
+        for deadline, item in bucket:
+            self._insert(deadline, item)
+
+    def advance(self, now: float) -> List[Any]:
+        """Advance to `now`, returning every item whose deadline has passed"""
+        target = int(now / self.tick)
+        expired = []
+        level0 = self.levels[0]
+        size0 = self.level_sizes[0]
+        while self.current <= target:
+            index = self.current % size0
+            if index == 0 and len(self.level_sizes) > 1:
+                self._cascade(1)
+            if level0[index]:
+                expired.extend(item for _, item in level0[index])
+                level0[index] = []
+            self.current += 1
+        self.count -= len(expired)
+        return expired
+
+
+def flow_hash(src_ip: np.ndarray, dst_ip: np.ndarray, src_port: np.ndarray,
+              dst_port: np.ndarray, protocol: np.ndarray) -> np.ndarray:
+    """64-bit hash of each packet's 5-tuple (splitmix64 finalizer over the packed fields)"""
+    with np.errstate(over='ignore'):
+        key = (src_ip.astype(np.uint64) << np.uint64(32)) | dst_ip.astype(np.uint64)
+        key ^= ((src_port.astype(np.uint64) << np.uint64(24)) |
+                (dst_port.astype(np.uint64) << np.uint64(8)) |
+                protocol.astype(np.uint64)) * np.uint64(0x9E3779B97F4A7C15)
+        key ^= key >> np.uint64(30)
+        key *= np.uint64(0xBF58476D1CE4E5B9)
+        key ^= key >> np.uint64(27)
+        key *= np.uint64(0x94D049BB133111EB)
+        key ^= key >> np.uint64(31)
+    return key
+
+
+class FlowTable:
+    """Per-flow state in parallel arrays, keyed by 5-tuple hash, expired by a timer wheel"""
+
+    def __init__(self, idle_timeout: float = 300.0, capacity: int = 4096):
+        self.idle_timeout = idle_timeout
+        self.slots: Dict[int, int] = {}
+        self.slot_keys = np.zeros(capacity, dtype=np.uint64)
+        self.start_time = np.zeros(capacity, dtype=np.float64)
+        self.last_seen = np.zeros(capacity, dtype=np.float64)
+        self.bytes = np.zeros(capacity, dtype=np.int64)
+        self.packets = np.zeros(capacity, dtype=np.int64)
+        self.src_ip = np.zeros(capacity, dtype=np.uint32)
+        self.dst_ip = np.zeros(capacity, dtype=np.uint32)
+        self.src_port = np.zeros(capacity, dtype=np.uint16)
+        self.dst_port = np.zeros(capacity, dtype=np.uint16)
+        self.protocol = np.zeros(capacity, dtype=np.uint8)
+        self.free_slots = list(range(capacity - 1, -1, -1))
+        self.wheel = TimerWheel()
+        self.stats = {'created': 0, 'expired': 0}
+
+    def __len__(self) -> int:
+        return len(self.slots)
+
+    def _grow(self):
+        old = len(self.slot_keys)
+        for name in ('slot_keys', 'start_time', 'last_seen', 'bytes', 'packets',
+                     'src_ip', 'dst_ip', 'src_port', 'dst_port', 'protocol'):
+            column = getattr(self, name)
+            grown = np.zeros(old * 2, dtype=column.dtype)
+            grown[:old] = column
+            setattr(self, name, grown)
+        self.free_slots.extend(range(old * 2 - 1, old - 1, -1))
+
+    def update(self, columns: Dict[str, np.ndarray]) -> int:
+        """Fold a packet batch into the table; returns the number of new flows"""
+        count = len(columns['timestamp'])
+        if not count:
+            return 0
+
+        hashes = flow_hash(columns['src_ip'], columns['dst_ip'], columns['src_port'],
+                           columns['dst_port'], columns['protocol'])
+        flows, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+        # Packets arrive in time order, so a flow's last packet is its first from the end
+        _, last_from_end = np.unique(hashes[::-1], return_index=True)
+        last = count - 1 - last_from_end
+
+        created = 0
+        slot_ids = np.empty(len(flows), dtype=np.intp)
+        for j, key in enumerate(flows.tolist()):
+            slot = self.slots.get(key)
+            if slot is None:
+                slot = self._allocate(key, columns, int(first[j]))
+                created += 1
+            slot_ids[j] = slot
+
+        self.bytes[slot_ids] += np.bincount(inverse, weights=columns['size'], minlength=len(flows)).astype(np.int64)
+        self.packets[slot_ids] += np.bincount(inverse, minlength=len(flows))
+        self.last_seen[slot_ids] = columns['timestamp'][last]
+
+        self.stats['created'] += created
+        return created
+
+    def _allocate(self, key: int, columns: Dict[str, np.ndarray], row: int) -> int:
+        if not self.free_slots:
+            self._grow()
+        slot = self.free_slots.pop()
+        timestamp = columns['timestamp'][row]
+
+        self.slots[key] = slot
+        self.slot_keys[slot] = key
+        self.start_time[slot] = timestamp
+        self.last_seen[slot] = timestamp
+        self.bytes[slot] = 0
+        self.packets[slot] = 0
+        for name in ('src_ip', 'dst_ip', 'src_port', 'dst_port', 'protocol'):
+            getattr(self, name)[slot] = columns[name][row]
+
+        self.wheel.schedule((key, slot), timestamp + self.idle_timeout)
+        return slot
+
+    def expire(self, now: float) -> int:
+        """Drop flows idle for longer than the timeout; only due timers are examined"""
+        expired = 0
+        for key, slot in self.wheel.advance(now):
+            if self.slots.get(key) != slot:
+                continue
+            idle_deadline = self.last_seen[slot] + self.idle_timeout
+            if now >= idle_deadline:
+                del self.slots[key]
+                self.free_slots.append(slot)
+                expired += 1
+            else:
+                # Seen since the timer was set: re-arm for its new idle deadline
+                self.wheel.schedule((key, slot), idle_deadline)
+        self.stats['expired'] += expired
+        return expired
+
+    def session(self, slot: int) -> TrafficSession:
+        """Materialize a TrafficSession view of one flow"""
+        source = f"{int_to_ip(self.src_ip[slot])}:{self.src_port[slot]}"
+        destination = f"{int_to_ip(self.dst_ip[slot])}:{self.dst_port[slot]}"
+        return TrafficSession(
+            session_id=hashlib.md5(f"{source}-{destination}".encode()).hexdigest()[:16],
+            bursts=[],
+            start_time=float(self.start_time[slot]),
+            end_time=float(self.last_seen[slot]),
+            total_bytes=int(self.bytes[slot]),
+            unique_destinations={int_to_ip(self.dst_ip[slot])},
+            session_pattern=TrafficPattern.WEB_BROWSING,  # Default
+            fingerprint_risk=0.0
+        )
+
+    def top_flows(self, n: int = 10) -> List[TrafficSession]:
+        active = np.fromiter(self.slots.values(), dtype=np.intp, count=len(self.slots))
+        if not len(active):
+            return []
+        ranked = active[np.argsort(-self.bytes[active], kind='stable')[:n]]
+        return [self.session(slot) for slot in ranked]
+
+
+class CompiledSignatures:
+    """Fingerprint signatures compiled into per-signature arrays and vector thresholds
+
+    Every signature is evaluated at every position with one broadcast
+    comparison per feature, for any number of signatures. Rolling size means
+    and cell-size/entropy runs come from cumulative sums.
+    """
+
+    def __init__(self, signatures: List[FingerprintSignature], size_window: int = 10, run_length: int = 5):
+        self.signatures = signatures
+        self.size_window = size_window
+        self.run_length = run_length
+
+        self.size_mean = np.array([np.mean(s.size_distribution) if s.size_distribution else 0.0
+                                   for s in signatures])
+        self.threshold = np.array([s.confidence_score * 0.7 for s in signatures])
+        self.total_features = np.array([max(len(s.distinguishing_features), 1) for s in signatures], dtype=float)
+        self.has_features = np.array([len(s.distinguishing_features) > 0 for s in signatures])
+        self.needs_entropy = np.array([bool(s.distinguishing_features.get('high_entropy')) for s in signatures])
+
+        # Fixed cell size per signature; -1 never equals a packet size
+        cell_sizes = [s.distinguishing_features.get('fixed_cell_size') for s in signatures]
+        self.cell_size = np.array([-1 if size is None else int(size) for size in cell_sizes], dtype=np.int64)
+        self.has_cell_size = self.cell_size >= 0
+
+    def _window_sums(self, values: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Sum and length of the trailing window ending at each position"""
+        n = len(values)
+        cumulative = np.concatenate([np.zeros((1,) + values.shape[1:]), np.cumsum(values, axis=0)])
+        ends = np.arange(1, n + 1)
+        starts = np.maximum(ends - window, 0)
+        return cumulative[ends] - cumulative[starts], (ends - starts)
+
+    def match(self, sizes: np.ndarray, entropies: np.ndarray, evaluate_from: int = 0) -> np.ndarray:
+        """Which signatures match at any position from `evaluate_from` onwards"""
+        if len(sizes) < 3 or not self.signatures:
+            return np.zeros(len(self.signatures), dtype=bool)
+
+        size_sums, size_counts = self._window_sums(sizes.astype(np.float64), self.size_window)
+        observed_mean = (size_sums / size_counts)[:, None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            similarity = np.minimum(observed_mean / self.size_mean, self.size_mean / observed_mean)
+        similarity = np.where((observed_mean > 0) & (self.size_mean > 0), similarity, 0.0)
+
+        cell_hits = sizes.astype(np.int64)[:, None] == self.cell_size
+        cell_runs, run_counts = self._window_sums(cell_hits.astype(np.float64), self.run_length)
+        cell_match = (cell_runs == run_counts[:, None]) & self.has_cell_size
+
+        entropy_runs, _ = self._window_sums((entropies > 7.0).astype(np.float64), self.run_length)
+        entropy_match = (entropy_runs == run_counts)[:, None] & self.needs_entropy
+
+        feature_confidence = np.where(self.has_features,
+                                      (cell_match.astype(float) + entropy_match) / self.total_features, 0.0)
+        confidence = (similarity + feature_confidence) / 2
+
+        # Positions need at least three packets of history, as before
+        valid = np.arange(len(sizes)) >= max(evaluate_from, 2)
+        return ((confidence > self.threshold) & valid[:, None]).any(axis=0)
+
+
 class TrafficCamouflageAnalysis:
     """AI-enhanced traffic camouflage and analysis system"""
 
@@ -141,10 +520,23 @@ def __init__(self, config_path: str = "/etc/synos/phase4/traffic-camouflage-conf
         self.capture_thread = None
         self.is_capturing = False
 
+        # Capture batches: preallocated buffers cycled between the capture thread and analysis
+        self.batch_size = 2048
+        self.batch_interval = 0.25  # seconds before a partial batch is analyzed
+        self._free_batches: queue.Queue = queue.Queue()
+        for _ in range(8):
+            self._free_batches.put_nowait(PacketBatch(self.batch_size))
+        self._current_batch: Optional[PacketBatch] = None
+        self._batch_started = 0.0
+        self._batch_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._last_packet_timestamp: Optional[float] = None
+
         # Analysis data
-        self.packet_buffer: deque = deque(maxlen=10000)
-        self.traffic_sessions: Dict[str, TrafficSession] = {}
+        self.packet_buffer = RecentPacketWindow(capacity=10000)
+        self.flow_table = FlowTable()
         self.fingerprint_database: Dict[str, FingerprintSignature] = {}
+        self.compiled_signatures: Optional[CompiledSignatures] = None
 
         # Camouflage profiles
         self.camouflage_profiles: Dict[str, CamouflageProfile] = {}
@@ -160,7 +552,8 @@ def __init__(self, config_path: str = "/etc/synos/phase4/traffic-camouflage-conf
             'total_bytes': 0,
             'session_count': 0,
             'camouflaged_sessions': 0,
-            'fingerprint_attempts_detected': 0
+            'fingerprint_attempts_detected': 0,
+            'dropped_packets': 0
         }
 
         # Real-time analysis
@@ -233,6 +626,7 @@ async def _load_fingerprint_database(self):
         try:
             # Load from database or create default signatures
             await self._create_default_fingerprint_signatures()
+            self._compile_signatures()
 
             logger.info(f"Loaded {len(self.fingerprint_database)} fingerprint signatures")
 
@@ -296,6 +690,10 @@ async def _create_default_fingerprint_signatures(self):
         for signature in signatures:
             self.fingerprint_database[signature.signature_id] = signature
 
+    def _compile_signatures(self):
+        """Rebuild signature lookup tables; call after changing fingerprint_database"""
+        self.compiled_signatures = CompiledSignatures(list(self.fingerprint_database.values()))
+
     async def _create_default_camouflage_profiles(self):
         """Create default traffic camouflage profiles"""
         profiles = [
@@ -389,6 +787,9 @@ async def start_traffic_analysis(self, interface: str = None) -> bool:
             interface = interface or self.config.get('capture_interface', 'any')
             logger.info(f"Starting traffic analysis on interface: {interface}")
 
+            # Capture thread hands batches to this loop
+            self._loop = asyncio.get_running_loop()
+
             # Start packet capture in separate thread
             self.is_capturing = True
             self.capture_thread = threading.Thread(
@@ -410,15 +811,7 @@ def _packet_capture_worker(self, interface: str):
         try:
             def packet_handler(packet):
                 try:
-                    # Extract features from packet
-                    features = self._extract_packet_features(packet)
-                    if features:
-                        # Add to analysis queue
-                        asyncio.run_coroutine_threadsafe(
-                            self.analysis_queue.put(features),
-                            asyncio.get_event_loop()
-                        )
-
+                    self._capture_packet(packet)
                 except Exception as e:
                     logger.debug(f"Error processing packet: {e}")
 
@@ -434,141 +827,131 @@ def packet_handler(packet):
         except Exception as e:
             logger.error(f"Packet capture worker error: {e}")
 
-    def _extract_packet_features(self, packet) -> Optional[PacketFeatures]:
-        """Extract features from a network packet"""
-        try:
-            if not packet.haslayer(IP):
-                return None
-
-            ip_layer = packet[IP]
-            timestamp = time.time()
-            size = len(packet)
-            protocol = "Unknown"
-            flags = set()
-
-            # Determine protocol
-            if packet.haslayer(TCP):
-                protocol = "TCP"
-                tcp_layer = packet[TCP]
-                source_port = tcp_layer.sport
-                dest_port = tcp_layer.dport
-
-                # Extract TCP flags
-                if tcp_layer.flags:
-                    flag_names = ['FIN', 'SYN', 'RST', 'PSH', 'ACK', 'URG', 'ECE', 'CWR']
-                    for i, flag in enumerate(flag_names):
-                        if tcp_layer.flags & (1 << i):
-                            flags.add(flag)
-
-            elif packet.haslayer(UDP):
-                protocol = "UDP"
-                udp_layer = packet[UDP]
-                source_port = udp_layer.sport
-                dest_port = udp_layer.dport
-            else:
-                source_port = 0
-                dest_port = 0
-
-            # Calculate payload entropy
-            payload = bytes(packet.payload) if packet.payload else b''
-            entropy = self._calculate_entropy(payload)
-
-            features = PacketFeatures(
-                timestamp=timestamp,
-                size=size,
-                protocol=protocol,
-                source_ip=ip_layer.src,
-                dest_ip=ip_layer.dst,
-                source_port=source_port,
-                dest_port=dest_port,
-                flags=flags,
-                payload_entropy=entropy
+    def _capture_packet(self, packet):
+        """Append a packet's header fields and payload to the current capture batch"""
+        if not packet.haslayer(IP):
+            return
+
+        ip_layer = packet[IP]
+        protocol, source_port, dest_port, tcp_flags = PROTO_UNKNOWN, 0, 0, 0
+        if packet.haslayer(TCP):
+            tcp_layer = packet[TCP]
+            protocol, source_port, dest_port = PROTO_TCP, tcp_layer.sport, tcp_layer.dport
+            tcp_flags = int(tcp_layer.flags)
+        elif packet.haslayer(UDP):
+            udp_layer = packet[UDP]
+            protocol, source_port, dest_port = PROTO_UDP, udp_layer.sport, udp_layer.dport
+
+        payload = bytes(packet.payload) if packet.payload else b''
+
+        with self._batch_lock:
+            if self._current_batch is None:
+                self._current_batch = self._take_free_batch()
+                if self._current_batch is None:
+                    # Analysis is behind and every buffer is in flight
+                    self.traffic_stats['dropped_packets'] += 1
+                    return
+                self._batch_started = time.monotonic()
+
+            full = self._current_batch.append(
+                time.time(), len(packet), protocol, ip_to_int(ip_layer.src), ip_to_int(ip_layer.dst),
+                source_port, dest_port, tcp_flags, payload
             )
+            if full or time.monotonic() - self._batch_started >= self.batch_interval:
+                self._submit_current_batch()
 
-            return features
-
-        except Exception as e:
-            logger.debug(f"Error extracting packet features: {e}")
+    def _take_free_batch(self) -> Optional[PacketBatch]:
+        try:
+            return self._free_batches.get_nowait()
+        except queue.Empty:
             return None
 
-    def _calculate_entropy(self, data: bytes) -> float:
-        """Calculate Shannon entropy of data"""
-        if not data:
-            return 0.0
-
-        # Count byte frequencies
-        frequencies = [0] * 256
-        for byte in data:
-            frequencies[byte] += 1
-
-        # Calculate entropy
-        entropy = 0.0
-        data_len = len(data)
-
-        for freq in frequencies:
-            if freq > 0:
-                probability = freq / data_len
-                entropy -= probability * np.log2(probability)
-
-        return entropy
+    def _submit_current_batch(self):
+        """Hand the filled batch to the event loop; caller holds _batch_lock"""
+        batch, self._current_batch = self._current_batch, None
+        if batch is None or batch.count == 0 or self._loop is None:
+            if batch is not None:
+                batch.reset()
+                self._free_batches.put_nowait(batch)
+            return
+        self._loop.call_soon_threadsafe(self.analysis_queue.put_nowait, batch)
+
+    def _flush_capture_batch(self) -> float:
+        """Submit a partial batch once it reaches batch_interval; returns seconds until the next deadline"""
+        with self._batch_lock:
+            if self._current_batch is None:
+                return self.batch_interval
+            remaining = self._batch_started + self.batch_interval - time.monotonic()
+            if remaining <= 0:
+                self._submit_current_batch()
+                return self.batch_interval
+            return remaining
 
     async def _analyze_traffic_continuously(self):
         """Continuously analyze captured traffic"""
         while True:
             try:
-                # Get packet features from queue
-                features = await asyncio.wait_for(self.analysis_queue.get(), timeout=1.0)
-
-                # Update statistics
-                self.traffic_stats['total_packets'] += 1
-                self.traffic_stats['total_bytes'] += features.size
-
-                # Add to packet buffer
-                self.packet_buffer.append(features)
+                # A partial batch is flushed by its max-age deadline, not only when the queue goes idle
+                timeout = self._flush_capture_batch()
+                batch = await asyncio.wait_for(self.analysis_queue.get(), timeout=timeout)
 
-                # Perform analysis
-                await self._analyze_packet_features(features)
-
-                # Session analysis
-                await self._update_traffic_sessions(features)
-
-                # Fingerprinting detection
-                await self._detect_fingerprinting_attempts()
+                try:
+                    await self._analyze_packet_batch(batch)
+                finally:
+                    batch.reset()
+                    self._free_batches.put_nowait(batch)
 
             except asyncio.TimeoutError:
                 continue
             except Exception as e:
                 logger.error(f"Error in traffic analysis: {e}")
 
-    async def _analyze_packet_features(self, features: PacketFeatures):
-        """Analyze individual packet features"""
-        try:
-            # Update inter-arrival time
-            if len(self.packet_buffer) > 1:
-                prev_packet = self.packet_buffer[-2]
-                features.inter_arrival_time = features.timestamp - prev_packet.timestamp
-
-            # Pattern recognition
-            if self.config.get('pattern_recognition_enabled'):
-                pattern = await self._classify_traffic_pattern([features])
-                if pattern:
-                    logger.debug(f"Detected pattern: {pattern.value}")
+    async def _analyze_packet_batch(self, batch: PacketBatch):
+        """Analyze a window of captured packets at once"""
+        batch.compute_features(self._last_packet_timestamp)
+        columns = batch.columns()
+        if not len(columns['timestamp']):
+            return
+        self._last_packet_timestamp = float(columns['timestamp'][-1])
+
+        # Update statistics
+        self.traffic_stats['total_packets'] += batch.count
+        self.traffic_stats['total_bytes'] += int(columns['size'].sum())
+
+        # Add to packet buffer
+        self.packet_buffer.extend(columns)
+
+        # Pattern recognition
+        if self.config.get('pattern_recognition_enabled'):
+            pattern = await self._classify_traffic_pattern(columns)
+            if pattern:
+                logger.debug(f"Detected pattern: {pattern.value}")
+
+        # Anomaly detection
+        suspicious = self._suspicious_packet_mask(columns)
+        if suspicious.any():
+            destinations, counts = np.unique(
+                np.stack([columns['dst_ip'][suspicious], columns['dst_port'][suspicious]]), axis=1,
+                return_counts=True
+            )
+            top = np.argsort(-counts)[:5]
+            summary = ', '.join(f"{int_to_ip(destinations[0, i])}:{destinations[1, i]} ({counts[i]})" for i in top)
+            logger.warning(f"{int(suspicious.sum())} suspicious packets detected: {summary}")
 
-            # Anomaly detection
-            if await self._is_suspicious_packet(features):
-                logger.warning(f"Suspicious packet detected: {features.dest_ip}:{features.dest_port}")
+        # Session analysis
+        await self._update_traffic_sessions(columns)
 
-        except Exception as e:
-            logger.error(f"Error analyzing packet features: {e}")
+        # Fingerprinting detection
+        await self._detect_fingerprinting_attempts(len(columns['timestamp']))
 
-    async def _classify_traffic_pattern(self, packet_features: List[PacketFeatures]) -> Optional[TrafficPattern]:
+    async def _classify_traffic_pattern(self, columns: Dict[str, np.ndarray]) -> Optional[TrafficPattern]:
         """Classify traffic pattern using ML model"""
         try:
-            if not packet_features:
+            if not len(columns['size']):
                 return None
 
             # Extract features for classification
-            feature_vector = self._extract_classification_features(packet_features)
+            feature_vector = self._extract_classification_features(columns)
 
             # Apply simple classification (in practice, this would use trained models)
             pattern_scores = np.dot(feature_vector, self.pattern_classifier_weights)
@@ -584,223 +967,107 @@ async def _classify_traffic_pattern(self, packet_features: List[PacketFeatures])
             logger.error(f"Error classifying traffic pattern: {e}")
             return None
 
-    def _extract_classification_features(self, packet_features: List[PacketFeatures]) -> np.ndarray:
-        """Extract features for traffic pattern classification"""
-        if not packet_features:
-            return np.zeros(50)
-
-        features = []
+    def _extract_classification_features(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """Extract features for traffic pattern classification from a packet window"""
+        features = np.zeros(50)
+        sizes = columns['size']
+        count = len(sizes)
+        if not count:
+            return features
 
         # Basic statistics
-        sizes = [p.size for p in packet_features]
-        features.extend([
-            len(packet_features),                    # packet count
-            np.mean(sizes) if sizes else 0,          # average packet size
-            np.std(sizes) if sizes else 0,           # packet size std dev
-            max(sizes) if sizes else 0,              # max packet size
-            min(sizes) if sizes else 0,              # min packet size
-        ])
+        features[0:5] = [count, sizes.mean(), sizes.std(), sizes.max(), sizes.min()]
 
         # Timing statistics
-        if len(packet_features) > 1:
-            inter_arrivals = [p.inter_arrival_time for p in packet_features[1:] if p.inter_arrival_time > 0]
-            features.extend([
-                np.mean(inter_arrivals) if inter_arrivals else 0,
-                np.std(inter_arrivals) if inter_arrivals else 0,
-                max(inter_arrivals) if inter_arrivals else 0,
-                min(inter_arrivals) if inter_arrivals else 0,
-            ])
-        else:
-            features.extend([0, 0, 0, 0])
+        inter_arrivals = columns['inter_arrival'][1:]
+        inter_arrivals = inter_arrivals[inter_arrivals > 0]
+        if len(inter_arrivals):
+            features[5:9] = [inter_arrivals.mean(), inter_arrivals.std(),
+                             inter_arrivals.max(), inter_arrivals.min()]
 
         # Protocol distribution
-        protocols = [p.protocol for p in packet_features]
-        tcp_ratio = protocols.count('TCP') / len(protocols) if protocols else 0
-        udp_ratio = protocols.count('UDP') / len(protocols) if protocols else 0
-        features.extend([tcp_ratio, udp_ratio])
+        protocol_counts = np.bincount(columns['protocol'], minlength=len(PROTOCOL_NAMES))
+        features[9:11] = protocol_counts[[PROTO_TCP, PROTO_UDP]] / count
 
         # Port analysis
-        dest_ports = [p.dest_port for p in packet_features if p.dest_port > 0]
-        unique_ports = len(set(dest_ports))
-        features.extend([
-            unique_ports,
-            1 if 80 in dest_ports else 0,   # HTTP
-            1 if 443 in dest_ports else 0,  # HTTPS
-            1 if 53 in dest_ports else 0,   # DNS
-        ])
+        dest_ports = columns['dst_port'][columns['dst_port'] > 0]
+        features[11:15] = [len(np.unique(dest_ports)), (dest_ports == 80).any(),
+                           (dest_ports == 443).any(), (dest_ports == 53).any()]
 
         # Entropy analysis
-        entropies = [p.payload_entropy for p in packet_features]
-        features.extend([
-            np.mean(entropies) if entropies else 0,
-            np.std(entropies) if entropies else 0,
-        ])
+        features[15:17] = [columns['entropy'].mean(), columns['entropy'].std()]
 
         # Direction analysis (simplified)
-        outbound_count = sum(1 for p in packet_features if p.direction == "outbound")
-        direction_ratio = outbound_count / len(packet_features) if packet_features else 0.5
-        features.append(direction_ratio)
+        features[17] = columns['outbound'].mean()
 
-        # Pad to exactly 50 features
-        while len(features) < 50:
-            features.append(0.0)
+        return features
 
-        return np.array(features[:50])
+    SUSPICIOUS_PORTS = np.array([22, 23, 135, 139, 445, 1433, 3389, 5432], dtype=np.uint16)
 
-    async def _is_suspicious_packet(self, features: PacketFeatures) -> bool:
-        """Detect potentially suspicious packets"""
-        try:
-            # Check for fingerprinting indicators
-            suspicious_indicators = 0
+    def _suspicious_packet_mask(self, columns: Dict[str, np.ndarray]) -> np.ndarray:
+        """Flag packets with two or more fingerprinting indicators"""
+        sizes = columns['size']
+        indicators = np.zeros(len(sizes), dtype=np.int32)
 
-            # Unusual packet sizes
-            if features.size < 60 or features.size > 1500:
-                suspicious_indicators += 1
+        # Unusual packet sizes
+        indicators += (sizes < 60) | (sizes > 1500)
 
-            # High entropy (might indicate encryption or obfuscation)
-            if features.payload_entropy > 7.5:
-                suspicious_indicators += 1
+        # High entropy (might indicate encryption or obfuscation)
+        indicators += columns['entropy'] > 7.5
 
-            # Unusual ports
-            suspicious_ports = {22, 23, 135, 139, 445, 1433, 3389, 5432}
-            if features.dest_port in suspicious_ports:
-                suspicious_indicators += 1
+        # Unusual ports
+        indicators += np.isin(columns['dst_port'], self.SUSPICIOUS_PORTS)
 
-            # TCP flags analysis
-            if 'SYN' in features.flags and 'FIN' in features.flags:
-                suspicious_indicators += 2  # SYN-FIN scan
+        # TCP flags analysis: SYN-FIN scan
+        syn_fin = TCP_SYN | TCP_FIN
+        indicators += 2 * ((columns['tcp_flags'] & syn_fin) == syn_fin)
 
-            # Rate limiting detection
-            recent_packets = [p for p in self.packet_buffer
-                            if p.timestamp > time.time() - 1.0 and
-                               p.dest_ip == features.dest_ip]
-            if len(recent_packets) > 50:  # More than 50 packets per second to same destination
-                suspicious_indicators += 1
+        # Rate limiting detection: more than 50 packets per second to one destination
+        recent = self.packet_buffer.tail(len(self.packet_buffer))
+        last_second = recent['dst_ip'][recent['timestamp'] > columns['timestamp'][-1] - 1.0]
+        destinations, counts = np.unique(last_second, return_counts=True)
+        indicators += np.isin(columns['dst_ip'], destinations[counts > 50])
 
-            return suspicious_indicators >= 2
+        return indicators >= 2
 
-        except Exception as e:
-            logger.error(f"Error in suspicious packet detection: {e}")
-            return False
-
-    async def _update_traffic_sessions(self, features: PacketFeatures):
+    async def _update_traffic_sessions(self, columns: Dict[str, np.ndarray]):
         """Update traffic session tracking"""
         try:
-            # Create session key
-            session_key = f"{features.source_ip}:{features.source_port}-{features.dest_ip}:{features.dest_port}"
-
-            # Find or create session
-            if session_key not in self.traffic_sessions:
-                session_id = hashlib.md5(session_key.encode()).hexdigest()[:16]
-                self.traffic_sessions[session_key] = TrafficSession(
-                    session_id=session_id,
-                    bursts=[],
-                    start_time=features.timestamp,
-                    end_time=features.timestamp,
-                    total_bytes=0,
-                    unique_destinations={features.dest_ip},
-                    session_pattern=TrafficPattern.WEB_BROWSING,  # Default
-                    fingerprint_risk=0.0
-                )
-                self.traffic_stats['session_count'] += 1
-
-            session = self.traffic_sessions[session_key]
-            session.end_time = features.timestamp
-            session.total_bytes += features.size
-            session.unique_destinations.add(features.dest_ip)
-
-            # Session timeout cleanup
-            current_time = time.time()
-            timeout = self.config.get('session_timeout_seconds', 300)
-            expired_sessions = [
-                key for key, session in self.traffic_sessions.items()
-                if current_time - session.end_time > timeout
-            ]
-
-            for key in expired_sessions:
-                del self.traffic_sessions[key]
+            self.flow_table.idle_timeout = self.config.get('session_timeout_seconds', 300)
+            self.traffic_stats['session_count'] += self.flow_table.update(columns)
+
+            # Session timeout cleanup: only flows whose timers are due are examined
+            self.flow_table.expire(time.time())
 
         except Exception as e:
             logger.error(f"Error updating traffic sessions: {e}")
 
-    async def _detect_fingerprinting_attempts(self):
-        """Detect active fingerprinting attempts"""
+    async def _detect_fingerprinting_attempts(self, new_packets: int = 1):
+        """Detect active fingerprinting attempts in the newest packets"""
         try:
             if len(self.packet_buffer) < 10:
                 return
 
-            # Analyze recent packets for fingerprinting patterns
-            recent_packets = list(self.packet_buffer)[-100:]  # Last 100 packets
-
-            # Look for fingerprinting signatures
-            for signature_id, signature in self.fingerprint_database.items():
-                if await self._matches_signature(recent_packets, signature):
-                    logger.warning(f"Potential fingerprinting detected: {signature_id}")
-                    self.traffic_stats['fingerprint_attempts_detected'] += 1
-
-                    # Apply countermeasures
-                    await self._apply_fingerprint_countermeasures(signature)
-
-        except Exception as e:
-            logger.error(f"Error detecting fingerprinting attempts: {e}")
-
-    async def _matches_signature(self, packets: List[PacketFeatures],
-                               signature: FingerprintSignature) -> bool:
-        """Check if packet sequence matches a fingerprinting signature"""
-        try:
-            if len(packets) < 3:
-                return False
+            if self.compiled_signatures is None:
+                self._compile_signatures()
 
-            # Extract features for comparison
-            packet_sizes = [p.size for p in packets[-10:]]  # Last 10 packets
+            # New packets plus enough history to fill the rolling windows
+            history = self.compiled_signatures.size_window - 1
+            recent_packets = self.packet_buffer.tail(new_packets + history)
+            evaluate_from = max(len(recent_packets['size']) - new_packets, 0)
 
-            # Simple pattern matching (in practice, this would be more sophisticated)
-            size_similarity = self._calculate_distribution_similarity(
-                packet_sizes, signature.size_distribution
+            matches = self.compiled_signatures.match(
+                recent_packets['size'], recent_packets['entropy'], evaluate_from
             )
+            for signature in np.array(self.compiled_signatures.signatures, dtype=object)[matches]:
+                logger.warning(f"Potential fingerprinting detected: {signature.signature_id}")
+                self.traffic_stats['fingerprint_attempts_detected'] += 1
 
-            # Check for distinguishing features
-            feature_matches = 0
-            total_features = len(signature.distinguishing_features)
-
-            for feature, expected_value in signature.distinguishing_features.items():
-                if feature == "fixed_cell_size":
-                    if all(size == expected_value for size in packet_sizes[-5:]):
-                        feature_matches += 1
-                elif feature == "high_entropy":
-                    if expected_value and all(p.payload_entropy > 7.0 for p in packets[-5:]):
-                        feature_matches += 1
-
-            # Calculate overall match confidence
-            feature_confidence = feature_matches / total_features if total_features > 0 else 0
-            overall_confidence = (size_similarity + feature_confidence) / 2
-
-            return overall_confidence > signature.confidence_score * 0.7
+                # Apply countermeasures
+                await self._apply_fingerprint_countermeasures(signature)
 
         except Exception as e:
-            logger.error(f"Error matching signature: {e}")
-            return False
-
-    def _calculate_distribution_similarity(self, observed: List[float],
-                                         expected: List[float]) -> float:
-        """Calculate similarity between two distributions"""
-        if not observed or not expected:
-            return 0.0
-
-        try:
-            # Normalize distributions
-            obs_mean = np.mean(observed)
-            exp_mean = np.mean(expected)
-
-            if obs_mean == 0 or exp_mean == 0:
-                return 0.0
-
-            # Simple similarity metric
-            ratio = min(obs_mean / exp_mean, exp_mean / obs_mean)
-            return ratio
-
-        except Exception:
-            return 0.0
+            logger.error(f"Error detecting fingerprinting attempts: {e}")
 
     async def _apply_fingerprint_countermeasures(self, signature: FingerprintSignature):
         """Apply countermeasures against detected fingerprinting"""
@@ -950,7 +1217,12 @@ async def get_analysis_report(self) -> Dict[str, Any]:
                 'timestamp': datetime.now().isoformat(),
                 'analysis_duration_hours': 0,  # Would calculate based on start time
                 'statistics': self.traffic_stats.copy(),
-                'active_sessions': len(self.traffic_sessions),
+                'active_sessions': len(self.flow_table),
+                'top_flows': [
+                    {'session_id': f.session_id, 'total_bytes': f.total_bytes,
+                     'destinations': sorted(f.unique_destinations)}
+                    for f in self.flow_table.top_flows(5)
+                ],
                 'active_camouflage': self.active_camouflage.name if self.active_camouflage else None,
                 'fingerprint_signatures': list(self.fingerprint_database.keys()),
                 'camouflage_profiles': list(self.camouflage_profiles.keys()),
@@ -958,17 +1230,18 @@ async def get_analysis_report(self) -> Dict[str, Any]:
             }
 
             # Add recent packet analysis
-            if self.packet_buffer:
-                recent_packets = list(self.packet_buffer)[-100:]
+            if len(self.packet_buffer):
+                recent_packets = self.packet_buffer.tail(100)
+                protocol_counts = np.bincount(recent_packets['protocol'], minlength=len(PROTOCOL_NAMES))
                 report['recent_analysis'] = {
-                    'packet_count': len(recent_packets),
-                    'total_bytes': sum(p.size for p in recent_packets),
+                    'packet_count': len(recent_packets['size']),
+                    'total_bytes': int(recent_packets['size'].sum()),
                     'protocols': {
-                        'TCP': sum(1 for p in recent_packets if p.protocol == 'TCP'),
-                        'UDP': sum(1 for p in recent_packets if p.protocol == 'UDP'),
-                        'Other': sum(1 for p in recent_packets if p.protocol not in ['TCP', 'UDP'])
+                        'TCP': int(protocol_counts[PROTO_TCP]),
+                        'UDP': int(protocol_counts[PROTO_UDP]),
+                        'Other': int(protocol_counts.sum() - protocol_counts[PROTO_TCP] - protocol_counts[PROTO_UDP])
                     },
-                    'average_entropy': statistics.mean([p.payload_entropy for p in recent_packets]) if recent_packets else 0
+                    'average_entropy': float(recent_packets['entropy'].mean())
                 }
 
             return report
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+AI Dashboard Broadcast Benchmarking
+===================================
+
+Compares the legacy per-request full broadcast with the tick-based delta
+scheduler in SynOSAIDashboard, measuring CPU time and bytes/s with many
+dashboards connected.
+"""
+
+import json
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+PACKAGES_DIR = Path(__file__).resolve().parents[2] / "linux-distribution" / "SynOS-Packages"
+sys.path.insert(0, str(PACKAGES_DIR / "synos-neural-darwinism" / "src"))
+sys.path.insert(0, str(PACKAGES_DIR / "synos-ai-dashboard" / "src"))
+
+from dashboard import AIMetricsCollector, BroadcastScheduler
+
+
+class CountingSocketIO:
+    """Stand-in for SocketIO that only counts what would go on the wire"""
+
+    def __init__(self, clients: int):
+        self.clients = clients
+        self.emits = 0
+        self.bytes = 0
+
+    def emit(self, event, payload, to=None):
+        size = len(json.dumps(payload, default=str))
+        # A room or global emit reaches every client; a sid reaches one
+        recipients = self.clients if to in (None, BroadcastScheduler.ROOM) else 1
+        self.emits += recipients
+        self.bytes += size * recipients
+
+    def sleep(self, seconds):
+        pass
+
+
+class DashboardBroadcastBenchmarker:
+    """Simulates bus traffic and client update requests against both broadcast paths"""
+
+    def __init__(self, clients: int = 200, duration: float = 30.0,
+                 bus_rate: float = 20.0, request_interval: float = 5.0, tick_interval: float = 0.5):
+        self.clients = clients
+        self.duration = duration
+        self.bus_rate = bus_rate
+        self.request_interval = request_interval
+        self.tick_interval = tick_interval
+        self.results = {
+            "timestamp": datetime.now().isoformat(),
+            "test_suite": "AI Dashboard Broadcast",
+            "parameters": {
+                "clients": clients,
+                "simulated_seconds": duration,
+                "bus_messages_per_sec": bus_rate,
+                "client_request_interval_s": request_interval,
+                "tick_interval_s": tick_interval
+            },
+            "benchmarks": {}
+        }
+
+    def _events(self):
+        """Time-ordered (time, kind, client) events for the simulated run"""
+        rng = random.Random(42)
+        events = []
+        t = 0.0
+        while t < self.duration:
+            events.append((t, "bus", None))
+            t += 1.0 / self.bus_rate
+        for client in range(self.clients):
+            t = rng.uniform(0, self.request_interval)
+            while t < self.duration:
+                events.append((t, "request", f"sid-{client}"))
+                t += self.request_interval
+        events.sort(key=lambda e: e[0])
+        return events
+
+    def _feed(self, collector, rng):
+        collector.add_consciousness_state({
+            'awareness_level': round(rng.random(), 2),
+            'neural_activity': round(rng.random(), 2),
+            'learning_rate': 0.5,
+            'system_integration': 0.9
+        })
+        if rng.random() < 0.2:
+            collector.add_security_event({'event_type': 'scan', 'severity': 'low'})
+
+    def _snapshot(self, collector):
+        return {
+            'consciousness': collector.get_latest_consciousness(max_age_seconds=60) or {},
+            'neural': collector.get_neural_activity_summary(),
+            'learning': collector.get_learning_summary(),
+            'security': collector.get_security_summary()
+        }
+
+    def benchmark_legacy(self):
+        """Every bus message and every client request recomputes and emits to all clients"""
+        print("📡 Benchmarking legacy full broadcasts...")
+        rng = random.Random(7)
+        collector = AIMetricsCollector()
+        socketio = CountingSocketIO(self.clients)
+
+        start = time.process_time()
+        for _, kind, _ in self._events():
+            if kind == "bus":
+                self._feed(collector, rng)
+            payload = {**self._snapshot(collector), 'timestamp': datetime.now().isoformat()}
+            socketio.emit('data_update', payload)
+        cpu = time.process_time() - start
+
+        return self._record("legacy", cpu, socketio)
+
+    def benchmark_scheduler(self):
+        """Bus messages mark state dirty; ticks emit one delta, requests are rate-limited"""
+        print("⏱️  Benchmarking delta broadcast scheduler...")
+        rng = random.Random(7)
+        collector = AIMetricsCollector()
+        socketio = CountingSocketIO(self.clients)
+        scheduler = BroadcastScheduler(socketio, lambda: self._snapshot(collector),
+                                       tick_interval=self.tick_interval)
+
+        for client in range(self.clients):
+            scheduler.client_connected(f"sid-{client}")
+
+        start = time.process_time()
+        next_tick = 0.0
+        for t, kind, sid in self._events():
+            while next_tick <= t:
+                scheduler.tick(now=next_tick)
+                next_tick += self.tick_interval
+            if kind == "bus":
+                self._feed(collector, rng)
+                scheduler.mark_dirty()
+            else:
+                scheduler.request_full(sid, now=t)
+        scheduler.tick(now=next_tick)
+        cpu = time.process_time() - start
+
+        result = self._record("scheduler", cpu, socketio)
+        result["scheduler_stats"] = dict(scheduler.stats)
+        return result
+
+    def _record(self, name, cpu, socketio):
+        result = {
+            "cpu_seconds": cpu,
+            "cpu_percent_of_one_core": cpu / self.duration * 100,
+            "messages_delivered": socketio.emits,
+            "bytes_total": socketio.bytes,
+            "bytes_per_sec": socketio.bytes / self.duration
+        }
+        self.results["benchmarks"][name] = result
+        print(f"  CPU: {cpu:.3f}s ({result['cpu_percent_of_one_core']:.1f}% of one core), "
+              f"{result['bytes_per_sec'] / 1024:.1f} KiB/s, {socketio.emits} messages")
+        return result
+
+    def run(self):
+        legacy = self.benchmark_legacy()
+        scheduler = self.benchmark_scheduler()
+
+        self.results["summary"] = {
+            "cpu_reduction_x": legacy["cpu_seconds"] / max(scheduler["cpu_seconds"], 1e-9),
+            "bandwidth_reduction_x": legacy["bytes_total"] / max(scheduler["bytes_total"], 1)
+        }
+        print(f"\n📊 CPU reduction: {self.results['summary']['cpu_reduction_x']:.1f}x, "
+              f"bandwidth reduction: {self.results['summary']['bandwidth_reduction_x']:.1f}x")
+        return self.results
+
+
+def main():
+    benchmarker = DashboardBroadcastBenchmarker(clients=200)
+    results = benchmarker.run()
+
+    output_file = Path(__file__).parent / "dashboard_broadcast_results.json"
+    with open(output_file, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"💾 Results saved to {output_file}")
+
+
+if __name__ == "__main__":
+    main()
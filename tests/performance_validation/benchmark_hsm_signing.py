@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+HSM Signing Benchmarking
+========================
+
+Compares the legacy per-call signing path in TPMManager (key file parsed,
+or tpm2_sign spawned, for every signature) with the batched SigningService,
+measuring signatures per second. The TPM paths run only when a TPM or swtpm
+is reachable (set TPM2TOOLS_TCTI for swtpm); otherwise the software backend
+is measured on its own.
+"""
+
+import asyncio
+import hashlib
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "core" / "security" / "crypto"))
+
+from hsm_manager import HSMKeyType, TPMManager
+
+
+class HSMSigningBenchmarker:
+    """Signs JWT-sized payloads through the legacy and batched paths"""
+
+    def __init__(self, signatures: int = 2000, concurrency: int = 64, legacy_sample: int = 100):
+        self.signatures = signatures
+        self.concurrency = concurrency
+        self.legacy_sample = legacy_sample
+        self.payloads = [f'{{"sub":"user-{i}","iat":{i}}}'.encode() for i in range(signatures)]
+        self.results = {
+            "timestamp": datetime.now().isoformat(),
+            "test_suite": "HSM Signing",
+            "parameters": {"signatures": signatures, "concurrency": concurrency, "legacy_sample": legacy_sample},
+            "benchmarks": {}
+        }
+
+    async def _legacy_software_sign(self, key, data):
+        """Signing as it was: the PEM file is read and parsed for every signature"""
+        with open(key.handle, 'rb') as f:
+            private_key = serialization.load_pem_private_key(f.read(), password=None, backend=default_backend())
+        return private_key.sign(
+            data,
+            padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH),
+            hashes.SHA256()
+        )
+
+    async def _legacy_tpm_sign(self, manager, key, data):
+        """Signing as it was on a TPM: one blocking tpm2_sign per signature"""
+        hash_file = f"{manager.key_storage_path}/temp_hash_{key.key_id}"
+        with open(hash_file, 'wb') as f:
+            f.write(hashlib.sha256(data).digest())
+        subprocess.run(["tpm2_sign", "-c", key.handle, "-g", "sha256", "-o", f"{hash_file}.sig", hash_file],
+                       capture_output=True, check=True, timeout=30)
+        with open(f"{hash_file}.sig", 'rb') as f:
+            return f.read()
+
+    async def _time_sequential(self, sign, count):
+        start = time.perf_counter()
+        for payload in self.payloads[:count]:
+            await sign(payload)
+        return time.perf_counter() - start
+
+    async def _time_concurrent(self, sign, count):
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def one(payload):
+            async with semaphore:
+                await sign(payload)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(payload) for payload in self.payloads[:count]))
+        return time.perf_counter() - start
+
+    async def benchmark_software(self, manager):
+        print("🔑 Benchmarking software signing...")
+        key = await manager.create_key(HSMKeyType.RSA_2048, "bench_jwt", "jwt_signing")
+        service = manager.signing_service
+        count = self.signatures
+
+        # Timed on a sample; parsing the key for every signature is slow
+        self._record("software_legacy", self.legacy_sample,
+                     await self._time_sequential(lambda p: self._legacy_software_sign(key, p), self.legacy_sample))
+        self._record("software_service_sequential", count,
+                     await self._time_sequential(lambda p: manager.sign_data(key, p), count))
+        self._record("software_service_concurrent", count,
+                     await self._time_concurrent(lambda p: manager.sign_data(key, p), count))
+        start = time.perf_counter()
+        await manager.sign_data_batch(key, self.payloads)
+        self._record("software_service_batch", count, time.perf_counter() - start)
+        self.results["benchmarks"]["software_service_concurrent"]["service_stats"] = dict(service.stats)
+
+    async def benchmark_tpm(self, manager):
+        print(f"🔐 Benchmarking TPM signing ({manager.signing_service.backend_name})...")
+        await manager.create_primary_key()
+        key = await manager.create_key(HSMKeyType.RSA_2048, "bench_tpm_jwt", "jwt_signing")
+        count = min(self.signatures, 200)
+
+        self._record("tpm_legacy", self.legacy_sample,
+                     await self._time_sequential(lambda p: self._legacy_tpm_sign(manager, key, p), self.legacy_sample))
+        self._record("tpm_service_concurrent", count,
+                     await self._time_concurrent(lambda p: manager.sign_data(key, p), count))
+
+    def _record(self, name, count, elapsed):
+        result = {
+            "signatures": count,
+            "seconds": elapsed,
+            "signatures_per_sec": count / elapsed
+        }
+        self.results["benchmarks"][name] = result
+        print(f"  {name}: {count} signatures in {elapsed:.2f}s ({result['signatures_per_sec']:.0f}/s)")
+        return result
+
+    async def run(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            manager = TPMManager()
+            manager.key_storage_path = tmp
+            tpm_available = manager.tpm_available
+            try:
+                if tpm_available:
+                    await self.benchmark_tpm(manager)
+                    manager.close()
+                manager.tpm_available = False
+                await self.benchmark_software(manager)
+            finally:
+                manager.close()
+
+        benchmarks = self.results["benchmarks"]
+        self.results["summary"] = {
+            "tpm_available": tpm_available,
+            "software_speedup_x": benchmarks["software_service_concurrent"]["signatures_per_sec"]
+                                  / benchmarks["software_legacy"]["signatures_per_sec"]
+        }
+        if tpm_available:
+            self.results["summary"]["tpm_speedup_x"] = (benchmarks["tpm_service_concurrent"]["signatures_per_sec"]
+                                                        / benchmarks["tpm_legacy"]["signatures_per_sec"])
+        print(f"\n📊 Software speedup: {self.results['summary']['software_speedup_x']:.1f}x"
+              + (f", TPM speedup: {self.results['summary']['tpm_speedup_x']:.1f}x" if tpm_available else
+                 " (no TPM reachable, TPM paths skipped)"))
+        return self.results
+
+
+def main():
+    benchmarker = HSMSigningBenchmarker()
+    results = asyncio.run(benchmarker.run())
+
+    output_file = Path(__file__).parent / "hsm_signing_results.json"
+    with open(output_file, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"💾 Results saved to {output_file}")
+
+
+if __name__ == "__main__":
+    main()
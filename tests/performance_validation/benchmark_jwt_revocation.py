@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+JWT Revocation Benchmarking
+===========================
+
+Compares the legacy in-memory set of revoked jti strings with the
+expiry-bucketed TokenRevocationStore at 10M revocations, measuring token
+verifications per second, memory held and what is left once tokens expire.
+"""
+
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import jwt
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "core" / "security" / "authentication"))
+
+from token_revocation import TokenRevocationStore
+
+SECRET = "benchmark-secret-key-with-at-least-32-chars"
+
+
+class JWTRevocationBenchmarker:
+    """Loads the same revocations into both stores and verifies tokens against them"""
+
+    def __init__(self, revocations: int = 10_000_000, verifications: int = 50_000,
+                 horizon_seconds: int = 86400):
+        self.revocations = revocations
+        self.verifications = verifications
+        self.horizon = horizon_seconds
+        self.now = int(time.time())
+        self.results = {
+            "timestamp": datetime.now().isoformat(),
+            "test_suite": "JWT Revocation",
+            "parameters": {
+                "revocations": revocations,
+                "verifications": verifications,
+                "expiry_horizon_s": horizon_seconds
+            },
+            "benchmarks": {}
+        }
+
+    def _revocation(self, i):
+        return f"revoked-{i:010d}", self.now + 60 + i % self.horizon
+
+    def _tokens(self):
+        """Live tokens to verify; one in a hundred is revoked (and far from expiry)"""
+        tokens = []
+        for i in range(1000):
+            if i % 100 == 0:
+                jti, exp = self._revocation((self.horizon // 2 + i) % self.revocations)
+            else:
+                jti, exp = f"live-{i}", self.now + 3600
+            payload = {"jti": jti, "exp": exp, "iat": self.now, "iss": "syn_os_auth", "aud": "syn_os_api"}
+            tokens.append((jwt.encode(payload, SECRET, algorithm="HS256"), jti, exp))
+        return tokens
+
+    def _verify_loop(self, tokens, is_revoked):
+        revoked = 0
+        start = time.perf_counter()
+        for i in range(self.verifications):
+            token = tokens[i % len(tokens)][0]
+            payload = jwt.decode(token, SECRET, algorithms=["HS256"], audience=["syn_os_api"], issuer="syn_os_auth")
+            revoked += is_revoked(payload["jti"], payload["exp"])
+        return time.perf_counter() - start, revoked
+
+    def _check_loop(self, tokens, is_revoked):
+        start = time.perf_counter()
+        for i in range(self.verifications):
+            _, jti, exp = tokens[i % len(tokens)]
+            is_revoked(jti, exp)
+        return time.perf_counter() - start
+
+    def benchmark_legacy(self, tokens):
+        """A set of jti strings that only ever grows"""
+        print(f"🐢 Loading {self.revocations:,} revocations into the legacy set...")
+        start = time.perf_counter()
+        revoked = set()
+        for i in range(self.revocations):
+            revoked.add(self._revocation(i)[0])
+        load = time.perf_counter() - start
+        size = sys.getsizeof(revoked) + sum(sys.getsizeof(jti) for jti in revoked)
+
+        check = lambda jti, exp: jti in revoked
+        result = self._record("legacy", tokens, check, load, size, len(revoked))
+        # Nothing ever leaves the set, even once every token has expired
+        result["entries_after_expiry"] = len(revoked)
+        return result
+
+    def benchmark_store(self, tokens):
+        """Expiry buckets behind a bloom prefilter"""
+        print(f"⚡ Loading {self.revocations:,} revocations into TokenRevocationStore...")
+        start = time.perf_counter()
+        store = TokenRevocationStore(expected_revocations=self.revocations)
+        for i in range(self.revocations):
+            store.revoke(*self._revocation(i))
+        load = time.perf_counter() - start
+        size = sys.getsizeof(store._bloom.bits) + sum(
+            sys.getsizeof(bucket.frozen) + sys.getsizeof(bucket.pending)
+            + sum(sys.getsizeof(fp) for fp in bucket.pending)
+            for bucket in store._buckets.values()
+        )
+
+        result = self._record("bucketed_store", tokens, store.is_revoked, load, size, len(store))
+        result["stats"] = store.stats()
+        store.purge(self.now + 60 + self.horizon // 2)
+        result["entries_after_half_horizon"] = len(store)
+        store.purge(self.now + 60 + self.horizon + store.bucket_seconds)
+        result["entries_after_expiry"] = len(store)
+        return result
+
+    def _record(self, name, tokens, is_revoked, load, size, entries):
+        verify_seconds, revoked = self._verify_loop(tokens, is_revoked)
+        check_seconds = self._check_loop(tokens, is_revoked)
+        result = {
+            "entries": entries,
+            "load_seconds": load,
+            "memory_mb": size / 2**20,
+            "bytes_per_revocation": size / entries,
+            "verifications_per_sec": self.verifications / verify_seconds,
+            "revocation_checks_per_sec": self.verifications / check_seconds,
+            "revoked_hits": revoked
+        }
+        self.results["benchmarks"][name] = result
+        print(f"  {result['memory_mb']:.0f} MiB ({result['bytes_per_revocation']:.1f} B/revocation), "
+              f"{result['verifications_per_sec']:,.0f} verifications/s, "
+              f"{result['revocation_checks_per_sec']:,.0f} checks/s")
+        return result
+
+    def run(self):
+        tokens = self._tokens()
+        legacy = self.benchmark_legacy(tokens)
+        store = self.benchmark_store(tokens)
+        assert legacy["revoked_hits"] == store["revoked_hits"]
+
+        self.results["summary"] = {
+            "memory_reduction_x": legacy["memory_mb"] / store["memory_mb"],
+            "verification_speedup_x": store["verifications_per_sec"] / legacy["verifications_per_sec"],
+            "entries_after_expiry": {"legacy": legacy["entries_after_expiry"],
+                                     "bucketed_store": store["entries_after_expiry"]}
+        }
+        print(f"\n📊 Memory reduction: {self.results['summary']['memory_reduction_x']:.1f}x, "
+              f"verification speed {self.results['summary']['verification_speedup_x']:.2f}x, "
+              f"{store['entries_after_expiry']} revocations kept after expiry "
+              f"(legacy: {legacy['entries_after_expiry']:,})")
+        return self.results
+
+
+def main():
+    revocations = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    benchmarker = JWTRevocationBenchmarker(revocations=revocations)
+    results = benchmarker.run()
+
+    output_file = Path(__file__).parent / "jwt_revocation_results.json"
+    with open(output_file, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"💾 Results saved to {output_file}")
+
+
+if __name__ == "__main__":
+    main()
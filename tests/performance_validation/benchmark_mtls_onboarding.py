@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+mTLS Onboarding Benchmarking
+============================
+
+Compares the legacy on-loop certificate issuance in MTLSCertificateManager
+(key generated, certificate signed and the whole registry rewritten per
+entity) with pooled key generation and coalesced registry writes, measuring
+entities onboarded per second, the worst event-loop stall during a bulk
+onboarding, and cached certificate verification.
+"""
+
+import asyncio
+import hashlib
+import json
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+from cryptography import x509
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import padding
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "core" / "security" / "network"))
+
+from mtls_certificate_manager import MTLSCertificateManager, _generate_entity_key
+
+
+@dataclass
+class Entity:
+    entity_id: str
+    name: str
+    entity_type: str = "service"
+    ip_addresses: List[str] = field(default_factory=list)
+
+
+class LoopLagProbe:
+    """Ticks every few milliseconds and records the longest late wake-up"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.max_lag = 0.0
+        self._expected = None
+        self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.max_lag = max(self.max_lag, loop.time() - self._expected)
+
+    def __enter__(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    def __exit__(self, *exc):
+        # A loop that never yielded leaves the last tick pending: count it too
+        if self._expected is not None:
+            self.max_lag = max(self.max_lag, asyncio.get_running_loop().time() - self._expected)
+        self._task.cancel()
+
+
+class MTLSOnboardingBenchmarker:
+    """Onboards the same entity burst through the legacy and pooled paths"""
+
+    def __init__(self, entities: int = 100, verifications: int = 5000):
+        self.entities = [Entity(f"svc-{i}", f"Service {i}", ip_addresses=[f"10.1.{i // 256}.{i % 256}"])
+                         for i in range(entities)]
+        self.verifications = verifications
+        self.results = {
+            "timestamp": datetime.now().isoformat(),
+            "test_suite": "mTLS Onboarding",
+            "parameters": {"entities": entities, "verifications": verifications},
+            "benchmarks": {}
+        }
+
+    async def _manager(self, path, **kwargs):
+        manager = MTLSCertificateManager(str(path), **kwargs)
+        await manager.initialize()
+        return manager
+
+    async def _legacy_issue(self, manager, entity):
+        """Issuance as it was: key, signature and registry rewrite all on the loop"""
+        private_pem, public_der = _generate_entity_key(manager.config["entity_key_size"])
+        certificate = manager._build_entity_certificate(entity, public_der)
+        manager._write_entity_files(entity.entity_id, certificate, private_pem)
+        manager.certificate_registry[entity.entity_id] = {
+            "fingerprint": hashlib.sha256(certificate.public_bytes(serialization.Encoding.DER)).hexdigest(),
+            "issued": datetime.utcnow().isoformat(),
+            "expires": certificate.not_valid_after.isoformat(),
+            "entity_type": entity.entity_type,
+            "entity_name": entity.name,
+            "serial_number": str(certificate.serial_number)
+        }
+        with open(manager.cert_base_path / "certificate_registry.json", 'w') as f:
+            json.dump(manager.certificate_registry.to_dict(), f, indent=2)
+
+    async def benchmark_legacy(self, path):
+        print("🐢 Benchmarking legacy on-loop issuance...")
+        manager = await self._manager(path, key_pool_size=0)
+        with LoopLagProbe() as probe:
+            await asyncio.sleep(0)
+            start = time.perf_counter()
+            for entity in self.entities:
+                await self._legacy_issue(manager, entity)
+            elapsed = time.perf_counter() - start
+        return self._record("legacy", elapsed, probe.max_lag), manager
+
+    async def benchmark_pooled(self, path, name, warm: bool):
+        print(f"⚡ Benchmarking pooled issuance ({'pre-warmed' if warm else 'cold'} key pool)...")
+        manager = await self._manager(path, key_pool_size=len(self.entities) if warm else 32)
+        try:
+            if warm:
+                await manager.key_pool.warm()
+            with LoopLagProbe() as probe:
+                await asyncio.sleep(0)
+                start = time.perf_counter()
+                issued = await manager.generate_entity_certificates(self.entities)
+                elapsed = time.perf_counter() - start
+            assert len(issued) == len(self.entities)
+            result = self._record(name, elapsed, probe.max_lag)
+            result["key_pool"] = dict(manager.key_pool.stats)
+        finally:
+            await manager.close()
+        return result
+
+    async def benchmark_verification(self, manager):
+        print("🔍 Benchmarking certificate verification...")
+        pems = []
+        for entity in self.entities[:50]:
+            cert_path, _ = await manager.get_entity_certificate_paths(entity.entity_id)
+            pems.append(Path(cert_path).read_bytes())
+
+        ca_public_key = manager.ca_certificate.public_key()
+        start = time.perf_counter()
+        for i in range(self.verifications):
+            # Verification as it was meant to work: parse and check the signature every call
+            certificate = x509.load_pem_x509_certificate(pems[i % len(pems)])
+            ca_public_key.verify(certificate.signature, certificate.tbs_certificate_bytes,
+                                 padding.PKCS1v15(), certificate.signature_hash_algorithm)
+        legacy = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(self.verifications):
+            await manager.verify_certificate(pems[i % len(pems)])
+        cached = time.perf_counter() - start
+
+        result = {
+            "legacy_verifications_per_sec": self.verifications / legacy,
+            "cached_verifications_per_sec": self.verifications / cached,
+            "cache_stats": manager.get_cache_stats()
+        }
+        self.results["benchmarks"]["verification"] = result
+        print(f"  legacy: {result['legacy_verifications_per_sec']:.0f}/s, "
+              f"cached: {result['cached_verifications_per_sec']:.0f}/s")
+        return result
+
+    def _record(self, name, elapsed, max_lag):
+        result = {
+            "entities": len(self.entities),
+            "seconds": elapsed,
+            "entities_per_sec": len(self.entities) / elapsed,
+            "max_event_loop_stall_ms": max_lag * 1000
+        }
+        self.results["benchmarks"][name] = result
+        print(f"  {len(self.entities)} entities in {elapsed:.2f}s ({result['entities_per_sec']:.1f}/s), "
+              f"worst loop stall {result['max_event_loop_stall_ms']:.0f} ms")
+        return result
+
+    async def run(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            legacy, manager = await self.benchmark_legacy(Path(tmp) / "legacy")
+            verification = await self.benchmark_verification(manager)
+            cold = await self.benchmark_pooled(Path(tmp) / "cold", "pooled_cold", warm=False)
+            warm = await self.benchmark_pooled(Path(tmp) / "warm", "pooled_warm", warm=True)
+
+        self.results["summary"] = {
+            "warm_pool_speedup_x": warm["entities_per_sec"] / legacy["entities_per_sec"],
+            "loop_stall_reduction_x": legacy["max_event_loop_stall_ms"] / max(cold["max_event_loop_stall_ms"], 1e-3),
+            "verification_speedup_x": (verification["cached_verifications_per_sec"]
+                                       / verification["legacy_verifications_per_sec"])
+        }
+        print(f"\n📊 Onboarding speedup with a warm pool: {self.results['summary']['warm_pool_speedup_x']:.1f}x, "
+              f"loop stalls {self.results['summary']['loop_stall_reduction_x']:.0f}x shorter, "
+              f"verification {self.results['summary']['verification_speedup_x']:.1f}x")
+        return self.results
+
+
+def main():
+    benchmarker = MTLSOnboardingBenchmarker()
+    results = asyncio.run(benchmarker.run())
+
+    output_file = Path(__file__).parent / "mtls_onboarding_results.json"
+    with open(output_file, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"💾 Results saved to {output_file}")
+
+
+if __name__ == "__main__":
+    main()
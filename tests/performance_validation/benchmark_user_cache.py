@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+User Cache Benchmarking
+=======================
+
+Compares the legacy UserCache (min() scan over access times on every
+eviction) with the LRUTTLCache-backed UserCache in OptimizedAuthEngine at
+1M users.
+"""
+
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "core" / "security" / "authentication"))
+
+from optimized_auth_engine import UserCache
+
+
+class LegacyUserCache:
+    """UserCache as it was: dict plus access times, O(n) eviction"""
+
+    def __init__(self, max_size: int, ttl_seconds: int = 300):
+        self.cache = {}
+        self.access_times = {}
+        self.max_size = max_size
+        self.ttl = ttl_seconds
+
+    async def get_user(self, username):
+        current_time = time.time()
+        if username in self.cache:
+            if current_time - self.access_times[username] < self.ttl:
+                self.access_times[username] = current_time
+                return self.cache[username]
+            del self.cache[username]
+            del self.access_times[username]
+        return None
+
+    async def set_user(self, username, user_data):
+        current_time = time.time()
+        if len(self.cache) >= self.max_size:
+            oldest_user = min(self.access_times.keys(), key=lambda k: self.access_times[k])
+            del self.cache[oldest_user]
+            del self.access_times[oldest_user]
+        self.cache[username] = user_data
+        self.access_times[username] = current_time
+
+
+class UserCacheBenchmarker:
+    """Fills each cache past capacity and measures set/get/evicting-set throughput"""
+
+    def __init__(self, users: int = 1_000_000, legacy_evictions: int = 20):
+        self.users = users
+        self.legacy_evictions = legacy_evictions
+        self.user_data = {"user_id": "uid", "account_locked": False}
+        self.results = {
+            "timestamp": datetime.now().isoformat(),
+            "test_suite": "User Cache",
+            "parameters": {"users": users},
+            "benchmarks": {}
+        }
+
+    async def _measure(self, cache, evicting_sets: int):
+        start = time.perf_counter()
+        for i in range(self.users):
+            await cache.set_user(f"user_{i:07d}", self.user_data)
+        fill = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(self.users):
+            await cache.get_user(f"user_{i:07d}")
+        get = time.perf_counter() - start
+
+        # Cache is full now, so every new user evicts one
+        start = time.perf_counter()
+        for i in range(evicting_sets):
+            await cache.set_user(f"new_user_{i:07d}", self.user_data)
+        evict = time.perf_counter() - start
+
+        return {
+            "fill_ops_per_sec": self.users / fill,
+            "get_ops_per_sec": self.users / get,
+            "evicting_set_ops_per_sec": evicting_sets / evict,
+            "avg_evicting_set_us": evict / evicting_sets * 1e6
+        }
+
+    def benchmark(self, name, cache, evicting_sets):
+        print(f"{'🐢' if name == 'legacy' else '⚡'} Benchmarking {name} user cache...")
+        result = asyncio.run(self._measure(cache, evicting_sets))
+        self.results["benchmarks"][name] = result
+        print(f"  fill {result['fill_ops_per_sec']:.0f}/s, get {result['get_ops_per_sec']:.0f}/s, "
+              f"evicting set {result['evicting_set_ops_per_sec']:.0f}/s")
+        return result
+
+    def run(self):
+        legacy = self.benchmark("legacy", LegacyUserCache(max_size=self.users), self.legacy_evictions)
+        lru = self.benchmark("lru_ttl", UserCache(max_size=self.users), self.users // 10)
+
+        self.results["summary"] = {
+            "evicting_set_speedup_x": lru["evicting_set_ops_per_sec"] / legacy["evicting_set_ops_per_sec"]
+        }
+        print(f"\n📊 Evicting set speedup at {self.users} users: "
+              f"{self.results['summary']['evicting_set_speedup_x']:.0f}x")
+        return self.results
+
+
+def main():
+    benchmarker = UserCacheBenchmarker()
+    results = benchmarker.run()
+
+    output_file = Path(__file__).parent / "user_cache_results.json"
+    with open(output_file, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"💾 Results saved to {output_file}")
+
+
+if __name__ == "__main__":
+    main()
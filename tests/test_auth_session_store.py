@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test Expiring Auth Session Stores
+=================================
+
+Covers background reaping, the O(1) active-session count and snapshot
+persistence of SessionManager, and front-of-queue reaping in the
+ultra-optimized engine's FastSessionManager.
+"""
+
+import asyncio
+import json
+import os
+import stat
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "core" / "security" / "authentication"))
+
+pytest.importorskip("psutil")
+
+from optimized_auth_engine import AuthRequest, SessionManager
+from ultra_optimized_auth_engine import FastSessionManager
+
+
+def _request():
+    return AuthRequest(username="alice", password="", client_ip="127.0.0.1",
+                       user_agent="pytest", request_id="req", timestamp=time.time())
+
+
+def test_expired_sessions_are_reaped_without_being_read():
+    async def run():
+        manager = SessionManager(session_ttl=1, reap_batch=16)
+        manager.cleanup_interval = 0.2
+        tokens = [await manager.create_session(f"uid_{i}", _request()) for i in range(100)]
+        assert manager.get_active_sessions_count() == 100
+
+        await asyncio.sleep(2.5)
+        # The background reaper emptied the store in batches; nothing was validated
+        assert manager.get_active_sessions_count() == 0
+        assert manager.sessions.stats()["expirations"] == 100
+        assert await manager.validate_session(tokens[0]) == (False, None)
+        await manager.close()
+
+    asyncio.run(run())
+
+
+def test_sessions_survive_restart_via_snapshot(tmp_path):
+    path = str(tmp_path / "sessions.json")
+
+    async def first_run():
+        manager = SessionManager(persist_path=path)
+        token = await manager.create_session("uid_alice", _request())
+        await manager.revoke_session(await manager.create_session("uid_bob", _request()))
+        await manager.close()
+        return token
+
+    token = asyncio.run(first_run())
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+    restarted = SessionManager(persist_path=path)
+    assert restarted.get_active_sessions_count() == 1
+    assert asyncio.run(restarted.validate_session(token)) == (True, "uid_alice")
+
+
+def test_revocation_survives_crash_and_bad_records_are_skipped(tmp_path):
+    path = tmp_path / "sessions.json"
+
+    async def first_run():
+        manager = SessionManager(persist_path=str(path))
+        kept = await manager.create_session("uid_alice", _request())
+        revoked = await manager.create_session("uid_bob", _request())
+        await manager.save()
+        await manager.revoke_session(revoked)
+        # No close(): the process dies here
+        return kept, revoked
+
+    kept, revoked = asyncio.run(first_run())
+    snapshot = json.loads(path.read_text())
+    assert revoked not in snapshot and kept in snapshot
+
+    snapshot["no-expiry"] = {"user_id": "uid_carol"}
+    snapshot["not-a-record"] = None
+    path.write_text(json.dumps(snapshot))
+
+    restarted = SessionManager(persist_path=str(path))
+    assert restarted.get_active_sessions_count() == 1
+    assert asyncio.run(restarted.validate_session(revoked)) == (False, None)
+    assert asyncio.run(restarted.validate_session(kept)) == (True, "uid_alice")
+
+
+def test_fast_session_manager_reaps_oldest_first():
+    manager = FastSessionManager(session_ttl=60, reap_batch=4)
+    tokens = [manager.create_session(f"uid_{i}") for i in range(10)]
+    for token in tokens[:6]:
+        manager.sessions[token]["expires"] = 0
+
+    assert manager.reap_expired() == 4
+    assert manager.get_active_sessions_count() == 4
+    assert manager.validate_session(tokens[0]) is None
+    assert manager.validate_session(tokens[-1]) == "uid_9"
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Test Multi-Process Authentication Workers
+=========================================
+
+Runs AuthWorkerServer with several worker processes on one SO_REUSEPORT
+port and checks that session, revocation and rate-limit state is shared.
+"""
+
+import asyncio
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "core" / "security" / "authentication"))
+
+pytest.importorskip("psutil")
+
+from optimized_auth_engine import (
+    AuthRequest, AuthStateStore, AuthWorkerServer, SharedSessionManager, SQLiteAuthStateStore, _request_client_ip
+)
+
+
+def _users():
+    salt = b"0123456789abcdef"
+    return {
+        "alice": {
+            "user_id": "uid_alice",
+            "username": "alice",
+            "password_hash": hashlib.pbkdf2_hmac("sha256", b"correct horse", salt, 50000),
+            "salt": salt,
+            "login_count": 0,
+            "last_login": None,
+            "account_locked": False
+        }
+    }
+
+
+def test_sqlite_store_shares_state_between_connections(tmp_path):
+    async def run():
+        db_path = str(tmp_path / "state.db")
+        first, second = SQLiteAuthStateStore(db_path), SQLiteAuthStateStore(db_path)
+        try:
+            await first.put_session("token", {"user_id": "uid_1"}, ttl_seconds=60)
+            assert (await second.get_session("token"))["user_id"] == "uid_1"
+            await first.put_session("stale", {"user_id": "uid_2"}, ttl_seconds=-1)
+            assert await second.get_session("stale") is None
+            assert await second.count_sessions() == 1
+
+            await second.revoke("jti-1", ttl_seconds=60)
+            assert await first.is_revoked("jti-1")
+            assert not await first.is_revoked("jti-2")
+
+            allowed = [await (first, second)[i % 2].hit_rate_limit("10.0.0.1", limit=10) for i in range(15)]
+            assert allowed.count(True) == 10 and allowed[-1] is False
+        finally:
+            await first.close()
+            await second.close()
+
+    asyncio.run(run())
+
+
+def test_sqlite_store_purge_keeps_live_windows_of_any_length(tmp_path):
+    async def run():
+        store = SQLiteAuthStateStore(str(tmp_path / "state.db"), purge_interval=0)
+        try:
+            # Every call purges; a 10-minute window must survive it
+            allowed = [await store.hit_rate_limit("10.0.0.1", limit=3, window_seconds=600) for _ in range(5)]
+            assert allowed == [True, True, True, False, False]
+        finally:
+            await store.close()
+
+    asyncio.run(run())
+    with pytest.raises(TypeError):
+        AuthStateStore()
+
+
+def test_revoked_session_stays_invalid_if_re_put(tmp_path):
+    async def run():
+        store = SQLiteAuthStateStore(str(tmp_path / "state.db"))
+        manager = SharedSessionManager(store)
+        try:
+            request = AuthRequest(username="alice", password="", client_ip="10.0.0.1",
+                                  user_agent="pytest", request_id="req", timestamp=0)
+            token = await manager.create_session("uid_alice", request)
+            assert await manager.validate_session(token) == (True, "uid_alice")
+
+            await manager.revoke_session(token)
+            # e.g. a worker that read the session before the revoke writes it back
+            await store.put_session(token, {"user_id": "uid_alice"}, ttl_seconds=60)
+            assert await manager.validate_session(token) == (False, None)
+        finally:
+            await manager.close()
+
+    asyncio.run(run())
+
+
+def test_client_ip_is_only_trusted_from_proxies():
+    request = {"client_ip": "203.0.113.9"}
+    assert _request_client_ip(request, "127.0.0.1", frozenset()) == "127.0.0.1"
+    assert _request_client_ip(request, "10.0.0.2", frozenset({"10.0.0.1"})) == "10.0.0.2"
+    assert _request_client_ip(request, "10.0.0.1", frozenset({"10.0.0.1"})) == "203.0.113.9"
+    assert _request_client_ip({}, "10.0.0.1", frozenset({"10.0.0.1"})) == "10.0.0.1"
+
+
+def test_spoofed_client_ip_does_not_bypass_rate_limit(tmp_path):
+    server = AuthWorkerServer(_users(), f"sqlite://{tmp_path / 'state.db'}", workers=1, rate_limit_per_minute=3)
+    port = server.start()
+
+    async def run():
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        results = []
+        for i in range(5):
+            request = {"op": "authenticate", "username": "alice", "password": "wrong",
+                       "client_ip": f"198.51.100.{i}"}
+            writer.write(json.dumps(request).encode() + b"\n")
+            await writer.drain()
+            results.append(json.loads(await reader.readline())["result"])
+        writer.close()
+        return results
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        server.stop()
+    assert results == ["invalid_credentials"] * 3 + ["rate_limited"] * 2
+
+
+def test_workers_share_sessions_and_revocations(tmp_path):
+    server = AuthWorkerServer(_users(), f"sqlite://{tmp_path / 'state.db'}", workers=2)
+    port = server.start()
+
+    async def call(payload):
+        # A new connection per call so requests land on different workers
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(json.dumps(payload).encode() + b"\n")
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        writer.close()
+        return response
+
+    async def run():
+        denied = await call({"op": "authenticate", "username": "alice", "password": "wrong"})
+        assert denied["result"] == "invalid_credentials"
+
+        auth = await call({"op": "authenticate", "username": "alice", "password": "correct horse"})
+        assert auth["result"] == "success"
+        token = auth["session_token"]
+
+        checks = [await call({"op": "validate_session", "session_token": token}) for _ in range(8)]
+        assert all(check == {"valid": True, "user_id": "uid_alice"} for check in checks)
+
+        assert await call({"op": "revoke_session", "session_token": token}) == {"revoked": True}
+        checks = [await call({"op": "validate_session", "session_token": token}) for _ in range(8)]
+        assert not any(check["valid"] for check in checks)
+
+        assert "error" in await call({"op": "unknown"})
+
+    try:
+        asyncio.run(run())
+    finally:
+        server.stop()
+    assert server.processes == []
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Test CVE Database
+=================
+
+version_key ordering and CVEDatabase interval lookups over a small NVD 2.0
+feed: inclusive and exclusive bounds, exact CPE versions, open-ended ranges,
+product aliases, batch lookups and feed re-import rules.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "linux-distribution" / "SynOS-Packages"
+                       / "synos-security-orchestrator" / "src"))
+
+from intelligent_vuln_scanner import CVEDatabase, version_key
+
+
+def _cve(cve_id, score, matches, last_modified="2024-01-01T00:00:00.000"):
+    return {'cve': {
+        'id': cve_id,
+        'lastModified': last_modified,
+        'descriptions': [{'lang': 'en', 'value': f"{cve_id} description"}],
+        'metrics': {'cvssMetricV31': [{'cvssData': {'baseScore': score}}]},
+        'configurations': [{'nodes': [{'cpeMatch': [dict(vulnerable=True, **m) for m in matches]}]}],
+    }}
+
+
+def _write_feed(path, vulnerabilities):
+    path.write_text(json.dumps({'vulnerabilities': vulnerabilities}))
+    return str(path)
+
+
+@pytest.fixture
+def cve_db(tmp_path):
+    db = CVEDatabase(str(tmp_path / "cve.db"))
+    db.import_feed(_write_feed(tmp_path / "nvdcve-2.0.json", [
+        # [2.4.0, 2.4.50)
+        _cve("CVE-A", 7.5, [{'criteria': 'cpe:2.3:a:apache:http_server:*:*:*:*:*:*:*:*',
+                             'versionStartIncluding': '2.4.0', 'versionEndExcluding': '2.4.50'}]),
+        # (1.9, 1.10]
+        _cve("CVE-B", 5.0, [{'criteria': 'cpe:2.3:a:example:widget:*:*:*:*:*:*:*:*',
+                             'versionStartExcluding': '1.9', 'versionEndIncluding': '1.10'}]),
+        # exactly 7.4p1
+        _cve("CVE-C", 9.8, [{'criteria': 'cpe:2.3:a:openbsd:openssh:7.4p1:*:*:*:*:*:*:*'}]),
+        # everything before 3.0 final, release candidates included
+        _cve("CVE-D", 4.3, [{'criteria': 'cpe:2.3:a:example:widget:*:*:*:*:*:*:*:*',
+                             'versionEndExcluding': '3.0'}]),
+    ]))
+    return db
+
+
+@pytest.mark.parametrize("older, newer", [
+    ("1.9", "1.10"),
+    ("1.10", "1.10.1"),
+    ("2.4.9", "2.4.49"),
+    ("1.0-rc1", "1.0"),
+    ("1.0rc1", "1.0rc2"),
+    ("1.0beta2", "1.0rc1"),
+    ("0.9", "1.0-rc1"),
+    ("7.4", "7.4p1"),
+    ("7.4p1", "7.5"),
+    ("1.0.2", "1.0.2a"),
+])
+def test_version_key_ordering(older, newer):
+    assert version_key(older) < version_key(newer)
+
+
+def test_version_key_normalization():
+    assert version_key("1.0") == version_key("1") == version_key("1.0.0")
+    assert version_key("1.0.rc1") == version_key("1.0-rc1")
+    # nmap distro suffixes are ignored
+    assert version_key("7.4p1 Debian 10+deb9u7") == version_key("7.4p1")
+    assert version_key("") == ""
+
+
+def _ids(records):
+    return [r.cve_id for r in records]
+
+
+def test_interval_bounds(cve_db):
+    # Inclusive start, exclusive end
+    assert _ids(cve_db.lookup("apache httpd", "2.4.0")) == ["CVE-A"]
+    assert _ids(cve_db.lookup("apache httpd", "2.4.49")) == ["CVE-A"]
+    assert _ids(cve_db.lookup("apache httpd", "2.4.50")) == []
+    assert _ids(cve_db.lookup("apache httpd", "2.3.9")) == []
+
+    # Exclusive start, inclusive end; "1.10" sorts after "1.9"
+    assert _ids(cve_db.lookup("widget", "1.9")) == ["CVE-D"]
+    assert _ids(cve_db.lookup("widget", "1.9.1")) == ["CVE-B", "CVE-D"]
+    assert _ids(cve_db.lookup("widget", "1.10")) == ["CVE-B", "CVE-D"]
+    assert _ids(cve_db.lookup("widget", "1.10.1")) == ["CVE-D"]
+
+    # A release candidate precedes its final release
+    assert _ids(cve_db.lookup("widget", "3.0-rc2")) == ["CVE-D"]
+    assert _ids(cve_db.lookup("widget", "3.0")) == []
+
+
+def test_exact_version_and_alias(cve_db):
+    assert _ids(cve_db.lookup("OpenSSH", "7.4p1 Debian 10+deb9u7")) == ["CVE-C"]
+    assert _ids(cve_db.lookup("OpenSSH", "7.4")) == []
+    assert _ids(cve_db.lookup("OpenSSH", "")) == []
+
+
+def test_lookup_many_matches_single_lookups_and_caches(cve_db):
+    services = [("apache httpd", "2.4.49"), ("widget", "1.10"), ("OpenSSH", "7.4p1"), ("unknown", "1.0")]
+    batch = cve_db.lookup_many(services)
+    assert [_ids(r) for r in batch] == [["CVE-A"], ["CVE-B", "CVE-D"], ["CVE-C"], []]
+
+    hits = cve_db.stats['cache_hits']
+    assert [_ids(cve_db.lookup(s, v)) for s, v in services] == [_ids(r) for r in batch]
+    assert cve_db.stats['cache_hits'] == hits + len(services)
+
+
+def test_feed_reimport_rules(cve_db, tmp_path):
+    feed = tmp_path / "nvdcve-2.0.json"
+    assert cve_db.import_feed(str(feed)) == {'updated': 0, 'skipped': 0, 'unchanged_feed': 1}
+
+    # A newer lastModified replaces the CVE's ranges; older records are skipped
+    _write_feed(feed, [
+        _cve("CVE-A", 7.5, [{'criteria': 'cpe:2.3:a:apache:http_server:2.4.50:*:*:*:*:*:*:*'}],
+             last_modified="2024-06-01T00:00:00.000"),
+        _cve("CVE-C", 9.8, [{'criteria': 'cpe:2.3:a:openbsd:openssh:7.5:*:*:*:*:*:*:*'}],
+             last_modified="2023-01-01T00:00:00.000"),
+    ])
+    assert cve_db.import_feed(str(feed)) == {'updated': 1, 'skipped': 1, 'unchanged_feed': 0}
+    assert _ids(cve_db.lookup("apache httpd", "2.4.49")) == []
+    assert _ids(cve_db.lookup("apache httpd", "2.4.50")) == ["CVE-A"]
+    assert _ids(cve_db.lookup("OpenSSH", "7.4p1")) == ["CVE-C"]
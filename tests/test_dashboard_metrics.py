@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test AI Dashboard Metrics
+=========================
+
+History window clamping in AIMetricsCollector and snapshot freshness in
+the tick-based BroadcastScheduler.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+PACKAGES_DIR = Path(__file__).resolve().parents[1] / "linux-distribution" / "SynOS-Packages"
+sys.path.insert(0, str(PACKAGES_DIR / "synos-neural-darwinism" / "src"))
+sys.path.insert(0, str(PACKAGES_DIR / "synos-ai-dashboard" / "src"))
+
+pytest.importorskip("numpy")
+
+from dashboard import AIMetricsCollector, BroadcastScheduler
+
+
+def test_history_window_is_clamped_to_retained_span(monkeypatch):
+    collector = AIMetricsCollector(max_history_points=10)
+    assert collector.clamp_history_minutes(60) == 1
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now - 30 * 60)
+    collector.add_consciousness_state({'awareness_level': 0.5})
+    monkeypatch.setattr(time, "time", lambda: now)
+    collector.add_consciousness_state({'awareness_level': 0.6})
+
+    assert collector.clamp_history_minutes(10_000) == 31
+    assert collector.clamp_history_minutes(5) == 5
+    assert collector.clamp_history_minutes(-3) == 1
+    assert len(collector.get_recent_consciousness_data(collector.clamp_history_minutes(10_000))) == 2
+
+
+class RecordingSocketIO:
+    def __init__(self):
+        self.emitted = []
+
+    def emit(self, event, payload, to=None):
+        self.emitted.append((event, payload, to))
+
+
+def test_stale_snapshot_is_rebuilt_while_the_bus_is_quiet():
+    state = {'consciousness': {'awareness_level': 0.9}}
+    socketio = RecordingSocketIO()
+    scheduler = BroadcastScheduler(socketio, lambda: dict(state), max_snapshot_age=5.0)
+
+    scheduler.tick(now=0.0)
+    assert scheduler.stats['snapshots_built'] == 1
+
+    # The reading ages out of get_latest_consciousness() without any bus message
+    state['consciousness'] = {}
+    scheduler.tick(now=1.0)
+    assert scheduler.snapshot['consciousness'] == {'awareness_level': 0.9}
+    scheduler.tick(now=5.5)
+    assert scheduler.snapshot['consciousness'] == {}
+    assert scheduler.stats['snapshots_expired'] == 1
+
+    scheduler.client_connected('late')
+    scheduler.tick(now=6.0)
+    event, payload, to = socketio.emitted[-1]
+    assert (event, to) == ('data_update', 'late')
+    assert payload['consciousness'] == {}
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Test LLM Evidence Correlator
+============================
+
+The persistent LLM analysis cache of EvidenceCorrelationEngine and the
+union-find cluster tracker behind incremental cluster detection.
+"""
+
+import asyncio
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "linux-distribution" / "SynOS-Packages"
+                       / "synos-security-orchestrator" / "src"))
+
+for module in ("networkx", "pandas", "sklearn", "openai"):
+    pytest.importorskip(module)
+
+from llm_evidence_correlator import (EvidenceCorrelationEngine, EvidenceItem, EvidenceType,
+                                    IncrementalClusterTracker)
+
+
+def _evidence(evidence_id, content):
+    return EvidenceItem(id=evidence_id, name=f"{evidence_id}.log", type=EvidenceType.SYSTEM_LOG,
+                        content=content, metadata={}, timestamp=datetime(2024, 1, 1, 12, 0))
+
+
+def _cached_rows(db_path):
+    import sqlite3
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM llm_analysis_cache").fetchone()[0]
+
+
+def test_only_real_llm_answers_are_cached_under_an_order_independent_key(tmp_path):
+    db_path = tmp_path / "correlation.db"
+    a, b = _evidence("ev-a", "ssh login from 10.0.0.5"), _evidence("ev-b", "sudo su from 10.0.0.5")
+
+    async def run():
+        engine = EvidenceCorrelationEngine(db_path=str(db_path))
+
+        # No API client: heuristic verdicts are returned but never stored
+        fallback = await engine._analyze_pair_cached(a, b)
+        assert fallback["analysis_source"] == "heuristic"
+        assert _cached_rows(db_path) == 0 and not engine.analysis_cache
+
+        calls = []
+
+        async def fake_llm(prompt):
+            calls.append(prompt)
+            return json.dumps({"correlation_type": "causal", "confidence_score": 0.9})
+
+        engine.llm_analyzer.client = object()
+        engine.llm_analyzer._call_llm = fake_llm
+        first = await engine._analyze_pair_cached(a, b)
+        second = await engine._analyze_pair_cached(b, a)
+        assert first == second and first["analysis_source"] == "llm"
+        assert len(calls) == 1
+        assert _cached_rows(db_path) == 1
+
+        # API errors fall back to the heuristic, which is not cached either
+        async def failing_llm(prompt):
+            raise RuntimeError("rate limited")
+
+        engine.llm_analyzer._call_llm = failing_llm
+        c = _evidence("ev-c", "cron job added")
+        assert (await engine._analyze_pair_cached(a, c))["analysis_source"] == "heuristic"
+        assert _cached_rows(db_path) == 1
+
+        # A fresh engine reads the stored answer back in either order
+        restarted = EvidenceCorrelationEngine(db_path=str(db_path))
+        restarted.llm_analyzer._call_llm = failing_llm
+        assert (await restarted._analyze_pair_cached(b, a))["correlation_type"] == "causal"
+
+    asyncio.run(run())
+
+
+def test_directed_answers_follow_the_analyzed_order_and_memory_cache_is_bounded(tmp_path):
+    async def run():
+        engine = EvidenceCorrelationEngine(db_path=str(tmp_path / "correlation.db"),
+                                           analysis_cache_size=2)
+        prompts = []
+
+        async def fake_llm(prompt):
+            prompts.append(prompt)
+            return json.dumps({"correlation_type": "causal", "confidence_score": 0.9})
+
+        engine.llm_analyzer.client = object()
+        engine.llm_analyzer._call_llm = fake_llm
+        for evidence_id in ("ev-a", "ev-b", "ev-c", "ev-d"):
+            engine.evidence_items[evidence_id] = _evidence(evidence_id, f"{evidence_id} content")
+
+        # Asked in reverse, the "ev-a causes ev-b" answer still points from ev-a to ev-b
+        correlation = await engine.correlate_evidence("ev-b", "ev-a")
+        assert prompts[0].index("ev-a.log") < prompts[0].index("ev-b.log")
+        assert (correlation.source_evidence, correlation.target_evidence) == ("ev-a", "ev-b")
+
+        await engine.correlate_evidence("ev-a", "ev-c")
+        await engine.correlate_evidence("ev-a", "ev-d")
+        assert len(engine.analysis_cache) == 2
+        assert not any(key.startswith("ev-a:") and "|ev-b:" in key for key in engine.analysis_cache)
+
+        # The evicted answer is still read back from the database
+        await engine.correlate_evidence("ev-a", "ev-b")
+        assert len(prompts) == 3
+
+    asyncio.run(run())
+
+
+def _cluster_rows(db_path):
+    import sqlite3
+    with sqlite3.connect(db_path) as conn:
+        return dict(conn.execute("SELECT id, evidence_items FROM evidence_clusters").fetchall())
+
+
+def test_cluster_rows_survive_restarts_and_retired_clusters_are_deleted(tmp_path):
+    db_path = tmp_path / "correlation.db"
+
+    async def fake_llm(prompt):
+        return json.dumps({"correlation_type": "behavioral", "confidence_score": 0.9})
+
+    async def engine_with(evidence_ids):
+        engine = EvidenceCorrelationEngine(db_path=str(db_path))
+        engine.llm_analyzer.client = object()
+        engine.llm_analyzer._call_llm = fake_llm
+        for evidence_id in evidence_ids:
+            engine.evidence_items[evidence_id] = _evidence(evidence_id, f"{evidence_id} content")
+        return engine
+
+    async def connect_all(engine, evidence_ids):
+        for i, first in enumerate(evidence_ids):
+            for second in evidence_ids[i + 1:]:
+                await engine.correlate_evidence(first, second)
+
+    async def run():
+        engine = await engine_with("abc")
+        await connect_all(engine, "abc")
+        [first] = await engine.detect_evidence_clusters()
+
+        # A restarted engine numbers its clusters without overwriting earlier rows
+        restarted = await engine_with("xyzpqr")
+        await connect_all(restarted, "xyz")
+        await connect_all(restarted, "pqr")
+        second, third = await restarted.detect_evidence_clusters()
+        rows = _cluster_rows(db_path)
+        assert len({first.id, second.id, third.id}) == 3
+        assert json.loads(rows[first.id]) == ["a", "b", "c"]
+
+        # Merging two clusters keeps one id and deletes the other's row
+        await connect_all(restarted, "xyzpqr")
+        [merged] = await restarted.detect_evidence_clusters()
+        assert merged.id in (second.id, third.id)
+        assert set(_cluster_rows(db_path)) == {first.id, merged.id}
+
+    asyncio.run(run())
+
+
+def test_union_find_merges_components_and_reports_only_changed_ones():
+    tracker = IncrementalClusterTracker()
+    tracker.add_edge("a", "b")
+    tracker.add_edge("c", "d")
+    assert sorted(map(sorted, tracker.take_dirty_components())) == [["a", "b"], ["c", "d"]]
+    assert tracker.take_dirty_components() == []
+
+    tracker.add_edge("e", "f")
+    assert tracker.take_dirty_components() == [{"e", "f"}]
+
+    # Bridging two components leaves one root holding every member
+    tracker.add_edge("b", "c")
+    assert tracker.find("a") == tracker.find("d")
+    assert tracker.find("a") != tracker.find("e")
+    assert tracker.take_dirty_components() == [{"a", "b", "c", "d"}]
+    assert len(tracker.members) == 2
+
+    # Edges inside an existing component still mark it for re-detection
+    tracker.add_edge("a", "d")
+    assert tracker.take_dirty_components() == [{"a", "b", "c", "d"}]
+
+
+def test_cluster_ids_are_stable_across_increments():
+    tracker = IncrementalClusterTracker(min_overlap=0.5)
+    [(first_id, _)] = tracker.assign_ids(set(), [{"a", "b", "c"}])
+    [(second_id, _)] = tracker.assign_ids(set(), [{"x", "y", "z"}])
+    assert first_id != second_id
+
+    # Growing a cluster keeps its id
+    [(grown_id, members)] = tracker.assign_ids({first_id}, [{"a", "b", "c", "d"}])
+    assert grown_id == first_id and members == {"a", "b", "c", "d"}
+    assert tracker.node_cluster["d"] == first_id
+
+    # On a split, the larger overlap keeps the id and the remainder gets a fresh one
+    split = dict((frozenset(c), i) for i, c in tracker.assign_ids({first_id}, [{"a", "b", "c"}, {"d"}]))
+    assert split[frozenset({"a", "b", "c"})] == first_id
+    assert split[frozenset({"d"})] not in (first_id, second_id)
+
+    # Merging two clusters keeps exactly one of the old ids and retires the other
+    merged = tracker.assign_ids({first_id, second_id}, [{"a", "b", "c", "x", "y", "z"}])
+    assert len(merged) == 1 and merged[0][0] in (first_id, second_id)
+    assert len({first_id, second_id} & set(tracker.cluster_members)) == 1
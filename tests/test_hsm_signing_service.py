@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Test HSM Signing Service
+========================
+
+Batched signing on the worker thread with the software backend, and the
+fallback from a failing TPM backend.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "core" / "security" / "crypto"))
+
+pytest.importorskip("cryptography")
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding
+
+from hsm_manager import HSMKey, HSMKeyType, SigningBackend, SigningService, TPMManager
+
+
+def _verify(key, message, signature):
+    public_key = serialization.load_pem_public_key(key.public_key)
+    public_key.verify(signature, message,
+                      padding.PSS(mgf=padding.MGF1(hashes.SHA256()), salt_length=padding.PSS.MAX_LENGTH),
+                      hashes.SHA256())
+
+
+class FailingTPMBackend(SigningBackend):
+    name = "failing"
+
+    def sign_batch(self, key, messages):
+        raise RuntimeError("TPM went away")
+
+
+def test_signing_backend_requires_sign_batch():
+    with pytest.raises(TypeError):
+        SigningBackend()
+
+    class Incomplete(SigningBackend):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_concurrent_requests_are_batched(tmp_path):
+    async def run():
+        manager = TPMManager(signing_batch_size=16)
+        manager.tpm_available = False
+        manager.key_storage_path = str(tmp_path)
+        key = await manager.create_key(HSMKeyType.RSA_2048, "jwt", "jwt_signing")
+        try:
+            messages = [f"payload-{i}".encode() for i in range(40)]
+            signatures = await asyncio.gather(*(manager.sign_data(key, m) for m in messages))
+            signatures += await manager.sign_data_batch(key, [b"a", b"b"])
+            stats = manager.signing_service.stats
+        finally:
+            manager.close()
+
+        for message, signature in zip(messages + [b"a", b"b"], signatures):
+            _verify(key, message, signature)
+        assert stats["requests"] == 41
+        assert stats["batches"] < 41
+        assert stats["software_signatures"] == 42
+
+    asyncio.run(run())
+
+
+def test_tpm_failure_falls_back_to_software_key(tmp_path):
+    async def run():
+        manager = TPMManager()
+        manager.tpm_available = False
+        manager.key_storage_path = str(tmp_path)
+        software_key = await manager.create_key(HSMKeyType.RSA_2048, "api", "api_signing")
+        # A TPM-looking handle that the software fallback can still read
+        key = HSMKey(key_id="api", key_type=HSMKeyType.RSA_2048,
+                     handle=software_key.handle.replace("_software", ""), public_key=software_key.public_key)
+        Path(key.handle).write_bytes(Path(software_key.handle).read_bytes())
+
+        service = SigningService(FailingTPMBackend())
+        try:
+            signature = await service.sign(key, b"payload")
+            with pytest.raises(ValueError):
+                await service.sign(HSMKey("aes", HSMKeyType.AES_256, handle="x_software.key"), b"payload")
+        finally:
+            service.close()
+
+        _verify(key, b"payload", signature)
+        assert service.stats["tpm_fallbacks"] == 1
+        assert service.stats["software_signatures"] == 1
+
+    asyncio.run(run())
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test JWT Verified Token Cache
+=============================
+
+VerifiedTokenCache bounds, expiry and metrics, and SecureJWTManager's cached
+verify_token path: hits, invalidation on revocation (local and through the
+shared revocation log) and key rotation.
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("jwt")
+pytest.importorskip("bcrypt")
+pytest.importorskip("cryptography")
+
+SECURITY_DIR = Path(__file__).resolve().parents[1] / "core" / "security"
+sys.path.insert(0, str(SECURITY_DIR))
+
+# jwt_auth builds a module-level manager from the environment on import
+for name in ("JWT_SECRET_KEY", "ENCRYPTION_KEY", "SIGNING_KEY"):
+    os.environ.setdefault(name, "t" * 48)
+
+# jwt_auth imports its configuration as a sibling module; it lives in access_control
+from access_control import config_manager
+sys.modules.setdefault("authentication.config_manager", config_manager)
+
+from access_control.config_manager import SecurityConfig
+from authentication.jwt_auth import (
+    JWTSecurityError, SecureJWTManager, TokenClaims, TokenType, VerifiedTokenCache
+)
+
+SECRET = "s" * 48
+
+
+def _manager(tmp_path, algorithm="HS256", **kwargs):
+    config = SecurityConfig(jwt_secret_key=SECRET, jwt_algorithm=algorithm)
+    return SecureJWTManager(config, revocation_log_path=str(tmp_path / "revoked.log"), **kwargs)
+
+
+def _claims(jti, expires_at):
+    return TokenClaims(user_id="uid", username="alice", roles=[], token_type="access",
+                       issued_at=0, expires_at=expires_at, jti=jti)
+
+
+def test_cache_is_bounded_lru_and_expires():
+    now = time.time()
+    cache = VerifiedTokenCache(max_size=2, ttl=60)
+    keys = [VerifiedTokenCache.key(f"token-{i}") for i in range(3)]
+    cache.put(keys[0], _claims("a", now + 3600), now=now)
+    cache.put(keys[1], _claims("b", now + 10), now=now)
+    assert cache.get(keys[0], now=now).jti == "a"  # keys[1] is now least recent
+    cache.put(keys[2], _claims("c", now + 3600), now=now)
+    assert cache.get(keys[1], now=now) is None
+    assert cache.evictions == 1
+
+    # Entries live until the token's exp or the ttl, whichever comes first
+    cache.put(keys[1], _claims("b", now + 10), now=now)
+    assert cache.get(keys[1], now=now + 11) is None
+    assert cache.get(keys[0], now=now + 61) is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 3
+    assert stats["hit_rate"] == 0.25
+
+
+def test_invalidate_and_clear():
+    cache = VerifiedTokenCache()
+    key = VerifiedTokenCache.key("token")
+    cache.put(key, _claims("jti-1", time.time() + 3600))
+    assert cache.invalidate_jti("jti-1")
+    assert not cache.invalidate_jti("jti-1")
+    assert cache.get(key) is None
+
+    cache.put(key, _claims("jti-2", time.time() + 3600))
+    cache.clear()
+    assert len(cache) == 0 and cache.stats()["invalidations"] == 2
+
+
+def test_verify_token_hits_cache_and_checks_type(tmp_path):
+    manager = _manager(tmp_path)
+    token = manager.create_access_token("uid_alice", "alice", ["user"])
+
+    first = manager.verify_token(token)
+    second = manager.verify_token(token, TokenType.ACCESS)
+    assert second is first
+    stats = manager.get_token_cache_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["size"] == 1
+
+    # The token type is still enforced on a cache hit
+    with pytest.raises(JWTSecurityError, match="Invalid token type"):
+        manager.verify_token(token, TokenType.REFRESH)
+
+
+def test_revocation_invalidates_cached_tokens(tmp_path):
+    manager = _manager(tmp_path)
+    other_worker = _manager(tmp_path)
+    other_worker.revoked_tokens.sync_interval = 0
+    token = manager.create_access_token("uid_alice", "alice", ["user"])
+    other_token = manager.create_access_token("uid_bob", "bob", ["user"])
+    for m in (manager, other_worker):
+        m.verify_token(token)
+        m.verify_token(other_token)
+
+    assert manager.revoke_token(token)
+    assert manager.get_token_cache_stats()["invalidations"] == 1
+    with pytest.raises(JWTSecurityError, match="revoked"):
+        manager.verify_token(token)
+
+    # Another process sharing the revocation log rejects its cached copy too
+    with pytest.raises(JWTSecurityError, match="revoked"):
+        other_worker.verify_token(token)
+    assert other_worker.verify_token(other_token).username == "bob"
+
+
+def test_rotate_keys_invalidates_old_tokens(tmp_path):
+    manager = _manager(tmp_path)
+    token = manager.create_access_token("uid_alice", "alice", ["user"])
+    manager.verify_token(token)
+
+    # HS* tokens are signed with the secret: rotating without a new one is refused
+    with pytest.raises(JWTSecurityError, match="secret_key"):
+        manager.rotate_keys()
+    with pytest.raises(JWTSecurityError, match="differ"):
+        manager.rotate_keys(SECRET)
+    assert manager.verify_token(token).username == "alice"
+
+    manager.rotate_keys("n" * 48)
+    assert len(manager.token_cache) == 0
+    with pytest.raises(JWTSecurityError, match="Invalid token"):
+        manager.verify_token(token)
+    assert manager.verify_token(manager.create_access_token("uid_alice", "alice", [])).username == "alice"
+
+
+def test_rotate_keys_rs256_generates_new_key_pair(tmp_path):
+    manager = _manager(tmp_path, algorithm="RS256")
+    token = manager.create_access_token("uid_alice", "alice", ["user"])
+    manager.verify_token(token)
+
+    manager.rotate_keys()
+    with pytest.raises(JWTSecurityError, match="Invalid token"):
+        manager.verify_token(token)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test LRU TTL Cache
+==================
+
+LRUTTLCache recency order, per-entry TTL and timer-wheel expiry, byte-bounded
+eviction and hit/miss metrics, plus background reaping started by
+OptimizedAuthEngine for its user cache and rate-limit windows.
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "core" / "security" / "authentication"))
+
+pytest.importorskip("psutil")
+
+from optimized_auth_engine import AuthRequest, LRUTTLCache, OptimizedAuthEngine
+
+
+def test_evicts_least_recently_used():
+    cache = LRUTTLCache(max_size=3)
+    for key in "abc":
+        cache.set(key, key.upper())
+    assert cache.get("a") == "A"  # a becomes most recent
+    cache.set("d", "D")
+
+    assert "b" not in cache
+    assert [key for key, _ in cache.items()] == ["c", "a", "d"]
+    assert cache.evictions == 1
+
+
+def test_entries_expire_by_ttl_without_being_read():
+    now = time.time()
+    cache = LRUTTLCache(default_ttl=5)
+    cache.set("short", 1, ttl=2, now=now)
+    cache.set("default", 2, now=now)
+    cache.set("long", 3, ttl=60, now=now)
+
+    assert cache.get("short", now=now + 1) == 1
+    assert cache.get("short", now=now + 3) is None
+    # The wheel drops due entries on any later call, read or not
+    assert cache.expire(now=now + 10) == 1
+    assert [key for key, _ in cache.items()] == ["long"]
+    assert cache.expirations == 2
+
+
+def test_entries_without_ttl_never_expire():
+    now = time.time()
+    cache = LRUTTLCache()
+    cache.set("forever", 1, now=now)
+    cache.expire(now=now + 86400)
+    assert cache.get("forever", now=now + 86400) == 1
+
+
+def test_refresh_on_get_extends_ttl():
+    now = time.time()
+    cache = LRUTTLCache(default_ttl=5, refresh_on_get=True)
+    cache.set("user", "alice", now=now)
+    assert cache.get("user", now=now + 4) == "alice"
+    assert cache.get("user", now=now + 8) == "alice"
+    assert cache.get("user", now=now + 14) is None
+
+
+def test_reap_batch_spreads_expiry_over_calls():
+    now = time.time()
+    cache = LRUTTLCache(default_ttl=1, reap_batch=10)
+    for i in range(25):
+        cache.set(i, i, now=now)
+
+    assert [cache.expire(now=now + 5) for _ in range(4)] == [10, 10, 5, 0]
+    assert len(cache) == 0
+
+
+def test_max_bytes_evicts_until_under_budget():
+    cache = LRUTTLCache(max_bytes=100, sizeof=len)
+    cache.set("a", "x" * 40)
+    cache.set("b", "x" * 40)
+    cache.set("c", "x" * 40)
+    assert cache.total_bytes == 80 and "a" not in cache
+
+    # Replacing an entry accounts for its new size
+    cache.set("b", "x" * 10)
+    assert cache.total_bytes == 50
+    cache.pop("c")
+    assert cache.total_bytes == 10
+
+    # A single entry over budget is kept rather than evicting itself
+    cache.set("huge", "x" * 500)
+    assert list(dict(cache.items())) == ["huge"]
+
+
+def test_stats_report_hits_misses_and_evictions():
+    cache = LRUTTLCache(max_size=1)
+    cache.set("a", 1)
+    cache.get("a")
+    cache.get("missing")
+    cache.set("b", 2)
+
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert stats["evictions"] == 1
+    assert stats["size"] == 1 and stats["max_size"] == 1
+
+
+def test_engine_reaps_user_cache_and_rate_limits_in_background():
+    async def run():
+        engine = OptimizedAuthEngine(hash_workers=1)
+        for cache in (engine.user_cache.cache, engine.rate_limiter.requests):
+            cache.default_ttl = 0.2
+
+        request = AuthRequest(username="nobody", password="x", client_ip="10.0.0.1",
+                              user_agent="pytest", request_id="req", timestamp=time.time())
+        await engine.authenticate(request)
+        engine.user_cache.cache.set("alice", {"user_id": "uid_alice"})
+        assert len(engine.rate_limiter.requests) == 1 and len(engine.user_cache.cache) == 1
+
+        # No further access: only the background reapers can drop them
+        await asyncio.sleep(2.5)
+        assert len(engine.rate_limiter.requests) == 0
+        assert len(engine.user_cache.cache) == 0
+        await engine.close()
+
+    asyncio.run(run())
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test LLM Model Residency
+========================
+
+Budgeted LRU residency in the local LLM engine: reserving room ahead of a
+load, eviction order, footprint accounting and the engine dropping its
+hold on an evicted model.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "linux-distribution" / "SynOS-Packages"
+                       / "synos-llm-hub" / "src"))
+
+for module in ("torch", "transformers", "accelerate", "huggingface_hub", "psutil"):
+    pytest.importorskip(module)
+
+from local_llm_engine import (LocalLLMEngine, ModelConfig, ModelManager, ModelResidencyManager,
+                              ModelSize, ModelType)
+
+GB = 1024**3
+
+
+class FakeModel:
+    def __init__(self, footprint):
+        self.footprint = footprint
+
+    def get_memory_footprint(self):
+        return self.footprint
+
+
+def test_reserve_and_admit_evict_least_recently_used_first():
+    residency = ModelResidencyManager(memory_budget_bytes=3 * GB)
+    for key in ("a", "b", "c"):
+        residency.admit(key, FakeModel(GB), object(), GB)
+    assert residency.resident_bytes == 3 * GB
+
+    assert residency.get("a") is not None
+    residency.reserve(GB)
+    assert residency.keys() == ["c", "a"]
+
+    residency.admit("d", FakeModel(2 * GB), object(), 2 * GB)
+    assert residency.keys() == ["a", "d"]
+    assert residency.resident_bytes == 3 * GB
+    metrics = residency.get_metrics()
+    assert metrics["evictions"] == 2
+    assert metrics["bytes_evicted"] == 2 * GB
+    assert metrics["hits"] == 1
+
+
+def test_oversized_model_is_still_admitted_alone():
+    residency = ModelResidencyManager(memory_budget_bytes=GB)
+    residency.admit("small", FakeModel(GB // 2), object(), GB // 2)
+    residency.admit("huge", FakeModel(4 * GB), object(), 4 * GB)
+    assert residency.keys() == ["huge"]
+    assert residency.evict("huge")
+    assert not residency.evict("huge")
+    assert residency.resident_bytes == 0
+
+
+def _manager(tmp_path, monkeypatch, budget_gb, sizes):
+    manager = ModelManager(models_dir=str(tmp_path), memory_budget_gb=budget_gb)
+    monkeypatch.setattr(manager, "_load_model_sync",
+                        lambda config: (FakeModel(sizes[config.model_id]), object()))
+    return manager
+
+
+def _config(model_id):
+    return ModelConfig(model_id=model_id, model_type=ModelType.GENERAL_CHAT, model_size=ModelSize.TINY)
+
+
+def test_footprint_comes_from_the_model_not_process_rss(tmp_path, monkeypatch):
+    manager = _manager(tmp_path, monkeypatch, 4, {"m1": GB, "m2": 2 * GB})
+    # Another load growing RSS at the same time must not be charged to this model
+    rss = iter([0, 10 * GB, 10 * GB, 30 * GB])
+    monkeypatch.setattr(manager, "_measure_footprint", lambda: next(rss))
+
+    async def run():
+        await asyncio.gather(manager.load_model(_config("m1")), manager.load_model(_config("m2")))
+
+    asyncio.run(run())
+    footprints = {entry["key"]: entry["footprint_bytes"]
+                  for entry in manager.get_residency_metrics()["resident_models"]}
+    assert footprints == {"m1_fp16": GB, "m2_fp16": 2 * GB}
+
+
+def test_engine_releases_evicted_model_and_reloads_on_demand(tmp_path, monkeypatch):
+    manager = _manager(tmp_path, monkeypatch, 1, {"active": GB, "other": GB})
+    engine = LocalLLMEngine.__new__(LocalLLMEngine)
+    engine.model_manager = manager
+    engine.current_model_config = _config("active")
+    engine.current_model_key = manager.model_key(engine.current_model_config)
+
+    async def run():
+        await engine._ensure_model_loaded()
+        assert engine.current_model is not None
+
+        await manager.load_model(_config("other"))
+        assert engine.current_model is None
+        assert manager.residency.keys() == ["other_fp16"]
+
+        model, _ = await engine._ensure_model_loaded()
+        assert engine.current_model is model
+
+    asyncio.run(run())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test mTLS Certificate Manager
+=============================
+
+Bulk issuance through the key pool, the verification cache and
+revocation-aware invalidation, and the indexed certificate registry.
+"""
+
+import asyncio
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "core" / "security" / "network"))
+
+pytest.importorskip("cryptography")
+
+from mtls_certificate_manager import CertificateRegistry, MTLSCertificateManager
+
+
+@dataclass
+class Entity:
+    entity_id: str
+    name: str
+    entity_type: str = "service"
+    ip_addresses: List[str] = field(default_factory=list)
+
+
+async def _manager(path, **kwargs):
+    manager = MTLSCertificateManager(str(path), **kwargs)
+    manager.config["key_size"] = 2048
+    assert await manager.initialize()
+    return manager
+
+
+def test_bulk_issuance_verification_cache_and_revocation(tmp_path):
+    async def run():
+        manager = await _manager(tmp_path, key_pool_size=4, key_pool_workers=1)
+        try:
+            entities = [Entity(f"svc-{i}", f"Service {i}", ip_addresses=["10.0.0.%d" % i, "svc.local"])
+                        for i in range(6)]
+            fingerprints = await manager.generate_entity_certificates(entities)
+            assert len(fingerprints) == 6
+            assert manager.key_pool.stats["acquired"] == 6
+
+            cert_path, _ = await manager.get_entity_certificate_paths("svc-3")
+            pem = Path(cert_path).read_bytes()
+            first = await manager.verify_certificate(pem)
+            second = await manager.verify_certificate(pem)
+            assert first["valid"] and second == first
+            assert first["entity_id"] == "svc-3"
+            assert first["fingerprint"] == fingerprints["svc-3"]
+            assert manager.verification_stats == {"hits": 1, "misses": 1, "invalidations": 0}
+
+            assert await manager.revoke_certificate("svc-3")
+            revoked = await manager.verify_certificate(pem)
+            assert revoked["revoked"] and not revoked["valid"]
+            assert manager.verification_stats["invalidations"] == 1
+
+            assert (await manager.verify_certificate(b"not a certificate"))["valid"] is False
+        finally:
+            await manager.close()
+
+        reloaded = await _manager(tmp_path, key_pool_size=0)
+        registry = reloaded.certificate_registry
+        assert len(registry) == 6
+        assert registry.find_by_fingerprint(fingerprints["svc-1"]) == "svc-1"
+        assert registry.is_revoked(fingerprints["svc-3"])
+        assert (await reloaded.get_certificate_status("svc-3"))["status"] == "revoked"
+
+        # Re-issuing keeps the superseded certificate revoked
+        await reloaded.generate_entity_certificate(entities[3])
+        assert registry.is_revoked(fingerprints["svc-3"])
+        assert (await reloaded.verify_certificate(pem))["revoked"]
+        assert (await reloaded.get_certificate_status("svc-3"))["status"] == "valid"
+
+    asyncio.run(run())
+
+
+def test_registry_indexes_follow_replacement_and_deletion():
+    registry = CertificateRegistry({
+        "a": {"fingerprint": "fa", "serial_number": "1", "expires": "2030-01-01T00:00:00"},
+        "b": {"fingerprint": "fb", "serial_number": "2", "expires": "2030-01-01T00:00:00",
+              "revoked": True, "revoked_at": "2024-01-01T00:00:00"}
+    })
+    assert registry.find_by_serial("2") == "b"
+    assert registry.is_revoked("fb") and not registry.is_revoked("fa")
+
+    registry["a"] = {"fingerprint": "fa2", "serial_number": "3", "expires": "2031-01-01T00:00:00"}
+    assert registry.find_by_fingerprint("fa") is None
+    assert registry.find_by_fingerprint("fa2") == "a"
+
+    del registry["b"]
+    assert registry.is_revoked("fb")
+    assert registry.find_by_serial("2") is None
+    assert registry.find_by_fingerprint("fb") is None
+
+    # Certificates superseded after revocation stay revoked through deletion too
+    registry.revoke("a", "2024-02-01T00:00:00")
+    registry["a"] = {"fingerprint": "fa3", "serial_number": "4", "expires": "2032-01-01T00:00:00"}
+    del registry["a"]
+    assert registry.is_revoked("fa2") and not registry.is_revoked("fa3")
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Test NATS Publisher Layer
+=========================
+
+Round trips through SynOSNATSClient against an in-process stub server:
+codec negotiation via headers, opt-in subject batching, the disconnected
+outbox and in-memory buffer, and the bounded subscription dispatchers.
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "linux-distribution" / "SynOS-Packages"
+                       / "synos-neural-darwinism" / "src"))
+
+from nats_integration import HEADER_BATCH, HEADER_CODEC, NATSPublisher, OverflowPolicy, SubscriptionDispatcher, SynOSNATSClient
+
+
+class StubNATSServer:
+    """Minimal stand-in for a nats.aio connection: routes publishes to subscribers"""
+
+    def __init__(self):
+        self.subscribers = {}
+        self.published = []
+        self.online = True
+        self._sid = 0
+
+    async def publish(self, subject, payload, headers=None):
+        if not self.online:
+            raise ConnectionError("stub server offline")
+        self.published.append((subject, payload, headers))
+        for cb in self.subscribers.get(subject, []):
+            await cb(SimpleNamespace(subject=subject, data=payload, headers=headers))
+
+    async def subscribe(self, subject, queue=None, cb=None):
+        self._sid += 1
+        self.subscribers.setdefault(subject, []).append(cb)
+        return SimpleNamespace(sid=self._sid, unsubscribe=self._noop)
+
+    async def close(self):
+        self.online = False
+
+    async def _noop(self):
+        pass
+
+
+async def _connect(client, server):
+    client.nc = server
+    client.connected = True
+    await client.publisher.attach(server)
+
+
+def test_defaults_stay_json_without_an_outbox():
+    client = SynOSNATSClient()
+    assert client.publisher.codec.name == "json"
+    assert client.publisher.outbox is None
+    assert client.publisher.batched_subjects == set()
+
+
+def test_unbatched_subjects_keep_single_message_payloads():
+    async def run():
+        server = StubNATSServer()
+        client = SynOSNATSClient(batch_interval=0.05)
+        await _connect(client, server)
+        for i in range(3):
+            await client.publish_system_metrics({"cpu": i})
+        await client.disconnect()
+
+        payloads = [json.loads(p) for _, p, _ in server.published]
+        assert [payload["metrics"]["cpu"] for payload in payloads] == [0, 1, 2]
+        assert all(HEADER_BATCH not in headers for _, _, headers in server.published)
+
+    asyncio.run(run())
+
+
+def test_round_trip_with_batching_and_legacy_json_subscribers():
+    async def run():
+        server = StubNATSServer()
+        client = SynOSNATSClient(batch_interval=0.05, batched_subjects=['system_metrics'])
+        await _connect(client, server)
+
+        received = []
+
+        async def on_event(event):
+            received.append(event)
+
+        await client.subscribe_to_security_events(on_event)
+        await client.publish_security_event({"type": "port_scan", "severity": "high"})
+        for i in range(3):
+            await client.publish_system_metrics({"cpu": i})
+        await asyncio.sleep(0.2)
+        await client.disconnect()
+
+        assert [event["event"]["type"] for event in received] == ["port_scan"]
+        # A subscriber that ignores headers can still read every payload as JSON
+        subject, payload, headers = server.published[0]
+        assert json.loads(payload)["severity"] == "high"
+        assert headers[HEADER_CODEC] == "json"
+        metrics = [json.loads(p) for s, p, _ in server.published if s == client.subjects['system_metrics']]
+        assert [item["metrics"]["cpu"] for batch in metrics for item in batch] == [0, 1, 2]
+
+    asyncio.run(run())
+
+
+def test_outbox_replays_messages_published_while_disconnected(tmp_path):
+    async def run():
+        server = StubNATSServer()
+        client = SynOSNATSClient(outbox_path=str(tmp_path / "outbox.bin"))
+        await _connect(client, server)
+
+        received = []
+
+        async def on_event(event):
+            received.append(event["event"]["seq"])
+
+        await client.subscribe_to_security_events(on_event)
+        server.online = False
+        await client._disconnected_cb()
+        for seq in range(5):
+            assert await client.publish_security_event({"seq": seq})
+        assert len(client.publisher.outbox) == 5
+        assert received == []
+
+        server.online = True
+        await client._reconnected_cb()
+        await asyncio.sleep(0.05)
+        assert received == [0, 1, 2, 3, 4]
+        assert len(client.publisher.outbox) == 0
+        assert client.get_publish_stats()["outbox_pending"] == 0
+        await client.disconnect()
+
+    asyncio.run(run())
+
+
+def test_memory_buffer_replays_and_bounds_messages_without_an_outbox():
+    async def run():
+        server = StubNATSServer()
+        client = SynOSNATSClient()
+        client.publisher = NATSPublisher(max_buffered=3)
+        await _connect(client, server)
+
+        server.online = False
+        await client._disconnected_cb()
+        for seq in range(5):
+            assert await client.publish_security_event({"seq": seq})
+        stats = client.get_publish_stats()
+        assert stats["buffer_pending"] == 3 and stats["buffer_dropped"] == 2
+
+        server.online = True
+        await client._reconnected_cb()
+        assert [json.loads(p)["event"]["seq"] for _, p, _ in server.published] == [2, 3, 4]
+        assert client.get_publish_stats()["buffer_pending"] == 0
+        await client.disconnect()
+
+    asyncio.run(run())
+
+
+def test_messages_are_dropped_when_buffering_is_disabled():
+    async def run():
+        server = StubNATSServer()
+        client = SynOSNATSClient()
+        client.publisher = NATSPublisher(max_buffered=0)
+        await _connect(client, server)
+
+        server.online = False
+        await client._disconnected_cb()
+        assert not await client.publish_security_event({"seq": 0})
+        server.online = True
+        await client._reconnected_cb()
+        assert server.published == []
+
+    asyncio.run(run())
+
+
+def test_stop_drains_queued_messages_before_cancelling_workers():
+    async def run():
+        handled = []
+
+        async def slow_responder(event):
+            await asyncio.sleep(0.01)
+            handled.append(event["seq"])
+
+        dispatcher = SubscriptionDispatcher("synos.security.events", slow_responder,
+                                            workers=2, overflow=OverflowPolicy.BLOCK)
+        dispatcher.start()
+        for seq in range(20):
+            await dispatcher.enqueue(SimpleNamespace(data=json.dumps({"seq": seq}).encode(), headers=None))
+        await dispatcher.stop()
+        assert sorted(handled) == list(range(20))
+
+        # A stuck callback cannot hold shutdown past the drain timeout
+        async def stuck(event):
+            await asyncio.sleep(60)
+
+        dispatcher = SubscriptionDispatcher("synos.model.updates", stuck, overflow=OverflowPolicy.BLOCK)
+        dispatcher.start()
+        await dispatcher.enqueue(SimpleNamespace(data=b"{}", headers=None))
+        await dispatcher.enqueue(SimpleNamespace(data=b"{}", headers=None))
+        await asyncio.wait_for(dispatcher.stop(drain_timeout=0.1), 1)
+
+    asyncio.run(run())
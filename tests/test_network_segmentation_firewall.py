@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test Network Segmentation Firewall Rulesets
+===========================================
+
+Renders segmentation rulesets in dry-run mode, so no root or firewall
+binaries are needed.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "core" / "security" / "network"))
+
+from network_segmentation_engine import NetworkSegmentationEngine, NetworkZone
+
+
+def _engine(backend):
+    engine = NetworkSegmentationEngine(firewall_backend=backend, firewall_dry_run=True)
+    asyncio.run(engine._create_default_rules())
+    asyncio.run(engine._configure_firewall_rules())
+    return engine
+
+
+def test_iptables_full_ruleset_is_one_restore_transaction():
+    engine = _engine("iptables")
+    transaction = engine.last_firewall_transaction
+    lines = transaction.splitlines()
+
+    assert lines[0] == "*filter" and lines[-1] == "COMMIT"
+    assert ":FORWARD DROP [0:0]" in lines
+    # Rules follow priority order and ports use multiport
+    assert "quarantine_isolation" in lines[10]
+    assert "-p tcp -m multiport --dports 22,80,443" in lines[11]
+    assert transaction == engine.render_firewall_ruleset()
+
+
+def test_iptables_quarantine_pushes_only_changed_rules():
+    engine = _engine("iptables")
+    asyncio.run(engine.quarantine_ip("10.10.3.7", "port scan"))
+    added = engine.last_firewall_transaction.splitlines()
+
+    assert added[0] == "*filter" and added[-1] == "COMMIT"
+    assert all(line.startswith("-I SYNOS-SEGMENTATION") for line in added[1:-1])
+    assert any("-s 10.10.3.7/32" in line for line in added)
+
+    asyncio.run(engine.remove_from_quarantine("10.10.3.7"))
+    removed = engine.last_firewall_transaction.splitlines()[1:-1]
+    assert removed == [f"-D SYNOS-SEGMENTATION {n}" for n in range(len(added) - 2, 0, -1)]
+
+    engine.last_firewall_transaction = ""
+    assert asyncio.run(engine.apply_firewall_ruleset())
+    assert engine.last_firewall_transaction == ""
+
+
+def test_nftables_zone_changes_only_touch_set_elements():
+    engine = _engine("nftables")
+    full = engine.last_firewall_transaction
+    assert full.startswith("table inet synos_segmentation\ndelete table inet synos_segmentation\n")
+    assert "ip saddr @zone_quarantine_v4 ip daddr @zone_internal_v4 counter drop" in full
+
+    engine.zone_networks[NetworkZone.DMZ].append("2001:db8::/64")
+    asyncio.run(engine.apply_firewall_ruleset())
+    assert engine.last_firewall_transaction == \
+        "add element inet synos_segmentation zone_dmz_v6 { 2001:db8::/64 }\n"
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Test Network Segmentation Policy Lookup
+=======================================
+
+Longest-prefix zone lookup, the compiled rule index against the linear rule
+scan it replaced, and decision cache invalidation after policy changes.
+"""
+
+import asyncio
+import random
+import sys
+from ipaddress import ip_network
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "core" / "security" / "network"))
+
+from network_segmentation_engine import (
+    CompiledRuleIndex, NetworkRule, NetworkSegmentationEngine, NetworkZone, PrefixTrie, TrafficAction,
+    ZoneLookup
+)
+
+
+def test_prefix_trie_matches_brute_force_longest_prefix():
+    rng = random.Random(23)
+    trie = PrefixTrie(32)
+    prefixes = {}
+    for index in range(300):
+        length = rng.choice([0, 4, 8, 12, 16, 20, 23, 24, 25, 30, 32])
+        # Cluster prefixes under 10.0.0.0/8 so they nest
+        address = (10 << 24) | rng.getrandbits(24) if length >= 8 else rng.getrandbits(32)
+        network = ip_network((address, length), strict=False)
+        key = (int(network.network_address), length)
+        trie.insert(*key, index)
+        prefixes.setdefault(key, index)  # the first value inserted for a prefix is kept
+
+    def brute_force(address, max_len=32):
+        best = None
+        for (network, length), value in prefixes.items():
+            mask = ((1 << length) - 1) << (32 - length)
+            if length <= max_len and address & mask == network and (best is None or length > best[0]):
+                best = (length, value)
+        return best[1] if best else None
+
+    for _ in range(2000):
+        address = (10 << 24) | rng.getrandbits(24) if rng.random() < 0.9 else rng.getrandbits(32)
+        max_len = rng.choice([32, 32, 25, 24, 23, 16, 12, 9, 7, 0])
+        assert trie.lookup(address, max_len) == brute_force(address, max_len)
+
+
+def test_zone_lookup_prefers_the_longest_prefix():
+    zones = ZoneLookup({
+        NetworkZone.EXTERNAL: ["0.0.0.0/0"],
+        NetworkZone.INTERNAL: ["10.0.0.0/8"],
+        NetworkZone.DMZ: ["10.10.0.0/16", "192.168.7.0/25"],
+        NetworkZone.QUARANTINE: ["10.10.5.7/32"],
+        NetworkZone.MANAGEMENT: ["2001:db8::/32"],
+        NetworkZone.PRIVILEGED: ["2001:db8:1::/48"],
+    })
+    assert zones.lookup("10.1.2.3") == NetworkZone.INTERNAL
+    assert zones.lookup("10.10.5.6") == NetworkZone.DMZ
+    assert zones.lookup("10.10.5.7") == NetworkZone.QUARANTINE
+    assert zones.lookup("192.168.7.127") == NetworkZone.DMZ
+    assert zones.lookup("192.168.7.128") == NetworkZone.EXTERNAL
+    assert zones.lookup("2001:db8:1::5") == NetworkZone.PRIVILEGED
+    assert zones.lookup("2001:db8:2::5") == NetworkZone.MANAGEMENT
+    assert zones.lookup("2001:db9::1") is None
+
+    # A CIDR only falls in zones whose prefix covers all of it
+    assert zones.lookup("10.10.5.0/24") == NetworkZone.DMZ
+    assert zones.lookup("10.0.0.0/7") == NetworkZone.EXTERNAL
+
+
+def legacy_match(rules, source_zone, dest_zone, dest_port, protocol):
+    """The linear rule scan CompiledRuleIndex replaced"""
+    matching = []
+    for rule in rules:
+        if not rule.enabled:
+            continue
+        if rule.source_zone != source_zone and rule.source_zone != NetworkZone.EXTERNAL:
+            continue
+        if rule.destination_zone != dest_zone and rule.destination_zone != NetworkZone.EXTERNAL:
+            continue
+        if rule.protocol != "any" and rule.protocol != protocol:
+            continue
+        if rule.destination_ports and dest_port not in rule.destination_ports:
+            continue
+        matching.append(rule)
+    matching.sort(key=lambda r: r.priority)
+    return matching[0] if matching else None
+
+
+def _rule(rule_id, source_zone, dest_zone, protocol, ports, priority, enabled=True, action=TrafficAction.ALLOW):
+    return NetworkRule(rule_id=rule_id, name=rule_id, source_zone=source_zone, destination_zone=dest_zone,
+                       protocol=protocol, source_ports=[], destination_ports=ports, action=action,
+                       priority=priority, conditions={}, enabled=enabled)
+
+
+def test_compiled_rule_index_matches_legacy_scan():
+    rng = random.Random(41)
+    zones = list(NetworkZone)
+    protocols = ["tcp", "udp", "icmp", "any"]
+    ports = [22, 53, 80, 443, 5432]
+
+    for _ in range(20):
+        rules = [
+            _rule(f"rule_{i}", rng.choice(zones), rng.choice(zones), rng.choice(protocols),
+                  rng.sample(ports, rng.randint(0, 3)),
+                  # Few distinct priorities, so ties fall back to insertion order
+                  rng.choice([5, 10, 50, 100]), enabled=rng.random() < 0.85)
+            for i in range(40)
+        ]
+        index = CompiledRuleIndex(rules)
+        for _ in range(200):
+            query = (rng.choice(zones), rng.choice(zones), rng.choice(ports + [8080]),
+                     rng.choice(["tcp", "udp", "icmp"]))
+            assert index.match(*query) is legacy_match(rules, *query)
+
+
+def _engine(**kwargs):
+    engine = NetworkSegmentationEngine(firewall_dry_run=True, **kwargs)
+    asyncio.run(engine._create_default_rules())
+    return engine
+
+
+def test_decisions_are_cached_until_the_policy_changes():
+    engine = _engine()
+    flow = ("10.10.3.20", "10.10.3.30", 443, "tcp")
+    assert asyncio.run(engine.evaluate_traffic(*flow)) == (TrafficAction.ALLOW, "internal_communication")
+    assert flow in engine._decision_cache
+
+    # Quarantining the source moves it to a longer prefix in another zone
+    asyncio.run(engine.quarantine_ip("10.10.3.20", "lateral movement"))
+    assert engine.get_zone_for_ip("10.10.3.20") == NetworkZone.QUARANTINE
+    assert asyncio.run(engine.evaluate_traffic(*flow)) == (TrafficAction.DENY, "quarantine_10_10_3_20")
+
+    asyncio.run(engine.remove_from_quarantine("10.10.3.20"))
+    assert asyncio.run(engine.evaluate_traffic(*flow)) == (TrafficAction.ALLOW, "internal_communication")
+
+    # A higher-priority rule takes over as soon as it is added
+    asyncio.run(engine.add_segmentation_rule(
+        _rule("block_https", NetworkZone.INTERNAL, NetworkZone.INTERNAL, "tcp", [443], 1,
+              action=TrafficAction.DENY)))
+    assert asyncio.run(engine.evaluate_traffic(*flow)) == (TrafficAction.DENY, "block_https")
+
+    # Editing rules in place needs an explicit invalidate_policy()
+    engine.rules["block_https"].enabled = False
+    assert asyncio.run(engine.evaluate_traffic(*flow))[1] == "block_https"
+    engine.invalidate_policy()
+    assert not engine._decision_cache
+    assert asyncio.run(engine.evaluate_traffic(*flow))[1] == "internal_communication"
+
+
+def test_decision_cache_is_bounded_lru():
+    engine = _engine(decision_cache_size=2)
+    flows = [("10.10.3.20", "10.10.3.30", port, "tcp") for port in (80, 443, 5432)]
+    for flow in flows[:2]:
+        asyncio.run(engine.evaluate_traffic(*flow))
+    asyncio.run(engine.evaluate_traffic(*flows[0]))  # flows[1] is now least recent
+    asyncio.run(engine.evaluate_traffic(*flows[2]))
+    assert list(engine._decision_cache) == [flows[0], flows[2]]
+
+    # Default deny results are cached too
+    unmatched = ("10.10.4.1", "10.10.1.1", 22, "udp")
+    assert asyncio.run(engine.evaluate_traffic(*unmatched)) == (TrafficAction.DENY, "default_deny")
+    assert unmatched in engine._decision_cache
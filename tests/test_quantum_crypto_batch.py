@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Test Post-Quantum Batch APIs
+============================
+
+Batched encapsulation, decapsulation, signing and verification must agree
+with the single-item calls, inline and across the process pool; pool workers
+never start nested pools and the async manager never blocks the event loop.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "core" / "security" / "crypto"))
+
+import quantum_crypto
+from quantum_crypto import DilithiumSignature, KyberKEM, PQCAlgorithm, QuantumCryptoManager, SPHINCSSignature
+
+
+def test_batches_match_single_item_calls(monkeypatch):
+    monkeypatch.setattr(quantum_crypto._BatchMixin, "parallel_workers", 1)
+    messages = [f"message-{i}".encode() for i in range(50)]
+
+    for scheme in (DilithiumSignature(3), SPHINCSSignature("128f")):
+        public_key, private_key = scheme.generate_keypair()
+        signatures = scheme.sign_batch(private_key, messages, key_id="k")
+        assert signatures == [scheme.sign(private_key, m) for m in messages]
+        # Cached prefix state is reused, and a new key under the same id is not served stale
+        assert scheme.sign_batch(private_key, messages[:3], key_id="k") == signatures[:3]
+        _, other_key = scheme.generate_keypair()
+        assert scheme.sign_batch(other_key, messages[:1], key_id="k") == [scheme.sign(other_key, messages[0])]
+
+        assert scheme.verify_batch(public_key, messages, signatures) == [True] * len(messages)
+        assert scheme.verify_batch(public_key, messages[:1], [b"short"]) == [False]
+
+    kem = KyberKEM(768)
+    public_key, private_key = kem.generate_keypair()
+    encapsulated = kem.encapsulate_batch(public_key, 20)
+    assert [len(c) for c, _ in encapsulated] == [len(kem.encapsulate(public_key)[0])] * 20
+    assert len({secret for _, secret in encapsulated}) == 20
+    ciphertexts = [c for c, _ in encapsulated]
+    assert kem.decapsulate_batch(private_key, ciphertexts, key_id="kem") == [
+        kem.decapsulate(private_key, c) for c in ciphertexts
+    ]
+
+
+def test_large_batches_run_across_the_process_pool(monkeypatch):
+    monkeypatch.setattr(quantum_crypto._BatchMixin, "parallel_threshold", 8)
+    monkeypatch.setattr(quantum_crypto._BatchMixin, "parallel_workers", 2)
+    scheme = DilithiumSignature(2)
+    _, private_key = scheme.generate_keypair()
+    messages = [f"m{i}".encode() for i in range(21)]
+
+    assert scheme.sign_batch(private_key, messages) == [scheme.sign(private_key, m) for m in messages]
+    assert quantum_crypto._batch_pool is not None
+
+
+def test_manager_batch_round_trip(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = QuantumCryptoManager()
+
+    async def run():
+        await manager.generate_keypair(PQCAlgorithm.DILITHIUM_2, "sign")
+        await manager.generate_keypair(PQCAlgorithm.KYBER_512, "kem")
+        messages = [f"msg-{i}".encode() for i in range(10)]
+
+        signatures = await manager.sign_messages("sign", messages)
+        assert await manager.verify_signatures("sign", messages, signatures) == [True] * 10
+        assert await manager.verify_signatures("sign", messages[::-1], signatures) == [False] * 10
+
+        encrypted = await manager.encapsulate_keys("kem", 10)
+        shared = await manager.decapsulate_keys("kem", encrypted)
+        assert shared == [await manager.decapsulate_key("kem", item) for item in encrypted]
+
+    asyncio.run(run())
+
+
+def test_pool_workers_run_their_chunk_inline(monkeypatch):
+    # Defaults that would otherwise start a pool inside every pool worker
+    monkeypatch.setattr(quantum_crypto._BatchMixin, "parallel_threshold", 1)
+    monkeypatch.setattr(quantum_crypto._BatchMixin, "parallel_workers", 2)
+    monkeypatch.setattr(quantum_crypto, "_batch_pool", None)
+    scheme = KyberKEM(512)
+    _, private_key = scheme.generate_keypair()
+    ciphertexts = [c for c, _ in scheme.encapsulate_batch(scheme.generate_keypair()[0], 5)]
+
+    results = quantum_crypto._run_batch_chunk(KyberKEM, 512, "decapsulate_batch", private_key, ciphertexts)
+    assert results == [scheme.decapsulate(private_key, c) for c in ciphertexts]
+    assert quantum_crypto._batch_pool is None
+
+
+def test_manager_batches_do_not_block_the_event_loop(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(quantum_crypto._BatchMixin, "parallel_threshold", 8)
+    monkeypatch.setattr(quantum_crypto._BatchMixin, "parallel_workers", 2)
+    manager = QuantumCryptoManager()
+
+    async def run():
+        await manager.generate_keypair(PQCAlgorithm.DILITHIUM_2, "sign")
+        await manager.generate_keypair(PQCAlgorithm.KYBER_512, "kem")
+        scheme = manager.algorithms[PQCAlgorithm.DILITHIUM_2]
+        private_key = manager.keys["sign"].private_key
+
+        ticks = 0
+        running = True
+
+        async def heartbeat():
+            nonlocal ticks
+            while running:
+                ticks += 1
+                await asyncio.sleep(0)
+
+        beat = asyncio.create_task(heartbeat())
+        # Pooled (21 items) and inline (3 items) batches both yield to the loop
+        for count in (21, 3):
+            messages = [f"m{i}".encode() for i in range(count)]
+            ticks = 0
+            signatures = await manager.sign_messages("sign", messages)
+            assert ticks > 0
+            assert [s.signature for s in signatures] == [scheme.sign(private_key, m) for m in messages]
+
+        encrypted = await manager.encapsulate_keys("kem", 21)
+        ticks = 0
+        shared = await manager.decapsulate_keys("kem", encrypted)
+        assert ticks > 0
+        assert shared == [await manager.decapsulate_key("kem", item) for item in encrypted]
+
+        running = False
+        await beat
+
+    asyncio.run(run())
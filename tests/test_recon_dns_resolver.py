@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test Recon DNS Resolver
+=======================
+
+AsyncDNSResolver against an in-process stub DNS server on UDP and TCP:
+pipelined answers, negative caching, wildcard filtering, truncated answers
+retried over TCP, IP literals and the system resolver fallback.
+"""
+
+import asyncio
+import socket
+import struct
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "linux-distribution" / "SynOS-Packages"
+                       / "synos-security-orchestrator" / "src"))
+
+from ai_reconnaissance import DNS_FLAG_TC, AsyncDNSResolver
+
+
+def _question_name(query):
+    labels, offset = [], 12
+    while query[offset]:
+        length = query[offset]
+        labels.append(query[offset + 1:offset + 1 + length].decode())
+        offset += length + 1
+    return '.'.join(labels).lower(), offset + 5
+
+
+def _response(query, addresses, truncated=False):
+    name, question_end = _question_name(query)
+    flags = 0x8180 | (DNS_FLAG_TC if truncated else 0) | (0 if addresses else 3)
+    answers = [] if truncated else addresses
+    header = struct.pack('>HHHHHH', struct.unpack('>H', query[:2])[0], flags, 1, len(answers), 0, 0)
+    records = b''.join(struct.pack('>HHHIH', 0xC00C, 1, 1, 60, 4) + socket.inet_aton(a) for a in answers)
+    return header + query[12:question_end] + records
+
+
+class StubDNSServer(asyncio.DatagramProtocol):
+    """Answers from a fixed zone; names in `large` only answer in full over TCP"""
+
+    def __init__(self, zone, large=(), wildcard=None):
+        self.zone = zone
+        self.large = set(large)
+        self.wildcard = wildcard
+        self.udp_queries = []
+        self.tcp_queries = []
+
+    def lookup(self, name):
+        if name in self.zone:
+            return self.zone[name]
+        if self.wildcard and name.endswith('.' + self.wildcard[0]):
+            return self.wildcard[1]
+        return []
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        name, _ = _question_name(data)
+        self.udp_queries.append(name)
+        self.transport.sendto(_response(data, self.lookup(name), truncated=name in self.large), addr)
+
+    async def handle_tcp(self, reader, writer):
+        length = struct.unpack('>H', await reader.readexactly(2))[0]
+        query = await reader.readexactly(length)
+        name, _ = _question_name(query)
+        self.tcp_queries.append(name)
+        reply = _response(query, self.lookup(name))
+        writer.write(struct.pack('>H', len(reply)) + reply)
+        await writer.drain()
+        writer.close()
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        self.udp, _ = await loop.create_datagram_endpoint(lambda: self, local_addr=('127.0.0.1', 0))
+        port = self.udp.get_extra_info('sockname')[1]
+        self.tcp = await asyncio.start_server(self.handle_tcp, '127.0.0.1', port)
+        return f"127.0.0.1:{port}"
+
+    def close(self):
+        self.udp.close()
+        self.tcp.close()
+
+
+def test_resolver_against_stub_server():
+    async def run():
+        server = StubDNSServer(
+            zone={'www.example.test': ['192.0.2.10'], 'mail.example.test': ['192.0.2.20'],
+                  'big.example.test': ['192.0.2.%d' % i for i in range(1, 40)]},
+            large={'big.example.test'},
+            wildcard=('wild.test', ['198.51.100.1'])
+        )
+        resolver = AsyncDNSResolver(nameservers=[await server.start()], timeout=1.0, retries=0)
+        try:
+            resolved = await resolver.resolve_many(['www.example.test', 'mail.example.test', 'nope.example.test'])
+            assert resolved == {'www.example.test': ['192.0.2.10'], 'mail.example.test': ['192.0.2.20'],
+                                'nope.example.test': []}
+
+            # Negative answers are cached too
+            sent = resolver.stats['queries_sent']
+            assert await resolver.resolve('nope.example.test') == []
+            assert resolver.stats['queries_sent'] == sent
+
+            # The truncated UDP answer is fetched again over TCP
+            assert len(await resolver.resolve('big.example.test')) == 39
+            assert server.tcp_queries == ['big.example.test']
+            assert resolver.stats['tcp_retries'] == 1
+
+            found = await resolver.enumerate_subdomains('wild.test', ['a', 'b'])
+            assert found == {} and resolver.stats['wildcard_filtered'] == 2
+
+            # IP literals never reach the network
+            sent = resolver.stats['queries_sent']
+            assert await resolver.resolve('10.0.0.5') == ['10.0.0.5']
+            assert resolver.stats['queries_sent'] == sent
+
+            # Names the server does not know fall back to getaddrinfo (/etc/hosts) on request
+            assert await resolver.resolve('localhost') == []
+            assert '127.0.0.1' in await resolver.resolve('localhost', system_fallback=True)
+            assert resolver.stats['system_fallbacks'] == 1
+        finally:
+            await resolver.close()
+            server.close()
+
+    asyncio.run(run())
+
+
+def test_unreachable_nameserver_falls_back_to_system_resolver():
+    async def run():
+        # Nothing listens here, so every query times out
+        resolver = AsyncDNSResolver(nameservers=['127.0.0.1:9'], timeout=0.2, retries=0)
+        try:
+            assert await resolver.resolve('localhost') == []
+            assert '127.0.0.1' in await resolver.resolve('localhost', system_fallback=True)
+        finally:
+            await resolver.close()
+
+    asyncio.run(run())
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test Recon HTTP Layer
+=====================
+
+ReconHTTPClient and the CT collectors against a local aiohttp mock server:
+concurrent fetches sharing the response cache and streaming JSON arrays
+whose numbers are split across chunk boundaries.
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "linux-distribution" / "SynOS-Packages"
+                       / "synos-security-orchestrator" / "src"))
+
+web = pytest.importorskip("aiohttp.web")
+
+from ai_reconnaissance import AIReconEngine, ReconHTTPClient, iter_json_array
+
+
+async def _chunks(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i:i + size]
+
+
+async def _collect(chunks):
+    return [element async for element in iter_json_array(chunks)]
+
+
+def test_stream_parser_handles_any_chunk_boundary():
+    document = [12345, -6.5e3, 0, True, None, "ü-日本", {"id": 987654321, "name_value": "a.example.com"}, [1, 22]]
+    data = json.dumps(document).encode()
+    for size in (1, 2, 3, 7, len(data)):
+        assert asyncio.run(_collect(_chunks(data, size))) == document
+
+
+class MockOSINTServer:
+    """crt.sh / certspotter stand-in that dribbles its JSON out in tiny writes"""
+
+    def __init__(self, certificates):
+        self.body = json.dumps(certificates).encode()
+        self.requests = 0
+
+    async def handle(self, request):
+        self.requests += 1
+        response = web.StreamResponse(headers={'Content-Type': 'application/json'})
+        await response.prepare(request)
+        for i in range(0, len(self.body), 5):
+            await response.write(self.body[i:i + 5])
+            await asyncio.sleep(0)
+        await response.write_eof()
+        return response
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/', self.handle)
+        app.router.add_get('/v1/issuances', self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+    async def close(self):
+        await self.runner.cleanup()
+
+
+CERTIFICATES = [{"id": 1000 + i, "serial": 10 ** 12 + i, "name_value": f"host{i}.example.com\n*.example.com",
+                 "dns_names": [f"api{i}.example.com"]} for i in range(50)]
+
+
+def test_concurrent_fetches_of_one_url_share_a_clean_cache_entry(tmp_path):
+    async def run():
+        server = MockOSINTServer(CERTIFICATES)
+        base = await server.start()
+        client = ReconHTTPClient(cache_dir=str(tmp_path))
+        try:
+            results = await asyncio.gather(*(client.get_json(f"{base}/?q=example.com", 'crtsh') for _ in range(8)))
+            assert all(result == CERTIFICATES for result in results)
+            assert not list(tmp_path.glob('*.partial'))
+            assert len(list(tmp_path.glob('*.body'))) == 1
+
+            # A later fetch is served from the cache
+            requests = server.requests
+            streamed = [cert async for cert in client.iter_json_array(f"{base}/?q=example.com", 'crtsh')]
+            assert streamed == CERTIFICATES and server.requests == requests
+        finally:
+            await client.close()
+            await server.close()
+
+    asyncio.run(run())
+
+
+def test_certificate_transparency_scan_against_mock_server(tmp_path):
+    async def run():
+        server = MockOSINTServer(CERTIFICATES)
+        base = await server.start()
+        engine = AIReconEngine(endpoints={'crtsh': base, 'certspotter': base}, cache_dir=str(tmp_path))
+        try:
+            found = await engine._certificate_transparency_scan('example.com')
+        finally:
+            await engine.http.close()
+            await server.close()
+        assert found == ({f"host{i}.example.com" for i in range(50)}
+                         | {f"api{i}.example.com" for i in range(50)} | {"example.com"})
+
+    asyncio.run(run())
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test Smart Metasploit Module Index
+==================================
+
+ModuleIndex service, CVE and platform lookups checked against the linear
+scans they replaced.
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "linux-distribution" / "SynOS-Packages"
+                       / "synos-security-orchestrator" / "src"))
+
+from smart_metasploit import ExploitCategory, ExploitModule, ModuleIndex, Target
+
+MODULE_PATHS = [
+    ("exploit/unix/ftp/vsftpd_234_backdoor", "VSFTPD v2.3.4 Backdoor Command Execution", ["CVE-2011-2523"]),
+    ("exploit/windows/smb/ms17_010_eternalblue", "MS17-010 EternalBlue SMB Remote Windows Kernel Pool Corruption",
+     ["CVE-2017-0144"]),
+    ("exploit/linux/ssh/libssh_auth_bypass", "libssh Authentication Bypass Scanner (CVE-2018-10933)", []),
+    ("exploit/multi/http/struts2_content_type_ognl", "Apache Struts Jakarta Multipart Parser OGNL Injection",
+     ["CVE-2017-5638"]),
+    ("exploit/windows/rdp/cve_2019_0708_bluekeep_rce", "CVE-2019-0708 BlueKeep RDP Remote Windows Kernel UAF", []),
+    ("exploit/linux/http/apache_mod_cgi_bash_env_exec", "Apache mod_cgi Bash Environment Variable Code Injection",
+     ["CVE-2014-6271"]),
+    ("auxiliary/scanner/ssh/ssh_login", "SSH Login Check Scanner", []),
+    ("auxiliary/scanner/ssh/ssh_enumusers", "OpenSSH Username Enumeration", ["CVE-2018-15473"]),
+    ("auxiliary/scanner/smb/smb_ms17_010", "MS17-010 SMB RCE Detection", ["CVE-2017-0144"]),
+    ("auxiliary/scanner/http/http_version", "HTTP Version Detection", []),
+    ("post/windows/gather/hashdump", "Windows Gather Local User Account Password Hashes", []),
+    ("post/linux/gather/enum_configs", "Linux Gather Configurations, including sshd_config", []),
+    ("payload/windows/meterpreter/reverse_tcp", "Windows Meterpreter, Reverse TCP Stager", []),
+]
+
+SERVICES = ["ssh", "OpenSSH", "sshd", "smb", "http", "ftp", "rdp", "bash", "http-proxy", "ms17-010",
+            "mod_cgi", "apache", "telnet", "", "windows kernel"]
+
+
+def _modules():
+    return [ExploitModule(name=name, category=ExploitCategory.REMOTE, description=description,
+                          targets=[], rank="normal", cve_refs=cves)
+            for name, description, cves in MODULE_PATHS]
+
+
+def _linear_by_service(modules, service):
+    """The scan ModuleIndex replaced: the whole service string as a substring"""
+    return {m.name for m in modules
+            if service.lower() in m.name.lower() or service.lower() in m.description.lower()}
+
+
+def _linear_by_cve(modules, cve):
+    return {m.name for m in modules if cve in m.cve_refs or cve in m.description}
+
+
+@pytest.fixture
+def index():
+    return ModuleIndex(_modules())
+
+
+@pytest.mark.parametrize("service", [s for s in SERVICES if s])
+def test_by_service_finds_everything_the_linear_scan_did(index, service):
+    expected = _linear_by_service(_modules(), service)
+    found = index.by_service(service)
+    assert expected <= found
+    # Single-token services match exactly as before
+    if service.isalnum():
+        assert found == expected
+
+
+def test_product_names_match_their_service_token(index):
+    assert "auxiliary/scanner/ssh/ssh_enumusers" in index.by_service("ssh")
+    assert index.by_service("openssh") == {"auxiliary/scanner/ssh/ssh_enumusers"}
+    # Aliases still map nmap names onto module path tokens
+    assert "exploit/windows/smb/ms17_010_eternalblue" in index.by_service("microsoft-ds")
+
+
+def test_by_cve_matches_linear_scan(index):
+    for cve in ["CVE-2017-0144", "CVE-2018-10933", "CVE-2014-6271", "CVE-2000-0001"]:
+        assert index.by_cve.get(cve, set()) == _linear_by_cve(_modules(), cve)
+
+
+def test_only_exploit_and_payload_paths_carry_a_platform(index):
+    assert index.by_platform["windows"] == {"exploit/windows/smb/ms17_010_eternalblue",
+                                            "exploit/windows/rdp/cve_2019_0708_bluekeep_rce",
+                                            "payload/windows/meterpreter/reverse_tcp"}
+    assert "scanner" not in index.by_platform
+    assert "auxiliary/scanner/ssh/ssh_login" in index.by_platform["multi"]
+    assert "post/linux/gather/enum_configs" in index.by_platform["multi"]
+
+
+def test_candidates_keep_scanners_when_the_os_is_known(index):
+    target = Target(host="10.0.0.5", port=22, service="ssh", version="7.4", os="Linux 3.10")
+    names = [m.name for m in index.candidates(target)]
+    assert "auxiliary/scanner/ssh/ssh_login" in names
+    assert "exploit/linux/ssh/libssh_auth_bypass" in names
+
+    # Platform-specific exploits for another OS are filtered out
+    target = Target(host="10.0.0.6", port=445, service="smb", version="", os="Linux",
+                    vulnerabilities=["CVE-2017-0144"])
+    names = [m.name for m in index.candidates(target)]
+    assert names == ["auxiliary/scanner/smb/smb_ms17_010"]
+
+
+def test_randomized_services_agree_with_linear_scan():
+    rng = random.Random(7)
+    words = ["ssh", "smb", "http", "ftp", "proxy", "apache", "tomcat", "mysql", "kernel", "rce"]
+    modules = []
+    for i in range(300):
+        kind = rng.choice(["exploit", "auxiliary/scanner", "post"])
+        platform = rng.choice(["windows", "linux", "unix", "multi"])
+        name_words = rng.sample(words, 2)
+        modules.append(ExploitModule(
+            name=f"{kind}/{platform}/{name_words[0]}/{'_'.join(name_words)}_{i}",
+            category=ExploitCategory.REMOTE,
+            description=" ".join(rng.sample(words, 3)) + f" Open{rng.choice(words).upper()} v{i}",
+            targets=[], rank="normal"))
+    index = ModuleIndex(modules)
+
+    for service in words + ["openssh", "opensmb", "v1", "ssh_smb"]:
+        expected = _linear_by_service(modules, service)
+        assert expected <= index.by_service(service)
+        if service.isalnum():
+            assert index.by_service(service) == expected
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Test Smart Metasploit msfrpcd Backend
+=====================================
+
+Runs the pooled console backend against a local fake msfrpcd speaking the
+MessagePack RPC protocol.
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "linux-distribution" / "SynOS-Packages"
+                       / "synos-security-orchestrator" / "src"))
+
+aiohttp = pytest.importorskip("aiohttp")
+msgpack = pytest.importorskip("msgpack")
+from aiohttp import web
+
+from smart_metasploit import (
+    ExploitCategory, ExploitModule, MSFConsolePool, MSFRPCClient, MSFRPCError,
+    PayloadConfig, PayloadType, SmartMetasploit, Target
+)
+
+
+class FakeMSFRPCServer:
+    """Minimal msfrpcd: auth, console create/write/read/destroy"""
+
+    def __init__(self, run_delay: float = 0.2):
+        self.run_delay = run_delay
+        self.failed_creates = 0
+        self.failed_reads = 0
+        self.consoles = {}
+        self.created = 0
+        self.destroyed = 0
+        self.logins = 0
+        self.valid_tokens = set()
+
+    async def handle(self, request):
+        method, *args = msgpack.unpackb(await request.read(), raw=False)
+        if method == 'auth.login':
+            self.logins += 1
+            token = f"token-{self.logins}"
+            self.valid_tokens.add(token)
+            return self._reply({'result': 'success', 'token': token})
+
+        token, *args = args
+        if token not in self.valid_tokens:
+            return self._reply({'error': True, 'error_class': 'Msf::RPC::Exception',
+                                'error_message': 'Invalid Authentication Token'})
+
+        if method == 'console.create':
+            if self.failed_creates:
+                self.failed_creates -= 1
+                return self._reply({'error': True, 'error_message': 'Console limit reached'})
+            self.created += 1
+            console_id = str(self.created)
+            self.consoles[console_id] = {'buffer': 'banner\n', 'busy_until': 0.0}
+            return self._reply({'id': console_id, 'prompt': 'msf6 > ', 'busy': False})
+        if method == 'console.write':
+            console_id, data = args
+            console = self.consoles[console_id]
+            loop = asyncio.get_running_loop()
+            if 'exploit -z' in data:
+                console['busy_until'] = loop.time() + self.run_delay
+                host = next(line.split()[-1] for line in data.splitlines() if line.startswith('set RHOST'))
+                loop.call_later(self.run_delay / 2, self._emit, console_id, f"[*] Started against {host}\n")
+                loop.call_later(self.run_delay, self._emit, console_id,
+                                f"[*] Command shell session 1 opened ({host})\n")
+            return self._reply({'wrote': len(data)})
+        if method == 'console.read':
+            if self.failed_reads:
+                self.failed_reads -= 1
+                return self._reply({'error': True, 'error_message': 'Console read failed'})
+            console = self.consoles[args[0]]
+            data, console['buffer'] = console['buffer'], ''
+            busy = asyncio.get_running_loop().time() < console['busy_until']
+            return self._reply({'data': data, 'prompt': 'msf6 > ', 'busy': busy})
+        if method == 'console.destroy':
+            self.destroyed += 1
+            self.consoles.pop(args[0], None)
+            return self._reply({'result': 'success'})
+        return self._reply({'error': True, 'error_message': f'Unknown API call {method}'})
+
+    def _emit(self, console_id, text):
+        if console_id in self.consoles:
+            self.consoles[console_id]['buffer'] += text
+
+    def _reply(self, payload):
+        return web.Response(body=msgpack.packb(payload, use_bin_type=True),
+                            content_type='binary/message-pack')
+
+
+async def _start_server(fake):
+    app = web.Application()
+    app.router.add_post('/api/', fake.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/api/"
+
+
+def _attempt(host):
+    target = Target(host=host, port=445, service="microsoft-ds", version="")
+    module = ExploitModule(name="exploit/windows/smb/ms17_010_eternalblue",
+                           category=ExploitCategory.REMOTE, description="", targets=["Windows"], rank="great")
+    payload = PayloadConfig(payload_type=PayloadType.REVERSE_TCP, lhost="127.0.0.1", lport=4444)
+    return target, module, payload
+
+
+def test_console_pool_reuses_consoles_and_streams_output():
+    async def run():
+        fake = FakeMSFRPCServer()
+        runner, url = await _start_server(fake)
+        pool = MSFConsolePool(MSFRPCClient(url, password="secret"), size=2, poll_interval=0.02)
+        try:
+            chunks = [chunk async for chunk in pool.stream("set RHOST 10.0.0.1\nexploit -z")]
+            assert len(chunks) == 2
+            assert "session 1 opened" in chunks[-1]
+            assert "banner" not in ''.join(chunks)
+
+            await pool.execute("set RHOST 10.0.0.2\nexploit -z")
+            assert fake.created == 1
+        finally:
+            await pool.close()
+            await runner.cleanup()
+        assert fake.destroyed == 1
+
+    asyncio.run(run())
+
+
+def test_failed_console_creation_releases_its_slot():
+    async def run():
+        fake = FakeMSFRPCServer()
+        fake.failed_creates = 1
+        runner, url = await _start_server(fake)
+        pool = MSFConsolePool(MSFRPCClient(url, password="secret"), size=1, poll_interval=0.02)
+        try:
+            with pytest.raises(MSFRPCError):
+                await pool.execute("set RHOST 10.0.0.1\nexploit -z")
+            # Created, but its banner cannot be read: the console is destroyed
+            fake.failed_reads = 1
+            with pytest.raises(MSFRPCError):
+                await asyncio.wait_for(pool.execute("set RHOST 10.0.0.1\nexploit -z"), 5)
+            assert fake.destroyed == 1
+
+            output = await asyncio.wait_for(pool.execute("set RHOST 10.0.0.1\nexploit -z"), 5)
+            assert "session 1 opened" in output
+            assert pool._created == 1
+        finally:
+            await pool.close()
+            await runner.cleanup()
+
+    asyncio.run(run())
+
+
+def test_discarded_console_wakes_queued_callers():
+    async def run():
+        fake = FakeMSFRPCServer(run_delay=0.3)
+        runner, url = await _start_server(fake)
+        pool = MSFConsolePool(MSFRPCClient(url, password="secret"), size=1, poll_interval=0.02)
+        try:
+            # The first run times out, leaving its console in an unknown state
+            doomed = asyncio.create_task(pool.execute("set RHOST 10.0.0.1\nexploit -z", timeout=0.1))
+            await asyncio.sleep(0.01)
+            waiters = [asyncio.create_task(pool.execute(f"set RHOST 10.0.0.{i}\nexploit -z"))
+                       for i in (2, 3)]
+            with pytest.raises(asyncio.TimeoutError):
+                await doomed
+
+            outputs = await asyncio.wait_for(asyncio.gather(*waiters), 5)
+            assert all("session 1 opened" in output for output in outputs)
+            assert fake.created == 2 and fake.destroyed == 1
+        finally:
+            await pool.close()
+            await runner.cleanup()
+
+    asyncio.run(run())
+
+
+def test_client_logs_in_again_when_token_expires():
+    async def run():
+        fake = FakeMSFRPCServer()
+        runner, url = await _start_server(fake)
+        client = MSFRPCClient(url, password="secret")
+        try:
+            await client.call('console.create')
+            fake.valid_tokens.clear()
+            await client.call('console.create')
+            assert fake.logins == 2
+
+            with pytest.raises(MSFRPCError):
+                await client.call('module.bogus')
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    asyncio.run(run())
+
+
+def test_execute_exploits_runs_targets_in_parallel(tmp_path):
+    async def run():
+        fake = FakeMSFRPCServer(run_delay=0.3)
+        runner, url = await _start_server(fake)
+        msf = SmartMetasploit(db_path=str(tmp_path / "msf.db"), rpc_url=url, console_pool_size=4)
+        msf.console_pool.poll_interval = 0.02
+        try:
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            session_ids = await msf.execute_exploits([_attempt(f"10.0.0.{i}") for i in range(4)])
+            elapsed = loop.time() - start
+        finally:
+            await msf.close()
+            await runner.cleanup()
+
+        assert len(set(session_ids)) == 4
+        assert all(session.success for session in msf.session_history)
+        assert fake.created == 4
+        # Four 0.3s runs on four consoles overlap rather than queueing
+        assert elapsed < 0.3 * 4
+
+    asyncio.run(run())
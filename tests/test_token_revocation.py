@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test JWT Revocation Store
+=========================
+
+Expiry-bucketed revocations, the bloom prefilter and the shared
+append-only log behind SecureJWTManager.revoked_tokens.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "core" / "security" / "authentication"))
+
+from token_revocation import TokenRevocationStore
+
+
+def test_revocations_are_dropped_with_their_expiry_bucket():
+    store = TokenRevocationStore(bucket_seconds=60, expected_revocations=100)
+    now = int(time.time())
+    for i in range(1000):
+        assert store.revoke(f"jti-{i}", now + 120 + i)
+    assert not store.revoke("jti-0", now + 120)
+    assert not store.revoke("already-expired", now - 1)
+
+    assert all(store.is_revoked(f"jti-{i}", now + 120 + i) for i in range(1000))
+    assert all(f"jti-{i}" in store for i in range(0, 1000, 37))
+    assert sum(store.is_revoked(f"other-{i}") for i in range(5000)) == 0
+    assert store.stats()["bloom_rejections"] > 4900
+
+    store.purge(now + 120 + 600)
+    assert 0 < len(store) < 1000
+    assert not store.is_revoked("jti-0", now + 120)
+    assert store.is_revoked("jti-999", now + 120 + 999)
+
+    store.purge(now + 120 + 1000 + 60)
+    assert len(store) == 0
+
+
+def test_log_survives_restart_and_is_shared_between_processes(tmp_path):
+    log_path = str(tmp_path / "revocations.log")
+    now = int(time.time())
+    writer = TokenRevocationStore(log_path, sync_interval=0)
+    reader = TokenRevocationStore(log_path, sync_interval=0)
+
+    writer.revoke("shared", now + 600)
+    assert reader.is_revoked("shared", now + 600)
+
+    writer.close()
+    reader.close()
+    restarted = TokenRevocationStore(log_path)
+    assert restarted.is_revoked("shared")
+    assert len(restarted) == 1
+
+
+def test_log_is_compacted_once_mostly_expired(tmp_path):
+    log_path = str(tmp_path / "revocations.log")
+    now = int(time.time())
+    store = TokenRevocationStore(log_path, bucket_seconds=1, sync_interval=0)
+    reader = TokenRevocationStore(log_path, bucket_seconds=1, sync_interval=0)
+    for i in range(3000):
+        store.revoke(f"short-{i}", now + 2)
+    store.revoke("long", now + 3600)
+    assert store.log_records() == 3001
+
+    time.sleep(3)
+    store.purge()
+    assert store.stats()["compactions"] == 1
+    assert store.log_records() == 1
+
+    # The other process follows the compacted file and keeps appending to it
+    reader.revoke("after-compaction", now + 3600)
+    assert store.is_revoked("after-compaction")
+    assert reader.is_revoked("long")
+    assert TokenRevocationStore(log_path).log_records() == 2
@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Test Traffic Camouflage Analysis
+================================
+
+Columnar capture batches: flushing on capacity versus the batch deadline,
+vectorized payload entropy and the suspicious-packet mask, each checked
+against the per-packet code they replaced. Also the timer wheel and flow
+table behind session expiry, and compiled fingerprint signatures against
+the per-signature matcher.
+"""
+
+import asyncio
+import queue
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "linux-distribution" / "SynOS-Packages"
+                       / "synos-smart-anonymity" / "src"))
+
+pytest.importorskip("scapy")
+from scapy.layers.inet import IP, TCP
+from scapy.packet import Raw
+
+from traffic_camouflage_analysis import (
+    TCP_FIN, TCP_SYN, CompiledSignatures, FingerprintSignature, FlowTable, PacketBatch, TimerWheel,
+    TrafficCamouflageAnalysis, TrafficPattern, batch_entropy, ip_to_int
+)
+
+
+def scalar_entropy(data: bytes) -> float:
+    """The per-packet Shannon entropy the batch version replaced"""
+    if not data:
+        return 0.0
+    frequencies = [0] * 256
+    for byte in data:
+        frequencies[byte] += 1
+    entropy = 0.0
+    for freq in frequencies:
+        if freq > 0:
+            probability = freq / len(data)
+            entropy -= probability * np.log2(probability)
+    return entropy
+
+
+def _packet(dport=443, payload=b"hello"):
+    return IP(src="10.0.0.1", dst="10.0.0.2") / TCP(sport=40000, dport=dport, flags="S") / Raw(payload)
+
+
+def _analysis(batch_capacity=4, batch_interval=0.05):
+    analysis = TrafficCamouflageAnalysis()
+    analysis.batch_interval = batch_interval
+    analysis._free_batches = queue.Queue()
+    for _ in range(2):
+        analysis._free_batches.put_nowait(PacketBatch(batch_capacity))
+    return analysis
+
+
+def test_batch_is_submitted_when_full():
+    async def run():
+        analysis = _analysis(batch_capacity=4, batch_interval=60)
+        analysis._loop = asyncio.get_running_loop()
+        for _ in range(3):
+            analysis._capture_packet(_packet())
+        await asyncio.sleep(0)
+        assert analysis.analysis_queue.empty()
+
+        analysis._capture_packet(_packet())
+        await asyncio.sleep(0)
+        batch = analysis.analysis_queue.get_nowait()
+        assert batch.count == 4 and analysis._current_batch is None
+
+    asyncio.run(run())
+
+
+def test_partial_batch_is_flushed_by_its_deadline():
+    async def run():
+        analysis = _analysis(batch_capacity=4, batch_interval=0.05)
+        analysis._loop = asyncio.get_running_loop()
+        analysis._capture_packet(_packet())
+
+        remaining = analysis._flush_capture_batch()
+        assert 0 < remaining <= 0.05
+        await asyncio.sleep(remaining + 0.01)
+        assert analysis._flush_capture_batch() == analysis.batch_interval
+        await asyncio.sleep(0)
+        assert analysis.analysis_queue.get_nowait().count == 1
+
+    asyncio.run(run())
+
+
+def test_analysis_loop_flushes_partial_batches_without_more_packets():
+    async def run():
+        analysis = _analysis(batch_capacity=4, batch_interval=0.05)
+        analysis._loop = asyncio.get_running_loop()
+        task = asyncio.create_task(analysis._analyze_traffic_continuously())
+        analysis._capture_packet(_packet())
+        analysis._capture_packet(_packet())
+        await asyncio.sleep(0.3)
+        task.cancel()
+
+        assert analysis.traffic_stats['total_packets'] == 2
+        # The buffer went back to the free list for reuse
+        assert analysis._free_batches.qsize() == 2
+
+    asyncio.run(run())
+
+
+def test_batch_entropy_matches_scalar_entropy():
+    rng = np.random.default_rng(3)
+    payloads = [b"", b"\x00", b"aaaa", bytes(range(256)) * 2, b"\x00\x00\x01"]
+    payloads += [rng.integers(0, rng.integers(1, 257), rng.integers(0, 1500), dtype=np.uint8).tobytes()
+                 for _ in range(50)]
+
+    batch = PacketBatch(capacity=len(payloads))
+    for payload in payloads:
+        batch.append(0.0, len(payload), 1, 0, 0, 0, 0, 0, payload)
+    batch.compute_features()
+    expected = [scalar_entropy(payload) for payload in payloads]
+    assert np.allclose(batch.entropy[:batch.count], expected)
+    assert np.allclose(batch_entropy(batch.payloads[:batch.count], batch.payload_len[:batch.count]), expected)
+
+    # Reusing a buffer clears the stale tail of a longer earlier payload
+    batch.reset()
+    batch.append(0.0, 3, 1, 0, 0, 0, 0, 0, b"\x00ab")
+    batch.compute_features()
+    assert batch.entropy[0] == pytest.approx(scalar_entropy(b"\x00ab"))
+
+
+def legacy_is_suspicious(packet, recent, now):
+    """The per-packet check the vectorized mask replaced"""
+    indicators = 0
+    if packet['size'] < 60 or packet['size'] > 1500:
+        indicators += 1
+    if packet['entropy'] > 7.5:
+        indicators += 1
+    if packet['dst_port'] in {22, 23, 135, 139, 445, 1433, 3389, 5432}:
+        indicators += 1
+    if packet['flags'] & TCP_SYN and packet['flags'] & TCP_FIN:
+        indicators += 2
+    same_destination = [p for p in recent if p['timestamp'] > now - 1.0 and p['dst_ip'] == packet['dst_ip']]
+    if len(same_destination) > 50:
+        indicators += 1
+    return indicators >= 2
+
+
+def test_suspicious_mask_matches_per_packet_checks():
+    rng = np.random.default_rng(11)
+    analysis = TrafficCamouflageAnalysis()
+    batch = PacketBatch(capacity=400)
+    destinations = [ip_to_int(f"192.0.2.{i}") for i in range(1, 5)]
+    packets = []
+    for i in range(400):
+        # One busy destination gets most packets inside the last second
+        dst_ip = destinations[0] if i % 3 else int(rng.choice(destinations))
+        payload_size = int(rng.choice([0, 20, 600, 1400]))
+        payload = (rng.integers(0, 256, payload_size, dtype=np.uint8) if rng.random() < 0.5
+                   else np.zeros(payload_size, dtype=np.uint8)).tobytes()
+        packet = {
+            'timestamp': 1000.0 + i * 0.005,
+            'size': int(rng.choice([40, 59, 60, 800, 1500, 1501, 9000])),
+            'dst_ip': dst_ip,
+            'dst_port': int(rng.choice([22, 80, 443, 445, 3389, 8080])),
+            'flags': int(rng.choice([TCP_SYN, TCP_FIN, TCP_SYN | TCP_FIN, 0x10, 0x12])),
+            'entropy': scalar_entropy(payload),
+        }
+        packets.append(packet)
+        batch.append(packet['timestamp'], packet['size'], 1, ip_to_int("10.0.0.1"), dst_ip,
+                     40000, packet['dst_port'], packet['flags'], payload)
+
+    batch.compute_features()
+    columns = batch.columns()
+    analysis.packet_buffer.extend(columns)
+    mask = analysis._suspicious_packet_mask(columns)
+
+    now = packets[-1]['timestamp']
+    expected = [legacy_is_suspicious(packet, packets, now) for packet in packets]
+    assert mask.tolist() == expected
+    assert 0 < mask.sum() < len(packets)
+
+
+def test_timer_wheel_expires_items_exactly_when_due():
+    rng = random.Random(5)
+    # Small levels so schedules cascade through every level and the overflow list
+    wheel = TimerWheel(tick=1.0, level_sizes=(8, 4, 4), start=0)
+    deadlines = {item: rng.uniform(0, 500) for item in range(300)}
+    for item, deadline in deadlines.items():
+        wheel.schedule(item, deadline)
+    assert len(wheel) == 300
+
+    expired = set()
+    now = 0.0
+    while now < 520:
+        now += rng.uniform(0.1, 20)
+        batch = wheel.advance(now)
+        assert not expired & set(batch)
+        expired.update(batch)
+        assert expired == {item for item, deadline in deadlines.items() if int(deadline) <= int(now)}
+    assert len(wheel) == 0
+
+    # A deadline already in the past fires on the next tick
+    wheel.schedule("late", now - 50)
+    assert wheel.advance(now + wheel.tick) == ["late"]
+
+
+def _flow_columns(rows):
+    """Packet columns for (timestamp, size, src_port) rows between two fixed hosts"""
+    timestamps, sizes, ports = zip(*rows)
+    count = len(rows)
+    return {
+        'timestamp': np.array(timestamps, dtype=np.float64), 'size': np.array(sizes, dtype=np.int32),
+        'protocol': np.ones(count, dtype=np.uint8),
+        'src_ip': np.full(count, ip_to_int("10.0.0.1"), dtype=np.uint32),
+        'dst_ip': np.full(count, ip_to_int("10.0.0.2"), dtype=np.uint32),
+        'src_port': np.array(ports, dtype=np.uint16), 'dst_port': np.full(count, 443, dtype=np.uint16),
+    }
+
+
+def test_flow_table_updates_expires_and_rearms_idle_timers():
+    start = float(int(time.time()))
+    table = FlowTable(idle_timeout=300, capacity=2)
+    assert table.update(_flow_columns([(start, 100, 1), (start + 1, 200, 2), (start + 2, 50, 1),
+                                       (start + 3, 10, 3)])) == 3
+    assert len(table) == 3  # grew past its initial capacity
+
+    flows = table.top_flows()
+    assert [flow.total_bytes for flow in flows] == [200, 150, 10]
+    assert (flows[1].start_time, flows[1].end_time) == (start, start + 2)
+    assert table.update(_flow_columns([(start + 200, 5, 1)])) == 0
+
+    assert table.expire(start + 250) == 0
+    # Ports 2 and 3 were idle for the whole timeout; port 1 was seen at +200
+    assert table.expire(start + 303) == 2
+    assert [flow.total_bytes for flow in table.top_flows()] == [155]
+    # Its timer was re-armed for the new idle deadline rather than dropped
+    assert table.expire(start + 499) == 0
+    assert table.expire(start + 500) == 1
+    assert len(table) == 0 and table.stats == {'created': 3, 'expired': 3}
+
+    # Freed slots are reused for new flows
+    assert table.update(_flow_columns([(start + 600, 1, 9)])) == 1
+    assert len(table.free_slots) == 3
+
+
+def legacy_matches_signature(sizes, entropies, signature):
+    """The per-signature check CompiledSignatures replaced, on the packets up to one position"""
+    if len(sizes) < 3:
+        return False
+    packet_sizes = sizes[-10:]
+    size_similarity = 0.0
+    if signature.size_distribution:
+        observed, expected = np.mean(packet_sizes), np.mean(signature.size_distribution)
+        if observed and expected:
+            size_similarity = min(observed / expected, expected / observed)
+
+    feature_matches = 0
+    for feature, expected_value in signature.distinguishing_features.items():
+        if feature == "fixed_cell_size":
+            if all(size == expected_value for size in packet_sizes[-5:]):
+                feature_matches += 1
+        elif feature == "high_entropy":
+            if expected_value and all(entropy > 7.0 for entropy in entropies[-5:]):
+                feature_matches += 1
+    total_features = len(signature.distinguishing_features)
+    feature_confidence = feature_matches / total_features if total_features else 0
+    return (size_similarity + feature_confidence) / 2 > signature.confidence_score * 0.7
+
+
+def _signature(index, rng, cell_sizes):
+    features = {}
+    if rng.random() < 0.6:
+        features['fixed_cell_size'] = rng.choice(cell_sizes)
+    if rng.random() < 0.5:
+        features['high_entropy'] = rng.random() < 0.8
+    if rng.random() < 0.2:
+        features['timing_pattern'] = 'regular'
+    return FingerprintSignature(
+        signature_id=f"sig-{index}", pattern_type=TrafficPattern.WEB_BROWSING,
+        size_distribution=[rng.choice(cell_sizes + [1500]) for _ in range(rng.randint(0, 4))],
+        timing_distribution=[], protocol_sequence=[], entropy_profile=[],
+        distinguishing_features=features, confidence_score=rng.uniform(0.6, 1.3))
+
+
+def test_compiled_signatures_match_per_signature_checks():
+    rng = random.Random(17)
+    cell_sizes = [64, 512, 586, 1200]
+    # Well past 64 signatures, so no per-signature bitmask can overflow
+    signatures = [_signature(i, rng, cell_sizes) for i in range(150)]
+    compiled = CompiledSignatures(signatures)
+
+    for _ in range(40):
+        length = rng.randint(0, 30)
+        run = rng.choice(cell_sizes)
+        sizes = np.array([run if rng.random() < 0.7 else rng.choice(cell_sizes + [40, 1500])
+                          for _ in range(length)], dtype=np.int32)
+        entropies = np.array([rng.uniform(6.5, 8.0) for _ in range(length)])
+        evaluate_from = rng.randint(0, max(length - 1, 0))
+
+        expected = [any(legacy_matches_signature(list(sizes[:end + 1]), list(entropies[:end + 1]), signature)
+                        for end in range(evaluate_from, length))
+                    for signature in signatures]
+        assert compiled.match(sizes, entropies, evaluate_from).tolist() == expected
+
+
+def test_fixed_cell_size_signature_beyond_the_64th_matches():
+    filler = [FingerprintSignature(f"filler-{i}", TrafficPattern.WEB_BROWSING, [9000], [], [], [],
+                                   {'fixed_cell_size': 9000}, 1.3) for i in range(70)]
+    tor_like = FingerprintSignature("tor-like", TrafficPattern.WEB_BROWSING, [586], [], [], [],
+                                    {'fixed_cell_size': 586}, 1.0)
+    compiled = CompiledSignatures(filler + [tor_like])
+
+    matches = compiled.match(np.full(8, 586, dtype=np.int32), np.zeros(8))
+    assert matches.tolist() == [False] * 70 + [True]
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test Vuln Scanner Resume
+========================
+
+IntelligentVulnScanner.resume_scan against a fake nmap binary: completed
+shards are replayed from the checkpoint, pending shards rerun with the nmap
+arguments they were checkpointed with, and a large stderr stream does not
+stall the XML reader.
+"""
+
+import asyncio
+import json
+import sqlite3
+import sys
+import textwrap
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "linux-distribution" / "SynOS-Packages"
+                       / "synos-security-orchestrator" / "src"))
+
+from intelligent_vuln_scanner import IntelligentVulnScanner
+
+FAKE_NMAP = textwrap.dedent("""\
+    #!{python}
+    import sys
+    with open({log!r}, 'a') as log:
+        log.write(' '.join(sys.argv[1:]) + '\\n')
+    # More than a pipe buffer of stderr before any XML
+    sys.stderr.write('warning: fake nmap\\n' * 20000)
+    sys.stderr.flush()
+    shard = sys.argv[-1]
+    host = shard.split('/')[0]
+    sys.stdout.write(
+        '<?xml version="1.0"?><nmaprun>'
+        '<host><address addr="' + host + '" addrtype="ipv4"/><ports>'
+        '<port protocol="tcp" portid="22"><state state="open"/>'
+        '<service name="ssh" product="OpenSSH" version="7.4"/></port>'
+        '</ports></host></nmaprun>'
+    )
+""")
+
+
+def test_resume_reuses_checkpointed_nmap_args(tmp_path):
+    log_path = tmp_path / "nmap_calls.log"
+    fake_nmap = tmp_path / "nmap"
+    fake_nmap.write_text(FAKE_NMAP.format(python=sys.executable, log=str(log_path)))
+    fake_nmap.chmod(0o755)
+
+    scanner = IntelligentVulnScanner(db_path=str(tmp_path / "scans.db"),
+                                     cve_db_path=str(tmp_path / "cve.db"))
+    scanner.scan_scheduler.nmap_binary = str(fake_nmap)
+
+    scan_id = "scan-interrupted"
+    original_args = "-sV -T3 --script=banner"
+    with sqlite3.connect(scanner.db_path) as conn:
+        conn.execute("INSERT INTO scans (scan_id, target, scan_type, start_time) VALUES (?, ?, ?, ?)",
+                     (scan_id, "10.0.0.0/27", "network", datetime.now()))
+        conn.execute("INSERT INTO scan_shards (scan_id, shard, nmap_args, status, results) VALUES (?, ?, ?, ?, ?)",
+                     (scan_id, "10.0.0.0/28", original_args, "completed",
+                      json.dumps([{'host': '10.0.0.1', 'ports': []}])))
+        conn.execute("INSERT INTO scan_shards (scan_id, shard, nmap_args) VALUES (?, ?, ?)",
+                     (scan_id, "10.0.0.16/28", original_args))
+        conn.commit()
+
+    async def resume():
+        assert await scanner.resume_scan(scan_id)
+        await asyncio.wait_for(scanner.active_scans[scan_id], timeout=30)
+
+    asyncio.run(resume())
+
+    # Only the pending shard ran, with the arguments it was checkpointed with
+    calls = log_path.read_text().splitlines()
+    assert calls == [f"{original_args} -oX - 10.0.0.16/28"]
+    assert scanner.scan_scheduler.get_progress(scan_id) == {'completed': 2}
+
+    with sqlite3.connect(scanner.db_path) as conn:
+        results = conn.execute("SELECT results FROM scan_shards WHERE scan_id = ? AND shard = ?",
+                               (scan_id, "10.0.0.16/28")).fetchone()[0]
+        status = conn.execute("SELECT status FROM scans WHERE scan_id = ?", (scan_id,)).fetchone()[0]
+    assert json.loads(results)[0]['host'] == "10.0.0.16"
+    assert status == 'completed'